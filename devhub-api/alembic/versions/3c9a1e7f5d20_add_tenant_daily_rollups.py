@@ -0,0 +1,78 @@
+"""add_tenant_daily_rollups
+
+Revision ID: 3c9a1e7f5d20
+Revises: b57e09d3c6f1
+Create Date: 2026-10-19 13:42:10.318552
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c9a1e7f5d20'
+down_revision: Union[str, None] = 'b57e09d3c6f1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('tenant_daily_rollups',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('tenant_id', sa.String(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('metric', sa.String(length=50), nullable=False),
+    sa.Column('dimension', sa.String(length=100), nullable=False),
+    sa.Column('value', sa.Numeric(precision=14, scale=2), nullable=False),
+    sa.ForeignKeyConstraint(['tenant_id'], ['tenants.system_id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('tenant_id', 'day', 'metric', 'dimension', name='uq_tenant_daily_rollup')
+    )
+    op.create_index(op.f('ix_tenant_daily_rollups_id'), 'tenant_daily_rollups', ['id'], unique=False)
+    op.create_index('idx_tenant_daily_rollup_metric_day', 'tenant_daily_rollups', ['tenant_id', 'metric', 'day'], unique=False)
+
+    # Backfill from existing rows; the service keeps them current afterwards
+    op.execute("""
+        INSERT INTO tenant_daily_rollups (tenant_id, day, metric, dimension, value)
+        SELECT tenant_id, day, metric, dimension, SUM(value)
+        FROM (
+            SELECT tenant_id, COALESCE(created_at, timezone('UTC', now()))::date AS day,
+                   'new_customers' AS metric, '' AS dimension, 1 AS value
+            FROM customers
+            UNION ALL
+            SELECT tenant_id, COALESCE(created_at, timezone('UTC', now()))::date,
+                   'new_leads', COALESCE(source, ''), 1
+            FROM leads
+            UNION ALL
+            SELECT tenant_id, COALESCE(updated_at, created_at, timezone('UTC', now()))::date,
+                   'conversions', COALESCE(source, ''), 1
+            FROM leads WHERE converted_to_customer
+            UNION ALL
+            SELECT tenant_id, COALESCE(created_at, timezone('UTC', now()))::date,
+                   'leads_in_stage', COALESCE(stage, ''), 1
+            FROM leads
+            UNION ALL
+            SELECT tenant_id, COALESCE(created_at, timezone('UTC', now()))::date,
+                   'stage_value', COALESCE(stage, ''), COALESCE(estimated_value, 0)
+            FROM leads
+            UNION ALL
+            SELECT tenant_id, COALESCE(created_at, timezone('UTC', now()))::date,
+                   'qualified_leads', '', 1
+            FROM leads WHERE qualification_status = 'qualified'
+            UNION ALL
+            SELECT c.tenant_id, COALESCE(i.created_at, timezone('UTC', now()))::date,
+                   'interactions', '', 1
+            FROM customer_interactions i
+            JOIN customers c ON c.system_id = i.customer_id
+        ) facts
+        WHERE tenant_id IS NOT NULL
+        GROUP BY tenant_id, day, metric, dimension
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_tenant_daily_rollup_metric_day', table_name='tenant_daily_rollups')
+    op.drop_index(op.f('ix_tenant_daily_rollups_id'), table_name='tenant_daily_rollups')
+    op.drop_table('tenant_daily_rollups')
@@ -0,0 +1,65 @@
+"""add_incremental_integrity_scanning
+
+Revision ID: 8d2f41c7a9e3
+Revises: 47d23c886898
+Create Date: 2026-10-19 10:12:31.418207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d2f41c7a9e3'
+down_revision: Union[str, None] = '47d23c886898'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+WATERMARKED_TABLES = ['users', 'projects', 'customers', 'invoices']
+
+
+def upgrade() -> None:
+    op.create_table('sync_watermarks',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('scope', sa.String(length=100), nullable=False),
+    sa.Column('last_updated_at', sa.DateTime(), nullable=True),
+    sa.Column('last_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('scope')
+    )
+    op.create_index(op.f('ix_sync_watermarks_id'), 'sync_watermarks', ['id'], unique=False)
+    op.create_table('integrity_issues',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('check_name', sa.String(length=100), nullable=False),
+    sa.Column('category', sa.String(length=50), nullable=False),
+    sa.Column('table_name', sa.String(length=100), nullable=False),
+    sa.Column('record_key', sa.String(), nullable=False),
+    sa.Column('message', sa.Text(), nullable=False),
+    sa.Column('first_seen_at', sa.DateTime(), nullable=False),
+    sa.Column('last_seen_at', sa.DateTime(), nullable=False),
+    sa.Column('resolved_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('check_name', 'record_key', name='uq_integrity_issue_check_record')
+    )
+    op.create_index(op.f('ix_integrity_issues_id'), 'integrity_issues', ['id'], unique=False)
+    op.create_index('idx_integrity_issue_open', 'integrity_issues', ['category', 'check_name'], unique=False,
+                    postgresql_where=sa.text('resolved_at IS NULL'))
+    # Watermark range scans on updated_at must not fall back to sequential scans
+    for table_name in WATERMARKED_TABLES:
+        op.create_index(f'idx_{table_name}_updated_at', table_name, ['updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    for table_name in WATERMARKED_TABLES:
+        op.drop_index(f'idx_{table_name}_updated_at', table_name=table_name)
+    op.drop_index('idx_integrity_issue_open', table_name='integrity_issues',
+                  postgresql_where=sa.text('resolved_at IS NULL'))
+    op.drop_index(op.f('ix_integrity_issues_id'), table_name='integrity_issues')
+    op.drop_table('integrity_issues')
+    op.drop_index(op.f('ix_sync_watermarks_id'), table_name='sync_watermarks')
+    op.drop_table('sync_watermarks')
@@ -0,0 +1,31 @@
+"""add_invoice_aging_index
+
+Revision ID: a1c8e5d3f296
+Revises: f7d3b1e6a042
+Create Date: 2026-10-19 22:37:09.582614
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a1c8e5d3f296'
+down_revision: Union[str, None] = 'f7d3b1e6a042'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Partial covering index: the aging report reads unpaid invoices per customer without touching the heap
+    op.create_index(
+        'idx_invoices_customer_outstanding', 'invoices', ['customer_id'], unique=False,
+        postgresql_include=['due_date', 'amount', 'currency'],
+        postgresql_where=sa.text("status NOT IN ('paid', 'cancelled', 'draft')")
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_invoices_customer_outstanding', table_name='invoices')
@@ -0,0 +1,28 @@
+"""add_lead_interaction_indexes
+
+Revision ID: a7c2e9d41f58
+Revises: f19c4d7a2b83
+Create Date: 2026-10-19 19:14:37.208451
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7c2e9d41f58'
+down_revision: Union[str, None] = 'f19c4d7a2b83'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Per-lead feature aggregation and the incremental lead scoring change scan
+    op.create_index('idx_lead_interactions_lead', 'lead_interactions', ['lead_id'], unique=False)
+    op.create_index('idx_lead_interactions_updated_at', 'lead_interactions', ['updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_lead_interactions_updated_at', table_name='lead_interactions')
+    op.drop_index('idx_lead_interactions_lead', table_name='lead_interactions')
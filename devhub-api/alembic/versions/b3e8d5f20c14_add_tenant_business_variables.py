@@ -0,0 +1,26 @@
+"""add_tenant_business_variables
+
+Revision ID: b3e8d5f20c14
+Revises: a7c2e9d41f58
+Create Date: 2026-10-19 20:03:52.661904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3e8d5f20c14'
+down_revision: Union[str, None] = 'a7c2e9d41f58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('tenants', sa.Column('business_variables', sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('tenants', 'business_variables')
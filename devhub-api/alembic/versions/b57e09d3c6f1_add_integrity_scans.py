@@ -0,0 +1,45 @@
+"""add_integrity_scans
+
+Revision ID: b57e09d3c6f1
+Revises: 8d2f41c7a9e3
+Create Date: 2026-10-19 11:03:52.771604
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b57e09d3c6f1'
+down_revision: Union[str, None] = '8d2f41c7a9e3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('integrity_scans',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('job_id', sa.String(length=32), nullable=False),
+    sa.Column('trigger', sa.String(length=20), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('requested_at', sa.DateTime(), nullable=False),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.Column('severity', sa.String(length=20), nullable=True),
+    sa.Column('total_issues', sa.Integer(), nullable=True),
+    sa.Column('result', sa.Text(), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_integrity_scans_id'), 'integrity_scans', ['id'], unique=False)
+    op.create_index(op.f('ix_integrity_scans_job_id'), 'integrity_scans', ['job_id'], unique=True)
+    op.create_index('idx_integrity_scan_status_finished', 'integrity_scans', ['status', 'finished_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_integrity_scan_status_finished', table_name='integrity_scans')
+    op.drop_index(op.f('ix_integrity_scans_job_id'), table_name='integrity_scans')
+    op.drop_index(op.f('ix_integrity_scans_id'), table_name='integrity_scans')
+    op.drop_table('integrity_scans')
@@ -0,0 +1,63 @@
+"""add_recurring_invoice_templates
+
+Revision ID: b9e2d4a7c031
+Revises: a1c8e5d3f296
+Create Date: 2026-10-19 23:02:18.447061
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b9e2d4a7c031'
+down_revision: Union[str, None] = 'a1c8e5d3f296'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('recurring_invoice_templates',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('system_id', sa.String(), nullable=True),
+    sa.Column('tenant_id', sa.String(length=50), nullable=False),
+    sa.Column('customer_id', sa.String(length=50), nullable=False),
+    sa.Column('project_id', sa.String(length=50), nullable=True),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('amount', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('currency', sa.String(length=3), nullable=False),
+    sa.Column('frequency', sa.String(length=20), nullable=False),
+    sa.Column('payment_terms_days', sa.Integer(), nullable=False),
+    sa.Column('start_date', sa.Date(), nullable=False),
+    sa.Column('end_date', sa.Date(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['tenant_id'], ['tenants.system_id'], ),
+    sa.ForeignKeyConstraint(['customer_id'], ['customers.system_id'], ),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.system_id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_recurring_invoice_templates_id'), 'recurring_invoice_templates', ['id'], unique=False)
+    op.create_index(op.f('ix_recurring_invoice_templates_system_id'), 'recurring_invoice_templates', ['system_id'], unique=True)
+    op.create_index('idx_recurring_templates_tenant_active', 'recurring_invoice_templates', ['tenant_id', 'id'],
+                    unique=False, postgresql_where=sa.text('is_active'))
+
+    op.add_column('invoices', sa.Column('recurring_template_id', sa.Integer(), nullable=True))
+    op.add_column('invoices', sa.Column('billing_period', sa.Date(), nullable=True))
+    op.create_foreign_key('fk_invoices_recurring_template', 'invoices', 'recurring_invoice_templates',
+                          ['recurring_template_id'], ['id'])
+    op.create_index('uq_invoices_recurring_period', 'invoices', ['recurring_template_id', 'billing_period'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('uq_invoices_recurring_period', table_name='invoices')
+    op.drop_constraint('fk_invoices_recurring_template', 'invoices', type_='foreignkey')
+    op.drop_column('invoices', 'billing_period')
+    op.drop_column('invoices', 'recurring_template_id')
+    op.drop_index('idx_recurring_templates_tenant_active', table_name='recurring_invoice_templates')
+    op.drop_index(op.f('ix_recurring_invoice_templates_system_id'), table_name='recurring_invoice_templates')
+    op.drop_index(op.f('ix_recurring_invoice_templates_id'), table_name='recurring_invoice_templates')
+    op.drop_table('recurring_invoice_templates')
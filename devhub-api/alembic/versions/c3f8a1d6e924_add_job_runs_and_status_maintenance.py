@@ -0,0 +1,55 @@
+"""add_job_runs_and_status_maintenance
+
+Revision ID: c3f8a1d6e924
+Revises: b9e2d4a7c031
+Create Date: 2026-10-19 23:48:05.213774
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3f8a1d6e924'
+down_revision: Union[str, None] = 'b9e2d4a7c031'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('job_runs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('job_name', sa.String(length=100), nullable=False),
+    sa.Column('job_id', sa.String(length=32), nullable=False),
+    sa.Column('trigger', sa.String(length=20), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('started_at', sa.DateTime(), nullable=False),
+    sa.Column('finished_at', sa.DateTime(), nullable=False),
+    sa.Column('duration_ms', sa.Integer(), nullable=False),
+    sa.Column('rows_affected', sa.Integer(), nullable=True),
+    sa.Column('batches', sa.Integer(), nullable=True),
+    sa.Column('details', sa.Text(), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_job_runs_id'), 'job_runs', ['id'], unique=False)
+    op.create_index('idx_job_runs_name_started', 'job_runs', ['job_name', 'started_at'], unique=False)
+
+    # Constant default: no table rewrite; the first stale-lead run sets the real values
+    op.add_column('leads', sa.Column('is_stale', sa.Boolean(), server_default=sa.false(), nullable=False))
+    op.create_index('idx_leads_tenant_stale', 'leads', ['tenant_id'], unique=False,
+                    postgresql_where=sa.text('is_stale'))
+
+    op.create_index('idx_invoices_open_due', 'invoices', ['due_date', 'id'], unique=False,
+                    postgresql_where=sa.text("status IN ('pending', 'sent', 'viewed')"))
+
+
+def downgrade() -> None:
+    op.drop_index('idx_invoices_open_due', table_name='invoices')
+    op.drop_index('idx_leads_tenant_stale', table_name='leads')
+    op.drop_column('leads', 'is_stale')
+    op.drop_index('idx_job_runs_name_started', table_name='job_runs')
+    op.drop_index(op.f('ix_job_runs_id'), table_name='job_runs')
+    op.drop_table('job_runs')
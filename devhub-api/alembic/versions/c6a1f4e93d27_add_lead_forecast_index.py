@@ -0,0 +1,32 @@
+"""add_lead_forecast_index
+
+Revision ID: c6a1f4e93d27
+Revises: b3e8d5f20c14
+Create Date: 2026-10-19 20:48:15.930127
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c6a1f4e93d27'
+down_revision: Union[str, None] = 'b3e8d5f20c14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Partial covering index: the forecast reads open deals of one tenant without touching the heap
+    op.create_index(
+        'idx_leads_tenant_open_forecast', 'leads', ['tenant_id'], unique=False,
+        postgresql_include=['stage', 'assigned_to', 'expected_close_date', 'estimated_value',
+                            'probability', 'is_active', 'converted_to_customer'],
+        postgresql_where=sa.text("coalesce(stage, '') NOT IN ('closed_won', 'closed_lost')")
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_leads_tenant_open_forecast', table_name='leads')
@@ -0,0 +1,55 @@
+"""add_lead_stage_events
+
+Revision ID: d2f7b6a38e51
+Revises: c6a1f4e93d27
+Create Date: 2026-10-19 21:26:40.118372
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2f7b6a38e51'
+down_revision: Union[str, None] = 'c6a1f4e93d27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'lead_stage_events',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('tenant_id', sa.String(), nullable=False),
+        sa.Column('lead_id', sa.String(), nullable=False),
+        sa.Column('from_stage', sa.String(), nullable=True),
+        sa.Column('to_stage', sa.String(), nullable=True),
+        sa.Column('changed_by', sa.String(), nullable=True),
+        sa.Column('changed_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['tenant_id'], ['tenants.system_id'], ),
+        sa.ForeignKeyConstraint(['lead_id'], ['leads.system_id'], ),
+        sa.ForeignKeyConstraint(['changed_by'], ['users.system_id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_lead_stage_events_id'), 'lead_stage_events', ['id'], unique=False)
+    op.create_index('idx_lead_stage_events_tenant_changed', 'lead_stage_events', ['tenant_id', 'changed_at'], unique=False)
+    op.create_index('idx_lead_stage_events_lead_changed', 'lead_stage_events', ['lead_id', 'changed_at'], unique=False)
+
+    # Seed one event per existing lead. The real entry time of the current stage is unknown;
+    # updated_at is the latest it can be, so existing deals are never reported as stalled too early.
+    op.execute("""
+        INSERT INTO lead_stage_events (tenant_id, lead_id, from_stage, to_stage, changed_at)
+        SELECT tenant_id, system_id, NULL, stage,
+               coalesce(updated_at, created_at, timezone('UTC', now()))
+        FROM leads
+        WHERE system_id IS NOT NULL
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_lead_stage_events_lead_changed', table_name='lead_stage_events')
+    op.drop_index('idx_lead_stage_events_tenant_changed', table_name='lead_stage_events')
+    op.drop_index(op.f('ix_lead_stage_events_id'), table_name='lead_stage_events')
+    op.drop_table('lead_stage_events')
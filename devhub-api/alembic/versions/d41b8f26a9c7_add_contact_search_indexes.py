@@ -0,0 +1,49 @@
+"""add_contact_search_indexes
+
+Revision ID: d41b8f26a9c7
+Revises: 3c9a1e7f5d20
+Create Date: 2026-10-19 15:20:37.904116
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd41b8f26a9c7'
+down_revision: Union[str, None] = '3c9a1e7f5d20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SEARCH_TEXT_SQL = "lower(coalesce(company, '') || ' ' || coalesce(name, '') || ' ' || coalesce(email, ''))"
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('simple'::regconfig, coalesce(company, '')), 'A') || "
+    "setweight(to_tsvector('simple'::regconfig, coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('simple'::regconfig, coalesce(email, '')), 'B')"
+)
+
+
+def upgrade() -> None:
+    # pg_trgm for substring matching, btree_gin so tenant_id can lead the GIN indexes
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gin")
+
+    for table in ('customers', 'leads'):
+        # Stored generated columns rewrite the table once
+        op.add_column(table, sa.Column('search_text', sa.Text(), sa.Computed(SEARCH_TEXT_SQL, persisted=True), nullable=True))
+        op.add_column(table, sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed(SEARCH_VECTOR_SQL, persisted=True), nullable=True))
+        op.create_index(f'idx_{table}_search_vector', table, ['tenant_id', 'search_vector'], unique=False, postgresql_using='gin')
+        op.create_index(f'idx_{table}_search_trgm', table, ['tenant_id', 'search_text'], unique=False, postgresql_using='gin',
+                        postgresql_ops={'search_text': 'gin_trgm_ops'})
+
+
+def downgrade() -> None:
+    for table in ('customers', 'leads'):
+        op.drop_index(f'idx_{table}_search_trgm', table_name=table)
+        op.drop_index(f'idx_{table}_search_vector', table_name=table)
+        op.drop_column(table, 'search_vector')
+        op.drop_column(table, 'search_text')
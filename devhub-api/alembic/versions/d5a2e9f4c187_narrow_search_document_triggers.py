@@ -0,0 +1,163 @@
+"""narrow_search_document_triggers
+
+Revision ID: d5a2e9f4c187
+Revises: c3f8a1d6e924
+Create Date: 2026-10-20 10:12:41.538026
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5a2e9f4c187'
+down_revision: Union[str, None] = 'c3f8a1d6e924'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# entity_type -> (source table, columns the search document is built from)
+SOURCES = {
+    'customer': ('customers', ['tenant_id', 'system_id', 'company', 'name', 'email', 'phone', 'city']),
+    'lead': ('leads', ['tenant_id', 'system_id', 'company', 'name', 'email', 'job_title', 'source', 'stage']),
+    'project': ('projects', ['tenant_id', 'system_id', 'name', 'description']),
+    'invoice': ('invoices', ['system_id', 'customer_id', 'amount', 'currency']),
+    'note': ('customer_notes', ['customer_id', 'system_id', 'title', 'content', 'is_private']),
+    'interaction': ('customer_interactions', ['customer_id', 'system_id', 'subject', 'interaction_type',
+                                              'description', 'outcome']),
+}
+
+# Old documents are removed by (tenant_id, entity_type, system_id) so the delete prunes to
+# one hash partition. Invoice documents no longer carry the status: it changes on every
+# payment and overdue run, and the invoice list filters on it directly.
+SYNC_FUNCTION = """
+CREATE OR REPLACE FUNCTION search_documents_sync() RETURNS trigger AS $$
+DECLARE
+    old_tenant TEXT;
+    doc_tenant TEXT;
+    doc_title TEXT;
+    doc_body TEXT;
+    customer_name TEXT;
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        IF TG_TABLE_NAME IN ('customers', 'leads', 'projects') THEN
+            old_tenant := OLD.tenant_id;
+        ELSE
+            SELECT tenant_id INTO old_tenant FROM customers WHERE system_id = OLD.customer_id;
+        END IF;
+
+        IF old_tenant IS NOT NULL THEN
+            DELETE FROM search_documents
+            WHERE tenant_id = old_tenant AND entity_type = TG_ARGV[0] AND system_id = OLD.system_id;
+        ELSE
+            -- Customer already gone: fall back to searching every partition
+            DELETE FROM search_documents
+            WHERE entity_type = TG_ARGV[0] AND system_id = OLD.system_id;
+        END IF;
+    END IF;
+    IF TG_OP = 'DELETE' THEN
+        RETURN OLD;
+    END IF;
+
+    IF TG_TABLE_NAME = 'customers' THEN
+        doc_tenant := NEW.tenant_id;
+        doc_title := coalesce(NEW.company, NEW.name, NEW.system_id);
+        doc_body := concat_ws(' ', NEW.name, NEW.email, NEW.phone, NEW.city);
+    ELSIF TG_TABLE_NAME = 'leads' THEN
+        doc_tenant := NEW.tenant_id;
+        doc_title := coalesce(NEW.company, NEW.name, NEW.system_id);
+        doc_body := concat_ws(' ', NEW.name, NEW.email, NEW.job_title, NEW.source, NEW.stage);
+    ELSIF TG_TABLE_NAME = 'projects' THEN
+        doc_tenant := NEW.tenant_id;
+        doc_title := NEW.name;
+        doc_body := NEW.description;
+    ELSIF TG_TABLE_NAME = 'invoices' THEN
+        SELECT tenant_id, coalesce(company, name) INTO doc_tenant, customer_name
+        FROM customers WHERE system_id = NEW.customer_id;
+        doc_title := 'Invoice ' || NEW.system_id;
+        doc_body := concat_ws(' ', customer_name, NEW.amount, NEW.currency);
+    ELSIF TG_TABLE_NAME = 'customer_notes' THEN
+        IF coalesce(NEW.is_private, false) THEN
+            RETURN NEW;
+        END IF;
+        SELECT tenant_id INTO doc_tenant FROM customers WHERE system_id = NEW.customer_id;
+        doc_title := coalesce(NEW.title, 'Note');
+        doc_body := NEW.content;
+    ELSIF TG_TABLE_NAME = 'customer_interactions' THEN
+        SELECT tenant_id INTO doc_tenant FROM customers WHERE system_id = NEW.customer_id;
+        doc_title := coalesce(NEW.subject, NEW.interaction_type, 'Interaction');
+        doc_body := concat_ws(' ', NEW.description, NEW.outcome);
+    END IF;
+
+    IF doc_tenant IS NULL OR NEW.system_id IS NULL THEN
+        RETURN NEW;
+    END IF;
+
+    INSERT INTO search_documents (tenant_id, entity_type, system_id, title, snippet, search_vector, updated_at)
+    VALUES (
+        doc_tenant, TG_ARGV[0], NEW.system_id, coalesce(doc_title, NEW.system_id), left(doc_body, 200),
+        setweight(to_tsvector('simple', coalesce(doc_title, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(doc_body, '')), 'B'),
+        timezone('UTC', now())
+    )
+    ON CONFLICT (tenant_id, entity_type, system_id) DO UPDATE SET
+        title = EXCLUDED.title,
+        snippet = EXCLUDED.snippet,
+        search_vector = EXCLUDED.search_vector,
+        updated_at = EXCLUDED.updated_at;
+
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+# Rebuild invoice documents without the status
+INVOICE_BACKFILL = """
+    INSERT INTO search_documents (tenant_id, entity_type, system_id, title, snippet, search_vector, updated_at)
+    SELECT c.tenant_id, 'invoice', i.system_id, 'Invoice ' || i.system_id,
+           left(concat_ws(' ', coalesce(c.company, c.name), i.amount, i.currency), 200),
+           setweight(to_tsvector('simple', 'Invoice ' || i.system_id), 'A') ||
+           setweight(to_tsvector('simple', concat_ws(' ', coalesce(c.company, c.name), i.amount, i.currency)), 'B'),
+           timezone('UTC', now())
+    FROM invoices i JOIN customers c ON c.system_id = i.customer_id
+    WHERE c.tenant_id IS NOT NULL AND i.system_id IS NOT NULL
+    ON CONFLICT (tenant_id, entity_type, system_id) DO UPDATE SET
+        snippet = EXCLUDED.snippet,
+        search_vector = EXCLUDED.search_vector,
+        updated_at = EXCLUDED.updated_at
+"""
+
+
+def upgrade() -> None:
+    op.execute(SYNC_FUNCTION)
+    for entity_type, (table, columns) in SOURCES.items():
+        old_values = ", ".join(f"OLD.{column}" for column in columns)
+        new_values = ", ".join(f"NEW.{column}" for column in columns)
+        op.execute(f"DROP TRIGGER IF EXISTS trg_{table}_search_documents ON {table}")
+        op.execute(
+            f"CREATE TRIGGER trg_{table}_search_documents "
+            f"AFTER INSERT OR DELETE ON {table} "
+            f"FOR EACH ROW EXECUTE FUNCTION search_documents_sync('{entity_type}')"
+        )
+        # Bulk updates of other columns (scores, flags, statuses) leave the index alone
+        op.execute(
+            f"CREATE TRIGGER trg_{table}_search_documents_update "
+            f"AFTER UPDATE OF {', '.join(columns)} ON {table} "
+            f"FOR EACH ROW WHEN (({old_values}) IS DISTINCT FROM ({new_values})) "
+            f"EXECUTE FUNCTION search_documents_sync('{entity_type}')"
+        )
+    op.execute(INVOICE_BACKFILL)
+
+
+def downgrade() -> None:
+    # The function keeps its partition-pruning delete; only the trigger events are restored
+    for entity_type, (table, _) in SOURCES.items():
+        op.execute(f"DROP TRIGGER IF EXISTS trg_{table}_search_documents_update ON {table}")
+        op.execute(f"DROP TRIGGER IF EXISTS trg_{table}_search_documents ON {table}")
+        op.execute(
+            f"CREATE TRIGGER trg_{table}_search_documents "
+            f"AFTER INSERT OR UPDATE OR DELETE ON {table} "
+            f"FOR EACH ROW EXECUTE FUNCTION search_documents_sync('{entity_type}')"
+        )
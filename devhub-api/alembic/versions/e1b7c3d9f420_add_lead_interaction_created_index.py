@@ -0,0 +1,26 @@
+"""add_lead_interaction_created_index
+
+Revision ID: e1b7c3d9f420
+Revises: d5a2e9f4c187
+Create Date: 2026-10-20 11:03:27.614902
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e1b7c3d9f420'
+down_revision: Union[str, None] = 'd5a2e9f4c187'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Lead scoring re-scores leads whose interactions left the recent window since its last run
+    op.create_index('idx_lead_interactions_created_at', 'lead_interactions', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_lead_interactions_created_at', table_name='lead_interactions')
@@ -0,0 +1,79 @@
+"""add_invoice_numeric_amount
+
+Revision ID: e4a9c2f7b815
+Revises: d2f7b6a38e51
+Create Date: 2026-10-19 22:04:52.671390
+
+Expand step of the invoices.amount VARCHAR -> NUMERIC(12,2) migration. Adds a shadow
+amount_numeric column that a trigger keeps in sync with every write to amount, then
+backfills existing rows in id batches, each committed on its own so no long lock or
+transaction is held. The contract step (f7d3b1e6a042) swaps the columns; stopping at this
+revision leaves the application fully working on the old column.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4a9c2f7b815'
+down_revision: Union[str, None] = 'd2f7b6a38e51'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+BATCH_SIZE = 5000
+
+# Accepts plain numbers plus a leading currency symbol or code and thousands separators
+# ("$1,200.50", "USD 99"); anything else, or values out of NUMERIC(12,2) range, yields NULL
+PARSE_FUNCTION = r"""
+CREATE OR REPLACE FUNCTION invoice_amount_numeric(value TEXT) RETURNS NUMERIC AS $$
+DECLARE
+    cleaned TEXT := regexp_replace(btrim(value), '^[^0-9-]+|,', '', 'g');
+BEGIN
+    IF cleaned ~ '^-?[0-9]{1,10}(\.[0-9]+)?$' THEN
+        RETURN round(CAST(cleaned AS NUMERIC), 2);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql IMMUTABLE
+"""
+
+DUAL_WRITE_FUNCTION = """
+CREATE OR REPLACE FUNCTION invoices_amount_dual_write() RETURNS TRIGGER AS $$
+BEGIN
+    NEW.amount_numeric := invoice_amount_numeric(NEW.amount);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+
+def upgrade() -> None:
+    op.add_column('invoices', sa.Column('amount_numeric', sa.Numeric(12, 2), nullable=True))
+    op.execute(PARSE_FUNCTION)
+    op.execute(DUAL_WRITE_FUNCTION)
+    op.execute(
+        "CREATE TRIGGER trg_invoices_amount_dual_write "
+        "BEFORE INSERT OR UPDATE OF amount ON invoices "
+        "FOR EACH ROW EXECUTE FUNCTION invoices_amount_dual_write()"
+    )
+
+    # Rows written from here on are covered by the trigger; backfill the rest one committed
+    # batch at a time (the UPDATE does not touch amount, so the trigger does not refire)
+    max_id = op.get_bind().execute(sa.text("SELECT coalesce(max(id), 0) FROM invoices")).scalar()
+    with op.get_context().autocommit_block():
+        for start in range(0, max_id + 1, BATCH_SIZE):
+            op.execute(sa.text("""
+                UPDATE invoices SET amount_numeric = invoice_amount_numeric(amount)
+                WHERE id >= :start AND id < :stop AND amount_numeric IS NULL AND amount IS NOT NULL
+            """).bindparams(start=start, stop=start + BATCH_SIZE))
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS trg_invoices_amount_dual_write ON invoices")
+    op.execute("DROP FUNCTION IF EXISTS invoices_amount_dual_write()")
+    op.execute("DROP FUNCTION IF EXISTS invoice_amount_numeric(TEXT)")
+    op.drop_column('invoices', 'amount_numeric')
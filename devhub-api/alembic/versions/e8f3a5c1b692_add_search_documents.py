@@ -0,0 +1,184 @@
+"""add_search_documents
+
+Revision ID: e8f3a5c1b692
+Revises: d41b8f26a9c7
+Create Date: 2026-10-19 16:48:05.127390
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8f3a5c1b692'
+down_revision: Union[str, None] = 'd41b8f26a9c7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+PARTITIONS = 16
+
+# entity_type -> source table
+SOURCES = {
+    'customer': 'customers',
+    'lead': 'leads',
+    'project': 'projects',
+    'invoice': 'invoices',
+    'note': 'customer_notes',
+    'interaction': 'customer_interactions',
+}
+
+# (tenant_id, system_id, title, body) per entity, used for the backfill
+BACKFILL_SELECTS = {
+    'customer': """
+        SELECT tenant_id, system_id, coalesce(company, name, system_id),
+               concat_ws(' ', name, email, phone, city)
+        FROM customers
+    """,
+    'lead': """
+        SELECT tenant_id, system_id, coalesce(company, name, system_id),
+               concat_ws(' ', name, email, job_title, source, stage)
+        FROM leads
+    """,
+    'project': """
+        SELECT tenant_id, system_id, name, description
+        FROM projects
+    """,
+    'invoice': """
+        SELECT c.tenant_id, i.system_id, 'Invoice ' || i.system_id,
+               concat_ws(' ', coalesce(c.company, c.name), i.amount, i.currency, i.status)
+        FROM invoices i JOIN customers c ON c.system_id = i.customer_id
+    """,
+    'note': """
+        SELECT c.tenant_id, n.system_id, coalesce(n.title, 'Note'), n.content
+        FROM customer_notes n JOIN customers c ON c.system_id = n.customer_id
+        WHERE NOT coalesce(n.is_private, false)
+    """,
+    'interaction': """
+        SELECT c.tenant_id, i.system_id, coalesce(i.subject, i.interaction_type, 'Interaction'),
+               concat_ws(' ', i.description, i.outcome)
+        FROM customer_interactions i JOIN customers c ON c.system_id = i.customer_id
+    """,
+}
+
+SYNC_FUNCTION = """
+CREATE OR REPLACE FUNCTION search_documents_sync() RETURNS trigger AS $$
+DECLARE
+    doc_tenant TEXT;
+    doc_title TEXT;
+    doc_body TEXT;
+    customer_name TEXT;
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        DELETE FROM search_documents
+        WHERE entity_type = TG_ARGV[0] AND system_id = OLD.system_id;
+    END IF;
+    IF TG_OP = 'DELETE' THEN
+        RETURN OLD;
+    END IF;
+
+    IF TG_TABLE_NAME = 'customers' THEN
+        doc_tenant := NEW.tenant_id;
+        doc_title := coalesce(NEW.company, NEW.name, NEW.system_id);
+        doc_body := concat_ws(' ', NEW.name, NEW.email, NEW.phone, NEW.city);
+    ELSIF TG_TABLE_NAME = 'leads' THEN
+        doc_tenant := NEW.tenant_id;
+        doc_title := coalesce(NEW.company, NEW.name, NEW.system_id);
+        doc_body := concat_ws(' ', NEW.name, NEW.email, NEW.job_title, NEW.source, NEW.stage);
+    ELSIF TG_TABLE_NAME = 'projects' THEN
+        doc_tenant := NEW.tenant_id;
+        doc_title := NEW.name;
+        doc_body := NEW.description;
+    ELSIF TG_TABLE_NAME = 'invoices' THEN
+        SELECT tenant_id, coalesce(company, name) INTO doc_tenant, customer_name
+        FROM customers WHERE system_id = NEW.customer_id;
+        doc_title := 'Invoice ' || NEW.system_id;
+        doc_body := concat_ws(' ', customer_name, NEW.amount, NEW.currency, NEW.status);
+    ELSIF TG_TABLE_NAME = 'customer_notes' THEN
+        IF coalesce(NEW.is_private, false) THEN
+            RETURN NEW;
+        END IF;
+        SELECT tenant_id INTO doc_tenant FROM customers WHERE system_id = NEW.customer_id;
+        doc_title := coalesce(NEW.title, 'Note');
+        doc_body := NEW.content;
+    ELSIF TG_TABLE_NAME = 'customer_interactions' THEN
+        SELECT tenant_id INTO doc_tenant FROM customers WHERE system_id = NEW.customer_id;
+        doc_title := coalesce(NEW.subject, NEW.interaction_type, 'Interaction');
+        doc_body := concat_ws(' ', NEW.description, NEW.outcome);
+    END IF;
+
+    IF doc_tenant IS NULL OR NEW.system_id IS NULL THEN
+        RETURN NEW;
+    END IF;
+
+    INSERT INTO search_documents (tenant_id, entity_type, system_id, title, snippet, search_vector, updated_at)
+    VALUES (
+        doc_tenant, TG_ARGV[0], NEW.system_id, coalesce(doc_title, NEW.system_id), left(doc_body, 200),
+        setweight(to_tsvector('simple', coalesce(doc_title, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(doc_body, '')), 'B'),
+        timezone('UTC', now())
+    )
+    ON CONFLICT (tenant_id, entity_type, system_id) DO UPDATE SET
+        title = EXCLUDED.title,
+        snippet = EXCLUDED.snippet,
+        search_vector = EXCLUDED.search_vector,
+        updated_at = EXCLUDED.updated_at;
+
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+
+def upgrade() -> None:
+    op.execute("""
+        CREATE TABLE search_documents (
+            tenant_id VARCHAR NOT NULL,
+            entity_type VARCHAR(30) NOT NULL,
+            system_id VARCHAR NOT NULL,
+            title VARCHAR NOT NULL,
+            snippet TEXT,
+            search_vector TSVECTOR NOT NULL,
+            updated_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            PRIMARY KEY (tenant_id, entity_type, system_id)
+        ) PARTITION BY HASH (tenant_id)
+    """)
+    for remainder in range(PARTITIONS):
+        op.execute(
+            f"CREATE TABLE search_documents_p{remainder} PARTITION OF search_documents "
+            f"FOR VALUES WITH (MODULUS {PARTITIONS}, REMAINDER {remainder})"
+        )
+    # btree_gin (enabled in d41b8f26a9c7) lets tenant_id lead the GIN index
+    op.create_index('idx_search_documents_vector', 'search_documents', ['tenant_id', 'search_vector'], unique=False, postgresql_using='gin')
+    op.create_index('idx_search_documents_entity', 'search_documents', ['entity_type', 'system_id'], unique=False)
+
+    op.execute(SYNC_FUNCTION)
+    for entity_type, table in SOURCES.items():
+        op.execute(
+            f"CREATE TRIGGER trg_{table}_search_documents "
+            f"AFTER INSERT OR UPDATE OR DELETE ON {table} "
+            f"FOR EACH ROW EXECUTE FUNCTION search_documents_sync('{entity_type}')"
+        )
+
+    for entity_type, select_sql in BACKFILL_SELECTS.items():
+        op.execute(f"""
+            INSERT INTO search_documents (tenant_id, entity_type, system_id, title, snippet, search_vector, updated_at)
+            SELECT tenant_id, '{entity_type}', system_id, coalesce(title, system_id), left(body, 200),
+                   setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+                   setweight(to_tsvector('simple', coalesce(body, '')), 'B'),
+                   timezone('UTC', now())
+            FROM ({select_sql}) AS source (tenant_id, system_id, title, body)
+            WHERE tenant_id IS NOT NULL AND system_id IS NOT NULL
+            ON CONFLICT DO NOTHING
+        """)
+
+
+def downgrade() -> None:
+    for table in SOURCES.values():
+        op.execute(f"DROP TRIGGER IF EXISTS trg_{table}_search_documents ON {table}")
+    op.execute("DROP FUNCTION IF EXISTS search_documents_sync()")
+    op.drop_index('idx_search_documents_entity', table_name='search_documents')
+    op.drop_index('idx_search_documents_vector', table_name='search_documents')
+    op.drop_table('search_documents')
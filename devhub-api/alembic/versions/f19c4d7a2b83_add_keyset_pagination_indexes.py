@@ -0,0 +1,41 @@
+"""add_keyset_pagination_indexes
+
+Revision ID: f19c4d7a2b83
+Revises: e8f3a5c1b692
+Create Date: 2026-10-19 18:02:11.417530
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f19c4d7a2b83'
+down_revision: Union[str, None] = 'e8f3a5c1b692'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (index, table, leading scope column) backing the (created_at, id) list cursors
+KEYSET_INDEXES = (
+    ('idx_customers_tenant_created', 'customers', 'tenant_id'),
+    ('idx_leads_tenant_created', 'leads', 'tenant_id'),
+    ('idx_projects_tenant_created', 'projects', 'tenant_id'),
+    ('idx_customer_interactions_customer_created', 'customer_interactions', 'customer_id'),
+    ('idx_invoices_created', 'invoices', None),
+)
+
+
+def upgrade() -> None:
+    # NULLS LAST matches the ORDER BY core/pagination.py emits for nullable keys
+    for name, table, scope in KEYSET_INDEXES:
+        columns = [scope] if scope else []
+        columns += [sa.text('created_at DESC NULLS LAST'), sa.text('id DESC')]
+        op.create_index(name, table, columns, unique=False)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(KEYSET_INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,102 @@
+"""convert_invoice_amount_to_numeric
+
+Revision ID: f7d3b1e6a042
+Revises: e4a9c2f7b815
+Create Date: 2026-10-19 22:11:37.204815
+
+Contract step of the invoices.amount VARCHAR -> NUMERIC(12,2) migration. Refuses to run
+while any amount could not be converted, proves NOT NULL with a constraint validated
+without blocking writes, then swaps the shadow column in under a brief exclusive lock and
+builds the amount index concurrently. Downgrading restores the VARCHAR column, its index
+and the dual-write trigger of e4a9c2f7b815.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f7d3b1e6a042'
+down_revision: Union[str, None] = 'e4a9c2f7b815'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# As created by e4a9c2f7b815; restored on downgrade
+PARSE_FUNCTION = r"""
+CREATE OR REPLACE FUNCTION invoice_amount_numeric(value TEXT) RETURNS NUMERIC AS $$
+DECLARE
+    cleaned TEXT := regexp_replace(btrim(value), '^[^0-9-]+|,', '', 'g');
+BEGIN
+    IF cleaned ~ '^-?[0-9]{1,10}(\.[0-9]+)?$' THEN
+        RETURN round(CAST(cleaned AS NUMERIC), 2);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql IMMUTABLE
+"""
+
+DUAL_WRITE_FUNCTION = """
+CREATE OR REPLACE FUNCTION invoices_amount_dual_write() RETURNS TRIGGER AS $$
+BEGIN
+    NEW.amount_numeric := invoice_amount_numeric(NEW.amount);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+
+def upgrade() -> None:
+    unconverted = op.get_bind().execute(sa.text("""
+        SELECT count(*) FILTER (WHERE amount IS NULL) AS missing,
+               count(*) FILTER (WHERE amount IS NOT NULL AND amount_numeric IS NULL) AS invalid
+        FROM invoices
+    """)).one()
+    if unconverted.missing or unconverted.invalid:
+        raise RuntimeError(
+            f"{unconverted.missing} invoices have no amount and {unconverted.invalid} have an amount "
+            "that is not a number; correct them (invoice_amount_numeric(amount) IS NULL) and rerun"
+        )
+
+    # Validating a NOT VALID check only takes a SHARE UPDATE EXCLUSIVE lock, and lets
+    # SET NOT NULL below skip its full-table scan. The ADD has to commit first: validated in
+    # its transaction, the scan would run under the ADD's ACCESS EXCLUSIVE lock. A rerun
+    # after a failure further down starts over with a fresh constraint.
+    op.execute("ALTER TABLE invoices DROP CONSTRAINT IF EXISTS ck_invoices_amount_numeric_not_null")
+    op.execute("ALTER TABLE invoices ADD CONSTRAINT ck_invoices_amount_numeric_not_null "
+               "CHECK (amount_numeric IS NOT NULL) NOT VALID")
+    with op.get_context().autocommit_block():
+        op.execute("ALTER TABLE invoices VALIDATE CONSTRAINT ck_invoices_amount_numeric_not_null")
+
+    op.execute("DROP TRIGGER IF EXISTS trg_invoices_amount_dual_write ON invoices")
+    op.execute("DROP INDEX IF EXISTS idx_invoice_amount")
+    op.drop_column('invoices', 'amount')
+    op.alter_column('invoices', 'amount_numeric', new_column_name='amount', nullable=False)
+    op.drop_constraint('ck_invoices_amount_numeric_not_null', 'invoices', type_='check')
+    op.execute("DROP FUNCTION IF EXISTS invoices_amount_dual_write()")
+    op.execute("DROP FUNCTION IF EXISTS invoice_amount_numeric(TEXT)")
+
+    with op.get_context().autocommit_block():
+        op.create_index('idx_invoice_amount', 'invoices', ['amount'], unique=False,
+                        postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    # Back to the expanded layout of e4a9c2f7b815, dual-write included; downgrading that
+    # revision drops the shadow column
+    op.drop_index('idx_invoice_amount', table_name='invoices')
+    op.alter_column('invoices', 'amount', new_column_name='amount_numeric', nullable=True)
+    op.add_column('invoices', sa.Column('amount', sa.String(50), nullable=True))
+    op.execute("UPDATE invoices SET amount = CAST(amount_numeric AS VARCHAR)")
+    op.alter_column('invoices', 'amount', nullable=False)
+    op.create_index('idx_invoice_amount', 'invoices', ['amount'], unique=False)
+
+    op.execute(PARSE_FUNCTION)
+    op.execute(DUAL_WRITE_FUNCTION)
+    op.execute(
+        "CREATE TRIGGER trg_invoices_amount_dual_write "
+        "BEFORE INSERT OR UPDATE OF amount ON invoices "
+        "FOR EACH ROW EXECUTE FUNCTION invoices_amount_dual_write()"
+    )
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Benchmark the vectorized CRM scoring engine against the scalar CRMFormulas
+
+Generates synthetic columnar records, checks that the batch results equal the
+scalar formulas exactly on a sample, then reports per-record cost of both.
+
+Usage: python benchmark_scoring.py [records] [sample]
+"""
+import sys
+import os
+import time
+
+import numpy as np
+
+# Add the src directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from devhub_api.crm_formulas import CRMFormulas
+from devhub_api.crm_formulas_batch import CRMBatchFormulas as B
+
+BUSINESS_VARIABLES = {
+    'industry_multiplier': 1.2,
+    'seasonality_factor': 0.9,
+    'engagement_multiplier': 3.5,
+    'referral_value': 250
+}
+
+
+def generate(n, rng):
+    """Random columnar inputs, including absent keys, unknown categories and empty lists"""
+
+    def optional(values, missing=0.2):
+        return np.where(rng.random(n) < missing, np.nan, values)
+
+    def codes(vocabulary, width):
+        # Includes the unknown code and right padding
+        matrix = rng.integers(0, len(vocabulary) + 1, size=(n, width))
+        lengths = rng.integers(0, width + 1, size=n)
+        matrix[np.arange(width) >= lengths[:, None]] = -1
+        return matrix
+
+    def padded(values, width):
+        lengths = rng.integers(0, width + 1, size=n)
+        return np.where(np.arange(width) >= lengths[:, None], np.nan, values)
+
+    channels = padded(np.round(rng.random((n, 4)), 3), 4)
+    return {
+        'acquisition_stage': rng.integers(0, len(B.STAGES) + 1, size=n),
+        'engagement_metrics': {
+            'email_opens': optional(rng.integers(0, 30, size=n).astype(float)),
+            'page_views': optional(rng.integers(0, 120, size=n).astype(float)),
+            'social_interactions': optional(rng.integers(0, 40, size=n).astype(float)),
+            'direct_interactions': optional(rng.integers(0, 10, size=n).astype(float))
+        },
+        'conversion_events': codes(B.CONVERSION_EVENTS, 3),
+        'retention_factors': {
+            'satisfaction_score': optional(rng.integers(0, 11, size=n).astype(float)),
+            'usage_frequency': optional(rng.integers(0, 60, size=n).astype(float)),
+            'support_interactions': optional(rng.integers(0, 12, size=n).astype(float))
+        },
+        'advocacy_indicators': codes(B.ADVOCACY_INDICATORS, 4),
+        'has_stages': rng.random(n) < 0.9,
+        'stage_probabilities': padded(np.round(rng.random((n, 4)), 2), 4),
+        'deal_value': np.round(rng.random(n) * 50000, 2),
+        'time_in_stage': padded(rng.integers(0, 90, size=(n, 4)).astype(float), 4),
+        'customer_signals': {signal: rng.random(n) < 0.4 for signal in B.CUSTOMER_SIGNALS},
+        'channel_response_rates': channels,
+        'has_response_rates': rng.random(n) < 0.9,
+        'message_types': codes(B.MESSAGE_TYPES, 3),
+        'preferred_channels': (rng.random((n, 4)) < 0.5) & ~np.isnan(channels),
+        'has_preferences': rng.random(n) < 0.8,
+        'has_preferred_channels': rng.random(n) < 0.8,
+        'revenue_history': padded(np.round(rng.random((n, 6)) * 4000, 2), 6),
+        'interaction_frequency': rng.integers(0, 50, size=n),
+        'referral_count': rng.integers(0, 8, size=n),
+        'support_cost': np.round(rng.random(n) * 2000, 2),
+        'retention_probability': np.round(rng.random(n), 3)
+    }
+
+
+def run_batch(data):
+    return {
+        'lifecycle': B.customer_lifecycle(
+            data['acquisition_stage'], data['engagement_metrics'], data['conversion_events'],
+            data['retention_factors'], data['advocacy_indicators']
+        ),
+        'pipeline': B.sales_pipeline(
+            data['has_stages'], data['stage_probabilities'], data['deal_value'],
+            data['time_in_stage'], data['customer_signals'], BUSINESS_VARIABLES
+        ),
+        'communication': B.communication_effectiveness(
+            data['channel_response_rates'], data['has_response_rates'], data['message_types'],
+            data['preferred_channels'], data['has_preferences'], data['has_preferred_channels']
+        ),
+        'value': B.customer_value(
+            data['revenue_history'], data['interaction_frequency'], data['referral_count'],
+            data['support_cost'], data['retention_probability'], BUSINESS_VARIABLES
+        )
+    }
+
+
+def scalar_inputs(data, i):
+    """Decode record i back into the dict/list arguments CRMFormulas takes"""
+
+    def present(row):
+        return [float(value) for value in row if not np.isnan(value)]
+
+    def names(row, vocabulary):
+        return [vocabulary[code] if code < len(vocabulary) else 'other' for code in row if code >= 0]
+
+    def fields(columns):
+        return {key: float(column[i]) for key, column in columns.items() if not np.isnan(column[i])}
+
+    stage_code = data['acquisition_stage'][i]
+    channels = [f'channel_{j}' for j in range(len(present(data['channel_response_rates'][i])))]
+    preferences = {}
+    if data['has_preferences'][i]:
+        preferences['timezone'] = 'UTC'
+        preferences['preferred_channels'] = [
+            channel for j, channel in enumerate(channels) if data['preferred_channels'][i, j]
+        ] + ['sms'] if data['has_preferred_channels'][i] else []
+
+    probabilities = present(data['stage_probabilities'][i])
+    times = present(data['time_in_stage'][i])
+    return {
+        'lifecycle': dict(
+            acquisition_stage=B.STAGES[stage_code] if stage_code < len(B.STAGES) else 'other',
+            engagement_metrics=fields(data['engagement_metrics']),
+            conversion_events=names(data['conversion_events'][i], B.CONVERSION_EVENTS),
+            retention_factors=fields(data['retention_factors']),
+            advocacy_indicators=names(data['advocacy_indicators'][i], B.ADVOCACY_INDICATORS)
+        ),
+        'pipeline': dict(
+            pipeline_stages=['new', 'won'] if data['has_stages'][i] else [],
+            stage_probabilities={f'stage_{j}': p for j, p in enumerate(probabilities)},
+            deal_value=float(data['deal_value'][i]),
+            time_in_stage={f'stage_{j}': t for j, t in enumerate(times)},
+            customer_signals={signal: bool(column[i]) for signal, column in data['customer_signals'].items()},
+            business_variables=BUSINESS_VARIABLES
+        ),
+        'communication': dict(
+            communication_channels=channels,
+            message_types={f'message_{j}': name for j, name in enumerate(names(data['message_types'][i], B.MESSAGE_TYPES))},
+            response_rates={
+                channel: rate for channel, rate in zip(channels, present(data['channel_response_rates'][i]))
+            } if data['has_response_rates'][i] else {},
+            engagement_metrics={},
+            customer_preferences=preferences
+        ),
+        'value': dict(
+            revenue_history=present(data['revenue_history'][i]),
+            interaction_frequency=int(data['interaction_frequency'][i]),
+            referral_count=int(data['referral_count'][i]),
+            support_cost=float(data['support_cost'][i]),
+            retention_probability=float(data['retention_probability'][i]),
+            business_variables=BUSINESS_VARIABLES
+        )
+    }
+
+
+def run_scalar(inputs):
+    return {
+        'lifecycle': CRMFormulas.customer_lifecycle_formula(**inputs['lifecycle']),
+        'pipeline': CRMFormulas.sales_pipeline_formula(**inputs['pipeline']),
+        'communication': CRMFormulas.communication_effectiveness_formula(**inputs['communication']),
+        'value': CRMFormulas.customer_value_formula(**inputs['value'])
+    }
+
+
+def mismatches(batch, scalar, i):
+    """Names of batch outputs that differ from the scalar result for record i"""
+    checks = {
+        'lifecycle_score': (batch['lifecycle']['lifecycle_score'][i], scalar['lifecycle']['lifecycle_score']),
+        'customer_tier': (B.CUSTOMER_TIER_LABELS[batch['lifecycle']['customer_tier'][i]], scalar['lifecycle']['customer_tier']),
+        'next_recommended_actions': (
+            list(B.NEXT_ACTION_LABELS[batch['lifecycle']['next_recommended_actions'][i]]),
+            scalar['lifecycle']['next_recommended_actions']
+        ),
+        'pipeline_score': (batch['pipeline']['pipeline_score'][i], scalar['pipeline']['pipeline_score']),
+        'conversion_probability': (batch['pipeline']['conversion_probability'][i], scalar['pipeline']['conversion_probability']),
+        'revenue_forecast': (batch['pipeline']['revenue_forecast'][i], scalar['pipeline']['revenue_forecast']),
+        'stage_velocity': (batch['pipeline']['stage_velocity'][i], scalar['pipeline']['stage_velocity']),
+        'pipeline_actions': (
+            list(B.PIPELINE_ACTION_LABELS[batch['pipeline']['recommended_actions'][i]]),
+            scalar['pipeline']['recommended_actions']
+        ),
+        'risk_factors': (
+            [f'Stalled in stage_{j} stage' for j in np.flatnonzero(batch['pipeline']['stalled_stages'][i])]
+            + (['Low conversion probability'] if batch['pipeline']['low_conversion_probability'][i] else []),
+            scalar['pipeline']['risk_factors']
+        ),
+        'communication_score': (batch['communication']['communication_score'][i], scalar['communication']['communication_score']),
+        'optimal_channels': (
+            list(B.OPTIMAL_CHANNEL_LABELS[batch['communication']['optimal_channels'][i]]),
+            scalar['communication']['optimal_channels']
+        ),
+        'customer_value': (batch['value']['customer_value'][i], scalar['value']['customer_value']),
+        'lifetime_value': (batch['value']['lifetime_value'][i], scalar['value']['lifetime_value']),
+        'value_tier': (B.VALUE_TIER_LABELS[batch['value']['value_tier'][i]], scalar['value']['value_tier'])
+    }
+    for component, value in scalar['lifecycle']['stage_breakdown'].items():
+        checks[f'lifecycle.{component}'] = (batch['lifecycle']['stage_breakdown'][component][i], value)
+
+    return [name for name, (ours, theirs) in checks.items() if ours != theirs]
+
+
+def main():
+    records = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    sample = min(int(sys.argv[2]) if len(sys.argv) > 2 else 20_000, records)
+    rng = np.random.default_rng(42)
+
+    print(f"Generating {records:,} records...")
+    data = generate(records, rng)
+
+    start = time.perf_counter()
+    batch = run_batch(data)
+    batch_seconds = time.perf_counter() - start
+
+    inputs = [scalar_inputs(data, i) for i in range(sample)]
+    start = time.perf_counter()
+    scalar = [run_scalar(record) for record in inputs]
+    scalar_seconds = time.perf_counter() - start
+
+    failures = {}
+    for i, result in enumerate(scalar):
+        for name in mismatches(batch, result, i):
+            failures.setdefault(name, i)
+
+    batch_ns = batch_seconds / records * 1e9
+    scalar_ns = scalar_seconds / sample * 1e9
+    print(f"Batch:  {batch_seconds:8.3f}s for {records:,} records  ({batch_ns:10.1f} ns/record)")
+    print(f"Scalar: {scalar_seconds:8.3f}s for {sample:,} records  ({scalar_ns:10.1f} ns/record)")
+    print(f"Speedup: {scalar_ns / batch_ns:.1f}x")
+
+    if failures:
+        for name, i in failures.items():
+            print(f"✗ {name} differs from the scalar formula (first at record {i})")
+        sys.exit(1)
+    print(f"✓ Batch results match the scalar formulas exactly on {sample:,} records")
+
+
+if __name__ == "__main__":
+    main()
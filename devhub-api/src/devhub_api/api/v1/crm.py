@@ -1,12 +1,23 @@
 """
 CRM API endpoints with tenant isolation
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+from datetime import datetime
+import time
 from ...database import get_db
+from ...core.serialization import dumps
+from ...core.pagination import PageParams, page_params
+from ...core.fieldsets import FieldSet
 from ...services.multitenant import TenantService, MultiTenantCRMService
+from ...services.batch_scoring import BatchScoringService
+from ...services.forecast import PipelineForecastService
+from ...services.pipeline_analytics import PipelineAnalyticsService
+from ...core.exceptions import ValidationError
 from ...models import Customer, Lead
+from ...schemas.crm import ScoringBatchRequest
 
 router = APIRouter()
 
@@ -29,55 +40,87 @@ def get_current_user_context(db: Session = Depends(get_db)):
         }
     }
 
+def resolve_tenant(current_user: Dict[str, Any], tenant_id: Optional[str]) -> str:
+    """Tenant a report runs for: the caller's own, or any tenant for platform founders"""
+    if tenant_id and tenant_id != current_user["tenant_id"] and not current_user["is_founder"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied to this tenant"
+        )
+    tenant_id = tenant_id or current_user["tenant_id"]
+    if not tenant_id:
+        raise ValidationError("tenant_id is required")
+    return tenant_id
+
 @router.get("/health")
 async def crm_health() -> Dict[str, str]:
     """CRM module health check"""
     return {"status": "healthy", "module": "crm"}
 
+# Fields the table views can request; the defaults are what the lists always returned
+CUSTOMER_FIELDS = FieldSet(Customer, {
+    "id": "system_id",
+    "name": "name",
+    "email": "email",
+    "company": "company",
+    "phone": "phone",
+    "tenant_id": "tenant_id",
+    "is_active": "is_active",
+    "city": "city",
+    "country": "country",
+    "created_at": "created_at",
+    "updated_at": "updated_at"
+}, default=["id", "name", "email", "company", "phone", "tenant_id", "created_at"])
+
+LEAD_FIELDS = FieldSet(Lead, {
+    "id": "system_id",
+    "name": "name",
+    "email": "email",
+    "company": "company",
+    "phone": "phone",
+    "job_title": "job_title",
+    "stage": "stage",
+    "source": "source",
+    "estimated_value": "estimated_value",
+    "probability": "probability",
+    "qualification_status": "qualification_status",
+    "assigned_to": "assigned_to",
+    "last_contacted": "last_contacted",
+    "is_stale": "is_stale",
+    "tenant_id": "tenant_id",
+    "created_at": "created_at",
+    "updated_at": "updated_at"
+}, default=["id", "name", "email", "company", "stage", "source", "tenant_id", "created_at"])
+
 @router.get("/customers")
 async def get_customers(
     db: Session = Depends(get_db),
-    current_user = Depends(get_current_user_context)
+    current_user = Depends(get_current_user_context),
+    page: PageParams = Depends(page_params),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return")
 ) -> List[Dict[str, Any]]:
-    """Get customers with tenant filtering"""
+    """Get one page of customers with tenant filtering; the next cursor is in X-Next-Cursor"""
+    selected = CUSTOMER_FIELDS.parse(fields)
     crm_service = MultiTenantCRMService(db)
-    customers = crm_service.get_customers(current_user)
+    customers = crm_service.get_customers(current_user, page=page, columns=CUSTOMER_FIELDS.columns(selected))
     
-    return [
-        {
-            "id": customer.system_id,
-            "name": customer.name,
-            "email": customer.email,
-            "company": customer.company,
-            "phone": customer.phone,
-            "tenant_id": customer.tenant_id,
-            "created_at": customer.created_at
-        }
-        for customer in customers
-    ]
+    return CUSTOMER_FIELDS.response(customers, selected)
 
 @router.get("/leads")
 async def get_leads(
     db: Session = Depends(get_db),
-    current_user = Depends(get_current_user_context)
+    current_user = Depends(get_current_user_context),
+    page: PageParams = Depends(page_params),
+    stale: Optional[bool] = Query(None, description="Only leads flagged (or not flagged) as stale"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return")
 ) -> List[Dict[str, Any]]:
-    """Get leads with tenant filtering"""
+    """Get one page of leads with tenant filtering; the next cursor is in X-Next-Cursor"""
+    selected = LEAD_FIELDS.parse(fields)
     crm_service = MultiTenantCRMService(db)
-    leads = crm_service.get_leads(current_user)
+    filters = {"is_stale": stale} if stale is not None else None
+    leads = crm_service.get_leads(current_user, filters, page=page, columns=LEAD_FIELDS.columns(selected))
     
-    return [
-        {
-            "id": lead.system_id,
-            "name": lead.name,
-            "email": lead.email,
-            "company": lead.company,
-            "stage": lead.stage,
-            "source": lead.source,
-            "tenant_id": lead.tenant_id,
-            "created_at": lead.created_at
-        }
-        for lead in leads
-    ]
+    return LEAD_FIELDS.response(leads, selected)
 
 @router.get("/analytics/dashboard")
 async def get_crm_analytics_dashboard(
@@ -86,32 +129,124 @@ async def get_crm_analytics_dashboard(
 ) -> Dict[str, Any]:
     """Get CRM dashboard analytics data with tenant filtering"""
     crm_service = MultiTenantCRMService(db)
-    
-    # Get tenant-filtered data
-    customers = crm_service.get_customers(current_user)
-    leads = crm_service.get_leads(current_user)
+    analytics = crm_service.get_dashboard_analytics(current_user)
     
     return {
-        "customer_metrics": {
-            "total_customers": len(customers),
-            "new_customers_this_month": len([c for c in customers if c.created_at and c.created_at.month == 7]),
-            "active_customers": len([c for c in customers if c.is_active])
-        },
-        "lead_metrics": {
-            "total_leads": len(leads),
-            "qualified_leads": len([l for l in leads if l.qualification_status == "qualified"]),
-            "converted_leads": len([l for l in leads if l.converted_to_customer]),
-            "conversion_rate": round(len([l for l in leads if l.converted_to_customer]) / len(leads) * 100, 1) if leads else 0
-        },
-        "interaction_metrics": {
-            "total_interactions": 0,
-            "interactions_this_week": 0
-        },
-        "pipeline_stages": {},
-        "lead_sources": {},
+        "customer_metrics": analytics["customer_metrics"],
+        "lead_metrics": analytics["lead_metrics"],
+        "interaction_metrics": analytics["interaction_metrics"],
+        "pipeline_stages": analytics["pipeline_stages"],
+        "lead_sources": analytics["lead_sources"],
         "tenant_context": {
             "tenant_id": current_user["tenant_id"],
             "user_role": current_user["user_role"],
             "is_founder": current_user["is_founder"]
         }
     }
+
+@router.get("/forecast")
+async def get_pipeline_forecast(
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user_context),
+    tenant_id: Optional[str] = Query(None, description="Tenant to forecast (platform founder only)")
+) -> Dict[str, Any]:
+    """Revenue forecast of open leads by stage, owner and close month, with weighted, best and worst cases"""
+    return PipelineForecastService.get_forecast(db, resolve_tenant(current_user, tenant_id))
+
+@router.get("/pipeline/funnel")
+async def get_pipeline_funnel(
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user_context),
+    tenant_id: Optional[str] = Query(None, description="Tenant to analyse (platform founder only)"),
+    since: Optional[datetime] = Query(None, description="Start of the period (default: 90 days before until)"),
+    until: Optional[datetime] = Query(None, description="End of the period (default: now)")
+) -> Dict[str, Any]:
+    """Leads entering each stage in the period, where they went next and step-to-step conversion"""
+    return PipelineAnalyticsService.funnel(db, resolve_tenant(current_user, tenant_id), since, until)
+
+@router.get("/pipeline/velocity")
+async def get_pipeline_velocity(
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user_context),
+    tenant_id: Optional[str] = Query(None, description="Tenant to analyse (platform founder only)"),
+    since: Optional[datetime] = Query(None, description="Start of the period (default: 90 days before until)"),
+    until: Optional[datetime] = Query(None, description="End of the period (default: now)")
+) -> Dict[str, Any]:
+    """Average and median days spent in each open stage"""
+    return PipelineAnalyticsService.velocity(db, resolve_tenant(current_user, tenant_id), since, until)
+
+@router.get("/pipeline/stalled")
+async def get_stalled_leads(
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user_context),
+    tenant_id: Optional[str] = Query(None, description="Tenant to analyse (platform founder only)"),
+    days: int = Query(PipelineAnalyticsService.STALLED_DAYS, ge=1, description="Minimum days in the current stage"),
+    limit: int = Query(100, ge=1, le=PipelineAnalyticsService.MAX_STALLED)
+) -> Dict[str, Any]:
+    """Open leads that have not changed stage for at least `days` days, longest stalled first"""
+    leads = PipelineAnalyticsService.stalled(db, resolve_tenant(current_user, tenant_id), days, limit)
+    return {"days": days, "count": len(leads), "leads": leads}
+
+@router.get("/leads/{lead_id}/pipeline")
+async def get_lead_pipeline(
+    lead_id: str,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user_context)
+) -> Dict[str, Any]:
+    """Pipeline score, risk factors and time spent per stage of one lead, from its stage history"""
+    query = TenantService(db).filter_by_tenant(db.query(Lead), Lead, current_user)
+    lead = query.filter(Lead.system_id == lead_id).first()
+    if not lead:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Lead not found"
+        )
+    
+    return PipelineAnalyticsService.lead_pipeline(db, lead)
+
+@router.post("/scoring/batch")
+async def score_batch(
+    request: ScoringBatchRequest,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user_context)
+) -> StreamingResponse:
+    """
+    Score leads or customers by ID or filter and stream NDJSON as chunks complete
+
+    Lines are {"type": "score", ...} per record, {"type": "error", ...} per failed
+    chunk and a final {"type": "summary", ...}.
+    """
+    selection, missing = BatchScoringService.resolve(
+        db, current_user, request.entity, request.ids, request.filters
+    )
+    
+    def generate():
+        start_time = time.perf_counter()
+        scored, failed = 0, 0
+        try:
+            for chunk in BatchScoringService.iter_scores(db, request.entity, list(selection)):
+                if chunk["error"]:
+                    failed += len(chunk["row_ids"])
+                    yield dumps({
+                        "type": "error",
+                        "error": chunk["error"],
+                        "ids": [selection[row_id] for row_id in chunk["row_ids"]]
+                    }) + b"\n"
+                    continue
+                scored += len(chunk["results"])
+                yield b"".join(dumps({"type": "score", **result}) + b"\n" for result in chunk["results"])
+        except Exception as e:
+            print(f"Error scoring {request.entity}: {e}")
+            yield dumps({"type": "error", "error": str(e), "ids": []}) + b"\n"
+        
+        yield dumps({
+            "type": "summary",
+            "entity": request.entity,
+            "requested": len(selection),
+            "scored": scored,
+            "failed": failed,
+            "not_found": missing,
+            "duration_ms": int((time.perf_counter() - start_time) * 1000)
+        }) + b"\n"
+    
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
@@ -1,16 +1,28 @@
 """
 Database API endpoints
 """
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import text, inspect
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from ...database import get_db, engine
+from ...database_manager import ColumnProfiler, DatabaseValidator, DatabaseManager, CascadePlanner
+from ...core.serialization import FastJSONResponse
+from ...services.scheduler import scheduler
+from ...services.integrity_scanner import IntegrityScanner
+from ...services.job_runs import JobRunService
+from ...services.pipeline_analytics import PipelineAnalyticsService
 from datetime import datetime, timezone
+import json
 import time
 
 router = APIRouter()
 
+# Upper bound on rows accepted by the bulk create endpoint
+MAX_BULK_ROWS = 5000
+
 @router.get("/health")
 async def database_health() -> Dict[str, str]:
     """Database module health check"""
@@ -72,61 +84,39 @@ async def get_database_stats(db: Session = Depends(get_db)) -> Dict[str, Any]:
         }
 
 @router.get("/validate")
-async def validate_database(db: Session = Depends(get_db)) -> Dict[str, Any]:
-    """Validate database integrity"""
+async def validate_database(
+    rescan: bool = Query(False, description="Queue a fresh background scan"),
+    db: Session = Depends(get_db)
+) -> Dict[str, Any]:
+    """Validate database integrity from the latest background scan snapshot"""
     try:
-        issues = {
-            "errors": [],
-            "warnings": [],
-            "suggestions": [],
-            "relationship_issues": [],
-            "id_system_issues": []
-        }
-        
-        # Use the same database session to avoid connection issues
-        inspector = inspect(db.bind)
-        table_names = inspector.get_table_names()
-        
-        total_issues = 0
-        severity = "healthy"
-        
-        # Check for tables without primary keys
-        for table_name in table_names:
-            try:
-                pk_constraint = inspector.get_pk_constraint(table_name)
-                if not pk_constraint or not pk_constraint['constrained_columns']:
-                    issues["warnings"].append(f"Table '{table_name}' has no primary key")
-                    total_issues += 1
-                    severity = "warning"
-            except Exception as e:
-                print(f"Error checking primary key for table {table_name}: {e}")
-                continue
-        
-        # Check for empty tables (except alembic_version)
-        for table_name in table_names:
-            if table_name == 'alembic_version':
-                continue
-            try:
-                result = db.execute(text(f"SELECT COUNT(*) FROM {table_name}"))
-                count = result.scalar() or 0
-                if count == 0:
-                    issues["suggestions"].append(f"Table '{table_name}' is empty")
-            except Exception as e:
-                print(f"Error checking table count for {table_name}: {e}")
-                continue
-        
-        # Determine overall status
-        status = "valid" if total_issues == 0 else "issues_found"
-        if severity == "healthy" and total_issues == 0:
-            severity = "healthy"
-        
-        return {
-            "status": status,
-            "severity": severity,
-            "total_issues": total_issues,
-            "issues": issues,
-            "timestamp": datetime.now(timezone.utc).isoformat()
-        }
+        if not scheduler.running:
+            # No background worker (e.g. SCHEDULER_ENABLED=false): validate inline
+            issues = await run_in_threadpool(DatabaseValidator.validate_schema, db)
+            return {
+                **DatabaseValidator.summarize(issues),
+                "issues": issues,
+                "timestamp": datetime.now(timezone.utc).isoformat()
+            }
+
+        snapshot = IntegrityScanner.latest_snapshot(db)
+        job = None
+        if rescan or not snapshot:
+            job = IntegrityScanner.serialize(IntegrityScanner.request_scan(db, scheduler), include_result=False)
+
+        if not snapshot:
+            return {
+                "status": "pending",
+                "severity": None,
+                "total_issues": None,
+                "issues": DatabaseValidator.empty_issues(),
+                "job": job,
+                "timestamp": datetime.now(timezone.utc).isoformat()
+            }
+
+        result = IntegrityScanner.serialize(snapshot)
+        result["job"] = job
+        return result
         
     except Exception as e:
         print(f"Error validating database: {e}")
@@ -144,6 +134,86 @@ async def validate_database(db: Session = Depends(get_db)) -> Dict[str, Any]:
             "timestamp": datetime.now(timezone.utc).isoformat()
         }
 
+@router.get("/validate/jobs/{job_id}")
+async def get_validation_job(job_id: str, db: Session = Depends(get_db)) -> Dict[str, Any]:
+    """Status of a background scan, with its results once completed"""
+    scan = IntegrityScanner.get_scan(db, job_id)
+    if not scan:
+        raise HTTPException(status_code=404, detail=f"Validation job '{job_id}' not found")
+    return IntegrityScanner.serialize(scan)
+
+@router.get("/jobs")
+async def get_background_jobs(
+    job_name: Optional[str] = Query(None, description="Only runs of this job"),
+    limit: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_db)
+) -> Dict[str, Any]:
+    """Registered background jobs with their live state, and the latest recorded runs"""
+    runs = JobRunService.recent(db, job_name, limit)
+    return {
+        "scheduler_running": scheduler.running,
+        "jobs": scheduler.status(),
+        "runs": [JobRunService.serialize(run) for run in runs]
+    }
+
+@router.post("/jobs/{job_name}/run")
+async def run_background_job(job_name: str) -> Dict[str, Any]:
+    """Queue a run of a registered job now; its outcome shows up under /jobs"""
+    try:
+        job_id = scheduler.submit(job_name)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return {"job_name": job_name, "job_id": job_id, "status": "queued", "scheduler_running": scheduler.running}
+
+@router.get("/validate/stream")
+async def stream_database_validation(db: Session = Depends(get_db)) -> StreamingResponse:
+    """Stream validation results as NDJSON, one line per check as it completes"""
+    def generate():
+        issues = DatabaseValidator.empty_issues()
+        try:
+            for result in DatabaseValidator.iter_checks(db):
+                if result["error"]:
+                    issues["errors"].append(f"Check '{result['check']}' failed: {result['error']}")
+                issues[result["category"]].extend(result["messages"])
+                yield json.dumps({"type": "check", **result}) + "\n"
+        except Exception as e:
+            print(f"Error validating database: {e}")
+            issues["errors"].append(f"Failed to validate database: {str(e)}")
+        
+        yield json.dumps({
+            "type": "summary",
+            **DatabaseValidator.summarize(issues),
+            "issues": issues,
+            "timestamp": datetime.now(timezone.utc).isoformat()
+        }) + "\n"
+    
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+@router.post("/validate/incremental")
+async def validate_database_incremental(db: Session = Depends(get_db)) -> Dict[str, Any]:
+    """Re-check rows changed since the last run and store the findings"""
+    try:
+        return await run_in_threadpool(DatabaseValidator.validate_incremental, db)
+    except Exception as e:
+        print(f"Error running incremental validation: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to run incremental validation: {str(e)}")
+
+@router.get("/validate/issues")
+async def get_stored_validation_issues(
+    limit: int = Query(20, ge=1, le=500, description="Messages returned per check"),
+    db: Session = Depends(get_db)
+) -> Dict[str, Any]:
+    """Cumulative open integrity issues, served without rescanning any table"""
+    try:
+        result = DatabaseValidator.get_stored_issues(db, limit)
+        result["timestamp"] = datetime.now(timezone.utc).isoformat()
+        return result
+    except Exception as e:
+        print(f"Error loading stored validation issues: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to load validation issues: {str(e)}")
+
 @router.get("/tables")
 async def get_database_tables(db: Session = Depends(get_db)) -> Dict[str, Any]:
     """Get list of database tables"""
@@ -244,63 +314,82 @@ async def execute_database_query(query_data: Dict[str, Any], db: Session = Depen
             "execution_time": 0
         }
 
-@router.get("/table/{table_name}")
-async def get_table_data(table_name: str, db: Session = Depends(get_db)) -> Dict[str, Any]:
+@router.get("/table/{table_name}", response_class=FastJSONResponse)
+async def get_table_data(
+    table_name: str,
+    limit: int = Query(100, ge=1, le=1000),
+    columns: Optional[str] = Query(None, description="Comma-separated columns to return"),
+    db: Session = Depends(get_db)
+) -> FastJSONResponse:
     """Get data from a specific table"""
     try:
         # Validate table name exists
-        inspector = inspect(engine)
-        table_names = inspector.get_table_names()
-        
-        if table_name not in table_names:
+        if DatabaseManager.get_table_metadata(db, table_name) is None:
             raise HTTPException(status_code=404, detail=f"Table '{table_name}' not found")
         
-        # Get column information
-        columns = inspector.get_columns(table_name)
-        column_info = [
-            {
-                "column_name": col['name'],
-                "data_type": str(col['type']),
-                "is_nullable": "YES" if col['nullable'] else "NO",
-                "column_default": str(col['default']) if col['default'] is not None else None
-            }
-            for col in columns
-        ]
-        
-        # Get total row count
-        count_result = db.execute(text(f"SELECT COUNT(*) FROM {table_name}"))
-        total_rows = count_result.scalar() or 0
+        selected = [name.strip() for name in columns.split(",") if name.strip()] if columns else None
+        result = DatabaseManager.get_table_data(db, table_name, limit, selected)
+        if not result["success"]:
+            raise HTTPException(status_code=400, detail=result["error"])
         
-        # Get sample data (limit to 100 rows)
-        data_result = db.execute(text(f"SELECT * FROM {table_name} LIMIT 100"))
-        column_names = list(data_result.keys()) if data_result.keys() else []
+        # Exact for small tables; large ones report the planner estimate instead of a full scan
+        total_rows, total_rows_exact = DatabaseManager.count_rows(db, table_name)
         
-        data = []
-        for row in data_result:
-            row_dict = {}
-            for i, col_name in enumerate(column_names):
-                row_dict[col_name] = row[i]
-            data.append(row_dict)
-        
-        return {
+        return FastJSONResponse({
             "table": table_name,
-            "columns": column_info,
-            "data": data,
+            "columns": result["columns"],
+            "data": result["data"],
+            "truncated_columns": result["truncated_columns"],
+            "preview_chars": result["preview_chars"],
             "total_rows": total_rows,
-            "displayed_rows": len(data)
-        }
+            "total_rows_exact": total_rows_exact,
+            "displayed_rows": len(result["data"])
+        })
         
     except HTTPException:
         raise
     except Exception as e:
         print(f"Error getting table data for {table_name}: {e}")
-        return {
+        return FastJSONResponse({
             "table": table_name,
             "columns": [],
             "data": [],
             "total_rows": 0,
             "displayed_rows": 0
-        }
+        })
+
+@router.get("/table/{table_name}/column/{column_name}/profile")
+async def get_column_profile(
+    table_name: str,
+    column_name: str,
+    mode: str = Query("auto", pattern="^(auto|stats|sample)$"),
+    db: Session = Depends(get_db)
+) -> Dict[str, Any]:
+    """Profile a column from pg_stats (or a TABLESAMPLE when stats are stale)"""
+    try:
+        # Validate table and column exist before they are interpolated into SQL
+        inspector = inspect(engine)
+        table_names = inspector.get_table_names()
+
+        if table_name not in table_names:
+            raise HTTPException(status_code=404, detail=f"Table '{table_name}' not found")
+
+        columns = inspector.get_columns(table_name)
+        if not any(col['name'] == column_name for col in columns):
+            raise HTTPException(status_code=404, detail=f"Column '{column_name}' not found in table '{table_name}'")
+
+        start_time = time.time()
+        profile = ColumnProfiler.profile_column(db, table_name, column_name, mode)
+        profile["execution_time"] = int((time.time() - start_time) * 1000)  # Convert to milliseconds
+
+        return profile
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        db.rollback()
+        print(f"Error profiling column {column_name} in table {table_name}: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to profile column: {str(e)}")
 
 @router.post("/table/{table_name}/column")
 async def add_column(table_name: str, column_data: Dict[str, Any], db: Session = Depends(get_db)) -> Dict[str, Any]:
@@ -338,6 +427,7 @@ async def add_column(table_name: str, column_data: Dict[str, Any], db: Session =
         # Execute the ALTER TABLE statement
         db.execute(text(alter_query))
         db.commit()
+        DatabaseManager.invalidate_table_metadata(table_name)
         
         return {
             "success": True,
@@ -397,6 +487,7 @@ async def update_column(table_name: str, column_name: str, column_data: Dict[str
             db.execute(text(statement))
         
         db.commit()
+        DatabaseManager.invalidate_table_metadata(table_name)
         
         return {
             "success": True,
@@ -434,6 +525,7 @@ async def delete_column(table_name: str, column_name: str, db: Session = Depends
         # Execute the ALTER TABLE statement
         db.execute(text(alter_query))
         db.commit()
+        DatabaseManager.invalidate_table_metadata(table_name)
         
         return {
             "success": True,
@@ -501,7 +593,16 @@ async def update_table_data(table_name: str, data: Dict[str, Any], db: Session =
                 WHERE {' AND '.join(where_conditions)}
             """
             
-            db.execute(text(update_query), row_data)
+            if table_name == "leads" and "stage" in row_data:
+                # Stage edits go into the lead's stage history like CRM edits do
+                from_stage = db.execute(
+                    text(f"SELECT stage FROM leads WHERE {' AND '.join(where_conditions)} FOR UPDATE"), row_data
+                ).scalar()
+                lead = db.execute(text(update_query + " RETURNING system_id, tenant_id, stage"), row_data).one_or_none()
+                if lead is not None and lead.stage != from_stage:
+                    PipelineAnalyticsService.record_stage_change(db, lead, from_stage)
+            else:
+                db.execute(text(update_query), row_data)
             updated_count += 1
         
         db.commit()
@@ -545,8 +646,13 @@ async def add_table_row(table_name: str, row_data: Dict[str, Any], db: Session =
         
         insert_query = f"INSERT INTO {table_name} ({column_list}) VALUES ({value_placeholders})"
         
-        # Execute the INSERT statement
-        result = db.execute(text(insert_query), filtered_data)
+        # Execute the INSERT statement; new leads start their stage history
+        if table_name == "leads":
+            lead = db.execute(text(insert_query + " RETURNING system_id, tenant_id, stage"), filtered_data).one()
+            if lead.system_id:  # Events reference the lead by system_id
+                PipelineAnalyticsService.record_stage_change(db, lead, None)
+        else:
+            db.execute(text(insert_query), filtered_data)
         db.commit()
         
         return {
@@ -562,6 +668,49 @@ async def add_table_row(table_name: str, row_data: Dict[str, Any], db: Session =
         print(f"Error adding row to table {table_name}: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to add row: {str(e)}")
 
+@router.post("/records/{table_name}/bulk", response_class=FastJSONResponse)
+async def create_records_bulk(table_name: str, payload: Dict[str, Any], db: Session = Depends(get_db)) -> FastJSONResponse:
+    """Create many records in one transaction, reporting per-row errors"""
+    rows = payload.get("rows")
+    if not isinstance(rows, list) or not rows:
+        raise HTTPException(status_code=400, detail="'rows' must be a non-empty list")
+    if len(rows) > MAX_BULK_ROWS:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BULK_ROWS} rows per request")
+    if table_name not in DatabaseManager.BULK_CREATE_TABLES:
+        raise HTTPException(status_code=400, detail=f"Bulk create is not supported for table '{table_name}'")
+    
+    try:
+        result = await run_in_threadpool(
+            DatabaseManager.create_records, db, table_name, rows, bool(payload.get("all_or_nothing", False))
+        )
+        return FastJSONResponse(result)
+    except Exception as e:
+        print(f"Error bulk creating records in {table_name}: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to create records: {str(e)}")
+
+@router.get("/records/{table_name}/{system_id}/delete-plan")
+async def get_delete_plan(table_name: str, system_id: str, db: Session = Depends(get_db)) -> Dict[str, Any]:
+    """Preview every row a delete would remove, clear, or be blocked by"""
+    result = await run_in_threadpool(DatabaseManager.delete_record, db, table_name, system_id, True)
+    if not result["success"]:
+        raise HTTPException(status_code=400, detail=result["error"])
+    return result["plan"]
+
+@router.delete("/records/{table_name}/{system_id}")
+async def delete_record_cascade(
+    table_name: str,
+    system_id: str,
+    dry_run: bool = Query(False, description="Only return the cascade plan"),
+    batch_size: int = Query(CascadePlanner.DEFAULT_BATCH_SIZE, ge=1, le=10000),
+    db: Session = Depends(get_db)
+) -> Dict[str, Any]:
+    """Delete a record and its dependents in bounded batches"""
+    result = await run_in_threadpool(DatabaseManager.delete_record, db, table_name, system_id, dry_run, batch_size)
+    if not result["success"]:
+        status_code = 404 if result["error"].endswith("not found") else 409
+        raise HTTPException(status_code=status_code, detail=result["error"])
+    return result
+
 @router.delete("/table/{table_name}/rows")
 async def delete_table_rows(table_name: str, data: Dict[str, Any], db: Session = Depends(get_db)) -> Dict[str, Any]:
     """Delete rows from a table"""
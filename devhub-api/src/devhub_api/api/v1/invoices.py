@@ -2,11 +2,16 @@
 
 from datetime import datetime, date
 from typing import List, Optional, Dict, Any
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Header
+from fastapi.responses import Response, StreamingResponse
 from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import and_, or_, desc
+import io
+import json
+import zipfile
 
 from ...core import get_db
+from ...core.pagination import PageParams, page_params, paginate, created_order
 from ...models import Invoice, Customer, Project, Tenant
 from ...schemas import (
     InvoiceCreate,
@@ -15,9 +20,17 @@ from ...schemas import (
     InvoiceList,
     InvoiceFilters,
     InvoiceStatus,
-    InvoiceSummary
+    InvoiceSummary,
+    RecurringInvoiceTemplateCreate,
+    RecurringInvoiceTemplateUpdate,
+    RecurringInvoiceTemplateResponse,
+    RecurringBillingRun
 )
 from ...services.auth_service import AuthService
+from ...services.invoice_summary import InvoiceSummaryService
+from ...services.receivables import ReceivablesAgingService
+from ...services.recurring_billing import RecurringBillingService
+from ...services.invoice_documents import InvoiceDocumentService
 
 router = APIRouter()
 
@@ -28,6 +41,12 @@ def get_current_user_and_tenant(db: Session = Depends(get_db)):
     return {"user_id": "temp_user", "tenant_id": "temp_tenant"}
 
 
+def _invoices_changed(tenant_id: str) -> None:
+    """Drop the tenant's cached invoice reports after a committed write."""
+    InvoiceSummaryService.invalidate(tenant_id)
+    ReceivablesAgingService.invalidate(tenant_id)
+
+
 @router.post("/", response_model=InvoiceResponse, status_code=status.HTTP_201_CREATED)
 async def create_invoice(
     invoice_data: InvoiceCreate,
@@ -102,6 +121,7 @@ async def create_invoice(
     
     db.commit()
     db.refresh(invoice)
+    _invoices_changed(auth_context["tenant_id"])
     
     # Load related data for response
     invoice_with_relations = db.query(Invoice).options(
@@ -115,27 +135,24 @@ async def create_invoice(
 
 @router.get("/", response_model=InvoiceList)
 async def list_invoices(
-    page: int = Query(1, ge=1, description="Page number"),
-    per_page: int = Query(10, ge=1, le=100, description="Items per page"),
     status: Optional[InvoiceStatus] = Query(None, description="Filter by status"),
     customer_id: Optional[str] = Query(None, description="Filter by customer ID"),
     project_id: Optional[str] = Query(None, description="Filter by project ID"),
     overdue_only: Optional[bool] = Query(False, description="Show only overdue invoices"),
     search: Optional[str] = Query(None, description="Search in invoice number and notes"),
+    page: PageParams = Depends(page_params),
     db: Session = Depends(get_db),
     auth_context: Dict[str, Any] = Depends(get_current_user_and_tenant)
 ) -> InvoiceList:
-    """List invoices with pagination and filtering."""
+    """List invoices with cursor pagination and filtering."""
     
     # Temporary fix: return empty list due to database schema mismatch
     # TODO: Fix database schema to match model definitions
     return InvoiceList(
         invoices=[],
-        total=0,
-        page=page,
-        per_page=per_page,
+        next_cursor=None,
         has_next=False,
-        has_prev=False
+        limit=page.limit
     )
     
     if customer_id:
@@ -145,13 +162,8 @@ async def list_invoices(
         query = query.filter(Invoice.project_id == project_id)
     
     if overdue_only:
-        today = date.today()
-        query = query.filter(
-            and_(
-                Invoice.due_date < today,
-                Invoice.status.in_([InvoiceStatus.SENT, InvoiceStatus.VIEWED, InvoiceStatus.PENDING])
-            )
-        )
+        # Kept current by the overdue-marking job (services/maintenance.py)
+        query = query.filter(Invoice.status == InvoiceStatus.OVERDUE)
     
     if search:
         search_term = f"%{search}%"
@@ -162,23 +174,18 @@ async def list_invoices(
             )
         )
     
-    # Get total count
-    total = query.count()
-    
-    # Apply pagination and ordering
-    offset = (page - 1) * per_page
-    invoices = query.order_by(desc(Invoice.created_at)).offset(offset).limit(per_page).all()
+    # Keyset pagination, newest first
+    result = paginate(db, query, page, created_order(Invoice))
     
     # Build response
-    invoice_responses = [_build_invoice_response(invoice) for invoice in invoices]
+    invoice_responses = [_build_invoice_response(invoice) for invoice in result.items]
     
     return InvoiceList(
         invoices=invoice_responses,
-        total=total,
-        page=page,
-        per_page=per_page,
-        has_next=offset + per_page < total,
-        has_prev=page > 1
+        next_cursor=result.next_cursor,
+        has_next=result.has_next,
+        limit=page.limit,
+        estimated_total=result.estimated_total
     )
 
 
@@ -187,35 +194,186 @@ async def get_invoice_summary(
     db: Session = Depends(get_db),
     auth_context: Dict[str, Any] = Depends(get_current_user_and_tenant)
 ) -> InvoiceSummary:
-    """Get invoice summary statistics."""
+    """Get invoice summary statistics, overall and per currency."""
+    
+    return InvoiceSummary(**InvoiceSummaryService.get_summary(db, auth_context["tenant_id"]))
+
+
+@router.get("/aging")
+async def get_aging_report(
+    as_of: Optional[date] = Query(None, description="Date to age invoices against (default: today)"),
+    db: Session = Depends(get_db),
+    auth_context: Dict[str, Any] = Depends(get_current_user_and_tenant)
+) -> Dict[str, Any]:
+    """Get outstanding amounts by days past due (current, 1-30, 31-60, 61-90, 90+), per customer and in total."""
+    
+    return ReceivablesAgingService.get_report(db, auth_context["tenant_id"], as_of)
+
+
+@router.get("/aging/export")
+async def export_aging_report(
+    as_of: Optional[date] = Query(None, description="Date to age invoices against (default: today)"),
+    db: Session = Depends(get_db),
+    auth_context: Dict[str, Any] = Depends(get_current_user_and_tenant)
+) -> StreamingResponse:
+    """Export the aging report as CSV for accounting."""
+    
+    report = ReceivablesAgingService.get_report(db, auth_context["tenant_id"], as_of)
+    filename = f"ar-aging-{report['tenant_id']}-{report['as_of']}.csv"
+    return StreamingResponse(
+        ReceivablesAgingService.iter_csv(report),
+        media_type="text/csv",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+@router.get("/recurring", response_model=List[RecurringInvoiceTemplateResponse])
+async def list_recurring_templates(
+    active_only: bool = Query(False, description="Only templates that are still billed"),
+    db: Session = Depends(get_db),
+    auth_context: Dict[str, Any] = Depends(get_current_user_and_tenant)
+) -> List[RecurringInvoiceTemplateResponse]:
+    """List the tenant's recurring invoice templates."""
     
-    invoices = db.query(Invoice).filter(
-        Invoice.tenant_id == auth_context["tenant_id"]
-    ).all()
+    templates = RecurringBillingService.list_templates(db, auth_context["tenant_id"], active_only)
+    return [RecurringInvoiceTemplateResponse.model_validate(template) for template in templates]
+
+
+@router.post("/recurring", response_model=RecurringInvoiceTemplateResponse, status_code=status.HTTP_201_CREATED)
+async def create_recurring_template(
+    template_data: RecurringInvoiceTemplateCreate,
+    db: Session = Depends(get_db),
+    auth_context: Dict[str, Any] = Depends(get_current_user_and_tenant)
+) -> RecurringInvoiceTemplateResponse:
+    """Create a template that issues an invoice to a customer every billing period."""
     
-    total_invoices = len(invoices)
-    total_amount = sum(invoice.total_amount for invoice in invoices)
-    paid_amount = sum(
-        invoice.total_amount for invoice in invoices 
-        if invoice.status == InvoiceStatus.PAID
+    template = RecurringBillingService.create_template(db, auth_context["tenant_id"], template_data.model_dump())
+    db.commit()
+    db.refresh(template)
+    
+    return RecurringInvoiceTemplateResponse.model_validate(template)
+
+
+@router.patch("/recurring/{template_id}", response_model=RecurringInvoiceTemplateResponse)
+async def update_recurring_template(
+    template_id: str,
+    template_data: RecurringInvoiceTemplateUpdate,
+    db: Session = Depends(get_db),
+    auth_context: Dict[str, Any] = Depends(get_current_user_and_tenant)
+) -> RecurringInvoiceTemplateResponse:
+    """Update a recurring invoice template; set is_active to false to stop billing it."""
+    
+    template = RecurringBillingService.update_template(
+        db, auth_context["tenant_id"], template_id, template_data.model_dump(exclude_unset=True)
     )
+    if not template:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Recurring invoice template not found"
+        )
+    
+    db.commit()
+    db.refresh(template)
+    
+    return RecurringInvoiceTemplateResponse.model_validate(template)
+
+
+@router.post("/recurring/run", response_model=RecurringBillingRun)
+async def run_recurring_billing(
+    period: Optional[date] = Query(None, description="Any day of the month to bill (default: current month)"),
+    db: Session = Depends(get_db),
+    auth_context: Dict[str, Any] = Depends(get_current_user_and_tenant)
+) -> RecurringBillingRun:
+    """Issue the billing period's invoices for every due template; safe to re-run."""
+    
+    return RecurringBillingRun(**RecurringBillingService.bill_period(db, auth_context["tenant_id"], period))
+
+
+@router.post("/documents/batch")
+async def render_invoice_documents(
+    billing_period: Optional[date] = Query(None, description="Render every invoice of this billing run (any day of its month)"),
+    invoice_ids: Optional[List[str]] = Query(None, description="Render these invoices"),
+    db: Session = Depends(get_db),
+    auth_context: Dict[str, Any] = Depends(get_current_user_and_tenant)
+) -> Response:
+    """Render many invoices in parallel and download them as one ZIP of PDFs."""
+    
+    if billing_period is None and not invoice_ids:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="billing_period or invoice_ids is required"
+        )
     
-    today = date.today()
-    overdue_amount = sum(
-        invoice.total_amount for invoice in invoices
-        if invoice.due_date < today and invoice.status in [
-            InvoiceStatus.SENT, InvoiceStatus.VIEWED, InvoiceStatus.PENDING
-        ]
+    documents = InvoiceDocumentService.load(db, auth_context["tenant_id"], invoice_ids, billing_period)
+    if not documents:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No invoices found"
+        )
+    
+    result = await InvoiceDocumentService.render_batch(documents)
+    
+    # Failures are listed in manifest.json; there can be too many for a header
+    manifest = {
+        "invoices": len(documents),
+        "rendered": result["rendered"],
+        "cached": result["cached"],
+        "failed": result["errors"]
+    }
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w", zipfile.ZIP_STORED) as zip_file:
+        for invoice_id, pdf in result["pdfs"].items():
+            zip_file.writestr(f"{invoice_id}.pdf", pdf)
+        zip_file.writestr("manifest.json", json.dumps(manifest, indent=2))
+    
+    return Response(
+        content=archive.getvalue(),
+        media_type="application/zip",
+        headers={
+            "Content-Disposition": 'attachment; filename="invoices.zip"',
+            "X-Rendered": str(result["rendered"]),
+            "X-Cached": str(result["cached"]),
+            "X-Failed": str(len(result["errors"]))
+        }
     )
+
+
+@router.get("/{invoice_id}/pdf")
+async def get_invoice_pdf(
+    invoice_id: str,
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db),
+    auth_context: Dict[str, Any] = Depends(get_current_user_and_tenant)
+) -> Response:
+    """Download an invoice as PDF; unchanged invoices are served from the document cache."""
     
-    pending_amount = total_amount - paid_amount
+    documents = InvoiceDocumentService.load(db, auth_context["tenant_id"], [invoice_id])
+    if not documents:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Invoice not found"
+        )
+    
+    etag = f'"{InvoiceDocumentService.content_hash(documents[0])}"'
+    if if_none_match == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    
+    try:
+        _, pdf = await InvoiceDocumentService.render(documents[0])
+    except RuntimeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "1"}
+        )
     
-    return InvoiceSummary(
-        total_invoices=total_invoices,
-        total_amount=total_amount,
-        paid_amount=paid_amount,
-        pending_amount=pending_amount,
-        overdue_amount=overdue_amount
+    return Response(
+        content=pdf,
+        media_type="application/pdf",
+        headers={
+            "ETag": etag,
+            "Content-Disposition": f'inline; filename="{invoice_id}.pdf"'
+        }
     )
 
 
@@ -309,6 +467,7 @@ async def update_invoice(
     
     db.commit()
     db.refresh(invoice)
+    _invoices_changed(auth_context["tenant_id"])
     
     # Load related data for response
     invoice_with_relations = db.query(Invoice).options(
@@ -347,6 +506,7 @@ async def delete_invoice(
     # Delete the invoice
     db.delete(invoice)
     db.commit()
+    _invoices_changed(auth_context["tenant_id"])
     
     return None
 
@@ -385,6 +545,8 @@ def _build_invoice_response(invoice: Invoice) -> InvoiceResponse:
         customer_id=invoice.customer_id,
         project_id=invoice.project_id,
         tenant_id=invoice.tenant_id,
+        amount=invoice.amount,
+        currency=invoice.currency,
         created_at=invoice.created_at,
         updated_at=invoice.updated_at,
         customer_name=invoice.customer.name if hasattr(invoice, 'customer') and invoice.customer else None,
@@ -3,22 +3,95 @@ Multi-Tenant API Endpoints for DevHub SaaS Platform
 """
 
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session
 
 from ...database import get_db
+from ...core.pagination import PageParams, page_params
+from ...core.fieldsets import FieldSet
+from ...models import Customer, Lead, Project, CustomerInteraction
 from ...services.multitenant import (
     TenantService, 
     MultiTenantCRMService, 
     MultiTenantProjectService,
     AuthorizationService
 )
-from ...schemas.tenant import TenantResponse, TenantCreate
+from ...services.formula_profiles import FormulaProfileService
+from ...schemas.tenant import TenantResponse, TenantCreate, TenantBusinessVariables
 from ...schemas.crm import CustomerResponse, CustomerCreate  
 from ...schemas.project import ProjectResponse, ProjectCreate
 
 router = APIRouter()
 
+# Sparse fieldsets for the list endpoints (fields= query parameter)
+CUSTOMER_FIELDS = FieldSet(Customer, {
+    "id": "system_id",
+    "tenant_id": "tenant_id",
+    "company": "company",
+    "name": "name",
+    "email": "email",
+    "phone": "phone",
+    "address_line1": "address_line1",
+    "address_line2": "address_line2",
+    "city": "city",
+    "state": "state",
+    "postal_code": "postal_code",
+    "country": "country",
+    "is_active": "is_active",
+    "created_at": "created_at",
+    "updated_at": "updated_at"
+})
+
+LEAD_FIELDS = FieldSet(Lead, {
+    "id": "system_id",
+    "tenant_id": "tenant_id",
+    "company": "company",
+    "name": "name",
+    "email": "email",
+    "phone": "phone",
+    "stage": "stage",
+    "source": "source",
+    "job_title": "job_title",
+    "assigned_to": "assigned_to",
+    "qualification_status": "qualification_status",
+    "converted_to_customer": "converted_to_customer",
+    "estimated_value": "estimated_value",
+    "probability": "probability",
+    "last_contacted": "last_contacted",
+    "is_stale": "is_stale",
+    "created_at": "created_at",
+    "updated_at": "updated_at"
+}, default=[
+    "id", "tenant_id", "company", "name", "email", "phone", "stage", "source", "job_title",
+    "assigned_to", "qualification_status", "converted_to_customer", "created_at", "updated_at"
+])
+
+PROJECT_FIELDS = FieldSet(Project, {
+    "id": "system_id",
+    "tenant_id": "tenant_id",
+    "name": "name",
+    "description": "description",
+    "status": "status",
+    "start_date": "start_date",
+    "due_date": "due_date",
+    "owner_id": "owner_id",
+    "created_at": "created_at",
+    "updated_at": "updated_at"
+})
+
+INTERACTION_FIELDS = FieldSet(CustomerInteraction, {
+    "id": "system_id",
+    "customer_id": "customer_id",
+    "user_id": "user_id",
+    "type": "interaction_type",
+    "subject": "subject",
+    "notes": "description",
+    "outcome": "outcome",
+    "date": "created_at",
+    "created_at": "created_at",
+    "updated_at": "updated_at"
+}, default=["id", "customer_id", "type", "notes", "date", "created_at", "updated_at"])
+
 # Dependency to get current user context
 def get_current_user_context(db: Session = Depends(get_db)):
     """
@@ -41,8 +114,10 @@ def get_current_user_context(db: Session = Depends(get_db)):
 # Tenant Management Endpoints
 @router.get("/tenants", response_model=List[TenantResponse])
 async def list_tenants(
+    response: Response,
     db: Session = Depends(get_db),
-    current_user = Depends(get_current_user_context)
+    current_user = Depends(get_current_user_context),
+    page: PageParams = Depends(page_params)
 ):
     """List all accessible tenants"""
     if not current_user["is_founder"]:
@@ -52,7 +127,8 @@ async def list_tenants(
         )
     
     tenant_service = TenantService(db)
-    tenants = tenant_service.get_accessible_tenants(current_user["user_id"])
+    tenants = tenant_service.get_accessible_tenants(current_user["user_id"], page)
+    tenants.apply_headers(response)
     
     return [
         TenantResponse(
@@ -64,7 +140,7 @@ async def list_tenants(
             max_users=tenant.max_users,
             created_at=tenant.created_at
         )
-        for tenant in tenants
+        for tenant in tenants.items
     ]
 
 @router.post("/tenants", response_model=TenantResponse)
@@ -99,14 +175,59 @@ async def create_tenant(
         created_at=tenant.created_at
     )
 
+@router.get("/tenants/{tenant_id}/business-variables", response_model=TenantBusinessVariables)
+async def get_tenant_business_variables(
+    tenant_id: str,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user_context)
+):
+    """Get the business variables the CRM formulas use for a tenant"""
+    if not AuthorizationService.can_access_tenant(current_user, tenant_id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied to this tenant"
+        )
+    
+    profile = FormulaProfileService.get(db, tenant_id)
+    return TenantBusinessVariables(business_variables=dict(profile.business_variables) or None)
+
+@router.put("/tenants/{tenant_id}/business-variables", response_model=TenantBusinessVariables)
+async def update_tenant_business_variables(
+    tenant_id: str,
+    data: TenantBusinessVariables,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user_context)
+):
+    """Replace a tenant's business variables (validated and recompiled for scoring)"""
+    if not AuthorizationService.can_access_tenant(current_user, tenant_id) or \
+            not AuthorizationService.can_manage_users(current_user):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only the platform founder or tenant managers can change business variables"
+        )
+    
+    profile = FormulaProfileService.update(db, tenant_id, data.business_variables)
+    if profile is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Tenant not found"
+        )
+    
+    db.commit()
+    return TenantBusinessVariables(business_variables=dict(profile.business_variables) or None)
+
 # Multi-Tenant CRM Endpoints
 @router.get("/tenants/{tenant_id}/customers", response_model=List[CustomerResponse])
 async def list_tenant_customers(
     tenant_id: str,
+    response: Response,
     db: Session = Depends(get_db),
     current_user = Depends(get_current_user_context),
     status_filter: Optional[str] = Query(None, alias="status"),
-    search: Optional[str] = Query(None)
+    search: Optional[str] = Query(None),
+    search_mode: str = Query("ranked", pattern="^(ranked|prefix)$"),
+    page: PageParams = Depends(page_params),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return")
 ):
     """List customers for a specific tenant"""
     # Check if user can access this tenant
@@ -127,8 +248,15 @@ async def list_tenant_customers(
         filters["status"] = status_filter
     if search:
         filters["search"] = search
+        filters["search_mode"] = search_mode
+    
+    selected = CUSTOMER_FIELDS.parse(fields)
+    if selected:
+        customers = crm_service.get_customers(tenant_context, filters, page, CUSTOMER_FIELDS.columns(selected))
+        return CUSTOMER_FIELDS.response(customers, selected)
     
-    customers = crm_service.get_customers(tenant_context, filters)
+    customers = crm_service.get_customers(tenant_context, filters, page)
+    customers.apply_headers(response)
     
     return [
         CustomerResponse(
@@ -148,7 +276,7 @@ async def list_tenant_customers(
             created_at=customer.created_at,
             updated_at=customer.updated_at
         )
-        for customer in customers
+        for customer in customers.items
     ]
 
 @router.post("/tenants/{tenant_id}/customers", response_model=CustomerResponse)
@@ -201,10 +329,13 @@ async def create_tenant_customer(
 @router.get("/tenants/{tenant_id}/projects", response_model=List[ProjectResponse])
 async def list_tenant_projects(
     tenant_id: str,
+    response: Response,
     db: Session = Depends(get_db),
     current_user = Depends(get_current_user_context),
     status_filter: Optional[str] = Query(None, alias="status"),
-    customer_id: Optional[str] = Query(None)
+    customer_id: Optional[str] = Query(None),
+    page: PageParams = Depends(page_params),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return")
 ):
     """List projects for a specific tenant"""
     # Check if user can access this tenant
@@ -226,7 +357,13 @@ async def list_tenant_projects(
     if customer_id:
         filters["customer_id"] = customer_id
     
-    projects = project_service.get_projects(tenant_context, filters)
+    selected = PROJECT_FIELDS.parse(fields)
+    if selected:
+        projects = project_service.get_projects(tenant_context, filters, page, PROJECT_FIELDS.columns(selected))
+        return PROJECT_FIELDS.response(projects, selected)
+    
+    projects = project_service.get_projects(tenant_context, filters, page)
+    projects.apply_headers(response)
     
     return [
         ProjectResponse(
@@ -240,7 +377,7 @@ async def list_tenant_projects(
             budget=project.budget,
             created_at=project.created_at
         )
-        for project in projects
+        for project in projects.items
     ]
 
 @router.post("/tenants/{tenant_id}/projects", response_model=ProjectResponse)
@@ -302,6 +439,7 @@ async def get_user_context(
     accessible_tenants = tenant_service.get_accessible_tenants(
         current_user["user_id"]
     )
+    context["accessible_tenants_next_cursor"] = accessible_tenants.next_cursor
     
     context["accessible_tenants"] = [
         {
@@ -309,7 +447,7 @@ async def get_user_context(
             "name": tenant.business_name,
             "subscription_plan": tenant.subscription_plan
         }
-        for tenant in accessible_tenants
+        for tenant in accessible_tenants.items
     ]
     
     return context
@@ -354,43 +492,15 @@ async def get_tenant_crm_analytics(
         tenant_context["tenant_id"] = tenant_id
     
     crm_service = MultiTenantCRMService(db)
-    
-    # Get analytics data
-    from ...models import Customer, Lead, Project
-    
-    # Customer metrics
-    customers = crm_service.get_customers(tenant_context, {})
-    total_customers = len(customers)
-    active_customers = len([c for c in customers if c.is_active])
-    
-    # Lead metrics  
-    leads = crm_service.get_leads(tenant_context, {})
-    total_leads = len(leads)
-    qualified_leads = len([l for l in leads if l.qualification_status == 'qualified'])
-    converted_leads = len([l for l in leads if l.converted_to_customer == True])
-    conversion_rate = (converted_leads / total_leads * 100) if total_leads > 0 else 0
-    
-    # Project metrics
-    project_service = MultiTenantProjectService(db)
-    projects = project_service.get_projects(tenant_context, {})
-    total_projects = len(projects)
+    analytics = crm_service.get_dashboard_analytics(tenant_context)
     
     return {
-        "customer_metrics": {
-            "total_customers": total_customers,
-            "active_customers": active_customers,
-            "new_customers_this_month": 0  # TODO: Calculate from created_at
-        },
-        "lead_metrics": {
-            "total_leads": total_leads,
-            "qualified_leads": qualified_leads,
-            "converted_leads": converted_leads,
-            "conversion_rate": round(conversion_rate, 2)
-        },
-        "project_metrics": {
-            "total_projects": total_projects,
-            "active_projects": len([p for p in projects if p.status == 'active'])
-        }
+        "customer_metrics": analytics["customer_metrics"],
+        "lead_metrics": analytics["lead_metrics"],
+        "project_metrics": analytics["project_metrics"],
+        "interaction_metrics": analytics["interaction_metrics"],
+        "pipeline_stages": analytics["pipeline_stages"],
+        "lead_sources": analytics["lead_sources"]
     }
 
 
@@ -401,7 +511,12 @@ async def list_tenant_leads(
     db: Session = Depends(get_db),
     current_user = Depends(get_current_user_context),
     status_filter: Optional[str] = Query(None, alias="status"),
-    source_filter: Optional[str] = Query(None, alias="source")
+    source_filter: Optional[str] = Query(None, alias="source"),
+    search: Optional[str] = Query(None),
+    search_mode: str = Query("ranked", pattern="^(ranked|prefix)$"),
+    stale: Optional[bool] = Query(None, description="Only leads flagged (or not flagged) as stale"),
+    page: PageParams = Depends(page_params),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return")
 ):
     """List leads for a specific tenant"""
     # Validate tenant access
@@ -415,28 +530,16 @@ async def list_tenant_leads(
         filters["status"] = status_filter
     if source_filter:
         filters["source"] = source_filter
+    if search:
+        filters["search"] = search
+        filters["search_mode"] = search_mode
+    if stale is not None:
+        filters["is_stale"] = stale
     
-    leads = crm_service.get_leads(tenant_context, filters)
+    selected = LEAD_FIELDS.parse(fields)
+    leads = crm_service.get_leads(tenant_context, filters, page, LEAD_FIELDS.columns(selected))
     
-    return [
-        {
-            "id": lead.system_id,
-            "tenant_id": lead.tenant_id,
-            "company": lead.company,
-            "name": lead.name,  # Use 'name' instead of 'contact_name'
-            "email": lead.email,
-            "phone": lead.phone,
-            "stage": lead.stage,  # Use 'stage' instead of 'status'
-            "source": lead.source,
-            "job_title": lead.job_title,
-            "assigned_to": lead.assigned_to,
-            "qualification_status": lead.qualification_status,
-            "converted_to_customer": lead.converted_to_customer,
-            "created_at": lead.created_at,
-            "updated_at": lead.updated_at
-        }
-        for lead in leads
-    ]
+    return LEAD_FIELDS.response(leads, selected)
 
 
 @router.post("/tenants/{tenant_id}/leads", response_model=dict)
@@ -479,13 +582,54 @@ async def create_tenant_lead(
     }
 
 
+@router.patch("/tenants/{tenant_id}/leads/{lead_id}", response_model=dict)
+async def update_tenant_lead(
+    tenant_id: str,
+    lead_id: str,
+    lead_data: dict,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user_context)
+):
+    """Update a lead for a specific tenant"""
+    # Validate tenant access
+    tenant_context = current_user.copy()
+    if not current_user["is_founder"]:
+        tenant_context["tenant_id"] = tenant_id
+    
+    crm_service = MultiTenantCRMService(db)
+    lead = crm_service.update_lead(lead_id, lead_data, tenant_context)
+    
+    db.commit()
+    db.refresh(lead)
+    
+    return {
+        "id": lead.system_id,
+        "tenant_id": lead.tenant_id,
+        "company": lead.company,
+        "name": lead.name,
+        "email": lead.email,
+        "phone": lead.phone,
+        "stage": lead.stage,
+        "source": lead.source,
+        "job_title": lead.job_title,
+        "assigned_to": lead.assigned_to,
+        "estimated_value": lead.estimated_value,
+        "qualification_status": lead.qualification_status,
+        "converted_to_customer": lead.converted_to_customer,
+        "created_at": lead.created_at,
+        "updated_at": lead.updated_at
+    }
+
+
 # Customer Interactions Endpoints
 @router.get("/tenants/{tenant_id}/customers/{customer_id}/interactions", response_model=List[dict])
 async def list_customer_interactions(
     tenant_id: str,
     customer_id: str,
     db: Session = Depends(get_db),
-    current_user = Depends(get_current_user_context)
+    current_user = Depends(get_current_user_context),
+    page: PageParams = Depends(page_params),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return")
 ):
     """List interactions for a specific customer"""
     # Validate tenant access
@@ -494,20 +638,12 @@ async def list_customer_interactions(
         tenant_context["tenant_id"] = tenant_id
     
     crm_service = MultiTenantCRMService(db)
-    interactions = crm_service.get_customer_interactions(tenant_context, customer_id)
+    selected = INTERACTION_FIELDS.parse(fields)
+    interactions = crm_service.get_customer_interactions(
+        tenant_context, customer_id, page, INTERACTION_FIELDS.columns(selected)
+    )
     
-    return [
-        {
-            "id": interaction.system_id,
-            "customer_id": interaction.customer_id,
-            "type": interaction.type,
-            "notes": interaction.notes,
-            "date": interaction.date,
-            "created_at": interaction.created_at,
-            "updated_at": interaction.updated_at
-        }
-        for interaction in interactions
-    ]
+    return INTERACTION_FIELDS.response(interactions, selected)
 
 
 @router.post("/tenants/{tenant_id}/customers/{customer_id}/interactions", response_model=dict)
@@ -537,9 +673,9 @@ async def create_customer_interaction(
     return {
         "id": interaction.system_id,
         "customer_id": interaction.customer_id,
-        "type": interaction.type,
-        "notes": interaction.notes,
-        "date": interaction.date,
+        "type": interaction.interaction_type,
+        "notes": interaction.description,
+        "date": interaction.created_at,
         "created_at": interaction.created_at,
         "updated_at": interaction.updated_at
     }
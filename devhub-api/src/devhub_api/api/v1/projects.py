@@ -7,6 +7,7 @@ from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import and_, or_, desc
 
 from ...core import get_db
+from ...core.pagination import PageParams, page_params, paginate, created_order
 from ...models import Project, Customer, Tenant
 from ...schemas import (
     ProjectCreate,
@@ -82,43 +83,37 @@ async def create_project(
 
 @router.get("/", response_model=ProjectList)
 async def list_projects(
-    page: int = Query(1, ge=1, description="Page number"),
-    per_page: int = Query(10, ge=1, le=100, description="Items per page"),
     status: Optional[ProjectStatus] = Query(None, description="Filter by status"),
     priority: Optional[ProjectPriority] = Query(None, description="Filter by priority"),
     customer_id: Optional[str] = Query(None, description="Filter by customer ID"),
     search: Optional[str] = Query(None, description="Search in name and description"),
+    page: PageParams = Depends(page_params),
     db: Session = Depends(get_db),
     auth_context: Dict[str, Any] = Depends(get_current_user_and_tenant)
 ) -> ProjectList:
-    """List projects with pagination and filtering."""
+    """List projects with cursor pagination and filtering."""
     
     # Temporary fix: return empty list due to database schema mismatch
     # TODO: Fix database schema to match model definitions
     return ProjectList(
         projects=[],
-        total=0,
-        page=page,
-        per_page=per_page,
+        next_cursor=None,
         has_next=False,
-        has_prev=False
+        limit=page.limit
     )
-    total = query.count()
     
-    # Apply pagination and ordering
-    offset = (page - 1) * per_page
-    projects = query.order_by(desc(Project.updated_at)).offset(offset).limit(per_page).all()
+    # Keyset pagination, newest first
+    result = paginate(db, query, page, created_order(Project))
     
     # Build response
-    project_responses = [_build_project_response(project) for project in projects]
+    project_responses = [_build_project_response(project) for project in result.items]
     
     return ProjectList(
         projects=project_responses,
-        total=total,
-        page=page,
-        per_page=per_page,
-        has_next=offset + per_page < total,
-        has_prev=page > 1
+        next_cursor=result.next_cursor,
+        has_next=result.has_next,
+        limit=page.limit,
+        estimated_total=result.estimated_total
     )
 
 
@@ -0,0 +1,40 @@
+"""
+Global search API endpoints
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import Dict, Any, Optional
+from ...database import get_db
+from ...services.multitenant import TenantService
+from ...services.search import GlobalSearch
+from .crm import get_current_user_context
+
+router = APIRouter()
+
+@router.get("")
+async def search_everything(
+    q: str = Query(..., min_length=1, description="Search text"),
+    mode: str = Query("ranked", pattern="^(ranked|prefix)$"),
+    types: Optional[str] = Query(None, description="Comma-separated entity types"),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user_context)
+) -> Dict[str, Any]:
+    """Search customers, leads, projects, invoices, notes and interactions at once"""
+    entity_types = [t.strip() for t in types.split(",") if t.strip()] if types else None
+    if entity_types:
+        unknown = [t for t in entity_types if t not in GlobalSearch.ENTITY_TYPES]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown entity types: {', '.join(unknown)}")
+    
+    tenant_service = TenantService(db)
+    return GlobalSearch.search(
+        db,
+        lambda query, model: tenant_service.filter_by_tenant(query, model, current_user),
+        q,
+        mode,
+        entity_types,
+        page,
+        page_size
+    )
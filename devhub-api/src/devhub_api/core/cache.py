@@ -0,0 +1,69 @@
+"""
+In-process TTL cache for read-heavy aggregates
+Entries expire after a fixed time so other workers' writes show up without coordination;
+writers in this process invalidate affected keys immediately
+"""
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+import threading
+import time
+
+
+class TTLCache:
+    """Thread-safe cache of values keyed by tuples, each expiring ttl_seconds after it was stored"""
+
+    def __init__(self, ttl_seconds: float, max_entries: int = 1024):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: Dict[Tuple, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(key: Hashable) -> Tuple:
+        return key if isinstance(key, tuple) else (key,)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Cached value, or None when missing or expired"""
+        key = self._key(key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return None
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        key = self._key(key)
+        now = time.monotonic()
+        with self._lock:
+            if key not in self._entries and len(self._entries) >= self.max_entries:
+                self._evict(now)
+            self._entries[key] = (now + self.ttl_seconds, value)
+
+    def get_or_set(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Cached value, computing and storing it on a miss (compute runs outside the lock)"""
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.set(key, value)
+        return value
+
+    def invalidate(self, *prefix: Hashable) -> int:
+        """Drop every key starting with prefix (everything when no prefix is given); returns the count"""
+        with self._lock:
+            if not prefix:
+                count = len(self._entries)
+                self._entries.clear()
+                return count
+            keys = [key for key in self._entries if key[:len(prefix)] == prefix]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+    def _evict(self, now: float) -> None:
+        """Drop expired entries, then the oldest ones, until there is room for one more"""
+        for key in [key for key, (expires_at, _) in self._entries.items() if expires_at <= now]:
+            del self._entries[key]
+        while len(self._entries) >= self.max_entries:
+            del self._entries[next(iter(self._entries))]
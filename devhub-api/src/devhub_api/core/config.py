@@ -2,6 +2,7 @@
 Core configuration management
 """
 import os
+import tempfile
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -27,6 +28,33 @@ class Settings:
     ENVIRONMENT: str = os.getenv("ENVIRONMENT", "development")
     DEBUG: bool = os.getenv("DEBUG", "true").lower() == "true"
     
+    # Background jobs
+    SCHEDULER_ENABLED: bool = os.getenv("SCHEDULER_ENABLED", "true").lower() == "true"
+    INTEGRITY_SCAN_INTERVAL_SECONDS: int = int(os.getenv("INTEGRITY_SCAN_INTERVAL_SECONDS", "900"))
+    INTEGRITY_SCAN_STATEMENT_TIMEOUT_MS: int = int(os.getenv("INTEGRITY_SCAN_STATEMENT_TIMEOUT_MS", "30000"))
+    ANALYTICS_ROLLUP_REBUILD_INTERVAL_SECONDS: int = int(os.getenv("ANALYTICS_ROLLUP_REBUILD_INTERVAL_SECONDS", "86400"))
+    LEAD_SCORING_INTERVAL_SECONDS: int = int(os.getenv("LEAD_SCORING_INTERVAL_SECONDS", "600"))
+    RECURRING_BILLING_INTERVAL_SECONDS: int = int(os.getenv("RECURRING_BILLING_INTERVAL_SECONDS", "3600"))
+    OVERDUE_MARKING_INTERVAL_SECONDS: int = int(os.getenv("OVERDUE_MARKING_INTERVAL_SECONDS", "900"))
+    STALE_LEAD_INTERVAL_SECONDS: int = int(os.getenv("STALE_LEAD_INTERVAL_SECONDS", "3600"))
+    STALE_LEAD_DAYS: int = int(os.getenv("STALE_LEAD_DAYS", "30"))
+    JOB_RUN_RETENTION_DAYS: int = int(os.getenv("JOB_RUN_RETENTION_DAYS", "30"))
+    
+    # Caching
+    FORECAST_CACHE_TTL_SECONDS: int = int(os.getenv("FORECAST_CACHE_TTL_SECONDS", "60"))
+    INVOICE_SUMMARY_CACHE_TTL_SECONDS: int = int(os.getenv("INVOICE_SUMMARY_CACHE_TTL_SECONDS", "30"))
+    AGING_CACHE_TTL_SECONDS: int = int(os.getenv("AGING_CACHE_TTL_SECONDS", "300"))
+    
+    # Invoice documents (INVOICE_RENDER_WORKERS=0 uses one process per CPU)
+    INVOICE_RENDER_WORKERS: int = int(os.getenv("INVOICE_RENDER_WORKERS", "0"))
+    INVOICE_RENDER_QUEUE_SIZE: int = int(os.getenv("INVOICE_RENDER_QUEUE_SIZE", "32"))
+    INVOICE_DOCUMENT_CACHE_DIR: str = os.getenv(
+        "INVOICE_DOCUMENT_CACHE_DIR", os.path.join(tempfile.gettempdir(), "devhub-invoice-documents")
+    )
+    INVOICE_DOCUMENT_CACHE_MAX_AGE_DAYS: int = int(os.getenv("INVOICE_DOCUMENT_CACHE_MAX_AGE_DAYS", "30"))
+    INVOICE_DOCUMENT_CACHE_MAX_MB: int = int(os.getenv("INVOICE_DOCUMENT_CACHE_MAX_MB", "512"))
+    INVOICE_DOCUMENT_CACHE_PRUNE_INTERVAL_SECONDS: int = int(os.getenv("INVOICE_DOCUMENT_CACHE_PRUNE_INTERVAL_SECONDS", "3600"))
+    
     # Feature Flags
     FEATURE_CRM: bool = True
     FEATURE_PROJECTS: bool = True
@@ -0,0 +1,49 @@
+"""
+Sparse fieldsets for list endpoints
+Maps a fields= query parameter onto a column-projected SELECT and a matching row serializer
+"""
+from typing import Any, Dict, List, Optional, Sequence
+
+from .exceptions import ValidationError
+from .pagination import Page
+from .serialization import FastJSONResponse
+
+
+class FieldSet:
+    """Public field names of a list view mapped to model column attributes"""
+
+    def __init__(self, model, fields: Dict[str, str], default: Optional[Sequence[str]] = None,
+                 required: Sequence[str] = ("id", "created_at")):
+        self.model = model
+        self.fields = fields
+        self.default = list(default or fields)
+        # Model attributes every projection carries, e.g. the pagination cursor keys
+        self.required = list(required)
+
+    def parse(self, fields: Optional[str]) -> Optional[List[str]]:
+        """Validate a comma-separated fields= value; None when the client asked for nothing specific"""
+        if not fields:
+            return None
+
+        names = list(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+        unknown = [name for name in names if name not in self.fields]
+        if unknown:
+            raise ValidationError(
+                f"Unknown fields: {', '.join(unknown)}. Available fields: {', '.join(self.fields)}"
+            )
+        return names or None
+
+    def columns(self, selected: Optional[Sequence[str]] = None) -> List[Any]:
+        """Model columns to SELECT for the selected fields"""
+        attributes = dict.fromkeys([self.fields[name] for name in selected or self.default] + self.required)
+        return [getattr(self.model, attribute) for attribute in attributes]
+
+    def serialize(self, row, selected: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+        """Render a projected row (or a full ORM object) with public field names"""
+        return {name: getattr(row, self.fields[name]) for name in selected or self.default}
+
+    def response(self, page: Page, selected: Optional[Sequence[str]] = None) -> FastJSONResponse:
+        """Serialize a page directly, bypassing response_model validation of the full schema"""
+        response = FastJSONResponse([self.serialize(row, selected) for row in page.items])
+        page.apply_headers(response)
+        return response
@@ -18,7 +18,16 @@ Triangle Problem Applied to CRM:
 Same formula, different variables = Universal solution
 """
 
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Mapping, Union
+
+from .crm_profiles import (
+    FormulaProfile, STAGE_SCORES, CONVERSION_VALUES, ADVOCACY_VALUES, MESSAGE_EFFECTIVENESS,
+    UNKNOWN_STAGE_SCORE, UNKNOWN_CONVERSION_VALUE, UNKNOWN_ADVOCACY_VALUE, UNKNOWN_MESSAGE_EFFECTIVENESS,
+    DEFAULT_COMMUNICATION_TIMES
+)
+
+# business_variables arguments take a raw dict or a FormulaProfile compiled from one
+BusinessVariables = Union[FormulaProfile, Mapping[str, Any], None]
 
 class CRMFormulas:
     """Universal CRM formulas that work for any business"""
@@ -34,7 +43,7 @@ class CRMFormulas:
         conversion_events: List[str],
         retention_factors: Dict[str, Any],
         advocacy_indicators: List[str],
-        business_variables: Optional[Dict[str, Any]] = None
+        business_variables: BusinessVariables = None
     ) -> Dict[str, Any]:
         """
         Universal Customer Lifecycle Formula
@@ -50,36 +59,26 @@ class CRMFormulas:
         
         Works for ANY business by plugging in appropriate variables
         """
+        profile = FormulaProfile.of(business_variables)
         
         # Calculate lifecycle score using universal formula
-        acquisition_score = CRMFormulas._calculate_stage_score(acquisition_stage)
+        acquisition_score = CRMFormulas._calculate_stage_score(acquisition_stage, profile.stage_scores)
         engagement_score = CRMFormulas._calculate_engagement_score(engagement_metrics)
-        conversion_score = CRMFormulas._calculate_conversion_score(conversion_events)
+        conversion_score = CRMFormulas._calculate_conversion_score(conversion_events, profile.conversion_values)
         retention_score = CRMFormulas._calculate_retention_score(retention_factors)
-        advocacy_score = CRMFormulas._calculate_advocacy_score(advocacy_indicators)
+        advocacy_score = CRMFormulas._calculate_advocacy_score(advocacy_indicators, profile.advocacy_values)
         
         # Apply business-specific weightings
-        weights = business_variables.get('lifecycle_weights', {
-            'acquisition': 0.15,
-            'engagement': 0.25,
-            'conversion': 0.25,
-            'retention': 0.25,
-            'advocacy': 0.10
-        }) if business_variables else {
-            'acquisition': 0.15,
-            'engagement': 0.25,
-            'conversion': 0.25,
-            'retention': 0.25,
-            'advocacy': 0.10
-        }
+        acquisition_weight, engagement_weight, conversion_weight, retention_weight, advocacy_weight = \
+            profile.lifecycle_weights
         
         # Universal lifecycle formula
         lifecycle_score = (
-            acquisition_score * weights['acquisition'] +
-            engagement_score * weights['engagement'] +
-            conversion_score * weights['conversion'] +
-            retention_score * weights['retention'] +
-            advocacy_score * weights['advocacy']
+            acquisition_score * acquisition_weight +
+            engagement_score * engagement_weight +
+            conversion_score * conversion_weight +
+            retention_score * retention_weight +
+            advocacy_score * advocacy_weight
         )
         
         return {
@@ -92,7 +91,7 @@ class CRMFormulas:
                 'advocacy': advocacy_score
             },
             'next_recommended_actions': CRMFormulas._generate_next_actions(
-                lifecycle_score, business_variables
+                lifecycle_score, profile.business_variables
             ),
             'customer_tier': CRMFormulas._determine_customer_tier(lifecycle_score)
         }
@@ -108,7 +107,7 @@ class CRMFormulas:
         deal_value: float,
         time_in_stage: Dict[str, int],
         customer_signals: Dict[str, Any],
-        business_variables: Optional[Dict[str, Any]] = None
+        business_variables: BusinessVariables = None
     ) -> Dict[str, Any]:
         """
         Universal Sales Pipeline Formula
@@ -127,6 +126,7 @@ class CRMFormulas:
         - Real Estate: ['inquiry', 'viewing', 'offer', 'inspection', 'contract', 'closing']
         - E-commerce: ['browse', 'cart', 'checkout', 'payment', 'fulfillment', 'delivery']
         """
+        profile = FormulaProfile.of(business_variables)
         
         # Calculate pipeline health using universal formula
         stage_velocity = CRMFormulas._calculate_stage_velocity(pipeline_stages, time_in_stage)
@@ -136,8 +136,8 @@ class CRMFormulas:
         revenue_forecast = deal_value * conversion_probability
         
         # Apply business-specific factors
-        industry_multiplier = business_variables.get('industry_multiplier', 1.0) if business_variables else 1.0
-        seasonality_factor = business_variables.get('seasonality_factor', 1.0) if business_variables else 1.0
+        industry_multiplier = profile.industry_multiplier
+        seasonality_factor = profile.seasonality_factor
         
         # Universal pipeline formula
         pipeline_score = (stage_velocity * 0.3 + conversion_probability * 0.7) * industry_multiplier * seasonality_factor
@@ -148,7 +148,7 @@ class CRMFormulas:
             'revenue_forecast': revenue_forecast,
             'stage_velocity': stage_velocity,
             'recommended_actions': CRMFormulas._generate_pipeline_actions(
-                pipeline_score, pipeline_stages, business_variables
+                pipeline_score, pipeline_stages, profile.business_variables
             ),
             'risk_factors': CRMFormulas._identify_risk_factors(time_in_stage, stage_probabilities)
         }
@@ -164,7 +164,7 @@ class CRMFormulas:
         response_rates: Dict[str, float],
         engagement_metrics: Dict[str, Any],
         customer_preferences: Dict[str, Any],
-        business_variables: Optional[Dict[str, Any]] = None
+        business_variables: BusinessVariables = None
     ) -> Dict[str, Any]:
         """
         Universal Communication Effectiveness Formula
@@ -180,6 +180,7 @@ class CRMFormulas:
         
         Works for any communication strategy across any business
         """
+        profile = FormulaProfile.of(business_variables)
         
         # Calculate communication effectiveness using universal formula
         channel_effectiveness = CRMFormulas._calculate_channel_effectiveness(
@@ -187,16 +188,13 @@ class CRMFormulas:
         )
         
         message_effectiveness = CRMFormulas._calculate_message_effectiveness(
-            message_types, response_rates
+            message_types, response_rates, profile.message_effectiveness
         )
         
         preference_alignment = CRMFormulas._calculate_preference_alignment(
             customer_preferences, communication_channels
         )
         
-        # Apply business context
-        industry_norms = business_variables.get('communication_norms', {}) if business_variables else {}
-        
         # Universal communication formula
         communication_score = (
             channel_effectiveness * 0.4 +
@@ -208,13 +206,13 @@ class CRMFormulas:
             'communication_score': communication_score,
             'optimal_channels': CRMFormulas._identify_optimal_channels(channel_effectiveness),
             'message_recommendations': CRMFormulas._generate_message_recommendations(
-                message_effectiveness, business_variables
+                message_effectiveness, profile.business_variables
             ),
             'timing_optimization': CRMFormulas._optimize_communication_timing(
-                customer_preferences, industry_norms
+                customer_preferences, profile.communication_times
             ),
             'next_communication_plan': CRMFormulas._generate_communication_plan(
-                communication_score, business_variables
+                communication_score, profile.business_variables
             )
         }
     
@@ -229,7 +227,7 @@ class CRMFormulas:
         referral_count: int,
         support_cost: float,
         retention_probability: float,
-        business_variables: Optional[Dict[str, Any]] = None
+        business_variables: BusinessVariables = None
     ) -> Dict[str, Any]:
         """
         Universal Customer Value Formula
@@ -245,11 +243,12 @@ class CRMFormulas:
         
         Calculates universal customer value regardless of business model
         """
+        profile = FormulaProfile.of(business_variables)
         
         # Calculate components using universal formulas
         revenue_value = sum(revenue_history) if revenue_history else 0
-        engagement_value = interaction_frequency * business_variables.get('engagement_multiplier', 1.0) if business_variables else interaction_frequency
-        referral_value = referral_count * business_variables.get('referral_value', 100) if business_variables else referral_count * 100
+        engagement_value = interaction_frequency * profile.engagement_multiplier
+        referral_value = referral_count * profile.referral_value
         
         # Universal customer value formula
         gross_value = revenue_value + engagement_value + referral_value
@@ -267,7 +266,7 @@ class CRMFormulas:
                 'support_cost': support_cost
             },
             'optimization_recommendations': CRMFormulas._generate_value_optimization(
-                net_value, business_variables
+                net_value, profile.business_variables
             )
         }
     
@@ -276,17 +275,9 @@ class CRMFormulas:
     # ====================================================================
     
     @staticmethod
-    def _calculate_stage_score(stage: str) -> float:
+    def _calculate_stage_score(stage: str, stage_scores: Mapping[str, float] = STAGE_SCORES) -> float:
         """Calculate score for acquisition stage"""
-        stage_scores = {
-            'unknown': 0.1,
-            'lead': 0.2,
-            'qualified': 0.4,
-            'interested': 0.6,
-            'evaluation': 0.8,
-            'ready': 1.0
-        }
-        return stage_scores.get(stage.lower(), 0.1)
+        return stage_scores.get(stage.lower(), UNKNOWN_STAGE_SCORE)
     
     @staticmethod
     def _calculate_engagement_score(metrics: Dict[str, Any]) -> float:
@@ -317,21 +308,13 @@ class CRMFormulas:
         return min(score, max_score)
     
     @staticmethod
-    def _calculate_conversion_score(events: List[str]) -> float:
+    def _calculate_conversion_score(events: List[str],
+                                    conversion_values: Mapping[str, float] = CONVERSION_VALUES) -> float:
         """Calculate conversion score from events"""
         if not events:
             return 0.0
         
-        conversion_values = {
-            'trial_started': 0.3,
-            'demo_requested': 0.4,
-            'quote_requested': 0.5,
-            'proposal_sent': 0.6,
-            'contract_signed': 0.8,
-            'payment_made': 1.0
-        }
-        
-        return max([conversion_values.get(event.lower(), 0.1) for event in events])
+        return max([conversion_values.get(event.lower(), UNKNOWN_CONVERSION_VALUE) for event in events])
     
     @staticmethod
     def _calculate_retention_score(factors: Dict[str, Any]) -> float:
@@ -356,20 +339,13 @@ class CRMFormulas:
         return min(score, 1.0)
     
     @staticmethod
-    def _calculate_advocacy_score(indicators: List[str]) -> float:
+    def _calculate_advocacy_score(indicators: List[str],
+                                  advocacy_values: Mapping[str, float] = ADVOCACY_VALUES) -> float:
         """Calculate advocacy score from indicators"""
         if not indicators:
             return 0.0
         
-        advocacy_values = {
-            'referral_given': 0.4,
-            'testimonial_provided': 0.3,
-            'review_written': 0.2,
-            'social_share': 0.1,
-            'case_study_participated': 0.5
-        }
-        
-        return min(sum([advocacy_values.get(indicator.lower(), 0.0) for indicator in indicators]), 1.0)
+        return min(sum([advocacy_values.get(indicator.lower(), UNKNOWN_ADVOCACY_VALUE) for indicator in indicators]), 1.0)
     
     @staticmethod
     def _generate_next_actions(score: float, business_vars: Optional[Dict[str, Any]]) -> List[str]:
@@ -464,21 +440,15 @@ class CRMFormulas:
         return total_effectiveness / len(channels)
     
     @staticmethod
-    def _calculate_message_effectiveness(message_types: Dict[str, str], response_rates: Dict[str, float]) -> float:
+    def _calculate_message_effectiveness(message_types: Dict[str, str], response_rates: Dict[str, float],
+                                         effectiveness_scores: Mapping[str, float] = MESSAGE_EFFECTIVENESS) -> float:
         """Calculate effectiveness of message types"""
         if not message_types:
             return 0.0
         
-        effectiveness_scores = {
-            'promotional': 0.3,
-            'educational': 0.6,
-            'transactional': 0.8,
-            'personal': 0.9
-        }
-        
         total_score = 0.0
         for msg_type in message_types.values():
-            total_score += effectiveness_scores.get(msg_type.lower(), 0.1)
+            total_score += effectiveness_scores.get(msg_type.lower(), UNKNOWN_MESSAGE_EFFECTIVENESS)
         
         return total_score / len(message_types)
     
@@ -518,16 +488,13 @@ class CRMFormulas:
             return ['Maintain current approach', 'Test new variations', 'Scale successful messages']
     
     @staticmethod
-    def _optimize_communication_timing(preferences: Dict[str, Any], industry_norms: Dict[str, Any]) -> Dict[str, Any]:
+    def _optimize_communication_timing(preferences: Dict[str, Any],
+                                       default_times: Mapping[str, str] = DEFAULT_COMMUNICATION_TIMES) -> Dict[str, Any]:
         """Optimize communication timing"""
         optimal_times = preferences.get('optimal_times', {})
         if not optimal_times:
-            # Use industry defaults
-            optimal_times = industry_norms.get('communication_times', {
-                'email': '9:00 AM',
-                'phone': '2:00 PM',
-                'sms': '11:00 AM'
-            })
+            # Use industry defaults (the profile's communication_norms.communication_times)
+            optimal_times = dict(default_times)
         
         return {
             'recommended_times': optimal_times,
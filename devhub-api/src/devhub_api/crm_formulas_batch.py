@@ -0,0 +1,412 @@
+"""
+CRM Formulas - Vectorized Batch Engine
+======================================
+
+Columnar versions of the CRMFormulas scores for scoring a whole tenant at once.
+Every function takes NumPy arrays (one entry per record) and returns arrays of
+the same sub-scores, weights, tiers and flags the scalar formulas return, with
+identical floating point results: each expression is evaluated in the same
+order as in crm_formulas.py.
+
+Input conventions:
+- Numeric per-record values are 1-D float arrays; NaN means the key was absent
+  from the scalar formula's dict.
+- Categorical values are integer codes from encode() against the vocabularies
+  below. Unknown values get the code len(vocabulary).
+- Per-record lists are 2-D arrays padded on the right: codes from encode_lists()
+  (padding -1) or floats from pad() (padding NaN). Order is kept, so sums add
+  up in the same order as the scalar loops.
+- Tiers, actions and plans come back as integer codes indexing the *_LABELS
+  tuples; use labels() to turn them into strings.
+- business_variables takes a raw dict or a compiled FormulaProfile; the lookup
+  tables and weights are read from the profile.
+"""
+
+from typing import Dict, List, Any, Optional, Sequence, Iterable
+
+import numpy as np
+
+from . import crm_profiles
+from .crm_profiles import FormulaProfile, DEFAULT_PROFILE
+from .crm_formulas import BusinessVariables
+
+
+class CRMBatchFormulas:
+    """Vectorized CRMFormulas over columnar inputs"""
+
+    # ====================================================================
+    # VOCABULARIES AND DEFAULT LOOKUP TABLES (see crm_profiles.py)
+    # ====================================================================
+
+    STAGES = crm_profiles.STAGES
+    STAGE_SCORES = DEFAULT_PROFILE.stage_table
+
+    CONVERSION_EVENTS = crm_profiles.CONVERSION_EVENTS
+    CONVERSION_SCORES = DEFAULT_PROFILE.conversion_table
+
+    ADVOCACY_INDICATORS = crm_profiles.ADVOCACY_INDICATORS
+    ADVOCACY_SCORES = DEFAULT_PROFILE.advocacy_table
+
+    MESSAGE_TYPES = crm_profiles.MESSAGE_TYPES
+    MESSAGE_SCORES = DEFAULT_PROFILE.message_table
+
+    ENGAGEMENT_METRICS = ('email_opens', 'page_views', 'social_interactions', 'direct_interactions')
+    RETENTION_FACTORS = ('satisfaction_score', 'usage_frequency', 'support_interactions')
+    CUSTOMER_SIGNALS = ('high_engagement', 'budget_confirmed', 'decision_maker')
+
+    CUSTOMER_TIER_LABELS = ('Bronze', 'Silver', 'Gold', 'VIP')
+    VALUE_TIER_LABELS = ('Basic', 'Standard', 'Premium', 'Enterprise')
+    NEXT_ACTION_LABELS = (
+        ('Increase engagement', 'Provide value-add content', 'Schedule follow-up'),
+        ('Nurture relationship', 'Provide product demo', 'Share case studies'),
+        ('Convert to customer', 'Upsell opportunity', 'Request referral')
+    )
+    PIPELINE_ACTION_LABELS = (
+        ('Qualify opportunity', 'Understand needs', 'Build rapport'),
+        ('Present solution', 'Handle objections', 'Provide references'),
+        ('Negotiate terms', 'Prepare contract', 'Close deal')
+    )
+    OPTIMAL_CHANNEL_LABELS = (('email',), ('email', 'phone'), ('email', 'phone', 'in-person'))
+    MESSAGE_RECOMMENDATION_LABELS = (
+        ('Personalize messages', 'Improve subject lines', 'Segment audience'),
+        ('Maintain current approach', 'Test new variations', 'Scale successful messages')
+    )
+    VALUE_OPTIMIZATION_LABELS = (
+        ('Increase engagement', 'Provide more value', 'Reduce support costs'),
+        ('Upsell opportunities', 'Improve retention', 'Encourage referrals'),
+        ('Maintain relationship', 'Expand account', 'Strategic partnership')
+    )
+
+    # ====================================================================
+    # ENCODING HELPERS
+    # ====================================================================
+
+    @staticmethod
+    def encode(values: Iterable[str], vocabulary: Sequence[str]) -> np.ndarray:
+        """Case-insensitive category codes; unknown values map to len(vocabulary)"""
+        codes = {name: index for index, name in enumerate(vocabulary)}
+        unknown = len(vocabulary)
+        return np.array([codes.get(value.lower(), unknown) for value in values], dtype=np.int64)
+
+    @staticmethod
+    def encode_lists(rows: Sequence[Sequence[str]], vocabulary: Sequence[str]) -> np.ndarray:
+        """Per-record lists of categories as a right-padded code matrix (padding -1)"""
+        codes = {name: index for index, name in enumerate(vocabulary)}
+        unknown = len(vocabulary)
+        width = max((len(row) for row in rows), default=0)
+        matrix = np.full((len(rows), width), -1, dtype=np.int64)
+        for index, row in enumerate(rows):
+            matrix[index, :len(row)] = [codes.get(value.lower(), unknown) for value in row]
+        return matrix
+
+    @staticmethod
+    def pad(rows: Sequence[Sequence[float]]) -> np.ndarray:
+        """Per-record lists of numbers as a right-padded float matrix (padding NaN)"""
+        width = max((len(row) for row in rows), default=0)
+        matrix = np.full((len(rows), width), np.nan, dtype=np.float64)
+        for index, row in enumerate(rows):
+            matrix[index, :len(row)] = row
+        return matrix
+
+    @staticmethod
+    def column(records: Sequence[Dict[str, Any]], key: str) -> np.ndarray:
+        """One optional numeric key of per-record dicts as a float column (NaN where absent)"""
+        return np.array([record.get(key, np.nan) if record else np.nan for record in records], dtype=np.float64)
+
+    @staticmethod
+    def labels(codes: np.ndarray, labels: Sequence[Any]) -> np.ndarray:
+        """Map result codes back to their labels"""
+        table = np.empty(len(labels), dtype=object)
+        table[:] = list(labels)
+        return table[codes]
+
+    # ====================================================================
+    # FORMULA 1: CUSTOMER LIFECYCLE
+    # ====================================================================
+
+    @staticmethod
+    def customer_lifecycle(
+        acquisition_stage: np.ndarray,
+        engagement_metrics: Dict[str, np.ndarray],
+        conversion_events: np.ndarray,
+        retention_factors: Dict[str, np.ndarray],
+        advocacy_indicators: np.ndarray,
+        business_variables: BusinessVariables = None
+    ) -> Dict[str, Any]:
+        """
+        Batch CRMFormulas.customer_lifecycle_formula
+
+        acquisition_stage: STAGES codes
+        engagement_metrics / retention_factors: ENGAGEMENT_METRICS / RETENTION_FACTORS columns
+        conversion_events / advocacy_indicators: encode_lists() matrices
+        """
+        profile = FormulaProfile.of(business_variables)
+        acquisition = profile.stage_table[acquisition_stage]
+        engagement = CRMBatchFormulas._engagement_scores(engagement_metrics, len(acquisition))
+        conversion = CRMBatchFormulas._conversion_scores(conversion_events, len(acquisition), profile.conversion_table)
+        retention = CRMBatchFormulas._retention_scores(retention_factors, len(acquisition))
+        advocacy = CRMBatchFormulas._advocacy_scores(advocacy_indicators, len(acquisition), profile.advocacy_table)
+
+        acquisition_weight, engagement_weight, conversion_weight, retention_weight, advocacy_weight = \
+            profile.lifecycle_weights
+
+        lifecycle_score = (
+            acquisition * acquisition_weight +
+            engagement * engagement_weight +
+            conversion * conversion_weight +
+            retention * retention_weight +
+            advocacy * advocacy_weight
+        )
+
+        return {
+            'lifecycle_score': lifecycle_score,
+            'stage_breakdown': {
+                'acquisition': acquisition,
+                'engagement': engagement,
+                'conversion': conversion,
+                'retention': retention,
+                'advocacy': advocacy
+            },
+            'next_recommended_actions': np.searchsorted([0.3, 0.6], lifecycle_score, side='right'),
+            'customer_tier': np.searchsorted([0.4, 0.6, 0.8], lifecycle_score, side='right')
+        }
+
+    # ====================================================================
+    # FORMULA 2: SALES PIPELINE
+    # ====================================================================
+
+    @staticmethod
+    def sales_pipeline(
+        has_stages: np.ndarray,
+        stage_probabilities: np.ndarray,
+        deal_value: np.ndarray,
+        time_in_stage: np.ndarray,
+        customer_signals: Dict[str, np.ndarray],
+        business_variables: BusinessVariables = None
+    ) -> Dict[str, Any]:
+        """
+        Batch CRMFormulas.sales_pipeline_formula
+
+        has_stages: whether each record's pipeline_stages list is non-empty
+        stage_probabilities / time_in_stage: pad() matrices of the dict values, in dict order
+        customer_signals: boolean CUSTOMER_SIGNALS columns (missing columns count as False)
+
+        Risk factors come back as flags: stalled_stages marks time_in_stage entries over
+        30 days (same positions as the input) and low_conversion_probability the rest.
+        """
+        time_total, time_count = CRMBatchFormulas._sum_count(time_in_stage)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            average_time = time_total / time_count
+            stage_velocity = np.where(
+                np.asarray(has_stages, dtype=bool) & (time_count > 0),
+                1.0 / (1.0 + average_time / 30),
+                0.0
+            )
+
+        probability_total, probability_count = CRMBatchFormulas._sum_count(stage_probabilities)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            base_probability = np.where(probability_count > 0, probability_total / probability_count, 0.0)
+
+        signal_boost = np.zeros(len(base_probability))
+        for signal, boost in zip(CRMBatchFormulas.CUSTOMER_SIGNALS, (0.1, 0.2, 0.15)):
+            if signal in customer_signals:
+                signal_boost = signal_boost + np.where(np.asarray(customer_signals[signal], dtype=bool), boost, 0.0)
+
+        conversion_probability = np.where(
+            probability_count > 0, np.minimum(base_probability + signal_boost, 1.0), 0.0
+        )
+        revenue_forecast = deal_value * conversion_probability
+
+        profile = FormulaProfile.of(business_variables)
+        industry_multiplier = profile.industry_multiplier
+        seasonality_factor = profile.seasonality_factor
+
+        pipeline_score = (stage_velocity * 0.3 + conversion_probability * 0.7) * industry_multiplier * seasonality_factor
+
+        return {
+            'pipeline_score': pipeline_score,
+            'conversion_probability': conversion_probability,
+            'revenue_forecast': revenue_forecast,
+            'stage_velocity': stage_velocity,
+            'recommended_actions': np.searchsorted([0.3, 0.6], pipeline_score, side='right'),
+            'stalled_stages': np.nan_to_num(time_in_stage, nan=0.0) > 30,
+            'low_conversion_probability': base_probability < 0.3
+        }
+
+    # ====================================================================
+    # FORMULA 3: COMMUNICATION EFFECTIVENESS
+    # ====================================================================
+
+    @staticmethod
+    def communication_effectiveness(
+        channel_response_rates: np.ndarray,
+        has_response_rates: np.ndarray,
+        message_types: np.ndarray,
+        preferred_channels: np.ndarray,
+        has_preferences: np.ndarray,
+        has_preferred_channels: np.ndarray,
+        business_variables: BusinessVariables = None
+    ) -> Dict[str, Any]:
+        """
+        Batch CRMFormulas.communication_effectiveness_formula
+
+        channel_response_rates: pad() matrix with response_rates.get(channel, 0.0) per
+            communication channel, in channel order (its width per row is the channel count)
+        has_response_rates: whether each record's response_rates dict is non-empty
+        message_types: encode_lists() matrix of the message_types dict values
+        preferred_channels: boolean matrix aligned with channel_response_rates, True where
+            the channel is in customer_preferences['preferred_channels']
+        has_preferences / has_preferred_channels: whether customer_preferences and its
+            preferred_channels list are non-empty
+
+        Timing optimization only echoes preference dicts, so it stays with the scalar formula.
+        """
+        rate_total, channel_count = CRMBatchFormulas._sum_count(channel_response_rates)
+        has_channels = channel_count > 0
+        with np.errstate(invalid='ignore', divide='ignore'):
+            channel_effectiveness = np.where(
+                has_channels & np.asarray(has_response_rates, dtype=bool),
+                rate_total / channel_count,
+                0.0
+            )
+
+        profile = FormulaProfile.of(business_variables)
+        message_total = CRMBatchFormulas._sequential_sum(profile.message_table[message_types])
+        message_count = (message_types >= 0).sum(axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            message_effectiveness = np.where(message_count > 0, message_total / message_count, 0.0)
+
+        preferred = np.asarray(preferred_channels, dtype=bool)
+        alignment = CRMBatchFormulas._sequential_sum(np.where(preferred, 1.0, 0.0))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            preference_alignment = np.where(
+                np.asarray(has_preferences, dtype=bool) & has_channels,
+                np.where(np.asarray(has_preferred_channels, dtype=bool), alignment / channel_count, 0.5),
+                0.0
+            )
+
+        communication_score = (
+            channel_effectiveness * 0.4 +
+            message_effectiveness * 0.3 +
+            preference_alignment * 0.3
+        )
+
+        return {
+            'communication_score': communication_score,
+            'channel_effectiveness': channel_effectiveness,
+            'message_effectiveness': message_effectiveness,
+            'preference_alignment': preference_alignment,
+            'optimal_channels': np.where(channel_effectiveness > 0.7, 2, np.where(channel_effectiveness > 0.4, 1, 0)),
+            'message_recommendations': (message_effectiveness >= 0.4).astype(np.int64),
+            'next_communication_plan': np.searchsorted([0.3, 0.6], communication_score, side='right')
+        }
+
+    # ====================================================================
+    # FORMULA 4: CUSTOMER VALUE
+    # ====================================================================
+
+    @staticmethod
+    def customer_value(
+        revenue_history: np.ndarray,
+        interaction_frequency: np.ndarray,
+        referral_count: np.ndarray,
+        support_cost: np.ndarray,
+        retention_probability: np.ndarray,
+        business_variables: BusinessVariables = None
+    ) -> Dict[str, Any]:
+        """
+        Batch CRMFormulas.customer_value_formula
+
+        revenue_history: pad() matrix of each record's revenue list
+        """
+        profile = FormulaProfile.of(business_variables)
+        revenue_value = CRMBatchFormulas._sequential_sum(revenue_history)
+        engagement_value = interaction_frequency * profile.engagement_multiplier
+        referral_value = referral_count * profile.referral_value
+
+        gross_value = revenue_value + engagement_value + referral_value
+        net_value = gross_value - support_cost
+        lifetime_value = net_value * retention_probability
+
+        optimization = np.searchsorted([1000, 5000], net_value, side='right')
+        return {
+            'customer_value': net_value,
+            'lifetime_value': lifetime_value,
+            'value_tier': np.searchsorted([1000, 5000, 10000], net_value, side='right'),
+            'value_breakdown': {
+                'revenue_value': revenue_value,
+                'engagement_value': engagement_value,
+                'referral_value': referral_value,
+                'support_cost': support_cost
+            },
+            'optimization_recommendations': optimization
+        }
+
+    # ====================================================================
+    # HELPER METHODS
+    # ====================================================================
+
+    @staticmethod
+    def _sequential_sum(matrix: np.ndarray) -> np.ndarray:
+        """
+        Row sums added left to right like the scalar loops (NaN padding adds nothing)
+
+        np.sum uses pairwise summation, which can differ from a Python loop in the last bit.
+        """
+        total = np.zeros(matrix.shape[0], dtype=np.float64)
+        for index in range(matrix.shape[1]):
+            values = matrix[:, index]
+            total = total + np.where(np.isnan(values), 0.0, values)
+        return total
+
+    @staticmethod
+    def _sum_count(matrix: np.ndarray):
+        return CRMBatchFormulas._sequential_sum(matrix), (~np.isnan(matrix)).sum(axis=1)
+
+    @staticmethod
+    def _capped_term(column: Optional[np.ndarray], divisor: float, cap: float, size: int) -> np.ndarray:
+        """min(value / divisor, cap) where the key is present, else nothing"""
+        if column is None:
+            return np.zeros(size)
+        with np.errstate(invalid='ignore'):
+            return np.where(np.isnan(column), 0.0, np.minimum(column / divisor, cap))
+
+    @staticmethod
+    def _engagement_scores(metrics: Dict[str, np.ndarray], size: int) -> np.ndarray:
+        term = CRMBatchFormulas._capped_term
+        score = np.zeros(size)
+        score = score + term(metrics.get('email_opens'), 10, 0.2, size)
+        score = score + term(metrics.get('page_views'), 50, 0.2, size)
+        score = score + term(metrics.get('social_interactions'), 20, 0.2, size)
+        score = score + term(metrics.get('direct_interactions'), 5, 0.4, size)
+        return np.minimum(score, 1.0)
+
+    @staticmethod
+    def _conversion_scores(events: np.ndarray, size: int, table: np.ndarray = CONVERSION_SCORES) -> np.ndarray:
+        if events.shape[1] == 0:
+            return np.zeros(size)
+        # Scores are non-negative and padding scores 0.0, so padding never raises the max and empty rows give 0.0
+        return table[events].max(axis=1)
+
+    @staticmethod
+    def _retention_scores(factors: Dict[str, np.ndarray], size: int) -> np.ndarray:
+        score = np.zeros(size)
+
+        satisfaction = factors.get('satisfaction_score')
+        if satisfaction is not None:
+            score = score + np.where(np.isnan(satisfaction), 0.0, satisfaction / 10 * 0.4)
+
+        score = score + CRMBatchFormulas._capped_term(factors.get('usage_frequency'), 30, 0.3, size)
+
+        support = factors.get('support_interactions')
+        if support is not None:
+            with np.errstate(invalid='ignore'):
+                score = score + np.where(np.isnan(support), 0.0, np.maximum(0, 0.3 - support / 20))
+
+        return np.minimum(score, 1.0)
+
+    @staticmethod
+    def _advocacy_scores(indicators: np.ndarray, size: int, table: np.ndarray = ADVOCACY_SCORES) -> np.ndarray:
+        if indicators.shape[1] == 0:
+            return np.zeros(size)
+        return np.minimum(CRMBatchFormulas._sequential_sum(table[indicators]), 1.0)
@@ -0,0 +1,204 @@
+"""
+CRM Formula Profiles
+====================
+
+Business variables compiled once into the immutable weights and lookup tables
+that CRMFormulas and CRMBatchFormulas read. A profile is built per tenant (see
+services/formula_profiles.py) and passed as business_variables, so scoring a
+record does no dict merging, default rebuilding or table construction.
+
+Besides the factors the formulas always read (lifecycle_weights,
+industry_multiplier, seasonality_factor, engagement_multiplier, referral_value,
+communication_norms), a tenant can override individual entries of the lookup
+tables: stage_scores, conversion_values, advocacy_values, message_effectiveness.
+Overrides only change scores of the known names, so batch category codes stay
+the same for every tenant.
+"""
+
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Sequence, Union
+
+import numpy as np
+
+# ====================================================================
+# DEFAULT LOOKUP TABLES
+# ====================================================================
+
+STAGE_SCORES = MappingProxyType({
+    'unknown': 0.1,
+    'lead': 0.2,
+    'qualified': 0.4,
+    'interested': 0.6,
+    'evaluation': 0.8,
+    'ready': 1.0
+})
+
+CONVERSION_VALUES = MappingProxyType({
+    'trial_started': 0.3,
+    'demo_requested': 0.4,
+    'quote_requested': 0.5,
+    'proposal_sent': 0.6,
+    'contract_signed': 0.8,
+    'payment_made': 1.0
+})
+
+ADVOCACY_VALUES = MappingProxyType({
+    'referral_given': 0.4,
+    'testimonial_provided': 0.3,
+    'review_written': 0.2,
+    'social_share': 0.1,
+    'case_study_participated': 0.5
+})
+
+MESSAGE_EFFECTIVENESS = MappingProxyType({
+    'promotional': 0.3,
+    'educational': 0.6,
+    'transactional': 0.8,
+    'personal': 0.9
+})
+
+# Score of a name missing from each table
+UNKNOWN_STAGE_SCORE = 0.1
+UNKNOWN_CONVERSION_VALUE = 0.1
+UNKNOWN_ADVOCACY_VALUE = 0.0
+UNKNOWN_MESSAGE_EFFECTIVENESS = 0.1
+
+LIFECYCLE_COMPONENTS = ('acquisition', 'engagement', 'conversion', 'retention', 'advocacy')
+DEFAULT_LIFECYCLE_WEIGHTS = MappingProxyType({
+    'acquisition': 0.15,
+    'engagement': 0.25,
+    'conversion': 0.25,
+    'retention': 0.25,
+    'advocacy': 0.10
+})
+
+DEFAULT_COMMUNICATION_TIMES = MappingProxyType({
+    'email': '9:00 AM',
+    'phone': '2:00 PM',
+    'sms': '11:00 AM'
+})
+
+# Batch category vocabularies, in code order
+STAGES = tuple(STAGE_SCORES)
+CONVERSION_EVENTS = tuple(CONVERSION_VALUES)
+ADVOCACY_INDICATORS = tuple(ADVOCACY_VALUES)
+MESSAGE_TYPES = tuple(MESSAGE_EFFECTIVENESS)
+
+
+def lookup_table(scores: Mapping[str, float], vocabulary: Sequence[str], default: float,
+                 padding: float = 0.0) -> np.ndarray:
+    """Read-only batch lookup table in code order: known values, then the unknown default, then padding (code -1)"""
+    table = np.array([scores[name] for name in vocabulary] + [default, padding], dtype=np.float64)
+    table.flags.writeable = False
+    return table
+
+
+class FormulaProfile:
+    """Business variables compiled into immutable formula weights and lookup tables"""
+
+    __slots__ = (
+        'business_variables', 'lifecycle_weights', 'industry_multiplier', 'seasonality_factor',
+        'engagement_multiplier', 'referral_value', 'communication_norms', 'communication_times',
+        'stage_scores', 'conversion_values', 'advocacy_values', 'message_effectiveness',
+        'stage_table', 'conversion_table', 'advocacy_table', 'message_table'
+    )
+
+    def __init__(self, business_variables: Optional[Mapping[str, Any]] = None):
+        """Validate and compile business_variables; raises ValueError on malformed values"""
+        if business_variables is not None and not isinstance(business_variables, Mapping):
+            raise ValueError("business_variables must be an object")
+        variables = dict(business_variables or {})
+
+        weights = _scores('lifecycle_weights', variables.get('lifecycle_weights'), DEFAULT_LIFECYCLE_WEIGHTS)
+        norms = variables.get('communication_norms') or {}
+        if not isinstance(norms, Mapping):
+            raise ValueError("business_variables.communication_norms must be an object")
+        communication_times = _times(
+            'communication_norms.communication_times',
+            norms.get('communication_times', DEFAULT_COMMUNICATION_TIMES)
+        )
+
+        stage_scores = _scores('stage_scores', variables.get('stage_scores'), STAGE_SCORES)
+        conversion_values = _scores('conversion_values', variables.get('conversion_values'), CONVERSION_VALUES)
+        advocacy_values = _scores('advocacy_values', variables.get('advocacy_values'), ADVOCACY_VALUES)
+        message_effectiveness = _scores(
+            'message_effectiveness', variables.get('message_effectiveness'), MESSAGE_EFFECTIVENESS
+        )
+
+        compiled = {
+            'business_variables': MappingProxyType(variables),
+            # Ordered as LIFECYCLE_COMPONENTS
+            'lifecycle_weights': tuple(weights[name] for name in LIFECYCLE_COMPONENTS),
+            'industry_multiplier': _number('industry_multiplier', variables.get('industry_multiplier', 1.0)),
+            'seasonality_factor': _number('seasonality_factor', variables.get('seasonality_factor', 1.0)),
+            'engagement_multiplier': _number('engagement_multiplier', variables.get('engagement_multiplier', 1.0)),
+            'referral_value': _number('referral_value', variables.get('referral_value', 100)),
+            'communication_norms': MappingProxyType(dict(norms)),
+            'communication_times': communication_times,
+            'stage_scores': stage_scores,
+            'conversion_values': conversion_values,
+            'advocacy_values': advocacy_values,
+            'message_effectiveness': message_effectiveness,
+            'stage_table': lookup_table(stage_scores, STAGES, UNKNOWN_STAGE_SCORE),
+            'conversion_table': lookup_table(conversion_values, CONVERSION_EVENTS, UNKNOWN_CONVERSION_VALUE),
+            'advocacy_table': lookup_table(advocacy_values, ADVOCACY_INDICATORS, UNKNOWN_ADVOCACY_VALUE),
+            'message_table': lookup_table(message_effectiveness, MESSAGE_TYPES, UNKNOWN_MESSAGE_EFFECTIVENESS)
+        }
+        for name, value in compiled.items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("FormulaProfile is immutable")
+
+    def __repr__(self):
+        return f"<FormulaProfile(business_variables={dict(self.business_variables)!r})>"
+
+    @staticmethod
+    def of(business_variables: Union['FormulaProfile', Mapping[str, Any], None]) -> 'FormulaProfile':
+        """The compiled profile for a formula's business_variables argument"""
+        if isinstance(business_variables, FormulaProfile):
+            return business_variables
+        if not business_variables:
+            return DEFAULT_PROFILE
+        # Ad-hoc dicts are compiled per call; pass a cached profile on hot paths
+        return FormulaProfile(business_variables)
+
+
+def _number(name: str, value: Any) -> float:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"business_variables.{name} must be a number")
+    return float(value)
+
+
+def _times(name: str, value: Any) -> Mapping[str, str]:
+    """Channel -> time-of-day text, e.g. {'email': '9:00 AM'}"""
+    if not isinstance(value, Mapping):
+        raise ValueError(f"business_variables.{name} must be an object")
+    for channel, time in value.items():
+        if not isinstance(time, str):
+            raise ValueError(f"business_variables.{name}.{channel} must be a string")
+    return MappingProxyType(dict(value))
+
+
+def _scores(name: str, overrides: Optional[Mapping[str, Any]], defaults: Mapping[str, float]) -> Mapping[str, float]:
+    """Defaults with non-negative overrides applied; override keys must be names the defaults know"""
+    if not overrides:
+        return defaults
+    if not isinstance(overrides, Mapping):
+        raise ValueError(f"business_variables.{name} must be an object")
+
+    unknown = [key for key in overrides if key not in defaults]
+    if unknown:
+        raise ValueError(
+            f"Unknown business_variables.{name} keys: {', '.join(unknown)}. "
+            f"Available keys: {', '.join(defaults)}"
+        )
+    merged: Dict[str, float] = dict(defaults)
+    for key, value in overrides.items():
+        merged[key] = _number(f"{name}.{key}", value)
+        if merged[key] < 0:
+            raise ValueError(f"business_variables.{name}.{key} must not be negative")
+    return MappingProxyType(merged)
+
+
+DEFAULT_PROFILE = FormulaProfile()
@@ -3,181 +3,616 @@ Database Management and Validation System
 Provides CRUD operations, relationship validation, and error detection
 """
 from fastapi import HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import text, inspect, func
-from typing import Dict, List, Any, Optional
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy import text, inspect, func, select, insert, exists, null, and_, or_, Table, MetaData, String, Text
+from sqlalchemy.exc import NoSuchTableError
+from typing import Dict, List, Any, Optional, Tuple, Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+from functools import partial
 import re
+import threading
+import time
 from .models import (
-    User, Project, Customer, Invoice, ProjectAssignment, ProjectCustomer,
-    Tenant, Lead, CustomerInteraction, LeadInteraction, CustomerNote, PasswordVault
+    User, Project, Customer, Invoice, ProjectAssignment,
+    Lead, CustomerInteraction,
+    SyncWatermark, IntegrityIssue
 )
 from .id_system import IDGenerator
+from .services.pipeline_analytics import PipelineAnalyticsService
 
 
 class DatabaseValidator:
     """Validates database integrity and relationships"""
     
+    # Number of offending rows reported per check (counts are always exact)
+    SAMPLE_LIMIT = 5
+    # Checks run concurrently, each on its own pooled connection
+    MAX_WORKERS = 4
+    
+    ISSUE_CATEGORIES = ["errors", "warnings", "suggestions", "relationship_issues", "id_system_issues"]
+    
+    ID_SYSTEM_MODELS = [
+        (User, "USR"),
+        (Project, "PRJ"),
+        (Customer, "CUS"),
+        (Invoice, "INV")
+    ]
+    
+    # (child model, foreign key column, parent model, referenced column, description)
+    RELATIONSHIPS = [
+        (Project, "owner_id", User, "system_id", "owner_id"),
+        (Invoice, "customer_id", Customer, "system_id", "customer_id"),
+        (ProjectAssignment, "user_id", User, "system_id", "user_id"),
+    ]
+    
+    # (model, column, description)
+    REQUIRED_COLUMNS = [
+        (User, "email", "users have no email address"),
+        (Project, "name", "projects have no name"),
+        (Customer, "name", "customers have no name"),
+    ]
+    
     @staticmethod
-    def validate_schema(db: Session) -> Dict[str, Any]:
+    def empty_issues() -> Dict[str, List[str]]:
+        """Issue buckets returned by every validation"""
+        return {category: [] for category in DatabaseValidator.ISSUE_CATEGORIES}
+    
+    @staticmethod
+    def validate_schema(db: Session, max_workers: Optional[int] = None) -> Dict[str, Any]:
         """Comprehensive database validation"""
-        issues = {
-            "errors": [],
-            "warnings": [],
-            "suggestions": [],
-            "relationship_issues": [],
-            "id_system_issues": []
+        issues = DatabaseValidator.empty_issues()
+        
+        for result in DatabaseValidator.iter_checks(db, max_workers):
+            if result["error"]:
+                issues["errors"].append(f"Check '{result['check']}' failed: {result['error']}")
+            issues[result["category"]].extend(result["messages"])
+        
+        return issues
+    
+    @staticmethod
+    def summarize(issues: Dict[str, List[str]]) -> Dict[str, Any]:
+        """Derive overall status and severity from issue buckets"""
+        blocking = len(issues["errors"]) + len(issues["relationship_issues"]) + len(issues["id_system_issues"])
+        total_issues = blocking + len(issues["warnings"])
+        
+        if issues["errors"]:
+            severity = "critical"
+        elif blocking:
+            severity = "error"
+        elif issues["warnings"]:
+            severity = "warning"
+        else:
+            severity = "healthy"
+        
+        return {
+            "status": "valid" if total_issues == 0 else "issues_found",
+            "severity": severity,
+            "total_issues": total_issues
         }
+    
+    @staticmethod
+    def get_checks() -> List[Tuple[str, str, Callable[[Session], Tuple[int, List[str]]]]]:
+        """
+        All registered checks as (name, issue category, callable)
         
-        # Check ID system consistency
-        issues.update(DatabaseValidator._validate_id_system(db))
+        Each callable runs set-based SQL and returns (issue count, messages);
+        messages only describe a bounded sample of offending rows.
+        """
+        checks = [
+            ("primary_keys", "warnings", DatabaseValidator._check_primary_keys),
+            ("empty_tables", "suggestions", DatabaseValidator._check_empty_tables),
+        ]
         
-        # Check relationships
-        issues.update(DatabaseValidator._validate_relationships(db))
+        for model, prefix in DatabaseValidator.ID_SYSTEM_MODELS:
+            checks.append((
+                f"id_format:{model.__tablename__}", "id_system_issues",
+                partial(DatabaseValidator._check_id_format, model, prefix)
+            ))
+            checks.append((
+                f"id_duplicates:{model.__tablename__}", "id_system_issues",
+                partial(DatabaseValidator._check_id_duplicates, model)
+            ))
         
-        # Check required columns
-        issues.update(DatabaseValidator._validate_required_columns(db))
+        for child, fk_column, parent, parent_column, label in DatabaseValidator.RELATIONSHIPS:
+            checks.append((
+                f"orphans:{child.__tablename__}.{fk_column}", "relationship_issues",
+                partial(DatabaseValidator._check_orphans, child, fk_column, parent, parent_column, label)
+            ))
         
-        # Check data consistency
-        issues.update(DatabaseValidator._validate_data_consistency(db))
+        checks.append(("required_columns", "warnings", DatabaseValidator._check_required_columns))
+        checks.append(("data_consistency", "suggestions", DatabaseValidator._check_data_consistency))
         
-        return issues
+        return checks
     
     @staticmethod
-    def _validate_id_system(db: Session) -> Dict[str, List[str]]:
-        """Validate ID system consistency"""
-        issues = {"id_system_issues": []}
+    def iter_checks(db: Session, max_workers: Optional[int] = None,
+                    statement_timeout_ms: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Run all checks concurrently and yield each result as soon as it finishes
         
-        # Check for missing or invalid system_ids
-        models = [
-            (User, "USR"),
-            (Project, "PRJ"),
-            (Customer, "CUS"),
-            (Invoice, "INV")
-        ]
+        Every worker opens its own session on the same engine as ``db`` so
+        checks proceed in parallel on separate connections. A statement
+        timeout, when given, bounds every query a check runs.
+        """
+        session_factory = sessionmaker(bind=db.get_bind(), autoflush=False)
+        checks = DatabaseValidator.get_checks()
+        executor = ThreadPoolExecutor(
+            max_workers=max_workers or DatabaseValidator.MAX_WORKERS,
+            thread_name_prefix="db-validator"
+        )
         
-        for model, prefix in models:
-            # Check for records with null system_id
-            null_count = db.query(model).filter(model.system_id.is_(None)).count()
-            if null_count > 0:
-                issues["id_system_issues"].append(
-                    f"{model.__tablename__}: {null_count} records have null system_id"
+        try:
+            futures = [
+                executor.submit(
+                    DatabaseValidator._run_check, session_factory, name, category, check, statement_timeout_ms
                 )
-            
-            # Check for invalid ID format
-            invalid_ids = db.query(model).filter(
-                ~model.system_id.like(f"{prefix}-%")
-            ).all()
-            
-            for record in invalid_ids:
-                if record.system_id:
-                    issues["id_system_issues"].append(
-                        f"{model.__tablename__}: Invalid ID format '{record.system_id}' (should be {prefix}-###)"
-                    )
-        
-        # Check for duplicate system_ids
-        for model, prefix in models:
-            duplicates = db.query(model.system_id, func.count(model.system_id)).group_by(
-                model.system_id
-            ).having(func.count(model.system_id) > 1).all()
-            
-            for system_id, count in duplicates:
-                issues["id_system_issues"].append(
-                    f"{model.__tablename__}: Duplicate system_id '{system_id}' ({count} records)"
+                for name, category, check in checks
+            ]
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+    
+    @staticmethod
+    def _run_check(session_factory, name: str, category: str,
+                   check: Callable[[Session], Tuple[int, List[str]]],
+                   statement_timeout_ms: Optional[int] = None) -> Dict[str, Any]:
+        """Execute one check on a dedicated session and time it"""
+        start_time = time.perf_counter()
+        session = session_factory()
+        try:
+            if statement_timeout_ms:
+                # Transaction-local so the setting never leaks back into the pool
+                session.execute(
+                    text("SELECT set_config('statement_timeout', :timeout, true)"),
+                    {"timeout": str(statement_timeout_ms)}
                 )
+            issue_count, messages = check(session)
+            error = None
+        except Exception as e:
+            issue_count, messages, error = 0, [], str(e)
+        finally:
+            session.close()
         
-        return issues
+        return {
+            "check": name,
+            "category": category,
+            "issue_count": issue_count,
+            "messages": messages,
+            "error": error,
+            "duration_ms": int((time.perf_counter() - start_time) * 1000)
+        }
     
     @staticmethod
-    def _validate_relationships(db: Session) -> Dict[str, List[str]]:
-        """Validate foreign key relationships"""
-        issues = {"relationship_issues": []}
+    def _check_primary_keys(db: Session) -> Tuple[int, List[str]]:
+        """Find tables without a primary key (catalog-only, no table access)"""
+        rows = db.execute(text("""
+            SELECT c.relname
+            FROM pg_class c
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE n.nspname = current_schema()
+              AND c.relkind IN ('r', 'p')
+              AND NOT EXISTS (
+                  SELECT 1 FROM pg_constraint k WHERE k.conrelid = c.oid AND k.contype = 'p'
+              )
+            ORDER BY c.relname
+        """)).scalars().all()
         
-        # Check orphaned projects (owner doesn't exist)
-        orphaned_projects = db.query(Project).filter(
-            ~Project.owner_id.in_(db.query(User.system_id))
-        ).all()
+        return len(rows), [f"Table '{table_name}' has no primary key" for table_name in rows]
+    
+    @staticmethod
+    def _check_empty_tables(db: Session) -> Tuple[int, List[str]]:
+        """Find empty tables with one EXISTS probe per table instead of COUNT(*)"""
+        table_names = [name for name in inspect(db.get_bind()).get_table_names() if name != "alembic_version"]
+        if not table_names:
+            return 0, []
         
-        for project in orphaned_projects:
-            issues["relationship_issues"].append(
-                f"Project '{project.name}' ({project.system_id}) has invalid owner_id: {project.owner_id}"
-            )
+        preparer = db.get_bind().dialect.identifier_preparer
+        probes = ", ".join(
+            f"EXISTS (SELECT 1 FROM {preparer.quote(name)}) AS t{index}"
+            for index, name in enumerate(table_names)
+        )
+        row = db.execute(text(f"SELECT {probes}")).one()
         
-        # Check orphaned invoices (customer doesn't exist)
-        orphaned_invoices = db.query(Invoice).filter(
-            ~Invoice.customer_id.in_(db.query(Customer.system_id))
-        ).all()
+        empty = [name for name, has_rows in zip(table_names, row) if not has_rows]
+        return len(empty), [f"Table '{table_name}' is empty" for table_name in empty]
+    
+    @staticmethod
+    def _check_id_format(model, prefix: str, db: Session) -> Tuple[int, List[str]]:
+        """Count null and malformed system_ids, sampling the malformed ones"""
+        table = model.__tablename__
+        pattern = f"{prefix}-%"
         
-        for invoice in orphaned_invoices:
-            issues["relationship_issues"].append(
-                f"Invoice {invoice.system_id} has invalid customer_id: {invoice.customer_id}"
-            )
+        null_count, invalid_count = db.execute(
+            select(
+                func.count().filter(model.system_id.is_(None)),
+                func.count().filter(~model.system_id.like(pattern))
+            ).select_from(model)
+        ).one()
+        
+        messages = []
+        if null_count:
+            messages.append(f"{table}: {null_count} records have null system_id")
         
-        # Check orphaned project assignments
-        orphaned_assignments = db.query(ProjectAssignment).filter(
-            ~ProjectAssignment.user_id.in_(db.query(User.system_id))
+        if invalid_count:
+            sample = db.execute(
+                select(model.system_id)
+                .where(~model.system_id.like(pattern))
+                .limit(DatabaseValidator.SAMPLE_LIMIT)
+            ).scalars().all()
+            for system_id in sample:
+                messages.append(f"{table}: Invalid ID format '{system_id}' (should be {prefix}-###)")
+            if invalid_count > len(sample):
+                messages.append(f"{table}: {invalid_count - len(sample)} more records have an invalid ID format")
+        
+        return null_count + invalid_count, messages
+    
+    @staticmethod
+    def _check_id_duplicates(model, db: Session) -> Tuple[int, List[str]]:
+        """Find duplicated system_ids; the window count reports the total before LIMIT"""
+        table = model.__tablename__
+        rows = db.execute(
+            select(model.system_id, func.count(), func.count().over())
+            .where(model.system_id.isnot(None))
+            .group_by(model.system_id)
+            .having(func.count() > 1)
+            .order_by(func.count().desc())
+            .limit(DatabaseValidator.SAMPLE_LIMIT)
         ).all()
         
-        for assignment in orphaned_assignments:
-            issues["relationship_issues"].append(
-                f"Project assignment has invalid user_id: {assignment.user_id}"
-            )
+        if not rows:
+            return 0, []
         
-        return issues
+        total_groups = rows[0][2]
+        messages = [
+            f"{table}: Duplicate system_id '{system_id}' ({count} records)"
+            for system_id, count, _ in rows
+        ]
+        if total_groups > len(rows):
+            messages.append(f"{table}: {total_groups - len(rows)} more duplicated system_ids")
+        
+        return total_groups, messages
     
     @staticmethod
-    def _validate_required_columns(db: Session) -> Dict[str, List[str]]:
-        """Check for missing required data"""
-        issues = {"warnings": []}
+    def _check_orphans(child, fk_column: str, parent, parent_column: str, label: str,
+                       db: Session) -> Tuple[int, List[str]]:
+        """Anti-join child rows against their parent table"""
+        table = child.__tablename__
+        fk = getattr(child, fk_column)
+        referenced = getattr(parent, parent_column)
+        identity = getattr(child, "system_id", child.id)
         
-        # Check for users without email
-        users_no_email = db.query(User).filter(User.email.is_(None)).count()
-        if users_no_email > 0:
-            issues["warnings"].append(f"{users_no_email} users have no email address")
+        rows = db.execute(
+            select(identity, fk, func.count().over())
+            .where(fk.isnot(None))
+            .where(~exists().where(referenced == fk))
+            .limit(DatabaseValidator.SAMPLE_LIMIT)
+        ).all()
         
-        # Check for projects without names
-        projects_no_name = db.query(Project).filter(Project.name.is_(None)).count()
-        if projects_no_name > 0:
-            issues["warnings"].append(f"{projects_no_name} projects have no name")
+        if not rows:
+            return 0, []
         
-        # Check for customers without names
-        customers_no_name = db.query(Customer).filter(Customer.name.is_(None)).count()
-        if customers_no_name > 0:
-            issues["warnings"].append(f"{customers_no_name} customers have no name")
+        total = rows[0][2]
+        messages = [
+            f"{table} {record_id} has invalid {label}: {value}"
+            for record_id, value, _ in rows
+        ]
+        if total > len(rows):
+            messages.append(f"{table}: {total - len(rows)} more records have an invalid {label}")
         
-        return issues
+        return total, messages
     
     @staticmethod
-    def _validate_data_consistency(db: Session) -> Dict[str, List[str]]:
+    def _check_required_columns(db: Session) -> Tuple[int, List[str]]:
+        """Count missing required values for all tables in a single statement"""
+        counts = db.execute(select(*[
+            select(func.count()).select_from(model).where(getattr(model, column).is_(None)).scalar_subquery()
+            for model, column, _ in DatabaseValidator.REQUIRED_COLUMNS
+        ])).one()
+        
+        messages = [
+            f"{count} {description}"
+            for count, (_, _, description) in zip(counts, DatabaseValidator.REQUIRED_COLUMNS)
+            if count
+        ]
+        return sum(counts), messages
+    
+    @staticmethod
+    def _check_data_consistency(db: Session) -> Tuple[int, List[str]]:
         """Check for data consistency issues"""
-        issues = {"suggestions": []}
+        inactive_owners, projects_no_due_date = db.execute(select(
+            select(func.count()).select_from(User).where(
+                User.is_active == False,
+                exists().where(Project.owner_id == User.system_id)
+            ).scalar_subquery(),
+            select(func.count()).select_from(Project).where(
+                Project.due_date.is_(None),
+                Project.status != "completed"
+            ).scalar_subquery()
+        )).one()
+        
+        messages = []
+        if inactive_owners:
+            messages.append(f"{inactive_owners} inactive users still own active projects")
+        if projects_no_due_date:
+            messages.append(f"{projects_no_due_date} active projects have no due date")
+        
+        return inactive_owners + projects_no_due_date, messages
+    
+    # ------------------------------------------------------------------
+    # Incremental validation
+    # ------------------------------------------------------------------
+    
+    # Rows reported per check by get_stored_issues (counts are always exact)
+    STORED_ISSUE_LIMIT = 20
+    
+    @staticmethod
+    def validate_incremental(db: Session) -> Dict[str, Any]:
+        """
+        Re-check only rows changed since the last run and persist the findings
+        
+        Each tracked table keeps an (updated_at, id) watermark in
+        sync_watermarks. Orphan, required-column and duplicate-ID checks run
+        over rows past the watermark (plus child rows that reference changed
+        parents), open or refresh an IntegrityIssue for every failing row and
+        resolve stored issues whose rows now pass or no longer exist. The first
+        run has no watermark and therefore scans everything once.
+        """
+        now = datetime.now(timezone.utc)
+        checks = DatabaseValidator._incremental_checks()
+        
+        # Snapshot the upper bound first so rows written during the run are
+        # picked up next time instead of being skipped
+        watermarks = {}
+        params: Dict[str, Any] = {"now": now}
+        for model in {spec["model"] for spec in checks} | {spec["parent"] for spec in checks if spec["parent"]}:
+            table = model.__tablename__
+            watermark = db.query(SyncWatermark).filter(SyncWatermark.scope == f"integrity:{table}").first()
+            has_timestamp = hasattr(model, "updated_at")
+            until_ts, until_id = db.execute(select(
+                func.max(model.updated_at) if has_timestamp else null(),
+                func.max(model.id)
+            )).one()
+            
+            params.update({
+                f"{table}_since_ts": watermark.last_updated_at if watermark else None,
+                f"{table}_since_id": watermark.last_id if watermark else 0,
+                f"{table}_until_ts": until_ts,
+                f"{table}_until_id": until_id or 0
+            })
+            watermarks[table] = (watermark, until_ts, until_id)
         
-        # Check for inactive users with active projects
-        inactive_users_with_projects = db.query(User).filter(
-            User.is_active == False,
-            User.system_id.in_(db.query(Project.owner_id))
-        ).count()
+        results = []
+        try:
+            for spec in checks:
+                start_time = time.perf_counter()
+                checked, failing, resolved = db.execute(
+                    text(DatabaseValidator._incremental_sql(spec)),
+                    {**params, "check_name": spec["name"], "category": spec["category"], "table_name": spec["table"]}
+                ).one()
+                results.append({
+                    "check": spec["name"],
+                    "category": spec["category"],
+                    "rows_checked": checked,
+                    "failing": failing,
+                    "resolved": resolved,
+                    "duration_ms": int((time.perf_counter() - start_time) * 1000)
+                })
+            
+            for table, (watermark, until_ts, until_id) in watermarks.items():
+                if watermark is None:
+                    watermark = SyncWatermark(scope=f"integrity:{table}", last_id=0)
+                    db.add(watermark)
+                if until_ts is not None:
+                    watermark.last_updated_at = until_ts
+                watermark.last_id = max(watermark.last_id or 0, until_id or 0)
+            
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
         
-        if inactive_users_with_projects > 0:
-            issues["suggestions"].append(
-                f"{inactive_users_with_projects} inactive users still own active projects"
+        return {
+            "checks": results,
+            "rows_checked": sum(result["rows_checked"] for result in results),
+            "timestamp": now.isoformat()
+        }
+    
+    @staticmethod
+    def get_stored_issues(db: Session, limit_per_check: Optional[int] = None) -> Dict[str, Any]:
+        """Cumulative open issues from integrity_issues, without rescanning any table"""
+        limit_per_check = limit_per_check or DatabaseValidator.STORED_ISSUE_LIMIT
+        
+        counts = db.execute(
+            select(IntegrityIssue.category, IntegrityIssue.check_name, func.count())
+            .where(IntegrityIssue.resolved_at.is_(None))
+            .group_by(IntegrityIssue.category, IntegrityIssue.check_name)
+        ).all()
+        
+        ranked = (
+            select(
+                IntegrityIssue.category,
+                IntegrityIssue.message,
+                func.row_number().over(
+                    partition_by=IntegrityIssue.check_name,
+                    order_by=IntegrityIssue.last_seen_at.desc()
+                ).label("position")
             )
+            .where(IntegrityIssue.resolved_at.is_(None))
+            .subquery()
+        )
+        rows = db.execute(
+            select(ranked.c.category, ranked.c.message).where(ranked.c.position <= limit_per_check)
+        ).all()
         
-        # Check for projects without due dates
-        projects_no_due_date = db.query(Project).filter(
-            Project.due_date.is_(None),
-            Project.status != "completed"
-        ).count()
+        issues = DatabaseValidator.empty_issues()
+        for category, message in rows:
+            issues.setdefault(category, []).append(message)
         
-        if projects_no_due_date > 0:
-            issues["suggestions"].append(
-                f"{projects_no_due_date} active projects have no due date"
+        summary = DatabaseValidator.summarize(issues)
+        summary["total_issues"] = sum(count for category, _, count in counts if category != "suggestions")
+        
+        return {
+            **summary,
+            "issues": issues,
+            "issue_counts": {check_name: count for _, check_name, count in counts}
+        }
+    
+    @staticmethod
+    def _incremental_checks() -> List[Dict[str, Any]]:
+        """Describe each incremental check as SQL fragments over alias ``t``"""
+        checks = []
+        
+        for model, column, _ in DatabaseValidator.REQUIRED_COLUMNS:
+            table = model.__tablename__
+            checks.append({
+                "name": f"required:{table}.{column}",
+                "category": "warnings",
+                "model": model,
+                "table": table,
+                "parent": None,
+                "key": "t.system_id",
+                "key_lookup": "t.system_id = i.record_key",
+                "scope": "t.system_id IS NOT NULL",
+                "failing": f"t.{column} IS NULL",
+                "message": f"format('{table} %s has no {column}', t.system_id)"
+            })
+        
+        for model, prefix in DatabaseValidator.ID_SYSTEM_MODELS:
+            table = model.__tablename__
+            checks.append({
+                "name": f"id_duplicates:{table}",
+                "category": "id_system_issues",
+                "model": model,
+                "table": table,
+                "parent": None,
+                "key": "t.system_id",
+                "key_lookup": "t.system_id = i.record_key",
+                "scope": "t.system_id IS NOT NULL",
+                "failing": f"EXISTS (SELECT 1 FROM {table} d WHERE d.system_id = t.system_id AND d.id <> t.id)",
+                "message": f"format('{table}: Duplicate system_id ''%s''', t.system_id)",
+                # The other copy of a duplicate may be renamed or deleted while the remaining
+                # row stays unchanged, so resolve by key rather than by re-checked rows
+                "resolved_lookup": f"(SELECT count(*) FROM {table} d WHERE d.system_id = i.record_key) <= 1"
+            })
+        
+        for child, fk_column, parent, parent_column, label in DatabaseValidator.RELATIONSHIPS:
+            table = child.__tablename__
+            has_system_id = hasattr(child, "system_id")
+            key = "t.system_id" if has_system_id else "t.id::text"
+            checks.append({
+                "name": f"orphans:{table}.{fk_column}",
+                "category": "relationship_issues",
+                "model": child,
+                "table": table,
+                "parent": parent,
+                "parent_column": parent_column,
+                "fk_column": fk_column,
+                "key": key,
+                "key_lookup": "t.system_id = i.record_key" if has_system_id else "t.id::text = i.record_key",
+                "scope": f"t.{fk_column} IS NOT NULL" + (" AND t.system_id IS NOT NULL" if has_system_id else ""),
+                "failing": f"NOT EXISTS (SELECT 1 FROM {parent.__tablename__} p WHERE p.{parent_column} = t.{fk_column})",
+                "message": f"format('{table} %s has invalid {label}: %s', {key}, t.{fk_column})"
+            })
+        
+        return checks
+    
+    @staticmethod
+    def _changed_rows_sql(model, alias: str) -> str:
+        """Predicate selecting rows of ``model`` between the stored and snapshot watermarks"""
+        table = model.__tablename__
+        predicate = f"({alias}.id > :{table}_since_id AND {alias}.id <= :{table}_until_id)"
+        if hasattr(model, "updated_at"):
+            predicate += (
+                f" OR ({alias}.updated_at > :{table}_since_ts"
+                f" AND {alias}.updated_at <= :{table}_until_ts)"
+            )
+        return f"({predicate})"
+    
+    @staticmethod
+    def _incremental_sql(spec: Dict[str, Any]) -> str:
+        """One statement per check: collect candidates, resolve passing rows, upsert failing rows"""
+        candidates = DatabaseValidator._changed_rows_sql(spec["model"], "t")
+        if spec["parent"] is not None:
+            # Children of changed parents may have been fixed (or broken) by that change
+            parent_table = spec["parent"].__tablename__
+            candidates = (
+                f"({candidates} OR t.{spec['fk_column']} IN ("
+                f"SELECT p.{spec['parent_column']} FROM {parent_table} p "
+                f"WHERE {DatabaseValidator._changed_rows_sql(spec['parent'], 'p')}))"
             )
         
-        return issues
+        # Stored issues are resolved when their row passes, or by this lookup (default: row gone)
+        resolved_lookup = spec.get("resolved_lookup") or \
+            f"NOT EXISTS (SELECT 1 FROM {spec['table']} t WHERE {spec['key_lookup']})"
+        
+        return f"""
+            WITH candidates AS (
+                SELECT DISTINCT ON (record_key) record_key, message, failing
+                FROM (
+                    SELECT {spec['key']} AS record_key,
+                           {spec['message']} AS message,
+                           ({spec['failing']}) AS failing
+                    FROM {spec['table']} t
+                    WHERE {spec['scope']} AND {candidates}
+                ) checked
+            ),
+            resolved AS (
+                UPDATE integrity_issues i
+                SET resolved_at = :now
+                WHERE i.check_name = :check_name
+                  AND i.resolved_at IS NULL
+                  AND (
+                      i.record_key IN (SELECT record_key FROM candidates WHERE NOT failing)
+                      OR {resolved_lookup}
+                  )
+                RETURNING i.id
+            ),
+            upserted AS (
+                INSERT INTO integrity_issues
+                    (check_name, category, table_name, record_key, message, first_seen_at, last_seen_at)
+                SELECT :check_name, :category, :table_name, record_key, message, :now, :now
+                FROM candidates
+                WHERE failing
+                ON CONFLICT (check_name, record_key) DO UPDATE
+                SET message = EXCLUDED.message, last_seen_at = EXCLUDED.last_seen_at, resolved_at = NULL
+                RETURNING id
+            )
+            SELECT (SELECT count(*) FROM candidates),
+                   (SELECT count(*) FROM upserted),
+                   (SELECT count(*) FROM resolved)
+        """
 
 
 class DatabaseManager:
     """Manages database operations and modifications"""
+
+    # Text columns longer than this are cut to a preview in table listings
+    PREVIEW_CHARS = 200
+    # Never returned by generic table listings
+    HIDDEN_COLUMNS = {"hashed_password", "search_text", "search_vector"}
+    # Tables estimated above this many rows report the pg_class estimate instead of COUNT(*)
+    EXACT_COUNT_LIMIT = 100_000
+
+    # Rows per INSERT ... RETURNING statement in create_records
+    BULK_BATCH_SIZE = 500
+    # table_name -> (ID entity type, model, defaults matching create_record)
+    BULK_CREATE_TABLES = {
+        "users": ("user", User, {"hashed_password": "temp_password", "is_active": True, "is_founder": False}),
+        "projects": ("project", Project, {"status": "active"}),
+        "customers": ("customer", Customer, {"is_active": True}),
+        "leads": ("lead", Lead, {
+            "source": "unknown", "lead_score": 0, "qualification_status": "new",
+            "stage": "prospect", "probability": 10, "country": "US", "is_active": True
+        }),
+        "customer_interactions": ("customer_interaction", CustomerInteraction, {
+            "interaction_type": "note", "subject": "", "description": "", "outcome": ""
+        }),
+    }
+
+    _table_metadata: Dict[str, Table] = {}
+    _metadata_lock = threading.Lock()
     
     @staticmethod
     def create_record(db: Session, table_name: str, data: Dict[str, Any]) -> Dict[str, Any]:
@@ -269,11 +704,11 @@ class DatabaseManager:
                 }
             
             elif table_name == "leads":
-                from .models import Lead
                 system_id = IDGenerator.generate_id("lead", db)
                 
                 lead = Lead(
                     system_id=system_id,
+                    tenant_id=data.get("tenant_id"),
                     name=data.get("name"),
                     email=data.get("email"),
                     phone=data.get("phone"),
@@ -296,6 +731,8 @@ class DatabaseManager:
                 )
                 
                 db.add(lead)
+                db.flush()
+                PipelineAnalyticsService.record_stage_change(db, lead, None)
                 db.commit()
                 db.refresh(lead)
                 
@@ -356,6 +793,134 @@ class DatabaseManager:
                 "error": str(e)
             }
     
+    @staticmethod
+    def create_records(db: Session, table_name: str, rows: List[Dict[str, Any]],
+                       all_or_nothing: bool = False) -> Dict[str, Any]:
+        """
+        Create many records in one transaction
+        
+        Rows are validated up front, IDs are reserved in one block, and rows
+        setting the same columns are inserted in batches with INSERT ... RETURNING.
+        Each batch runs in a savepoint; if one fails its rows are retried
+        individually so only the offending rows are reported. With all_or_nothing any error rolls back
+        the whole request.
+        """
+        spec = DatabaseManager.BULK_CREATE_TABLES.get(table_name)
+        if not spec:
+            return {"success": False, "error": f"Unsupported table: {table_name}", "created": 0,
+                    "records": [], "errors": []}
+
+        entity_type, model, defaults = spec
+        table = model.__table__
+        errors: List[Dict[str, Any]] = []
+        prepared: List[Tuple[int, Dict[str, Any]]] = []
+
+        for index, row in enumerate(rows):
+            row_errors = DatabaseManager._validate_bulk_row(table, row)
+            if row_errors:
+                errors.append({"index": index, "error": "; ".join(row_errors)})
+            else:
+                prepared.append((index, {**defaults, **row}))
+
+        if errors and all_or_nothing:
+            return {"success": False, "created": 0, "records": [], "errors": errors}
+
+        records: List[Dict[str, Any]] = []
+        try:
+            system_ids = IDGenerator.reserve_ids(entity_type, db, len(prepared))
+            for (index, values), system_id in zip(prepared, system_ids):
+                values["system_id"] = system_id
+                if table_name == "users":
+                    values.setdefault("display_id", system_id)
+
+            returning = [table.c[name] for name in DatabaseManager._returning_columns(table)]
+            # RETURNING rows are matched to batch rows by position
+            statement = insert(table).returning(*returning, sort_by_parameter_order=True)
+            batch_size = DatabaseManager.BULK_BATCH_SIZE
+
+            # An executemany compiles one INSERT from the first row's keys, so each batch
+            # only holds rows setting the same columns; omitted columns keep their defaults
+            groups: Dict[frozenset, List[Tuple[int, Dict[str, Any]]]] = {}
+            for index, values in prepared:
+                groups.setdefault(frozenset(values), []).append((index, values))
+            batches = [
+                group[start:start + batch_size]
+                for group in groups.values()
+                for start in range(0, len(group), batch_size)
+            ]
+
+            for batch in batches:
+                try:
+                    with db.begin_nested():
+                        inserted = db.execute(statement, [values for _, values in batch]).all()
+                    for (index, _), row in zip(batch, inserted):
+                        DatabaseManager._after_bulk_insert(db, table_name, row)
+                        records.append({"index": index, **row._mapping})
+                except Exception as e:
+                    if all_or_nothing:
+                        raise
+                    # Isolate the failing rows; the rest of the batch still goes in
+                    for index, values in batch:
+                        try:
+                            with db.begin_nested():
+                                row = db.execute(statement, values).one()
+                            DatabaseManager._after_bulk_insert(db, table_name, row)
+                            records.append({"index": index, **row._mapping})
+                        except Exception as row_error:
+                            errors.append({"index": index, "error": str(getattr(row_error, "orig", row_error))})
+
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            errors.append({"index": None, "error": str(getattr(e, "orig", e))})
+            return {"success": False, "created": 0, "records": [], "errors": errors}
+
+        records.sort(key=lambda record: record["index"])
+        errors.sort(key=lambda error: error["index"])
+        return {
+            "success": not errors,
+            "created": len(records),
+            "records": records,
+            "errors": errors
+        }
+
+    @staticmethod
+    def _after_bulk_insert(db: Session, table_name: str, row) -> None:
+        """Side records create_record writes for a single row, for a RETURNING row of create_records"""
+        if table_name == "leads":
+            PipelineAnalyticsService.record_stage_change(db, row, None)
+
+    @staticmethod
+    def _validate_bulk_row(table: Table, row: Any) -> List[str]:
+        """Check a row against the table definition before anything is written"""
+        if not isinstance(row, dict):
+            return ["Row must be an object"]
+
+        row_errors = []
+        for key in row:
+            if key not in table.c:
+                row_errors.append(f"Unknown column '{key}'")
+            elif key in ("id", "system_id"):
+                row_errors.append(f"Column '{key}' is generated")
+
+        for column in table.c:
+            if column.primary_key or column.name == "system_id":
+                continue
+            if not column.nullable and column.default is None and column.server_default is None \
+                    and row.get(column.name) is None:
+                row_errors.append(f"Missing required column '{column.name}'")
+
+        return row_errors
+
+    @staticmethod
+    def _returning_columns(table: Table) -> List[str]:
+        """Columns echoed back for created rows, minus large and sensitive ones"""
+        return [
+            column.name for column in table.c
+            if column.name not in DatabaseManager.HIDDEN_COLUMNS
+            and not DatabaseManager._is_large_text(column)
+        ]
+
     @staticmethod
     def update_record(db: Session, table_name: str, system_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
         """Update an existing record"""
@@ -403,6 +968,23 @@ class DatabaseManager:
                 
                 return {"success": True, "message": f"Customer {system_id} updated"}
             
+            elif table_name == "leads":
+                lead = db.query(Lead).filter(Lead.system_id == system_id).with_for_update().first()
+                if not lead:
+                    raise ValueError(f"Lead {system_id} not found")
+                
+                from_stage = lead.stage
+                for key, value in data.items():
+                    if hasattr(lead, key) and key != "system_id":
+                        setattr(lead, key, value)
+                
+                db.flush()
+                if lead.stage != from_stage:
+                    PipelineAnalyticsService.record_stage_change(db, lead, from_stage)
+                db.commit()
+                
+                return {"success": True, "message": f"Lead {system_id} updated"}
+            
             else:
                 raise ValueError(f"Unsupported table: {table_name}")
                 
@@ -411,300 +993,658 @@ class DatabaseManager:
             return {"success": False, "error": str(e)}
     
     @staticmethod
-    def delete_record(db: Session, table_name: str, system_id: str) -> Dict[str, Any]:
-        """Delete a record"""
+    def delete_record(db: Session, table_name: str, system_id: str, dry_run: bool = False,
+                      batch_size: Optional[int] = None) -> Dict[str, Any]:
+        """Delete a record and its dependents, or preview the cascade with dry_run"""
         try:
-            if table_name == "users":
-                user = db.query(User).filter(User.system_id == system_id).first()
-                if not user:
-                    raise ValueError(f"User {system_id} not found")
-                
-                # Check if user owns projects
-                owned_projects = db.query(Project).filter(Project.owner_id == system_id).count()
-                if owned_projects > 0:
-                    raise ValueError(f"Cannot delete user {system_id}: owns {owned_projects} projects")
-                
-                db.delete(user)
-                db.commit()
-                
-                return {"success": True, "message": f"User {system_id} deleted"}
-            
-            elif table_name == "projects":
-                project = db.query(Project).filter(Project.system_id == system_id).first()
-                if not project:
-                    raise ValueError(f"Project {system_id} not found")
-                
-                # Delete related assignments first
-                db.query(ProjectAssignment).filter(ProjectAssignment.project_id == system_id).delete()
-                db.query(ProjectCustomer).filter(ProjectCustomer.project_id == system_id).delete()
-                
-                db.delete(project)
-                db.commit()
-                
-                return {"success": True, "message": f"Project {system_id} deleted"}
-            
-            elif table_name == "customers":
-                customer = db.query(Customer).filter(Customer.system_id == system_id).first()
-                if not customer:
-                    raise ValueError(f"Customer {system_id} not found")
-                
-                # Check if customer has invoices
-                invoices = db.query(Invoice).filter(Invoice.customer_id == system_id).count()
-                if invoices > 0:
-                    raise ValueError(f"Cannot delete customer {system_id}: has {invoices} invoices")
-                
-                db.delete(customer)
-                db.commit()
-                
-                return {"success": True, "message": f"Customer {system_id} deleted"}
+            if dry_run:
+                return {"success": True, "plan": CascadePlanner.plan(db, table_name, system_id)}
             
-            else:
-                raise ValueError(f"Unsupported table: {table_name}")
+            result = CascadePlanner.execute(db, table_name, system_id, batch_size)
+            return {
+                "success": True,
+                "message": f"{table_name} {system_id} deleted",
+                **result
+            }
                 
         except Exception as e:
             db.rollback()
             return {"success": False, "error": str(e)}
     
     @staticmethod
-    def get_table_data(db: Session, table_name: str, limit: int = 100) -> Dict[str, Any]:
-        """Get paginated table data"""
+    def get_table_metadata(db: Session, table_name: str) -> Optional[Table]:
+        """Reflected table definition, cached until a column change invalidates it"""
+        with DatabaseManager._metadata_lock:
+            table = DatabaseManager._table_metadata.get(table_name)
+        if table is not None:
+            return table
+
         try:
-            if table_name == "users":
-                users = db.query(User).limit(limit).all()
-                return {
-                    "success": True,
-                    "data": [
-                        {
-                            "system_id": user.system_id,
-                            "display_id": user.display_id,
-                            "email": user.email,
-                            "full_name": user.full_name,
-                            "is_active": user.is_active,
-                            "is_founder": user.is_founder,
-                            "created_at": user.created_at.isoformat() if user.created_at else None
-                        }
-                        for user in users
-                    ]
-                }
-            
-            elif table_name == "projects":
-                projects = db.query(Project).limit(limit).all()
-                return {
-                    "success": True,
-                    "data": [
-                        {
-                            "system_id": project.system_id,
-                            "name": project.name,
-                            "description": project.description,
-                            "status": project.status,
-                            "owner_id": project.owner_id,
-                            "created_at": project.created_at.isoformat() if project.created_at else None
-                        }
-                        for project in projects
-                    ]
-                }
-            
-            elif table_name == "customers":
-                customers = db.query(Customer).limit(limit).all()
-                return {
-                    "success": True,
-                    "data": [
-                        {
-                            "system_id": customer.system_id,
-                            "name": customer.name,
-                            "email": customer.email,
-                            "phone": customer.phone,
-                            "company": customer.company,
-                            "is_active": customer.is_active,
-                            "created_at": customer.created_at.isoformat() if customer.created_at else None
-                        }
-                        for customer in customers
-                    ]
-                }
-            
-            elif table_name == "invoices":
-                invoices = db.query(Invoice).limit(limit).all()
-                return {
-                    "success": True,
-                    "data": [
-                        {
-                            "system_id": invoice.system_id,
-                            "invoice_number": invoice.invoice_number,
-                            "customer_id": invoice.customer_id,
-                            "project_id": invoice.project_id,
-                            "amount": float(invoice.amount) if invoice.amount else None,
-                            "status": invoice.status,
-                            "due_date": invoice.due_date.isoformat() if invoice.due_date else None,
-                            "created_at": invoice.created_at.isoformat() if invoice.created_at else None
-                        }
-                        for invoice in invoices
-                    ]
-                }
-            
-            elif table_name == "tenants":
-                tenants = db.query(Tenant).limit(limit).all()
-                return {
-                    "success": True,
-                    "data": [
-                        {
-                            "system_id": tenant.system_id,
-                            "business_name": tenant.business_name,
-                            "business_email": tenant.business_email,
-                            "business_phone": tenant.business_phone,
-                            "subscription_plan": tenant.subscription_plan,
-                            "is_active": tenant.is_active,
-                            "max_users": tenant.max_users,
-                            "city": tenant.city,
-                            "state": tenant.state,
-                            "country": tenant.country,
-                            "created_at": tenant.created_at.isoformat() if tenant.created_at else None
-                        }
-                        for tenant in tenants
-                    ]
-                }
-            
-            elif table_name == "leads":
-                leads = db.query(Lead).limit(limit).all()
-                return {
-                    "success": True,
-                    "data": [
-                        {
-                            "system_id": lead.system_id,
-                            "name": lead.name,
-                            "email": lead.email,
-                            "phone": lead.phone,
-                            "company": lead.company,
-                            "job_title": lead.job_title,
-                            "source": lead.source,
-                            "lead_score": lead.lead_score,
-                            "qualification_status": lead.qualification_status,
-                            "stage": lead.stage,
-                            "estimated_value": float(lead.estimated_value) if lead.estimated_value else None,
-                            "probability": lead.probability,
-                            "assigned_to": lead.assigned_to,
-                            "is_active": lead.is_active,
-                            "created_at": lead.created_at.isoformat() if lead.created_at else None
-                        }
-                        for lead in leads
-                    ]
-                }
-            
-            elif table_name == "customer_interactions":
-                interactions = db.query(CustomerInteraction).limit(limit).all()
-                return {
-                    "success": True,
-                    "data": [
-                        {
-                            "system_id": interaction.system_id,
-                            "customer_id": interaction.customer_id,
-                            "user_id": interaction.user_id,
-                            "interaction_type": interaction.interaction_type,
-                            "subject": interaction.subject,
-                            "description": interaction.description,
-                            "outcome": interaction.outcome,
-                            "priority": interaction.priority,
-                            "status": interaction.status,
-                            "is_billable": interaction.is_billable,
-                            "billable_hours": float(interaction.billable_hours) if interaction.billable_hours else None,
-                            "created_at": interaction.created_at.isoformat() if interaction.created_at else None,
-                            "completed_at": interaction.completed_at.isoformat() if interaction.completed_at else None
-                        }
-                        for interaction in interactions
-                    ]
-                }
-            
-            elif table_name == "lead_interactions":
-                interactions = db.query(LeadInteraction).limit(limit).all()
-                return {
-                    "success": True,
-                    "data": [
-                        {
-                            "system_id": interaction.system_id,
-                            "lead_id": interaction.lead_id,
-                            "user_id": interaction.user_id,
-                            "interaction_type": interaction.interaction_type,
-                            "subject": interaction.subject,
-                            "description": interaction.description,
-                            "outcome": interaction.outcome,
-                            "priority": interaction.priority,
-                            "status": interaction.status,
-                            "created_at": interaction.created_at.isoformat() if interaction.created_at else None,
-                            "completed_at": interaction.completed_at.isoformat() if interaction.completed_at else None
-                        }
-                        for interaction in interactions
-                    ]
-                }
-            
-            elif table_name == "customer_notes":
-                notes = db.query(CustomerNote).limit(limit).all()
-                return {
-                    "success": True,
-                    "data": [
-                        {
-                            "system_id": note.system_id,
-                            "customer_id": note.customer_id,
-                            "user_id": note.user_id,
-                            "note_type": note.note_type,
-                            "title": note.title,
-                            "content": note.content,
-                            "is_private": note.is_private,
-                            "priority": note.priority,
-                            "created_at": note.created_at.isoformat() if note.created_at else None
-                        }
-                        for note in notes
-                    ]
-                }
-            
-            elif table_name == "project_assignments":
-                project_assignments = db.query(ProjectAssignment).limit(limit).all()
-                return {
-                    "success": True,
-                    "data": [
-                        {
-                            "id": assignment.id,
-                            "project_id": assignment.project_id,
-                            "user_id": assignment.user_id,
-                            "role": assignment.role,
-                            "assigned_at": assignment.assigned_at.isoformat() if assignment.assigned_at else None
-                        }
-                        for assignment in project_assignments
-                    ]
-                }
-            
-            elif table_name == "project_customers":
-                project_customers = db.query(ProjectCustomer).limit(limit).all()
-                return {
-                    "success": True,
-                    "data": [
-                        {
-                            "id": pc.id,
-                            "project_id": pc.project_id,
-                            "customer_id": pc.customer_id,
-                            "assigned_at": pc.assigned_at.isoformat() if pc.assigned_at else None
-                        }
-                        for pc in project_customers
-                    ]
-                }
-            
-            elif table_name == "password_vault":
-                vault_entries = db.query(PasswordVault).limit(limit).all()
-                return {
-                    "success": True,
-                    "data": [
-                        {
-                            "id": entry.id,
-                            "user_system_id": entry.user_system_id,
-                            "vault_access_code": entry.vault_access_code,
-                            "created_by": entry.created_by,
-                            "created_at": entry.created_at.isoformat() if entry.created_at else None,
-                            "updated_at": entry.updated_at.isoformat() if entry.updated_at else None
-                        }
-                        for entry in vault_entries
-                    ]
-                }
-            
+            table = Table(table_name, MetaData(), autoload_with=db.get_bind())
+        except NoSuchTableError:
+            return None
+
+        with DatabaseManager._metadata_lock:
+            DatabaseManager._table_metadata[table_name] = table
+        return table
+
+    @staticmethod
+    def invalidate_table_metadata(table_name: Optional[str] = None) -> None:
+        """Drop cached metadata for one table (or all tables) after DDL"""
+        with DatabaseManager._metadata_lock:
+            if table_name is None:
+                DatabaseManager._table_metadata.clear()
             else:
+                DatabaseManager._table_metadata.pop(table_name, None)
+        CascadePlanner.invalidate()
+
+    @staticmethod
+    def _is_large_text(column) -> bool:
+        """Text columns and strings declared longer than PREVIEW_CHARS are truncated in listings"""
+        if isinstance(column.type, Text):
+            return True
+        # String without a length is the schema's default for ids, names and emails
+        return isinstance(column.type, String) and column.type.length is not None \
+            and column.type.length > DatabaseManager.PREVIEW_CHARS
+
+    @staticmethod
+    def count_rows(db: Session, table_name: str) -> Tuple[int, bool]:
+        """Row count for table listings and whether it is exact (small tables) or the planner estimate"""
+        estimate = ColumnProfiler._get_table_activity(db, table_name)["row_estimate"]
+        if estimate > DatabaseManager.EXACT_COUNT_LIMIT:
+            return estimate, False
+        table = DatabaseManager.get_table_metadata(db, table_name)
+        return db.execute(select(func.count()).select_from(table)).scalar() or 0, True
+
+    @staticmethod
+    def get_table_data(db: Session, table_name: str, limit: int = 100,
+                       columns: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Get table rows as plain dicts, selecting only the listed columns"""
+        try:
+            table = DatabaseManager.get_table_metadata(db, table_name)
+            if table is None:
                 raise ValueError(f"Unsupported table: {table_name}")
-                
+
+            if columns:
+                unknown = [
+                    name for name in columns
+                    if name not in table.c or name in DatabaseManager.HIDDEN_COLUMNS
+                ]
+                if unknown:
+                    raise ValueError(f"Unknown columns for {table_name}: {', '.join(unknown)}")
+                selected = [table.c[name] for name in columns]
+            else:
+                selected = [
+                    column for column in table.c
+                    if column.name not in DatabaseManager.HIDDEN_COLUMNS
+                ]
+
+            projection = []
+            truncated = []
+            for column in selected:
+                if DatabaseManager._is_large_text(column):
+                    projection.append(func.left(column, DatabaseManager.PREVIEW_CHARS).label(column.name))
+                    truncated.append(column.name)
+                else:
+                    projection.append(column)
+
+            query = select(*projection).limit(limit)
+            primary_key = list(table.primary_key.columns)
+            if primary_key:
+                query = query.order_by(*primary_key)
+
+            rows = db.execute(query).mappings().all()
+
+            return {
+                "success": True,
+                "columns": [
+                    {
+                        "column_name": column.name,
+                        "data_type": str(column.type),
+                        "is_nullable": "YES" if column.nullable else "NO",
+                        "column_default": str(column.server_default.arg) if column.server_default is not None else None
+                    }
+                    for column in table.c
+                ],
+                "truncated_columns": truncated,
+                "preview_chars": DatabaseManager.PREVIEW_CHARS,
+                "data": [dict(row) for row in rows]
+            }
+
         except Exception as e:
+            db.rollback()
             return {"success": False, "error": str(e)}
+
+
+class CascadePlanner:
+    """
+    Plans and runs cascading deletes from the foreign key graph
+
+    The graph comes from reflected schema metadata, so it follows the live
+    database rather than the ORM models. Every foreign key pointing into the
+    delete set is handled by a policy:
+      - cascade: dependent rows are deleted too
+      - set_null: the reference is cleared and the row kept
+      - restrict: any dependent row outside the delete set blocks the delete
+    Only relations listed in RELATION_POLICIES cascade; anything else is
+    restricted unless the database declares ON DELETE SET NULL.
+    """
+
+    # Explicit policies; the only source of cascades
+    RELATION_POLICIES = {
+        ("projects", "owner_id"): "restrict",
+        ("invoices", "customer_id"): "restrict",
+        ("users", "tenant_id"): "cascade",
+        ("project_assignments", "project_id"): "cascade",
+        ("project_assignments", "user_id"): "cascade",
+        ("project_customers", "project_id"): "cascade",
+        ("project_customers", "customer_id"): "cascade",
+        # Stage history belongs to its lead; it keeps the event when the user who made it goes
+        ("lead_stage_events", "lead_id"): "cascade",
+        ("lead_stage_events", "changed_by"): "set_null",
+    }
+    ON_DELETE_POLICIES = {"SET NULL": "set_null"}
+
+    DEFAULT_BATCH_SIZE = 1000
+
+    _schema_metadata: Optional[MetaData] = None
+    _metadata_lock = threading.Lock()
+
+    @staticmethod
+    def get_schema_metadata(db: Session) -> MetaData:
+        """Reflected schema, cached until DatabaseManager.invalidate_table_metadata runs"""
+        with CascadePlanner._metadata_lock:
+            if CascadePlanner._schema_metadata is None:
+                metadata = MetaData()
+                metadata.reflect(bind=db.get_bind())
+                CascadePlanner._schema_metadata = metadata
+            return CascadePlanner._schema_metadata
+
+    @staticmethod
+    def invalidate() -> None:
+        with CascadePlanner._metadata_lock:
+            CascadePlanner._schema_metadata = None
+
+    @staticmethod
+    def plan(db: Session, table_name: str, system_id: str) -> Dict[str, Any]:
+        """Dry run: what a delete would touch, counted in a single query"""
+        graph = CascadePlanner._build_graph(db, table_name)
+        ctes = CascadePlanner._delete_set_ctes(graph, system_id)
+
+        labels = []
+        counts = []
+        for name in graph["order"]:
+            labels.append(("delete", name, graph["cascades"].get(name)))
+            counts.append(select(func.count()).select_from(ctes[name]).scalar_subquery())
+        for edge in graph["set_null"]:
+            labels.append(("set_null", edge["child"].name, edge))
+            counts.append(select(func.count()).where(CascadePlanner._references(edge, ctes)).scalar_subquery())
+        for edge in graph["restrict"]:
+            labels.append(("restrict", edge["child"].name, edge))
+            counts.append(select(func.count()).where(CascadePlanner._restrict_condition(edge, ctes)).scalar_subquery())
+
+        row = db.execute(select(*counts)).one()
+
+        if row[0] == 0:
+            raise ValueError(f"{table_name} {system_id} not found")
+
+        steps = []
+        blockers = []
+        for (action, name, edge), count in zip(labels, row):
+            step = {
+                "action": action,
+                "table": name,
+                "via": CascadePlanner._describe_path(edge),
+                "rows": count
+            }
+            if action == "restrict":
+                if count:
+                    blockers.append(f"{count} {name} rows reference it via {step['via']}")
+                continue
+            steps.append(step)
+
+        return {
+            "table": table_name,
+            "system_id": system_id,
+            "steps": steps,
+            "rows_deleted": sum(step["rows"] for step in steps if step["action"] == "delete"),
+            "rows_updated": sum(step["rows"] for step in steps if step["action"] == "set_null"),
+            "blocked": bool(blockers),
+            "blockers": blockers,
+            "skipped_references": [CascadePlanner._describe(edge) for edge in graph["skipped"]]
+        }
+
+    @staticmethod
+    def execute(db: Session, table_name: str, system_id: str,
+                batch_size: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Run the planned delete in bounded batches, committing after each one
+
+        References are cleared first, then tables are emptied leaves-first so
+        every batch satisfies the foreign keys on its own and row locks are
+        held for one batch only. The root row goes last and the delete set is
+        recomputed from it, so after a failure part-way the earlier batches
+        stay committed and repeating the delete finishes the rest.
+        """
+        batch_size = batch_size or CascadePlanner.DEFAULT_BATCH_SIZE
+        plan = CascadePlanner.plan(db, table_name, system_id)
+        if plan["blocked"]:
+            raise ValueError(f"Cannot delete {table_name} {system_id}: " + "; ".join(plan["blockers"]))
+
+        graph = CascadePlanner._build_graph(db, table_name)
+        ctes = CascadePlanner._delete_set_ctes(graph, system_id)
+        affected: Dict[str, int] = {}
+        batches = 0
+        run = partial(CascadePlanner._run_batches, db, batch_size=batch_size)
+
+        try:
+            for edge in graph["set_null"]:
+                child = edge["child"]
+                pk = CascadePlanner._primary_key(child)
+                target = select(pk).where(CascadePlanner._references(edge, ctes)).limit(batch_size)
+                statement = child.update().where(pk.in_(target)).values({edge["column"]: None})
+                count, runs = run(statement)
+                key = f"{child.name}.{edge['column']}"
+                affected[key] = affected.get(key, 0) + count
+                batches += runs
+
+            for name in reversed(graph["order"]):
+                table = graph["tables"][name]
+                pk = CascadePlanner._primary_key(table)
+                target = select(ctes[name].c[pk.name]).limit(batch_size)
+                statement = table.delete().where(pk.in_(target))
+                affected[name], runs = run(statement)
+                batches += runs
+        except Exception as e:
+            raise RuntimeError(
+                f"Delete of {table_name} {system_id} stopped part-way; the batches before "
+                f"the failure are committed, repeat the delete to finish it: {e}"
+            ) from e
+
+        return {
+            "table": table_name,
+            "system_id": system_id,
+            "rows_affected": affected,
+            "rows_deleted": sum(affected.get(name, 0) for name in graph["order"]),
+            "batches": batches,
+            "batch_size": batch_size
+        }
+
+    @staticmethod
+    def _run_batches(db: Session, statement, batch_size: int) -> Tuple[int, int]:
+        """Repeat a LIMITed statement until it runs short, one commit per batch; returns (rows, batches)"""
+        total = 0
+        batches = 0
+        while True:
+            try:
+                count = db.execute(statement).rowcount
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+            total += count
+            batches += 1
+            if count < batch_size:
+                return total, batches
+
+    @staticmethod
+    def _build_graph(db: Session, table_name: str) -> Dict[str, Any]:
+        """Walk references into table_name and order the delete set parents-first"""
+        metadata = CascadePlanner.get_schema_metadata(db)
+        root = metadata.tables.get(table_name)
+        if root is None:
+            raise ValueError(f"Unsupported table: {table_name}")
+        if "system_id" not in root.c or not root.primary_key.columns:
+            raise ValueError(f"Table {table_name} has no system_id key")
+
+        incoming: Dict[str, List[Dict[str, Any]]] = {}
+        for child in metadata.tables.values():
+            for fk in child.foreign_keys:
+                parent = fk.column.table
+                if parent is child or len(fk.constraint.elements) != 1:
+                    continue
+                policy = CascadePlanner.RELATION_POLICIES.get((child.name, fk.parent.name)) \
+                    or CascadePlanner.ON_DELETE_POLICIES.get((fk.ondelete or "").upper()) \
+                    or "restrict"
+                incoming.setdefault(parent.name, []).append({
+                    "child": child,
+                    "column": fk.parent.name,
+                    "parent": parent.name,
+                    "parent_column": fk.column.name,
+                    "policy": policy
+                })
+
+        # Tables reached through cascade edges
+        tables = {table_name: root}
+        queue = [table_name]
+        while queue:
+            name = queue.pop(0)
+            for edge in incoming.get(name, []):
+                child = edge["child"]
+                if edge["policy"] == "cascade" and child.name not in tables and child.primary_key.columns:
+                    tables[child.name] = child
+                    queue.append(child.name)
+
+        cascade_edges = [
+            edge for name in tables for edge in incoming.get(name, [])
+            if edge["policy"] == "cascade" and edge["child"].name in tables
+        ]
+
+        # Topological order so each CTE only reads the ones before it
+        order = []
+        remaining = dict.fromkeys(tables)
+        while remaining:
+            ready = [
+                name for name in remaining
+                if not any(edge["child"].name == name and edge["parent"] in remaining for edge in cascade_edges)
+            ] or [next(iter(remaining))]  # Cycle: take the earliest reached table
+            for name in ready:
+                order.append(name)
+                del remaining[name]
+
+        position = {name: index for index, name in enumerate(order)}
+        cascades: Dict[str, List[Dict[str, Any]]] = {}
+        skipped = []
+        for edge in cascade_edges:
+            if position[edge["parent"]] < position[edge["child"].name]:
+                cascades.setdefault(edge["child"].name, []).append(edge)
+            else:
+                skipped.append(edge)
+
+        return {
+            "tables": tables,
+            "order": order,
+            "cascades": cascades,
+            "set_null": [e for name in tables for e in incoming.get(name, []) if e["policy"] == "set_null"],
+            "restrict": [e for name in tables for e in incoming.get(name, []) if e["policy"] == "restrict"],
+            "skipped": skipped
+        }
+
+    @staticmethod
+    def _delete_set_ctes(graph: Dict[str, Any], system_id: str) -> Dict[str, Any]:
+        """One CTE per table holding the keys of its rows in the delete set"""
+        ctes = {}
+        referenced: Dict[str, set] = {}
+        for edges in list(graph["cascades"].values()) + [graph["set_null"], graph["restrict"]]:
+            for edge in edges:
+                referenced.setdefault(edge["parent"], set()).add(edge["parent_column"])
+
+        for index, name in enumerate(graph["order"]):
+            table = graph["tables"][name]
+            pk = CascadePlanner._primary_key(table)
+            columns = [pk] + [table.c[col] for col in sorted(referenced.get(name, ())) if col != pk.name]
+            if index == 0:
+                condition = table.c.system_id == system_id
+            else:
+                condition = or_(*[
+                    table.c[edge["column"]].in_(select(ctes[edge["parent"]].c[edge["parent_column"]]))
+                    for edge in graph["cascades"][name]
+                ])
+            ctes[name] = select(*columns).where(condition).cte(f"del_{name}")
+
+        return ctes
+
+    @staticmethod
+    def _references(edge: Dict[str, Any], ctes: Dict[str, Any]):
+        parent_keys = select(ctes[edge["parent"]].c[edge["parent_column"]])
+        return edge["child"].c[edge["column"]].in_(parent_keys)
+
+    @staticmethod
+    def _restrict_condition(edge: Dict[str, Any], ctes: Dict[str, Any]):
+        """References from rows that are not themselves being deleted"""
+        child = edge["child"]
+        condition = CascadePlanner._references(edge, ctes)
+        if child.name in ctes:
+            pk = CascadePlanner._primary_key(child)
+            condition = and_(condition, pk.not_in(select(ctes[child.name].c[pk.name])))
+        return condition
+
+    @staticmethod
+    def _primary_key(table: Table):
+        return list(table.primary_key.columns)[0]
+
+    @staticmethod
+    def _describe_path(edges) -> Optional[str]:
+        """Label a step with the reference (or references) that pulled it in"""
+        if not edges:
+            return None
+        if isinstance(edges, dict):
+            edges = [edges]
+        return ", ".join(CascadePlanner._describe(edge) for edge in edges)
+
+    @staticmethod
+    def _describe(edge: Dict[str, Any]) -> str:
+        return f"{edge['child'].name}.{edge['column']} -> {edge['parent']}.{edge['parent_column']}"
+
+
+class ColumnProfiler:
+    """Profiles table columns from planner statistics instead of full scans"""
+    
+    # A column is considered stale once this fraction of rows changed since ANALYZE
+    STALE_MODIFIED_FRACTION = 0.2
+    # Target number of rows read by the TABLESAMPLE fallback
+    SAMPLE_TARGET_ROWS = 30000
+    MAX_COMMON_VALUES = 10
+    HISTOGRAM_BUCKETS = 10
+    
+    @staticmethod
+    def profile_column(db: Session, table_name: str, column_name: str, mode: str = "auto") -> Dict[str, Any]:
+        """
+        Profile a column using pg_stats, falling back to a TABLESAMPLE scan
+        
+        Args:
+            db: Database session
+            table_name: Table to profile (must already be validated by the caller)
+            column_name: Column to profile (must already be validated by the caller)
+            mode: "auto" (pg_stats unless stale), "stats" or "sample"
+            
+        Returns:
+            Column profile with null fraction, distinct estimate, most common
+            values and histogram bounds
+        """
+        if mode not in ("auto", "stats", "sample"):
+            raise ValueError(f"Unsupported profile mode: {mode}")
+        
+        table_stats = ColumnProfiler._get_table_activity(db, table_name)
+        stale = ColumnProfiler._is_stale(table_stats)
+        
+        if mode != "sample":
+            stats = ColumnProfiler._profile_from_pg_stats(db, table_name, column_name, table_stats)
+            if stats and (mode == "stats" or not stale):
+                stats["stale"] = stale
+                return stats
+        
+        profile = ColumnProfiler._profile_from_sample(db, table_name, column_name, table_stats)
+        profile["stale"] = stale
+        return profile
+    
+    @staticmethod
+    def _get_table_activity(db: Session, table_name: str) -> Dict[str, Any]:
+        """Read row estimate and analyze bookkeeping for a table"""
+        row = db.execute(text("""
+            SELECT c.reltuples::bigint AS reltuples,
+                   s.n_live_tup,
+                   s.n_mod_since_analyze,
+                   GREATEST(s.last_analyze, s.last_autoanalyze) AS last_analyzed
+            FROM pg_class c
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            LEFT JOIN pg_stat_user_tables s ON s.relid = c.oid
+            WHERE n.nspname = current_schema() AND c.relname = :table_name
+        """), {"table_name": table_name}).mappings().first()
+        
+        if not row:
+            return {"row_estimate": 0, "modified_since_analyze": 0, "last_analyzed": None}
+        
+        # reltuples is -1 for tables that have never been vacuumed or analyzed
+        row_estimate = row["reltuples"] if row["reltuples"] and row["reltuples"] > 0 else (row["n_live_tup"] or 0)
+        return {
+            "row_estimate": int(row_estimate),
+            "modified_since_analyze": int(row["n_mod_since_analyze"] or 0),
+            "last_analyzed": row["last_analyzed"]
+        }
+    
+    @staticmethod
+    def _is_stale(table_stats: Dict[str, Any]) -> bool:
+        """Check whether planner statistics still describe the table"""
+        if table_stats["last_analyzed"] is None:
+            return True
+        
+        threshold = max(table_stats["row_estimate"], 1) * ColumnProfiler.STALE_MODIFIED_FRACTION
+        return table_stats["modified_since_analyze"] > threshold
+    
+    @staticmethod
+    def _profile_from_pg_stats(db: Session, table_name: str, column_name: str,
+                               table_stats: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Build a profile from the pg_stats view (no table access at all)"""
+        row = db.execute(text("""
+            SELECT null_frac,
+                   n_distinct,
+                   avg_width,
+                   correlation,
+                   most_common_vals::text::text[] AS most_common_vals,
+                   most_common_freqs,
+                   histogram_bounds::text::text[] AS histogram_bounds
+            FROM pg_stats
+            WHERE schemaname = current_schema()
+              AND tablename = :table_name
+              AND attname = :column_name
+        """), {"table_name": table_name, "column_name": column_name}).mappings().first()
+        
+        if not row:
+            return None
+        
+        row_estimate = table_stats["row_estimate"]
+        # Negative n_distinct is a fraction of the row count (-1 means unique)
+        n_distinct = row["n_distinct"]
+        if n_distinct is not None and n_distinct < 0:
+            n_distinct = -n_distinct * row_estimate
+        
+        common_values = [
+            {"value": value, "frequency": float(frequency)}
+            for value, frequency in zip(row["most_common_vals"] or [], row["most_common_freqs"] or [])
+        ]
+        
+        return {
+            "table": table_name,
+            "column": column_name,
+            "source": "pg_stats",
+            "row_estimate": row_estimate,
+            "null_fraction": float(row["null_frac"]) if row["null_frac"] is not None else None,
+            "n_distinct": int(round(n_distinct)) if n_distinct is not None else None,
+            "most_common_values": common_values,
+            "histogram_bounds": list(row["histogram_bounds"] or []),
+            "correlation": float(row["correlation"]) if row["correlation"] is not None else None,
+            "avg_width": row["avg_width"],
+            "last_analyzed": table_stats["last_analyzed"].isoformat() if table_stats["last_analyzed"] else None,
+            "sample_percent": None
+        }
+    
+    @staticmethod
+    def _profile_from_sample(db: Session, table_name: str, column_name: str,
+                             table_stats: Dict[str, Any]) -> Dict[str, Any]:
+        """Build a profile from a block-level TABLESAMPLE of the table"""
+        preparer = db.bind.dialect.identifier_preparer
+        table_sql = preparer.quote(table_name)
+        column_sql = preparer.quote(column_name)
+        
+        row_estimate = table_stats["row_estimate"]
+        if row_estimate > 0:
+            sample_percent = min(100.0, max(0.01, ColumnProfiler.SAMPLE_TARGET_ROWS * 100.0 / row_estimate))
+        else:
+            sample_percent = 100.0
+        
+        # REPEATABLE keeps every query below on the same sampled blocks
+        sample_cte = f"""
+            WITH sample AS (
+                SELECT {column_sql} AS value
+                FROM {table_sql} TABLESAMPLE SYSTEM (:sample_percent) REPEATABLE (42)
+            )
+        """
+        params = {"sample_percent": sample_percent, "max_values": ColumnProfiler.MAX_COMMON_VALUES}
+        
+        summary = db.execute(text(sample_cte + """
+            , groups AS (
+                SELECT value, count(*) AS cnt FROM sample WHERE value IS NOT NULL GROUP BY value
+            )
+            SELECT (SELECT count(*) FROM sample) AS sampled_rows,
+                   (SELECT count(*) FROM sample WHERE value IS NULL) AS null_rows,
+                   (SELECT count(*) FROM groups) AS distinct_values,
+                   (SELECT count(*) FROM groups WHERE cnt = 1) AS singletons
+        """), params).mappings().first()
+        
+        sampled_rows = summary["sampled_rows"] or 0
+        non_null_rows = sampled_rows - (summary["null_rows"] or 0)
+        
+        common_values = []
+        if non_null_rows:
+            rows = db.execute(text(sample_cte + """
+                SELECT value::text AS value, count(*) AS cnt
+                FROM sample
+                WHERE value IS NOT NULL
+                GROUP BY value
+                ORDER BY cnt DESC
+                LIMIT :max_values
+            """), params).all()
+            common_values = [
+                {"value": value, "frequency": cnt / sampled_rows}
+                for value, cnt in rows
+            ]
+        
+        return {
+            "table": table_name,
+            "column": column_name,
+            "source": "sample",
+            "row_estimate": row_estimate,
+            "null_fraction": (summary["null_rows"] / sampled_rows) if sampled_rows else None,
+            "n_distinct": ColumnProfiler._estimate_distinct(
+                sampled_rows, non_null_rows, summary["distinct_values"] or 0,
+                summary["singletons"] or 0, row_estimate
+            ),
+            "most_common_values": common_values,
+            "histogram_bounds": ColumnProfiler._sample_histogram(db, sample_cte, params) if non_null_rows else [],
+            "correlation": None,
+            "avg_width": None,
+            "last_analyzed": table_stats["last_analyzed"].isoformat() if table_stats["last_analyzed"] else None,
+            "sample_percent": sample_percent
+        }
+    
+    @staticmethod
+    def _sample_histogram(db: Session, sample_cte: str, params: Dict[str, Any]) -> List[str]:
+        """Equi-depth histogram bounds over the sample (empty for unorderable types)"""
+        try:
+            # Savepoint so an unorderable column type does not poison the session
+            with db.begin_nested():
+                rows = db.execute(text(sample_cte + """
+                    , buckets AS (
+                        SELECT value, ntile(:buckets) OVER (ORDER BY value) AS bucket
+                        FROM sample
+                        WHERE value IS NOT NULL
+                    )
+                    SELECT min(value)::text AS lower_bound, max(value)::text AS upper_bound
+                    FROM buckets
+                    GROUP BY bucket
+                    ORDER BY bucket
+                """), {**params, "buckets": ColumnProfiler.HISTOGRAM_BUCKETS}).all()
+        except Exception:
+            return []
+        
+        if not rows:
+            return []
+        return [lower for lower, _ in rows] + [rows[-1][1]]
+    
+    @staticmethod
+    def _estimate_distinct(sampled_rows: int, non_null_rows: int, distinct_values: int,
+                           singletons: int, row_estimate: int) -> Optional[int]:
+        """Scale sample distinct count to the table (Haas-Stokes, as used by ANALYZE)"""
+        if not sampled_rows:
+            return None
+        if not non_null_rows or sampled_rows >= row_estimate:
+            return distinct_values
+        if singletons == distinct_values:
+            # Every sampled value was unique - assume the column is unique
+            return int(row_estimate * non_null_rows / sampled_rows)
+        
+        n = non_null_rows
+        total = row_estimate * non_null_rows / sampled_rows
+        estimate = n * distinct_values / (n - singletons + singletons * n / total)
+        return int(round(min(max(estimate, distinct_values), total)))
@@ -14,7 +14,7 @@ from .models.tenant import Tenant
 from .models.user import User
 from .models.project import Project
 from .models.crm import Customer, Lead, CustomerInteraction, CustomerNote
-from .models.invoice import Invoice
+from .models.invoice import Invoice, RecurringInvoiceTemplate
 
 
 class IDGenerator:
@@ -28,7 +28,20 @@ class IDGenerator:
         "invoice": "INV",
         "lead": "LED",
         "customer_interaction": "INT",
-        "customer_note": "NOT"
+        "customer_note": "NOT",
+        "recurring_invoice": "REC"
+    }
+    
+    MODELS = {
+        "tenant": Tenant,
+        "user": User,
+        "project": Project,
+        "customer": Customer,
+        "invoice": Invoice,
+        "lead": Lead,
+        "customer_interaction": CustomerInteraction,
+        "customer_note": CustomerNote,
+        "recurring_invoice": RecurringInvoiceTemplate
     }
     
     @classmethod
@@ -61,18 +74,7 @@ class IDGenerator:
         Uses database-level operations for better consistency and performance
         """
         
-        model_map = {
-            "tenant": Tenant,
-            "user": User,
-            "project": Project,
-            "customer": Customer,
-            "invoice": Invoice,
-            "lead": Lead,
-            "customer_interaction": CustomerInteraction,
-            "customer_note": CustomerNote
-        }
-        
-        model = model_map.get(entity_type.lower())
+        model = cls.MODELS.get(entity_type.lower())
         if not model:
             raise ValueError(f"Unknown entity type: {entity_type}")
         
@@ -110,6 +112,48 @@ class IDGenerator:
         # Return the next number (starting from 0 if none found)
         return max_seq + 1
     
+    @classmethod
+    def reserve_ids(cls, entity_type: str, db: Session, count: int) -> list[str]:
+        """
+        Allocate a contiguous block of IDs for a bulk insert
+        
+        Takes a transaction-scoped advisory lock per prefix so concurrent bulk
+        creates cannot hand out the same numbers, then finds the current
+        maximum with a single aggregate query instead of loading every ID.
+        
+        Args:
+            entity_type: Type of entity (tenant, user, project, customer, invoice)
+            db: Database session (the lock is held until it commits or rolls back)
+            count: Number of IDs to allocate
+            
+        Returns:
+            List of sequential IDs like ["CUS-021", "CUS-022", ...]
+        """
+        prefix = cls.PREFIXES.get(entity_type.lower())
+        if not prefix:
+            raise ValueError(f"Unknown entity type: {entity_type}")
+        if count <= 0:
+            return []
+        
+        model = cls.MODELS[entity_type.lower()]
+        table_name = model.__tablename__
+        
+        db.execute(
+            text("SELECT pg_advisory_xact_lock(hashtext(:lock_key))"),
+            {"lock_key": f"id_system:{prefix}"}
+        )
+        max_seq = db.execute(
+            text(f"""
+                SELECT MAX(CAST(substring(system_id FROM :offset) AS INTEGER))
+                FROM {table_name}
+                WHERE system_id ~ :pattern
+            """),
+            {"offset": len(prefix) + 2, "pattern": f"^{prefix}-[0-9]{{3,}}$"}
+        ).scalar()
+        
+        start = 0 if max_seq is None else max_seq + 1
+        return [f"{prefix}-{seq:03d}" for seq in range(start, start + count)]
+    
     @classmethod
     def validate_id_format(cls, entity_type: str, system_id: str) -> bool:
         """
@@ -0,0 +1,213 @@
+"""
+Invoice PDF rendering
+Dependency-free PDF writer using the standard Helvetica fonts, and the invoice layout.
+Everything here is a pure function of plain data and imports only the standard library,
+so it can run in worker processes (see services/invoice_documents.py).
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+import zlib
+
+# Bump when the layout changes so cached documents are re-rendered
+LAYOUT_VERSION = 1
+
+PAGE_WIDTH = 612  # US Letter, in points
+PAGE_HEIGHT = 792
+MARGIN = 54
+
+# Advance widths (1/1000 em) of printable ASCII, from the Helvetica and Helvetica-Bold AFM files
+_HELVETICA_WIDTHS = (
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584
+)
+_HELVETICA_BOLD_WIDTHS = (
+    278, 333, 474, 556, 556, 889, 722, 238, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 333, 333, 584, 584, 584, 611,
+    975, 722, 722, 722, 722, 667, 611, 778, 722, 278, 556, 722, 611, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 333, 278, 333, 584, 556,
+    333, 556, 611, 556, 611, 556, 333, 611, 611, 278, 278, 556, 278, 889, 611, 611,
+    611, 611, 389, 556, 333, 611, 556, 778, 556, 556, 500, 389, 280, 389, 584
+)
+_DEFAULT_WIDTH = 556
+
+
+def text_width(value: str, size: float, bold: bool = False) -> float:
+    """Width of value in points when set in Helvetica (Bold) at size"""
+    widths = _HELVETICA_BOLD_WIDTHS if bold else _HELVETICA_WIDTHS
+    total = 0
+    for char in value:
+        code = ord(char)
+        total += widths[code - 32] if 32 <= code <= 126 else _DEFAULT_WIDTH
+    return total * size / 1000
+
+
+def wrap(value: str, size: float, max_width: float, bold: bool = False) -> List[str]:
+    """Greedy word wrap of value into lines no wider than max_width"""
+    lines: List[str] = []
+    for paragraph in (value or "").splitlines() or [""]:
+        line = ""
+        for word in paragraph.split():
+            candidate = f"{line} {word}" if line else word
+            if line and text_width(candidate, size, bold) > max_width:
+                lines.append(line)
+                line = word
+            else:
+                line = candidate
+        lines.append(line)
+    return lines
+
+
+class PDFWriter:
+    """Minimal PDF 1.4 writer: pages of text and rules with compressed content streams"""
+
+    FONTS = {False: "F1", True: "F2"}
+
+    def __init__(self):
+        self._pages: List[List[str]] = []
+
+    def new_page(self) -> None:
+        self._pages.append([])
+
+    def text(self, x: float, y: float, value: Any, size: float = 10, bold: bool = False,
+             align: str = "left") -> None:
+        """Draw one line of text with its baseline at y; align is left, right or center on x"""
+        value = "" if value is None else str(value)
+        if align != "left":
+            width = text_width(value, size, bold)
+            x -= width if align == "right" else width / 2
+        self._pages[-1].append(
+            f"BT /{self.FONTS[bold]} {size:g} Tf {x:.2f} {y:.2f} Td ({self._escape(value)}) Tj ET"
+        )
+
+    def rule(self, x1: float, y1: float, x2: float, y2: float, width: float = 0.5) -> None:
+        """Draw a straight line"""
+        self._pages[-1].append(f"{width:g} w {x1:.2f} {y1:.2f} m {x2:.2f} {y2:.2f} l S")
+
+    @staticmethod
+    def _escape(value: str) -> str:
+        # Standard fonts use WinAnsiEncoding; unsupported characters become '?'
+        value = value.encode("cp1252", "replace").decode("latin-1")
+        return value.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+    def to_bytes(self) -> bytes:
+        """Serialize the document; output depends only on what was drawn"""
+        pages = self._pages or [[]]
+        # 1 catalog, 2 page tree, 3-4 fonts, then a page and a content stream per page
+        objects: List[bytes] = [
+            b"<< /Type /Catalog /Pages 2 0 R >>",
+            ("<< /Type /Pages /Kids [%s] /Count %d >>" % (
+                " ".join(f"{5 + 2 * index} 0 R" for index in range(len(pages))), len(pages)
+            )).encode("ascii"),
+            b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+            b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>",
+        ]
+        for index, operations in enumerate(pages):
+            stream = zlib.compress("\n".join(operations).encode("latin-1"))
+            objects.append((
+                f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+                f"/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> /Contents {6 + 2 * index} 0 R >>"
+            ).encode("ascii"))
+            objects.append(
+                f"<< /Length {len(stream)} /Filter /FlateDecode >>\nstream\n".encode("ascii")
+                + stream + b"\nendstream"
+            )
+
+        output = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        offsets = []
+        for number, body in enumerate(objects, start=1):
+            offsets.append(len(output))
+            output += f"{number} 0 obj\n".encode("ascii") + body + b"\nendobj\n"
+        xref_offset = len(output)
+        output += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("ascii")
+        output += b"".join(f"{offset:010d} 00000 n \n".encode("ascii") for offset in offsets)
+        output += (
+            f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n"
+        ).encode("ascii")
+        return bytes(output)
+
+
+def _address(party: Dict[str, Any]) -> List[str]:
+    """Non-empty address lines of an issuer or customer"""
+    locality = " ".join(part for part in (party.get("city"), party.get("state"), party.get("postal_code")) if part)
+    lines = [party.get("address_line1"), party.get("address_line2"), locality, party.get("country")]
+    return [line for line in lines if line]
+
+
+def _block(pdf: PDFWriter, x: float, y: float, title: Optional[str], lines: List[str],
+           align: str = "left") -> float:
+    """Draw a titled block of lines from y downwards; returns the y below it"""
+    if title:
+        pdf.text(x, y, title, 11, bold=True, align=align)
+        y -= 14
+    for line in lines:
+        pdf.text(x, y, line, 9, align=align)
+        y -= 12
+    return y
+
+
+def render_invoice_pdf(document: Dict[str, Any]) -> bytes:
+    """
+    Render one invoice document to PDF bytes
+
+    ``document`` is the plain dict built by InvoiceDocumentService.document_data: invoice
+    fields plus ``issuer`` and ``customer`` dicts. Amounts arrive pre-formatted as strings.
+    """
+    pdf = PDFWriter()
+    pdf.new_page()
+    right = PAGE_WIDTH - MARGIN
+    issuer, customer = document.get("issuer") or {}, document.get("customer") or {}
+
+    y = PAGE_HEIGHT - MARGIN - 10
+    pdf.text(MARGIN, y, "INVOICE", 24, bold=True)
+    _block(pdf, right, y, issuer.get("business_name"),
+           [*_address(issuer), *(value for value in (issuer.get("email"), issuer.get("phone")) if value)],
+           align="right")
+
+    y -= 40
+    details: List[Tuple[str, Any]] = [
+        ("Invoice", document.get("invoice_id")),
+        ("Issue date", document.get("issue_date")),
+        ("Due date", document.get("due_date")),
+        ("Status", (document.get("status") or "").upper()),
+    ]
+    if document.get("billing_period"):
+        details.append(("Billing period", document["billing_period"]))
+    if document.get("paid_date"):
+        details.append(("Paid on", document["paid_date"]))
+    for label, value in details:
+        pdf.text(MARGIN, y, f"{label}:", 9, bold=True)
+        pdf.text(MARGIN + 80, y, value, 9)
+        y -= 12
+
+    y -= 16
+    bill_to = [line for line in (customer.get("company"), customer.get("name")) if line]
+    y = _block(pdf, MARGIN, y, "Bill to",
+               [*bill_to, *_address(customer), *([customer["email"]] if customer.get("email") else [])])
+
+    # Single line: invoices carry one amount, not itemized lines
+    y -= 20
+    amount_x = right
+    pdf.text(MARGIN, y, "Description", 10, bold=True)
+    pdf.text(amount_x, y, f"Amount ({document.get('currency')})", 10, bold=True, align="right")
+    y -= 6
+    pdf.rule(MARGIN, y, right, y)
+    y -= 14
+    description_lines = wrap(document.get("description") or "Professional services", 10, amount_x - MARGIN - 120)
+    pdf.text(amount_x, y, document.get("amount"), 10, align="right")
+    for line in description_lines:
+        pdf.text(MARGIN, y, line, 10)
+        y -= 13
+
+    y -= 4
+    pdf.rule(MARGIN, y, right, y)
+    y -= 18
+    pdf.text(amount_x - 110, y, "Total due", 12, bold=True, align="right")
+    pdf.text(amount_x, y, f"{document.get('amount')} {document.get('currency')}", 12, bold=True, align="right")
+
+    pdf.text(PAGE_WIDTH / 2, MARGIN - 20,
+             f"{issuer.get('business_name') or ''} - {document.get('invoice_id')}", 8, align="center")
+    return pdf.to_bytes()
@@ -6,23 +6,49 @@ from fastapi import FastAPI, Depends, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.orm import Session
 from sqlalchemy import text
+from contextlib import asynccontextmanager
 import logging
 
 # Import from our organized structure
 from .core import settings, get_db
-from .api.v1 import auth, crm, admin, database, projects, invoices, multitenant
+from .api.v1 import auth, crm, admin, database, projects, invoices, multitenant, search
+from .services.scheduler import scheduler
+from .services.integrity_scanner import IntegrityScanner
+from .services.analytics_rollup import AnalyticsRollupService
+from .services.lead_scoring import LeadScoringService
+from .services.recurring_billing import RecurringBillingService
+from .services.invoice_documents import InvoiceDocumentService
+from .services.maintenance import MaintenanceService
+from .services.job_runs import JobRunService
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start background jobs with the application and stop them on shutdown"""
+    IntegrityScanner.register(scheduler)
+    AnalyticsRollupService.register(scheduler)
+    LeadScoringService.register(scheduler)
+    RecurringBillingService.register(scheduler)
+    MaintenanceService.register(scheduler)
+    InvoiceDocumentService.register(scheduler)
+    JobRunService.register(scheduler)
+    if settings.SCHEDULER_ENABLED:
+        scheduler.start()
+    yield
+    scheduler.stop()
+    InvoiceDocumentService.shutdown()
+
 def create_app() -> FastAPI:
     """Application factory pattern"""
     
     app = FastAPI(
         title="DevHub API",
         description="Business Management Hub - Clean Architecture",
-        version="1.0.0"
+        version="1.0.0",
+        lifespan=lifespan
     )
 
     # Configure CORS
@@ -42,6 +68,7 @@ def create_app() -> FastAPI:
     app.include_router(projects.router, prefix="/api/v1/projects", tags=["projects"])
     app.include_router(invoices.router, prefix="/api/v1/invoices", tags=["invoices"])
     app.include_router(multitenant.router, prefix="/api/v1/multitenant", tags=["multitenant"])
+    app.include_router(search.router, prefix="/api/v1/search", tags=["search"])
 
     @app.get("/")
     async def root():
@@ -4,9 +4,13 @@ Models package - Organized database models by domain
 from .base import BaseModel, TimestampMixin
 from .tenant import Tenant
 from .user import User
-from .crm import Customer, Lead, CustomerInteraction, LeadInteraction, CustomerNote, CustomerStatus, LeadStatus
-from .project import Project, ProjectStatus, ProjectPriority
-from .invoice import Invoice, InvoiceStatus
+from .crm import Customer, Lead, CustomerInteraction, LeadInteraction, LeadStageEvent, CustomerNote, CustomerStatus, LeadStatus
+from .project import Project, ProjectStatus, ProjectPriority, ProjectAssignment, ProjectCustomer
+from .invoice import Invoice, InvoiceStatus, RecurringInvoiceTemplate, RecurringFrequency
+from .integrity import SyncWatermark, IntegrityIssue, IntegrityScan
+from .jobs import JobRun
+from .analytics import TenantDailyRollup
+from .search import SearchDocument
 
 __all__ = [
     "BaseModel",
@@ -17,12 +21,23 @@ __all__ = [
     "Lead", 
     "CustomerInteraction",
     "LeadInteraction",
+    "LeadStageEvent",
     "CustomerNote",
     "CustomerStatus",
     "LeadStatus",
     "Project",
     "ProjectStatus",
     "ProjectPriority",
+    "ProjectAssignment",
+    "ProjectCustomer",
     "Invoice",
-    "InvoiceStatus"
+    "InvoiceStatus",
+    "RecurringInvoiceTemplate",
+    "RecurringFrequency",
+    "SyncWatermark",
+    "IntegrityIssue",
+    "IntegrityScan",
+    "JobRun",
+    "TenantDailyRollup",
+    "SearchDocument"
 ]
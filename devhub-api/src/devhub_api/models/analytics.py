@@ -0,0 +1,34 @@
+"""
+Analytics models - Pre-aggregated counters for dashboards
+"""
+from sqlalchemy import Column, String, Date, Numeric, ForeignKey, Index, UniqueConstraint
+from .base import BaseModel
+
+
+class TenantDailyRollup(BaseModel):
+    """
+    Per-tenant, per-day counter for one dashboard metric
+    
+    Metrics are additive so any date range is answered by summing days:
+    - new_customers, interactions: rows created that day
+    - new_leads: leads created that day, by source
+    - conversions: leads converted that day, by source
+    - leads_in_stage: net change in leads per stage (entries minus exits)
+    - stage_value: net change in estimated value per stage
+    - qualified_leads: net change in leads with qualification_status "qualified"
+    """
+    __tablename__ = "tenant_daily_rollups"
+    
+    tenant_id = Column(String, ForeignKey("tenants.system_id"), nullable=False)
+    day = Column(Date, nullable=False)
+    metric = Column(String(50), nullable=False)
+    dimension = Column(String(100), nullable=False, default="")  # Stage or source; "" when unused
+    value = Column(Numeric(14, 2), nullable=False, default=0)
+    
+    __table_args__ = (
+        UniqueConstraint('tenant_id', 'day', 'metric', 'dimension', name='uq_tenant_daily_rollup'),
+        Index('idx_tenant_daily_rollup_metric_day', 'tenant_id', 'metric', 'day'),
+    )
+    
+    def __repr__(self):
+        return f"<TenantDailyRollup(tenant_id='{self.tenant_id}', day={self.day}, metric='{self.metric}')>"
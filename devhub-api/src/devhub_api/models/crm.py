@@ -1,11 +1,23 @@
 """
 CRM models - Customer, Lead, and related interaction models
 """
-from sqlalchemy import Column, String, Boolean, Text, ForeignKey, Integer, Date
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, Boolean, Text, ForeignKey, Integer, Date, DateTime, Index, Computed, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 from .base import BaseModel, TimestampMixin
+from datetime import datetime, timezone
 import enum
 
+# Generated search columns shared by customers and leads (see services/search.py)
+CONTACT_SEARCH_TEXT_SQL = (
+    "lower(coalesce(company, '') || ' ' || coalesce(name, '') || ' ' || coalesce(email, ''))"
+)
+CONTACT_SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('simple'::regconfig, coalesce(company, '')), 'A') || "
+    "setweight(to_tsvector('simple'::regconfig, coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('simple'::regconfig, coalesce(email, '')), 'B')"
+)
+
 class CustomerStatus(enum.Enum):
     PROSPECT = "prospect"
     ACTIVE = "active"
@@ -48,12 +60,24 @@ class Customer(BaseModel, TimestampMixin):
     postal_code = Column(String)
     country = Column(String, default="US")
     
+    # Search (generated by the database, not loaded with the entity)
+    search_text = deferred(Column(Text, Computed(CONTACT_SEARCH_TEXT_SQL, persisted=True)))
+    search_vector = deferred(Column(TSVECTOR, Computed(CONTACT_SEARCH_VECTOR_SQL, persisted=True)))
+    
     # Relationships
     tenant = relationship("Tenant", back_populates="customers")
     interactions = relationship("CustomerInteraction", back_populates="customer")
     notes_list = relationship("CustomerNote", back_populates="customer")
     # projects = relationship("Project", back_populates="customer")  # Disabled - no customer_id in projects table
     invoices = relationship("Invoice", back_populates="customer")
+    
+    __table_args__ = (
+        Index('idx_customers_updated_at', 'updated_at'),
+        Index('idx_customers_tenant_created', 'tenant_id', text('created_at DESC NULLS LAST'), text('id DESC')),
+        Index('idx_customers_search_vector', 'tenant_id', 'search_vector', postgresql_using='gin'),
+        Index('idx_customers_search_trgm', 'tenant_id', 'search_text', postgresql_using='gin',
+              postgresql_ops={'search_text': 'gin_trgm_ops'}),
+    )
 
 class Lead(BaseModel, TimestampMixin):
     """Lead management for CRM"""
@@ -91,14 +115,34 @@ class Lead(BaseModel, TimestampMixin):
     last_contacted = Column(Date)
     converted_to_customer = Column(Boolean, default=False)
     converted_customer_id = Column(String)
+    # Open lead without contact for STALE_LEAD_DAYS; maintained by the stale-lead job
+    is_stale = Column(Boolean, nullable=False, default=False)
     
     # Assignment
     assigned_to = Column(String, ForeignKey("users.system_id"), nullable=True)
     
+    # Search (generated by the database, not loaded with the entity)
+    search_text = deferred(Column(Text, Computed(CONTACT_SEARCH_TEXT_SQL, persisted=True)))
+    search_vector = deferred(Column(TSVECTOR, Computed(CONTACT_SEARCH_VECTOR_SQL, persisted=True)))
+    
     # Relationships
     tenant = relationship("Tenant")
     assigned_user = relationship("User", foreign_keys=[assigned_to], back_populates="assigned_leads")
     interactions = relationship("LeadInteraction", back_populates="lead")
+    
+    __table_args__ = (
+        Index('idx_leads_tenant_created', 'tenant_id', text('created_at DESC NULLS LAST'), text('id DESC')),
+        Index('idx_leads_search_vector', 'tenant_id', 'search_vector', postgresql_using='gin'),
+        Index('idx_leads_search_trgm', 'tenant_id', 'search_text', postgresql_using='gin',
+              postgresql_ops={'search_text': 'gin_trgm_ops'}),
+        # Covers the pipeline forecast over open deals (services/forecast.py)
+        Index('idx_leads_tenant_open_forecast', 'tenant_id',
+              postgresql_include=['stage', 'assigned_to', 'expected_close_date', 'estimated_value',
+                                  'probability', 'is_active', 'converted_to_customer'],
+              postgresql_where=text("coalesce(stage, '') NOT IN ('closed_won', 'closed_lost')")),
+        # Stale leads per tenant, for the is_stale filter
+        Index('idx_leads_tenant_stale', 'tenant_id', postgresql_where=text('is_stale')),
+    )
 
 class CustomerInteraction(BaseModel, TimestampMixin):
     """Track all interactions with customers"""
@@ -117,6 +161,11 @@ class CustomerInteraction(BaseModel, TimestampMixin):
     # Relationships
     customer = relationship("Customer", back_populates="interactions")
     user = relationship("User", back_populates="customer_interactions")
+    
+    __table_args__ = (
+        Index('idx_customer_interactions_customer_created', 'customer_id',
+              text('created_at DESC NULLS LAST'), text('id DESC')),
+    )
 
 class LeadInteraction(BaseModel, TimestampMixin):
     """Track all interactions with leads"""
@@ -135,6 +184,36 @@ class LeadInteraction(BaseModel, TimestampMixin):
     # Relationships
     lead = relationship("Lead", back_populates="interactions")
     user = relationship("User", back_populates="lead_interactions")
+    
+    __table_args__ = (
+        Index('idx_lead_interactions_lead', 'lead_id'),
+        Index('idx_lead_interactions_updated_at', 'updated_at'),
+        Index('idx_lead_interactions_created_at', 'created_at'),
+    )
+
+class LeadStageEvent(BaseModel):
+    """
+    Append-only record of a lead entering a stage
+    
+    Written by lead creation (from_stage NULL) and by every stage change; the time a
+    lead spent in a stage is the gap to its next event (see services/pipeline_analytics.py)
+    """
+    __tablename__ = "lead_stage_events"
+    
+    tenant_id = Column(String, ForeignKey("tenants.system_id"), nullable=False)
+    lead_id = Column(String, ForeignKey("leads.system_id"), nullable=False)
+    from_stage = Column(String, nullable=True)
+    to_stage = Column(String, nullable=True)
+    changed_by = Column(String, ForeignKey("users.system_id"), nullable=True)
+    changed_at = Column(DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
+    
+    __table_args__ = (
+        Index('idx_lead_stage_events_tenant_changed', 'tenant_id', 'changed_at'),
+        Index('idx_lead_stage_events_lead_changed', 'lead_id', 'changed_at'),
+    )
+    
+    def __repr__(self):
+        return f"<LeadStageEvent(lead_id='{self.lead_id}', from_stage='{self.from_stage}', to_stage='{self.to_stage}')>"
 
 class CustomerNote(BaseModel, TimestampMixin):
     """Customer notes and comments"""
@@ -0,0 +1,68 @@
+"""
+Integrity models - Incremental validation state and stored findings
+"""
+from sqlalchemy import Column, String, Integer, DateTime, Text, Index, UniqueConstraint
+from .base import BaseModel, TimestampMixin
+
+
+class SyncWatermark(BaseModel, TimestampMixin):
+    """
+    High-water mark of rows already processed by an incremental job
+    Scopes are free-form keys such as "integrity:projects"
+    """
+    __tablename__ = "sync_watermarks"
+    
+    scope = Column(String(100), unique=True, nullable=False)
+    last_updated_at = Column(DateTime, nullable=True)  # Highest updated_at processed
+    last_id = Column(Integer, nullable=False, default=0)  # Highest primary key processed
+    
+    def __repr__(self):
+        return f"<SyncWatermark(scope='{self.scope}', last_id={self.last_id})>"
+
+
+class IntegrityIssue(BaseModel):
+    """A finding from the database validator, kept until a re-check resolves it"""
+    __tablename__ = "integrity_issues"
+    
+    check_name = Column(String(100), nullable=False)  # e.g. orphans:projects.owner_id
+    category = Column(String(50), nullable=False)  # relationship_issues, id_system_issues, warnings...
+    table_name = Column(String(100), nullable=False)
+    record_key = Column(String, nullable=False)  # system_id, or id for tables without one
+    message = Column(Text, nullable=False)
+    
+    first_seen_at = Column(DateTime, nullable=False)
+    last_seen_at = Column(DateTime, nullable=False)
+    resolved_at = Column(DateTime, nullable=True)  # NULL while the issue is open
+    
+    __table_args__ = (
+        UniqueConstraint('check_name', 'record_key', name='uq_integrity_issue_check_record'),
+        Index('idx_integrity_issue_open', 'category', 'check_name', postgresql_where=(resolved_at.is_(None))),
+    )
+    
+    def __repr__(self):
+        return f"<IntegrityIssue(check_name='{self.check_name}', record_key='{self.record_key}')>"
+
+
+class IntegrityScan(BaseModel):
+    """A background validation run and the snapshot of findings it produced"""
+    __tablename__ = "integrity_scans"
+    
+    job_id = Column(String(32), unique=True, index=True, nullable=False)
+    trigger = Column(String(20), nullable=False, default="scheduled")  # scheduled, manual
+    status = Column(String(20), nullable=False, default="queued")  # queued, running, completed, failed
+    
+    requested_at = Column(DateTime, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    
+    severity = Column(String(20), nullable=True)
+    total_issues = Column(Integer, nullable=True)
+    result = Column(Text, nullable=True)  # JSON: issues and per-check timings
+    error = Column(Text, nullable=True)
+    
+    __table_args__ = (
+        Index('idx_integrity_scan_status_finished', 'status', 'finished_at'),
+    )
+    
+    def __repr__(self):
+        return f"<IntegrityScan(job_id='{self.job_id}', status='{self.status}')>"
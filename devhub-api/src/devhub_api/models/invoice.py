@@ -1,7 +1,7 @@
 """
 Invoice Management Models - Comprehensive Version
 """
-from sqlalchemy import Column, String, DateTime, ForeignKey, Index
+from sqlalchemy import Column, String, Boolean, Integer, Text, Date, DateTime, ForeignKey, Index, Numeric, text
 from sqlalchemy.orm import relationship
 from decimal import Decimal
 from .base import BaseModel, TimestampMixin
@@ -33,14 +33,18 @@ class Invoice(BaseModel, TimestampMixin):
     due_date = Column(DateTime, nullable=False)
     paid_date = Column(DateTime, nullable=True)
     
-    # Amount fields (stored as strings in actual DB)
-    amount = Column(String(50), nullable=False)  # Matches actual VARCHAR type
+    # Amount fields
+    amount = Column(Numeric(12, 2), nullable=False)
     currency = Column(String(3), nullable=False, default="USD")
     
     # Foreign keys
     customer_id = Column(String(50), ForeignKey('customers.system_id'), nullable=False)
     # Note: No tenant_id or project_id in actual table schema
     
+    # Set on invoices generated from a recurring template (first day of the billed period)
+    recurring_template_id = Column(Integer, ForeignKey('recurring_invoice_templates.id'), nullable=True)
+    billing_period = Column(Date, nullable=True)
+    
     # Relationships
     customer = relationship("Customer", back_populates="invoices")
     # Note: No project or tenant relationships due to missing foreign keys
@@ -52,6 +56,17 @@ class Invoice(BaseModel, TimestampMixin):
         Index('idx_invoice_due_date', 'due_date'),
         Index('idx_invoice_issue_date', 'issue_date'),
         Index('idx_invoice_amount', 'amount'),
+        Index('idx_invoices_updated_at', 'updated_at'),
+        Index('idx_invoices_created', text('created_at DESC NULLS LAST'), text('id DESC')),
+        # Unpaid invoices per customer for the aging report, readable without the heap
+        Index('idx_invoices_customer_outstanding', 'customer_id',
+              postgresql_include=['due_date', 'amount', 'currency'],
+              postgresql_where=text("status NOT IN ('paid', 'cancelled', 'draft')")),
+        # Open invoices by due date, scanned by the overdue-marking job
+        Index('idx_invoices_open_due', 'due_date', 'id',
+              postgresql_where=text("status IN ('pending', 'sent', 'viewed')")),
+        # One invoice per template and period; recurring billing inserts ON CONFLICT DO NOTHING
+        Index('uq_invoices_recurring_period', 'recurring_template_id', 'billing_period', unique=True),
     )
     
     def __repr__(self):
@@ -59,12 +74,14 @@ class Invoice(BaseModel, TimestampMixin):
     
     @property
     def is_overdue(self) -> bool:
-        """Check if invoice is overdue"""
-        if self.status in [InvoiceStatus.PAID, InvoiceStatus.CANCELLED]:
+        """Check if invoice is overdue (due before today, UTC, like the overdue-marking job)"""
+        if self.status == InvoiceStatus.OVERDUE:
+            return True
+        if self.status not in [InvoiceStatus.PENDING, InvoiceStatus.SENT, InvoiceStatus.VIEWED]:
             return False
         
-        from datetime import datetime
-        return datetime.now() > self.due_date
+        from datetime import datetime, timezone
+        return self.due_date.date() < datetime.now(timezone.utc).date()
     
     @property
     def days_until_due(self) -> int:
@@ -72,6 +89,44 @@ class Invoice(BaseModel, TimestampMixin):
         from datetime import datetime
         return (self.due_date - datetime.now()).days
 
+class RecurringFrequency:
+    """Recurring billing frequencies and their length in months"""
+    MONTHLY = "monthly"
+    QUARTERLY = "quarterly"
+    YEARLY = "yearly"
+
+    MONTHS = {MONTHLY: 1, QUARTERLY: 3, YEARLY: 12}
+
+
+class RecurringInvoiceTemplate(BaseModel, TimestampMixin):
+    """Invoice issued to a customer every billing period, optionally for a project"""
+    __tablename__ = "recurring_invoice_templates"
+    
+    system_id = Column(String, unique=True, index=True)  # REC-000, REC-001, etc.
+    tenant_id = Column(String(50), ForeignKey('tenants.system_id'), nullable=False)
+    customer_id = Column(String(50), ForeignKey('customers.system_id'), nullable=False)
+    project_id = Column(String(50), ForeignKey('projects.system_id'), nullable=True)
+    
+    description = Column(Text, nullable=True)
+    amount = Column(Numeric(12, 2), nullable=False)
+    currency = Column(String(3), nullable=False, default="USD")
+    frequency = Column(String(20), nullable=False, default=RecurringFrequency.MONTHLY)
+    payment_terms_days = Column(Integer, nullable=False, default=30)
+    
+    # Billed for every period from start_date's month through end_date's month
+    start_date = Column(Date, nullable=False)
+    end_date = Column(Date, nullable=True)
+    is_active = Column(Boolean, nullable=False, default=True)
+    
+    __table_args__ = (
+        Index('idx_recurring_templates_tenant_active', 'tenant_id', 'id',
+              postgresql_where=text('is_active')),
+    )
+    
+    def __repr__(self):
+        return f"<RecurringInvoiceTemplate(system_id='{self.system_id}', customer_id='{self.customer_id}', amount={self.amount}, frequency='{self.frequency}')>"
+
+
 # InvoiceItem class disabled - not present in actual database schema
 # class InvoiceItem(BaseModel, TimestampMixin):
 #     """Invoice item/line item model"""
@@ -0,0 +1,31 @@
+"""
+Job models - Recorded runs of scheduled background jobs
+"""
+from sqlalchemy import Column, String, Integer, DateTime, Text, Index
+from .base import BaseModel
+
+
+class JobRun(BaseModel):
+    """One finished run of a scheduler job and the metrics it reported"""
+    __tablename__ = "job_runs"
+    
+    job_name = Column(String(100), nullable=False)  # e.g. mark_overdue_invoices
+    job_id = Column(String(32), nullable=False)
+    trigger = Column(String(20), nullable=False, default="scheduled")  # scheduled, manual
+    status = Column(String(20), nullable=False)  # completed, failed
+    
+    started_at = Column(DateTime, nullable=False)
+    finished_at = Column(DateTime, nullable=False)
+    duration_ms = Column(Integer, nullable=False)
+    
+    rows_affected = Column(Integer, nullable=True)
+    batches = Column(Integer, nullable=True)
+    details = Column(Text, nullable=True)  # JSON: everything else the job returned
+    error = Column(Text, nullable=True)
+    
+    __table_args__ = (
+        Index('idx_job_runs_name_started', 'job_name', 'started_at'),
+    )
+    
+    def __repr__(self):
+        return f"<JobRun(job_name='{self.job_name}', job_id='{self.job_id}', status='{self.status}')>"
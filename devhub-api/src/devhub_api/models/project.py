@@ -1,9 +1,10 @@
 """
 Project Management Models
 """
-from sqlalchemy import Column, String, Text, Date, Numeric, ForeignKey, Index
+from sqlalchemy import Column, String, Text, Date, DateTime, Numeric, ForeignKey, Index, text
 from sqlalchemy.orm import relationship
 from decimal import Decimal
+from datetime import datetime, timezone
 from .base import BaseModel, TimestampMixin
 from .tenant import Tenant
 from .user import User
@@ -58,6 +59,8 @@ class Project(BaseModel, TimestampMixin):
         Index('idx_project_due_date', 'due_date'),
         Index('idx_project_start_date', 'start_date'),
         Index('idx_project_owner', 'owner_id'),
+        Index('idx_projects_updated_at', 'updated_at'),
+        Index('idx_projects_tenant_created', 'tenant_id', text('created_at DESC NULLS LAST'), text('id DESC')),
     )
     
     def __repr__(self):
@@ -79,3 +82,28 @@ class Project(BaseModel, TimestampMixin):
             return 0
         
         return (self.due_date - self.start_date).days
+
+
+class ProjectAssignment(BaseModel):
+    """Links users to the projects they work on"""
+    __tablename__ = "project_assignments"
+    
+    user_id = Column(String, ForeignKey('users.system_id'), nullable=True)
+    project_id = Column(String, ForeignKey('projects.system_id'), nullable=True)
+    role = Column(String, nullable=True)
+    assigned_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    
+    def __repr__(self):
+        return f"<ProjectAssignment(project_id='{self.project_id}', user_id='{self.user_id}')>"
+
+
+class ProjectCustomer(BaseModel):
+    """Links customers to the projects delivered for them"""
+    __tablename__ = "project_customers"
+    
+    project_id = Column(String, ForeignKey('projects.system_id'), nullable=True)
+    customer_id = Column(String, ForeignKey('customers.system_id'), nullable=True)
+    linked_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    
+    def __repr__(self):
+        return f"<ProjectCustomer(project_id='{self.project_id}', customer_id='{self.customer_id}')>"
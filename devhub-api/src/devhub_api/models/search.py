@@ -0,0 +1,35 @@
+"""
+Search models - Unified cross-entity search index
+"""
+from sqlalchemy import Column, String, Text, DateTime, Index
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from ..database import Base
+
+
+class SearchDocument(Base):
+    """
+    One searchable document per customer, lead, project, invoice, note or interaction
+    
+    Maintained by database triggers on the source tables (see migration
+    e8f3a5c1b692), hash-partitioned by tenant_id so a tenant's search touches
+    a single partition.
+    """
+    __tablename__ = "search_documents"
+    
+    tenant_id = Column(String, primary_key=True)
+    entity_type = Column(String(30), primary_key=True)  # customer, lead, project, invoice, note, interaction
+    system_id = Column(String, primary_key=True)
+    
+    title = Column(String, nullable=False)
+    snippet = Column(Text, nullable=True)  # First characters of the indexed body
+    search_vector = Column(TSVECTOR, nullable=False)
+    updated_at = Column(DateTime, nullable=False)
+    
+    __table_args__ = (
+        Index('idx_search_documents_vector', 'tenant_id', 'search_vector', postgresql_using='gin'),
+        Index('idx_search_documents_entity', 'entity_type', 'system_id'),
+        {'postgresql_partition_by': 'HASH (tenant_id)'},
+    )
+    
+    def __repr__(self):
+        return f"<SearchDocument(entity_type='{self.entity_type}', system_id='{self.system_id}')>"
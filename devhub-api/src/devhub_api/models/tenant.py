@@ -1,7 +1,7 @@
 """
 Tenant model - Represents client businesses using the DevHub platform
 """
-from sqlalchemy import Column, String, Boolean, Integer
+from sqlalchemy import Column, String, Boolean, Integer, Text
 from sqlalchemy.orm import relationship
 from .base import BaseModel, TimestampMixin
 
@@ -32,6 +32,9 @@ class Tenant(BaseModel, TimestampMixin):
     is_active = Column(Boolean, default=True)
     max_users = Column(Integer, default=5)  # Based on subscription plan
     
+    # CRM formula settings
+    business_variables = Column(Text, nullable=True)  # JSON: compiled by services/formula_profiles.py
+    
     # Relationships
     users = relationship("User", back_populates="tenant")
     customers = relationship("Customer", back_populates="tenant")
@@ -1,7 +1,7 @@
 """
 User model - Represents people who can login to the DevHub platform
 """
-from sqlalchemy import Column, String, Boolean, Text, ForeignKey
+from sqlalchemy import Column, String, Boolean, Text, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from .base import BaseModel, TimestampMixin
 
@@ -44,3 +44,7 @@ class User(BaseModel, TimestampMixin):
     lead_interactions = relationship("LeadInteraction", back_populates="user")
     customer_notes = relationship("CustomerNote", back_populates="user")
     assigned_leads = relationship("Lead", foreign_keys="Lead.assigned_to", back_populates="assigned_user")
+    
+    __table_args__ = (
+        Index('idx_users_updated_at', 'updated_at'),
+    )
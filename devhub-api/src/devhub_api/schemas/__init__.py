@@ -23,7 +23,13 @@ from .invoice import (
     InvoiceResponse,
     InvoiceList,
     InvoiceFilters,
+    InvoiceCurrencySummary,
     InvoiceSummary,
+    RecurringFrequency,
+    RecurringInvoiceTemplateCreate,
+    RecurringInvoiceTemplateUpdate,
+    RecurringInvoiceTemplateResponse,
+    RecurringBillingRun,
 )
 
 __all__ = [
@@ -48,5 +54,11 @@ __all__ = [
     "InvoiceResponse",
     "InvoiceList",
     "InvoiceFilters",
+    "InvoiceCurrencySummary",
     "InvoiceSummary",
+    "RecurringFrequency",
+    "RecurringInvoiceTemplateCreate",
+    "RecurringInvoiceTemplateUpdate",
+    "RecurringInvoiceTemplateResponse",
+    "RecurringBillingRun",
 ]
\ No newline at end of file
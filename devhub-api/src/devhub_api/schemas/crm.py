@@ -3,7 +3,7 @@ CRM-related Pydantic schemas for DevHub SaaS Platform
 """
 
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Optional, List, Dict, Any
 from datetime import datetime
 
 class CustomerBase(BaseModel):
@@ -92,3 +92,11 @@ class LeadResponse(LeadBase):
     
     class Config:
         from_attributes = True
+
+class ScoringBatchRequest(BaseModel):
+    """Schema for scoring a selection of leads or customers"""
+    entity: str = Field(..., description="leads or customers")
+    ids: Optional[List[str]] = Field(None, description="System IDs to score")
+    filters: Optional[Dict[str, Any]] = Field(
+        None, description="Column filters (leads: stage, source, is_active; customers: is_active)"
+    )
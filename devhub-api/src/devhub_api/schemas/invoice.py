@@ -155,6 +155,8 @@ class InvoiceResponse(InvoiceBase):
     customer_id: str = Field(..., description="Customer ID this invoice belongs to")
     project_id: Optional[str] = Field(None, description="Related project ID")
     tenant_id: str = Field(..., description="Tenant ID")
+    amount: Optional[Decimal] = Field(None, max_digits=12, decimal_places=2, description="Invoice amount")
+    currency: Optional[str] = Field(None, min_length=3, max_length=3, description="ISO 4217 currency code")
     created_at: datetime = Field(..., description="Creation timestamp")
     updated_at: datetime = Field(..., description="Last update timestamp")
     
@@ -184,6 +186,8 @@ class InvoiceResponse(InvoiceBase):
                 "customer_id": "550e8400-e29b-41d4-a716-446655440001",
                 "project_id": "550e8400-e29b-41d4-a716-446655440002",
                 "tenant_id": "550e8400-e29b-41d4-a716-446655440003",
+                "amount": "1620.00",
+                "currency": "USD",
                 "created_at": "2024-01-01T00:00:00Z",
                 "updated_at": "2024-01-15T12:30:00Z",
                 "customer_name": "Acme Corp",
@@ -197,23 +201,21 @@ class InvoiceResponse(InvoiceBase):
 
 # Schema for listing invoices with pagination
 class InvoiceList(BaseModel):
-    """Schema for paginated invoice list responses."""
+    """Schema for cursor-paginated invoice list responses."""
     invoices: List[InvoiceResponse] = Field(..., description="List of invoices")
-    total: int = Field(..., description="Total number of invoices")
-    page: int = Field(..., description="Current page number")
-    per_page: int = Field(..., description="Items per page")
+    next_cursor: Optional[str] = Field(None, description="Cursor for the next page, if any")
     has_next: bool = Field(..., description="Whether there are more pages")
-    has_prev: bool = Field(..., description="Whether there are previous pages")
+    limit: int = Field(..., description="Items per page")
+    estimated_total: Optional[int] = Field(None, description="Planner estimate of the total, when requested")
 
     model_config = ConfigDict(
         json_schema_extra={
             "example": {
                 "invoices": [],
-                "total": 25,
-                "page": 1,
-                "per_page": 10,
+                "next_cursor": "eyJzIjoiY3JlYXRlZF9hdCxpZCIsImsiOltdfQ",
                 "has_next": True,
-                "has_prev": False
+                "limit": 50,
+                "estimated_total": 25
             }
         }
     )
@@ -245,6 +247,16 @@ class InvoiceFilters(BaseModel):
 
 
 # Schema for invoice summary/statistics
+class InvoiceCurrencySummary(BaseModel):
+    """Schema for the invoice totals of one currency."""
+    currency: str = Field(..., description="ISO 4217 currency code")
+    total_invoices: int = Field(..., description="Number of invoices in this currency")
+    total_amount: Decimal = Field(..., description="Total amount of all invoices")
+    paid_amount: Decimal = Field(..., description="Total amount of paid invoices")
+    pending_amount: Decimal = Field(..., description="Total amount of pending invoices")
+    overdue_amount: Decimal = Field(..., description="Total amount of overdue invoices")
+
+
 class InvoiceSummary(BaseModel):
     """Schema for invoice summary statistics."""
     total_invoices: int = Field(..., description="Total number of invoices")
@@ -252,6 +264,10 @@ class InvoiceSummary(BaseModel):
     paid_amount: Decimal = Field(..., description="Total amount of paid invoices")
     pending_amount: Decimal = Field(..., description="Total amount of pending invoices")
     overdue_amount: Decimal = Field(..., description="Total amount of overdue invoices")
+    by_currency: List[InvoiceCurrencySummary] = Field(
+        default_factory=list,
+        description="The same totals per currency; the top-level amounts add currencies together"
+    )
     
     model_config = ConfigDict(
         json_schema_extra={
@@ -260,7 +276,100 @@ class InvoiceSummary(BaseModel):
                 "total_amount": "45000.00",
                 "paid_amount": "30000.00", 
                 "pending_amount": "10000.00",
-                "overdue_amount": "5000.00"
+                "overdue_amount": "5000.00",
+                "by_currency": [
+                    {
+                        "currency": "USD",
+                        "total_invoices": 25,
+                        "total_amount": "45000.00",
+                        "paid_amount": "30000.00",
+                        "pending_amount": "10000.00",
+                        "overdue_amount": "5000.00"
+                    }
+                ]
+            }
+        }
+    )
+
+
+# Schemas for recurring invoice templates
+class RecurringFrequency(str, Enum):
+    """Recurring billing frequency enum."""
+    MONTHLY = "monthly"
+    QUARTERLY = "quarterly"
+    YEARLY = "yearly"
+
+
+class RecurringInvoiceTemplateCreate(BaseModel):
+    """Schema for creating a recurring invoice template."""
+    customer_id: str = Field(..., description="Customer billed every period")
+    project_id: Optional[str] = Field(None, description="Related project ID")
+    description: Optional[str] = Field(None, max_length=1000, description="Invoice description")
+    amount: Decimal = Field(..., ge=0, max_digits=12, decimal_places=2, description="Amount billed per period")
+    currency: str = Field(default="USD", min_length=3, max_length=3, description="ISO 4217 currency code")
+    frequency: RecurringFrequency = Field(default=RecurringFrequency.MONTHLY, description="Billing frequency")
+    payment_terms_days: int = Field(default=30, ge=0, le=365, description="Days from issue to due date")
+    start_date: date = Field(..., description="Contract start; its month is the first billed period, invoiced on this date")
+    end_date: Optional[date] = Field(None, description="Last billed period (its month)")
+
+    model_config = ConfigDict(
+        use_enum_values=True,
+        validate_default=True,
+        json_schema_extra={
+            "example": {
+                "customer_id": "CUS-001",
+                "project_id": "PRJ-002",
+                "description": "Monthly hosting and maintenance",
+                "amount": "450.00",
+                "currency": "USD",
+                "frequency": "monthly",
+                "payment_terms_days": 30,
+                "start_date": "2024-01-01"
             }
         }
     )
+
+
+class RecurringInvoiceTemplateUpdate(BaseModel):
+    """Schema for updating a recurring invoice template."""
+    project_id: Optional[str] = None
+    description: Optional[str] = Field(None, max_length=1000)
+    amount: Optional[Decimal] = Field(None, ge=0, max_digits=12, decimal_places=2)
+    currency: Optional[str] = Field(None, min_length=3, max_length=3)
+    frequency: Optional[RecurringFrequency] = None
+    payment_terms_days: Optional[int] = Field(None, ge=0, le=365)
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    is_active: Optional[bool] = None
+
+    model_config = ConfigDict(use_enum_values=True)
+
+
+class RecurringInvoiceTemplateResponse(BaseModel):
+    """Schema for recurring invoice template responses."""
+    id: str = Field(..., validation_alias="system_id", description="Template ID")
+    tenant_id: str
+    customer_id: str
+    project_id: Optional[str] = None
+    description: Optional[str] = None
+    amount: Decimal
+    currency: str
+    frequency: RecurringFrequency
+    payment_terms_days: int
+    start_date: date
+    end_date: Optional[date] = None
+    is_active: bool
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class RecurringBillingRun(BaseModel):
+    """Schema for the result of a recurring billing run."""
+    tenant_id: str
+    period: date = Field(..., description="First day of the billed month")
+    created: int = Field(..., description="Invoices issued by this run")
+    skipped: int = Field(..., description="Templates billed concurrently by another run")
+    chunks: int = Field(..., description="Transactions committed")
+    duration_ms: int
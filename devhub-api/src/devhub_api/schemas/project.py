@@ -124,23 +124,21 @@ class ProjectResponse(ProjectBase):
 
 # Schema for listing projects with pagination
 class ProjectList(BaseModel):
-    """Schema for paginated project list responses."""
+    """Schema for cursor-paginated project list responses."""
     projects: List[ProjectResponse] = Field(..., description="List of projects")
-    total: int = Field(..., description="Total number of projects")
-    page: int = Field(..., description="Current page number")
-    per_page: int = Field(..., description="Items per page")
+    next_cursor: Optional[str] = Field(None, description="Cursor for the next page, if any")
     has_next: bool = Field(..., description="Whether there are more pages")
-    has_prev: bool = Field(..., description="Whether there are previous pages")
+    limit: int = Field(..., description="Items per page")
+    estimated_total: Optional[int] = Field(None, description="Planner estimate of the total, when requested")
 
     model_config = ConfigDict(
         json_schema_extra={
             "example": {
                 "projects": [],
-                "total": 25,
-                "page": 1,
-                "per_page": 10,
+                "next_cursor": "eyJzIjoiY3JlYXRlZF9hdCxpZCIsImsiOltdfQ",
                 "has_next": True,
-                "has_prev": False
+                "limit": 50,
+                "estimated_total": 25
             }
         }
     )
@@ -3,7 +3,7 @@ Tenant-related Pydantic schemas for DevHub SaaS Platform
 """
 
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Optional, Dict, Any
 from datetime import datetime
 
 class TenantBase(BaseModel):
@@ -38,6 +38,12 @@ class TenantUpdate(BaseModel):
     max_users: Optional[int] = None
     is_active: Optional[bool] = None
 
+class TenantBusinessVariables(BaseModel):
+    """Schema for a tenant's CRM formula business variables"""
+    business_variables: Optional[Dict[str, Any]] = Field(
+        None, description="Formula weights, multipliers and lookup table overrides (see crm_profiles.py)"
+    )
+
 class TenantResponse(TenantBase):
     """Schema for tenant responses"""
     id: str = Field(..., description="Tenant system ID")
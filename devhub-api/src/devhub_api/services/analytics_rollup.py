@@ -0,0 +1,198 @@
+"""
+Per-tenant daily analytics rollups
+Keeps additive dashboard counters up to date on write and rebuilds them from source tables
+"""
+
+from typing import Optional, Dict, Any, Tuple
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from sqlalchemy import text, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+import logging
+
+from ..database import SessionLocal
+from ..models import TenantDailyRollup
+from ..core.config import settings
+from .scheduler import JobScheduler
+
+logger = logging.getLogger(__name__)
+
+
+class AnalyticsRollupService:
+    """Incremental writes, periodic rebuilds and range reads for TenantDailyRollup"""
+
+    REBUILD_JOB = "analytics_rollup_rebuild"
+
+    # Every metric maintained by the write paths and reproduced by rebuild()
+    REBUILD_SQL = """
+        INSERT INTO tenant_daily_rollups (tenant_id, day, metric, dimension, value)
+        SELECT tenant_id, day, metric, dimension, SUM(value)
+        FROM (
+            SELECT tenant_id, COALESCE(created_at, timezone('UTC', now()))::date AS day,
+                   'new_customers' AS metric, '' AS dimension, 1 AS value
+            FROM customers
+            UNION ALL
+            SELECT tenant_id, COALESCE(created_at, timezone('UTC', now()))::date,
+                   'new_leads', COALESCE(source, ''), 1
+            FROM leads
+            UNION ALL
+            SELECT tenant_id, COALESCE(updated_at, created_at, timezone('UTC', now()))::date,
+                   'conversions', COALESCE(source, ''), 1
+            FROM leads WHERE converted_to_customer
+            UNION ALL
+            SELECT tenant_id, COALESCE(created_at, timezone('UTC', now()))::date,
+                   'leads_in_stage', COALESCE(stage, ''), 1
+            FROM leads
+            UNION ALL
+            SELECT tenant_id, COALESCE(created_at, timezone('UTC', now()))::date,
+                   'stage_value', COALESCE(stage, ''), COALESCE(estimated_value, 0)
+            FROM leads
+            UNION ALL
+            SELECT tenant_id, COALESCE(created_at, timezone('UTC', now()))::date,
+                   'qualified_leads', '', 1
+            FROM leads WHERE qualification_status = 'qualified'
+            UNION ALL
+            SELECT c.tenant_id, COALESCE(i.created_at, timezone('UTC', now()))::date,
+                   'interactions', '', 1
+            FROM customer_interactions i
+            JOIN customers c ON c.system_id = i.customer_id
+        ) facts
+        WHERE tenant_id IS NOT NULL
+          AND (CAST(:tenant_id AS VARCHAR) IS NULL OR tenant_id = :tenant_id)
+        GROUP BY tenant_id, day, metric, dimension
+    """
+
+    @staticmethod
+    def record(db: Session, tenant_id: str, metric: str, delta=1,
+               dimension: Optional[str] = None, day: Optional[date] = None) -> None:
+        """Add delta to one counter in the caller's transaction"""
+        if not tenant_id or not delta:
+            return
+
+        statement = insert(TenantDailyRollup).values(
+            tenant_id=tenant_id,
+            day=day or datetime.now(timezone.utc).date(),
+            metric=metric,
+            dimension=dimension or "",
+            value=delta
+        )
+        statement = statement.on_conflict_do_update(
+            constraint="uq_tenant_daily_rollup",
+            set_={"value": TenantDailyRollup.value + statement.excluded.value}
+        )
+        db.execute(statement)
+
+    @staticmethod
+    def record_customer_created(db: Session, customer) -> None:
+        AnalyticsRollupService.record(db, customer.tenant_id, "new_customers")
+
+    @staticmethod
+    def record_interaction_created(db: Session, tenant_id: str) -> None:
+        AnalyticsRollupService.record(db, tenant_id, "interactions")
+
+    @staticmethod
+    def record_lead_created(db: Session, lead) -> None:
+        record = AnalyticsRollupService.record
+        record(db, lead.tenant_id, "new_leads", dimension=lead.source)
+        record(db, lead.tenant_id, "leads_in_stage", dimension=lead.stage)
+        record(db, lead.tenant_id, "stage_value", lead.estimated_value or 0, dimension=lead.stage)
+        if lead.qualification_status == "qualified":
+            record(db, lead.tenant_id, "qualified_leads")
+        if lead.converted_to_customer:
+            record(db, lead.tenant_id, "conversions", dimension=lead.source)
+
+    @staticmethod
+    def record_lead_changed(db: Session, lead, before: Dict[str, Any]) -> None:
+        """Record the deltas between a lead's previous field values and its current ones"""
+        record = AnalyticsRollupService.record
+        tenant_id = lead.tenant_id
+        old_value = before.get("estimated_value") or 0
+        new_value = lead.estimated_value or 0
+
+        if before.get("stage") != lead.stage:
+            record(db, tenant_id, "leads_in_stage", -1, dimension=before.get("stage"))
+            record(db, tenant_id, "leads_in_stage", 1, dimension=lead.stage)
+            record(db, tenant_id, "stage_value", -old_value, dimension=before.get("stage"))
+            record(db, tenant_id, "stage_value", new_value, dimension=lead.stage)
+        elif old_value != new_value:
+            record(db, tenant_id, "stage_value", new_value - old_value, dimension=lead.stage)
+
+        was_qualified = before.get("qualification_status") == "qualified"
+        is_qualified = lead.qualification_status == "qualified"
+        if was_qualified != is_qualified:
+            record(db, tenant_id, "qualified_leads", 1 if is_qualified else -1)
+
+        # Leads count under their current source, as in rebuild()
+        source_changed = (before.get("source") or "") != (lead.source or "")
+        if source_changed:
+            created_on = lead.created_at.date() if lead.created_at else None
+            record(db, tenant_id, "new_leads", -1, dimension=before.get("source"), day=created_on)
+            record(db, tenant_id, "new_leads", 1, dimension=lead.source, day=created_on)
+
+        if not before.get("converted_to_customer") and lead.converted_to_customer:
+            record(db, tenant_id, "conversions", dimension=lead.source)
+        elif before.get("converted_to_customer") and not lead.converted_to_customer:
+            record(db, tenant_id, "conversions", -1, dimension=before.get("source"))
+        elif lead.converted_to_customer and source_changed:
+            record(db, tenant_id, "conversions", -1, dimension=before.get("source"))
+            record(db, tenant_id, "conversions", 1, dimension=lead.source)
+
+    @staticmethod
+    def rebuild(db: Session, tenant_id: Optional[str] = None) -> int:
+        """Recompute rollups from the source tables, for one tenant or all of them"""
+        query = db.query(TenantDailyRollup)
+        if tenant_id:
+            query = query.filter(TenantDailyRollup.tenant_id == tenant_id)
+        query.delete(synchronize_session=False)
+
+        result = db.execute(text(AnalyticsRollupService.REBUILD_SQL), {"tenant_id": tenant_id})
+        db.commit()
+
+        return result.rowcount
+
+    @staticmethod
+    def register(scheduler: JobScheduler) -> None:
+        """Register the periodic reconciliation job"""
+        scheduler.register(
+            AnalyticsRollupService.REBUILD_JOB,
+            AnalyticsRollupService.run_rebuild,
+            settings.ANALYTICS_ROLLUP_REBUILD_INTERVAL_SECONDS
+        )
+
+    @staticmethod
+    def run_rebuild(job_id: str) -> None:
+        """Scheduler entry point: reconcile rollups with writes made outside the service layer"""
+        db = SessionLocal()
+        try:
+            rows = AnalyticsRollupService.rebuild(db)
+            logger.info("Analytics rollup rebuild %s wrote %d rows", job_id, rows)
+        finally:
+            db.close()
+
+    @staticmethod
+    def read_metrics(db: Session, tenant_filter) -> Dict[Tuple[str, str], Dict[str, Decimal]]:
+        """
+        Sum every counter over all time, this month and this week
+
+        tenant_filter applies tenant scoping to the query (see TenantService.filter_by_tenant).
+        Returns {(metric, dimension): {"total", "month", "week"}}.
+        """
+        today = datetime.now(timezone.utc).date()
+        month_start = today.replace(day=1)
+        week_start = date.fromordinal(today.toordinal() - today.weekday())
+
+        query = db.query(
+            TenantDailyRollup.metric,
+            TenantDailyRollup.dimension,
+            func.sum(TenantDailyRollup.value),
+            func.coalesce(func.sum(TenantDailyRollup.value).filter(TenantDailyRollup.day >= month_start), 0),
+            func.coalesce(func.sum(TenantDailyRollup.value).filter(TenantDailyRollup.day >= week_start), 0)
+        )
+        query = tenant_filter(query, TenantDailyRollup)
+
+        return {
+            (metric, dimension): {"total": total, "month": month, "week": week}
+            for metric, dimension, total, month, week
+            in query.group_by(TenantDailyRollup.metric, TenantDailyRollup.dimension).all()
+        }
@@ -0,0 +1,240 @@
+"""
+On-demand batch scoring of leads and customers
+Resolves a selection to row ids, scores it in chunks on a worker pool with the
+vectorized formula engine and yields each chunk's results as soon as it finishes
+"""
+
+from typing import Optional, Dict, Any, List, Iterator, Tuple
+from datetime import datetime, timedelta, timezone
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from sqlalchemy import text
+from sqlalchemy.orm import Session, sessionmaker
+import time
+
+import numpy as np
+
+from ..models import Lead, Customer
+from ..core.exceptions import ValidationError
+from ..crm_formulas_batch import CRMBatchFormulas
+from .lead_scoring import LeadScoringService
+from .formula_profiles import FormulaProfileService
+from .multitenant import TenantService
+
+
+class BatchScoringService:
+    """Score a selection of leads or customers through CRMBatchFormulas"""
+
+    ENTITIES = {"leads": Lead, "customers": Customer}
+    # Filters accepted when no explicit ids are given
+    FILTERS = {
+        "leads": ("stage", "source", "is_active"),
+        "customers": ("is_active",)
+    }
+    CHUNK_SIZE = 500
+    MAX_RECORDS = 50000
+    MAX_WORKERS = 4
+
+    CUSTOMER_FEATURES_SQL = """
+        SELECT c.id, c.system_id, c.tenant_id, coalesce(c.is_active, true) AS is_active,
+               coalesce(f.interactions, 0) AS interactions,
+               coalesce(f.emails, 0) AS emails,
+               coalesce(f.direct, 0) AS direct,
+               coalesce(f.support, 0) AS support,
+               coalesce(f.recent, 0) AS recent,
+               coalesce(v.paid_invoices, 0) AS paid_invoices,
+               CAST(coalesce(v.revenue, 0) AS FLOAT) AS revenue
+        FROM customers c
+        LEFT JOIN LATERAL (
+            SELECT count(*) AS interactions,
+                   count(*) FILTER (WHERE lower(i.interaction_type) = 'email') AS emails,
+                   count(*) FILTER (WHERE lower(i.interaction_type) IN ('call', 'meeting', 'demo')) AS direct,
+                   count(*) FILTER (WHERE lower(i.interaction_type) = 'support') AS support,
+                   count(*) FILTER (WHERE i.created_at >= :recent_since) AS recent
+            FROM customer_interactions i
+            WHERE i.customer_id = c.system_id
+        ) f ON true
+        LEFT JOIN LATERAL (
+            SELECT count(*) AS paid_invoices, sum(v.amount) AS revenue
+            FROM invoices v
+            WHERE v.customer_id = c.system_id AND v.status = 'paid'
+        ) v ON true
+        WHERE c.id = ANY(CAST(:ids AS INTEGER[]))
+    """
+
+    @staticmethod
+    def resolve(db: Session, tenant_context: Dict[str, Any], entity: str,
+                ids: Optional[List[str]] = None, filters: Optional[Dict[str, Any]] = None) -> Tuple[Dict[int, str], List[str]]:
+        """
+        Row ids to score mapped to their system IDs (only rows visible to the tenant
+        context), plus the requested system IDs that were not found
+        """
+        model = BatchScoringService.ENTITIES.get(entity)
+        if model is None:
+            raise ValidationError(f"Unknown entity: {entity}. Available entities: {', '.join(BatchScoringService.ENTITIES)}")
+
+        query = db.query(model.id, model.system_id)
+        query = TenantService(db).filter_by_tenant(query, model, tenant_context)
+
+        if ids:
+            query = query.filter(model.system_id.in_(ids))
+        for name, value in (filters or {}).items():
+            if name not in BatchScoringService.FILTERS[entity]:
+                raise ValidationError(
+                    f"Unknown {entity} filter: {name}. "
+                    f"Available filters: {', '.join(BatchScoringService.FILTERS[entity])}"
+                )
+            query = query.filter(getattr(model, name) == value)
+
+        rows = query.order_by(model.id).limit(BatchScoringService.MAX_RECORDS + 1).all()
+        if len(rows) > BatchScoringService.MAX_RECORDS:
+            raise ValidationError(
+                f"Selection matches more than {BatchScoringService.MAX_RECORDS} {entity}; narrow the ids or filters"
+            )
+
+        selection = {row.id: row.system_id for row in rows}
+        found = set(selection.values())
+        missing = [system_id for system_id in dict.fromkeys(ids or []) if system_id not in found]
+        return selection, missing
+
+    @staticmethod
+    def iter_scores(db: Session, entity: str, row_ids: List[int],
+                    max_workers: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Score row_ids in chunks concurrently and yield one result per chunk as it completes
+
+        Every worker opens its own session on the same engine as ``db``. A failed chunk
+        yields its error and row ids instead of scores.
+        """
+        session_factory = sessionmaker(bind=db.get_bind(), autoflush=False)
+        score_chunk = {
+            "leads": BatchScoringService._score_leads,
+            "customers": BatchScoringService._score_customers
+        }[entity]
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        executor = ThreadPoolExecutor(
+            max_workers=max_workers or BatchScoringService.MAX_WORKERS,
+            thread_name_prefix="batch-scoring"
+        )
+
+        try:
+            futures = [
+                executor.submit(
+                    BatchScoringService._run_chunk, session_factory, score_chunk,
+                    row_ids[offset:offset + BatchScoringService.CHUNK_SIZE], now
+                )
+                for offset in range(0, len(row_ids), BatchScoringService.CHUNK_SIZE)
+            ]
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    @staticmethod
+    def _run_chunk(session_factory, score_chunk, row_ids: List[int], now: datetime) -> Dict[str, Any]:
+        """Score one chunk on a dedicated session and time it"""
+        start_time = time.perf_counter()
+        session = session_factory()
+        try:
+            results, error = score_chunk(session, row_ids, now), None
+        except Exception as e:
+            results, error = [], str(e)
+        finally:
+            session.close()
+
+        return {
+            "results": results,
+            "row_ids": row_ids if error else None,
+            "error": error,
+            "duration_ms": int((time.perf_counter() - start_time) * 1000)
+        }
+
+    @staticmethod
+    def _by_tenant(session: Session, rows) -> Iterator[Tuple[list, Any]]:
+        """Rows grouped by tenant, each with the tenant's compiled formula profile"""
+        by_tenant: Dict[str, list] = {}
+        for row in rows:
+            by_tenant.setdefault(row.tenant_id, []).append(row)
+        profiles = FormulaProfileService.get_many(session, by_tenant)
+        for tenant_id, tenant_rows in by_tenant.items():
+            yield tenant_rows, profiles.get(tenant_id)
+
+    @staticmethod
+    def _score_leads(session: Session, row_ids: List[int], now: datetime) -> List[Dict[str, Any]]:
+        """Lifecycle and pipeline scores of a chunk of leads"""
+        rows = session.execute(text(LeadScoringService.FEATURES_SQL), {
+            "ids": row_ids,
+            "now": now,
+            "recent_since": now - timedelta(days=LeadScoringService.RECENT_DAYS),
+            "decision_maker_titles": LeadScoringService.DECISION_MAKER_TITLES
+        }).all()
+
+        formulas = CRMBatchFormulas
+        results = []
+        for tenant_rows, profile in BatchScoringService._by_tenant(session, rows):
+            lifecycle, pipeline = LeadScoringService.evaluate(tenant_rows, profile)
+            tiers = formulas.labels(lifecycle["customer_tier"], formulas.CUSTOMER_TIER_LABELS)
+            actions = formulas.labels(pipeline["recommended_actions"], formulas.PIPELINE_ACTION_LABELS)
+            for index, row in enumerate(tenant_rows):
+                risk_factors = [f"Stalled in {row.stage} stage"] if pipeline["stalled_stages"][index, 0] else []
+                if pipeline["low_conversion_probability"][index]:
+                    risk_factors.append("Low conversion probability")
+                results.append({
+                    "id": row.system_id,
+                    "lifecycle_score": float(lifecycle["lifecycle_score"][index]),
+                    "customer_tier": tiers[index],
+                    "pipeline_score": float(pipeline["pipeline_score"][index]),
+                    "conversion_probability": float(pipeline["conversion_probability"][index]),
+                    "revenue_forecast": float(pipeline["revenue_forecast"][index]),
+                    "recommended_actions": list(actions[index]),
+                    "risk_factors": risk_factors
+                })
+        return results
+
+    @staticmethod
+    def _score_customers(session: Session, row_ids: List[int], now: datetime) -> List[Dict[str, Any]]:
+        """Lifecycle and value scores of a chunk of customers"""
+        rows = session.execute(text(BatchScoringService.CUSTOMER_FEATURES_SQL), {
+            "ids": row_ids,
+            "recent_since": now - timedelta(days=LeadScoringService.RECENT_DAYS)
+        }).all()
+
+        formulas = CRMBatchFormulas
+        results = []
+        for tenant_rows, profile in BatchScoringService._by_tenant(session, rows):
+            size = len(tenant_rows)
+            column = lambda name, dtype=np.float64: np.fromiter((getattr(row, name) for row in tenant_rows), dtype, size)
+            paid = column("paid_invoices") > 0
+
+            lifecycle = formulas.customer_lifecycle(
+                np.where(paid, formulas.STAGES.index("ready"), formulas.STAGES.index("qualified")),
+                {"email_opens": column("emails"), "direct_interactions": column("direct")},
+                np.where(paid, formulas.CONVERSION_EVENTS.index("payment_made"), -1)[:, None],
+                {"usage_frequency": column("recent"), "support_interactions": column("support")},
+                np.empty((size, 0), dtype=np.int64),
+                profile
+            )
+            # Inactive customers are not expected to stay
+            retention = np.where(column("is_active", bool), lifecycle["stage_breakdown"]["retention"], 0.0)
+            value = formulas.customer_value(
+                column("revenue")[:, None],
+                column("interactions"),
+                np.zeros(size),
+                np.zeros(size),
+                retention,
+                profile
+            )
+
+            tiers = formulas.labels(lifecycle["customer_tier"], formulas.CUSTOMER_TIER_LABELS)
+            actions = formulas.labels(lifecycle["next_recommended_actions"], formulas.NEXT_ACTION_LABELS)
+            value_tiers = formulas.labels(value["value_tier"], formulas.VALUE_TIER_LABELS)
+            for index, row in enumerate(tenant_rows):
+                results.append({
+                    "id": row.system_id,
+                    "lifecycle_score": float(lifecycle["lifecycle_score"][index]),
+                    "customer_tier": tiers[index],
+                    "recommended_actions": list(actions[index]),
+                    "customer_value": float(value["customer_value"][index]),
+                    "lifetime_value": float(value["lifetime_value"][index]),
+                    "value_tier": value_tiers[index]
+                })
+        return results
@@ -0,0 +1,114 @@
+"""
+Pipeline revenue forecast
+Aggregates open deals' estimated_value by stage, owner and expected close month in a single
+GROUPING SETS query, with weighted, best-case and worst-case scenarios, cached per tenant
+"""
+
+from typing import Optional, Dict, Any
+from datetime import datetime, timezone
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from ..core.cache import TTLCache
+from ..core.config import settings
+
+
+class PipelineForecastService:
+    """Tenant-wide revenue forecast over open leads"""
+
+    # Deals at or above this probability (0-100) count towards the worst case
+    COMMIT_PROBABILITY = 80
+    SCENARIOS = ("pipeline", "weighted", "best_case", "worst_case")
+
+    # Scenario definitions:
+    # - pipeline: every open deal at full value
+    # - weighted: value x probability
+    # - best_case: every deal with a non-zero probability closes
+    # - worst_case: only committed deals (probability >= COMMIT_PROBABILITY) close
+    FORECAST_SQL = """
+        SELECT d.stage, d.owner, d.close_month,
+               GROUPING(d.stage) AS by_stage,
+               GROUPING(d.owner) AS by_owner,
+               GROUPING(d.close_month) AS by_month,
+               count(*) AS deals,
+               coalesce(sum(d.value), 0) AS pipeline,
+               coalesce(sum(d.value * d.probability / 100.0), 0) AS weighted,
+               coalesce(sum(d.value) FILTER (WHERE d.probability > 0), 0) AS best_case,
+               coalesce(sum(d.value) FILTER (WHERE d.probability >= :commit_probability), 0) AS worst_case
+        FROM (
+            SELECT coalesce(l.stage, '') AS stage,
+                   l.assigned_to AS owner,
+                   CAST(date_trunc('month', l.expected_close_date) AS DATE) AS close_month,
+                   CAST(coalesce(l.estimated_value, 0) AS NUMERIC) AS value,
+                   least(greatest(coalesce(l.probability, 0), 0), 100) AS probability
+            FROM leads l
+            WHERE l.tenant_id = :tenant_id
+              AND coalesce(l.is_active, true)
+              AND NOT coalesce(l.converted_to_customer, false)
+              AND coalesce(l.stage, '') NOT IN ('closed_won', 'closed_lost')
+        ) d
+        GROUP BY GROUPING SETS ((d.stage), (d.owner), (d.close_month), ())
+    """
+
+    _cache = TTLCache(settings.FORECAST_CACHE_TTL_SECONDS)
+
+    @staticmethod
+    def get_forecast(db: Session, tenant_id: str) -> Dict[str, Any]:
+        """Cached forecast of one tenant"""
+        return PipelineForecastService._cache.get_or_set(
+            tenant_id, lambda: PipelineForecastService.compute(db, tenant_id)
+        )
+
+    @staticmethod
+    def invalidate(tenant_id: Optional[str] = None) -> None:
+        """Drop the cached forecast of one tenant (or all tenants) after lead writes"""
+        if tenant_id is None:
+            PipelineForecastService._cache.invalidate()
+        else:
+            PipelineForecastService._cache.invalidate(tenant_id)
+
+    @staticmethod
+    def compute(db: Session, tenant_id: str) -> Dict[str, Any]:
+        """Run the forecast query; totals plus one bucket list per dimension"""
+        rows = db.execute(text(PipelineForecastService.FORECAST_SQL), {
+            "tenant_id": tenant_id,
+            "commit_probability": PipelineForecastService.COMMIT_PROBABILITY
+        }).all()
+
+        forecast: Dict[str, Any] = {
+            "tenant_id": tenant_id,
+            "commit_probability": PipelineForecastService.COMMIT_PROBABILITY,
+            "total": PipelineForecastService._bucket(None),
+            "by_stage": [],
+            "by_owner": [],
+            "by_close_month": [],
+            "generated_at": datetime.now(timezone.utc).isoformat()
+        }
+        for row in rows:
+            if row.by_stage and row.by_owner and row.by_month:
+                forecast["total"] = PipelineForecastService._bucket(row)
+            elif not row.by_stage:
+                forecast["by_stage"].append({"stage": row.stage or None, **PipelineForecastService._bucket(row)})
+            elif not row.by_owner:
+                forecast["by_owner"].append({"owner": row.owner, **PipelineForecastService._bucket(row)})
+            else:
+                forecast["by_close_month"].append({
+                    "close_month": row.close_month.isoformat() if row.close_month else None,
+                    **PipelineForecastService._bucket(row)
+                })
+
+        for dimension in ("by_stage", "by_owner"):
+            forecast[dimension].sort(key=lambda bucket: bucket["weighted"], reverse=True)
+        # Chronological, deals without a close date last
+        forecast["by_close_month"].sort(key=lambda bucket: (bucket["close_month"] is None, bucket["close_month"] or ""))
+        return forecast
+
+    @staticmethod
+    def _bucket(row) -> Dict[str, Any]:
+        """Deal count and scenario totals of one grouping row"""
+        if row is None:
+            return {"deals": 0, **{scenario: 0.0 for scenario in PipelineForecastService.SCENARIOS}}
+        return {
+            "deals": row.deals,
+            **{scenario: float(getattr(row, scenario)) for scenario in PipelineForecastService.SCENARIOS}
+        }
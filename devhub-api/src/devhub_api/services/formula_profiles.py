@@ -0,0 +1,108 @@
+"""
+Per-tenant CRM formula profiles
+Compiles Tenant.business_variables into FormulaProfile objects once and caches them per tenant
+"""
+
+from typing import Optional, Dict, Any, Iterable, Tuple
+from datetime import datetime
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from fastapi import HTTPException
+import json
+import threading
+
+from ..models import Tenant
+from ..crm_profiles import FormulaProfile, DEFAULT_PROFILE
+
+
+class FormulaProfileService:
+    """Cached FormulaProfile per tenant, keyed on the tenant row's updated_at"""
+
+    # tenant system_id -> (tenants.updated_at the profile was compiled from, profile)
+    _profiles: Dict[str, Tuple[Optional[datetime], FormulaProfile]] = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def get(db: Session, tenant_id: str) -> FormulaProfile:
+        """Compiled profile of one tenant (the default profile for unknown tenants)"""
+        return FormulaProfileService.get_many(db, [tenant_id]).get(tenant_id, DEFAULT_PROFILE)
+
+    @staticmethod
+    def get_many(db: Session, tenant_ids: Iterable[str]) -> Dict[str, FormulaProfile]:
+        """
+        Compiled profiles of several tenants
+
+        Reads only each tenant's updated_at on a cache hit, so other workers' edits are
+        picked up without cross-process invalidation; business_variables is loaded and
+        compiled only for tenants whose row changed since their profile was cached.
+        """
+        tenant_ids = list(dict.fromkeys(tenant_ids))
+        if not tenant_ids:
+            return {}
+
+        versions = dict(db.execute(
+            select(Tenant.system_id, Tenant.updated_at).where(Tenant.system_id.in_(tenant_ids))
+        ).all())
+
+        profiles: Dict[str, FormulaProfile] = {}
+        stale = []
+        with FormulaProfileService._lock:
+            for tenant_id, version in versions.items():
+                cached = FormulaProfileService._profiles.get(tenant_id)
+                if cached is not None and cached[0] == version:
+                    profiles[tenant_id] = cached[1]
+                else:
+                    stale.append(tenant_id)
+
+        if stale:
+            rows = db.execute(
+                select(Tenant.system_id, Tenant.updated_at, Tenant.business_variables)
+                .where(Tenant.system_id.in_(stale))
+            ).all()
+            for tenant_id, version, stored in rows:
+                profile = FormulaProfileService.compile(stored)
+                with FormulaProfileService._lock:
+                    FormulaProfileService._profiles[tenant_id] = (version, profile)
+                profiles[tenant_id] = profile
+
+        return profiles
+
+    @staticmethod
+    def compile(stored: Optional[str]) -> FormulaProfile:
+        """Profile for a stored business_variables value; falls back to defaults if it no longer validates"""
+        if not stored:
+            return DEFAULT_PROFILE
+        try:
+            return FormulaProfile(json.loads(stored))
+        except ValueError:
+            return DEFAULT_PROFILE
+
+    @staticmethod
+    def update(db: Session, tenant_id: str, business_variables: Optional[Dict[str, Any]]) -> Optional[FormulaProfile]:
+        """
+        Validate and store a tenant's business variables and drop its cached profile; None if
+        the tenant does not exist. The tenant row's new updated_at makes the next lead scoring
+        run re-score all of the tenant's leads with the new profile.
+        """
+        tenant = db.query(Tenant).filter(Tenant.system_id == tenant_id).first()
+        if not tenant:
+            return None
+
+        try:
+            profile = FormulaProfile(business_variables) if business_variables else DEFAULT_PROFILE
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e)) from None
+
+        tenant.business_variables = json.dumps(business_variables) if business_variables else None
+        db.flush()
+        FormulaProfileService.invalidate(tenant_id)
+        return profile
+
+    @staticmethod
+    def invalidate(tenant_id: Optional[str] = None) -> None:
+        """Drop the cached profile of one tenant (or all tenants)"""
+        with FormulaProfileService._lock:
+            if tenant_id is None:
+                FormulaProfileService._profiles.clear()
+            else:
+                FormulaProfileService._profiles.pop(tenant_id, None)
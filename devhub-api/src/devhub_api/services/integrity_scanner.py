@@ -0,0 +1,168 @@
+"""
+Background integrity scanning
+Runs DatabaseValidator checks on a schedule and stores timestamped snapshots
+"""
+
+from typing import Optional, Dict, Any
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+import json
+import logging
+import uuid
+
+from ..database import SessionLocal
+from ..database_manager import DatabaseValidator
+from ..models import IntegrityScan
+from ..core.config import settings
+from .scheduler import JobScheduler
+
+logger = logging.getLogger(__name__)
+
+
+class IntegrityScanner:
+    """Schedules validation runs and serves their stored results"""
+
+    SCAN_JOB = "integrity_scan"
+    INCREMENTAL_JOB = "integrity_incremental"
+
+    # Background scans use one connection at a time to stay out of the way of requests
+    SCAN_WORKERS = 1
+    # Queued/running scans older than this are treated as abandoned (e.g. after a restart)
+    ABANDONED_AFTER = timedelta(hours=1)
+
+    @staticmethod
+    def register(scheduler: JobScheduler) -> None:
+        """Register the periodic scan jobs with the scheduler"""
+        interval = settings.INTEGRITY_SCAN_INTERVAL_SECONDS
+        scheduler.register(IntegrityScanner.SCAN_JOB, IntegrityScanner.run_scan, interval)
+        scheduler.register(IntegrityScanner.INCREMENTAL_JOB, IntegrityScanner.run_incremental, interval)
+
+    @staticmethod
+    def request_scan(db: Session, scheduler: JobScheduler, trigger: str = "manual") -> IntegrityScan:
+        """Queue a scan, reusing one that is already queued or running"""
+        cutoff = datetime.now(timezone.utc) - IntegrityScanner.ABANDONED_AFTER
+        active = db.query(IntegrityScan).filter(
+            IntegrityScan.status.in_(["queued", "running"]),
+            IntegrityScan.requested_at >= cutoff
+        ).order_by(IntegrityScan.requested_at.desc()).first()
+        if active:
+            return active
+
+        # Commit the row before queueing so the worker always finds it
+        scan = IntegrityScan(
+            job_id=uuid.uuid4().hex,
+            trigger=trigger,
+            status="queued",
+            requested_at=datetime.now(timezone.utc)
+        )
+        db.add(scan)
+        db.commit()
+
+        try:
+            scheduler.submit(IntegrityScanner.SCAN_JOB, job_id=scan.job_id)
+        except RuntimeError as e:
+            scan.status = "failed"
+            scan.error = str(e)
+            scan.finished_at = datetime.now(timezone.utc)
+            db.commit()
+
+        db.refresh(scan)
+        return scan
+
+    @staticmethod
+    def run_scan(job_id: str) -> None:
+        """Scheduler entry point: run all checks and store the snapshot"""
+        db = SessionLocal()
+        try:
+            scan = db.query(IntegrityScan).filter(IntegrityScan.job_id == job_id).first()
+            if not scan:
+                # Scheduled runs have no row yet; manual runs were created by request_scan
+                scan = IntegrityScan(
+                    job_id=job_id,
+                    trigger="scheduled",
+                    requested_at=datetime.now(timezone.utc)
+                )
+                db.add(scan)
+
+            scan.status = "running"
+            scan.started_at = datetime.now(timezone.utc)
+            db.commit()
+
+            try:
+                issues = DatabaseValidator.empty_issues()
+                checks = []
+                for result in DatabaseValidator.iter_checks(
+                    db,
+                    max_workers=IntegrityScanner.SCAN_WORKERS,
+                    statement_timeout_ms=settings.INTEGRITY_SCAN_STATEMENT_TIMEOUT_MS
+                ):
+                    if result["error"]:
+                        issues["errors"].append(f"Check '{result['check']}' failed: {result['error']}")
+                    issues[result["category"]].extend(result["messages"])
+                    checks.append({key: value for key, value in result.items() if key != "messages"})
+
+                summary = DatabaseValidator.summarize(issues)
+                scan.status = "completed"
+                scan.severity = summary["severity"]
+                scan.total_issues = summary["total_issues"]
+                scan.result = json.dumps({"issues": issues, "checks": checks})
+            except Exception as e:
+                db.rollback()
+                logger.exception("Integrity scan %s failed", job_id)
+                scan.status = "failed"
+                scan.error = str(e)
+
+            scan.finished_at = datetime.now(timezone.utc)
+            db.commit()
+        finally:
+            db.close()
+
+    @staticmethod
+    def run_incremental(job_id: str) -> None:
+        """Scheduler entry point: refresh stored issues from rows changed since the last run"""
+        db = SessionLocal()
+        try:
+            db.execute(
+                text("SELECT set_config('statement_timeout', :timeout, true)"),
+                {"timeout": str(settings.INTEGRITY_SCAN_STATEMENT_TIMEOUT_MS)}
+            )
+            result = DatabaseValidator.validate_incremental(db)
+            logger.info("Incremental integrity scan %s checked %d rows", job_id, result["rows_checked"])
+        finally:
+            db.close()
+
+    @staticmethod
+    def latest_snapshot(db: Session) -> Optional[IntegrityScan]:
+        """Most recent completed scan"""
+        return db.query(IntegrityScan).filter(
+            IntegrityScan.status == "completed"
+        ).order_by(IntegrityScan.finished_at.desc()).first()
+
+    @staticmethod
+    def get_scan(db: Session, job_id: str) -> Optional[IntegrityScan]:
+        return db.query(IntegrityScan).filter(IntegrityScan.job_id == job_id).first()
+
+    @staticmethod
+    def serialize(scan: IntegrityScan, include_result: bool = True) -> Dict[str, Any]:
+        """Render a scan in the /database/validate response shape"""
+        data = {
+            "job_id": scan.job_id,
+            "trigger": scan.trigger,
+            "job_status": scan.status,
+            "requested_at": scan.requested_at.isoformat() if scan.requested_at else None,
+            "started_at": scan.started_at.isoformat() if scan.started_at else None,
+            "finished_at": scan.finished_at.isoformat() if scan.finished_at else None,
+            "error": scan.error
+        }
+
+        if include_result and scan.result:
+            result = json.loads(scan.result)
+            data.update({
+                **DatabaseValidator.summarize(result["issues"]),
+                "issues": result["issues"],
+                "checks": result.get("checks", []),
+                "timestamp": data["finished_at"]
+            })
+
+        return data
@@ -0,0 +1,363 @@
+"""
+Invoice document rendering
+Renders invoice PDFs in a process pool off the event loop, behind a bounded queue, and
+caches them on disk under a hash of the invoice content so unchanged invoices are never
+rendered twice
+"""
+
+from typing import Optional, Dict, Any, List, Tuple
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import date, datetime
+from decimal import Decimal
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+import asyncio
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+
+from ..models import Invoice, Customer, Tenant, RecurringInvoiceTemplate
+from ..core.config import settings
+from ..core.exceptions import ValidationError
+from ..invoice_pdf import LAYOUT_VERSION, render_invoice_pdf
+from .scheduler import JobScheduler
+
+logger = logging.getLogger(__name__)
+
+
+class InvoiceDocumentService:
+    """Process-pool PDF rendering with a content-addressed cache"""
+
+    MAX_BATCH = 5000
+    PRUNE_JOB = "invoice_document_cache_prune"
+    # Temporary files this old were left behind by an interrupted write
+    ABANDONED_TEMP_SECONDS = 3600
+    PARTY_FIELDS = ("address_line1", "address_line2", "city", "state", "postal_code", "country")
+
+    _executor: Optional[ProcessPoolExecutor] = None
+    _lock = threading.Lock()
+    # Free places in the render queue; requests beyond it are turned away instead of piling up
+    _slots = threading.BoundedSemaphore(settings.INVOICE_RENDER_QUEUE_SIZE)
+    # content hash -> render in progress, shared by concurrent requests for the same document
+    _inflight: Dict[str, Future] = {}
+
+    # ====================================================================
+    # POOL
+    # ====================================================================
+
+    @staticmethod
+    def executor() -> ProcessPoolExecutor:
+        """The process pool, started on first use"""
+        with InvoiceDocumentService._lock:
+            if InvoiceDocumentService._executor is None:
+                # spawn: forking a process that runs server and scheduler threads is unsafe
+                InvoiceDocumentService._executor = ProcessPoolExecutor(
+                    max_workers=settings.INVOICE_RENDER_WORKERS or os.cpu_count(),
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return InvoiceDocumentService._executor
+
+    @staticmethod
+    def shutdown() -> None:
+        """Stop the worker processes; called on application shutdown"""
+        with InvoiceDocumentService._lock:
+            executor, InvoiceDocumentService._executor = InvoiceDocumentService._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    # ====================================================================
+    # DOCUMENT DATA
+    # ====================================================================
+
+    @staticmethod
+    def load(db: Session, tenant_id: str, invoice_ids: Optional[List[str]] = None,
+             billing_period: Optional[date] = None) -> List[Dict[str, Any]]:
+        """
+        Document data of the tenant's invoices selected by ids and/or billing period, in id order
+
+        Raises ValidationError when the selection has more than MAX_BATCH invoices rather
+        than returning part of it.
+        """
+        party = InvoiceDocumentService.PARTY_FIELDS
+        query = (
+            select(
+                Invoice.system_id, Invoice.status, Invoice.issue_date, Invoice.due_date, Invoice.paid_date,
+                Invoice.amount, Invoice.currency, Invoice.billing_period,
+                RecurringInvoiceTemplate.description,
+                Customer.name.label("customer_name"), Customer.company.label("customer_company"),
+                Customer.email.label("customer_email"),
+                *(getattr(Customer, field).label(f"customer_{field}") for field in party),
+                Tenant.business_name, Tenant.business_email, Tenant.business_phone,
+                *(getattr(Tenant, field).label(f"issuer_{field}") for field in party)
+            )
+            .join(Customer, Customer.system_id == Invoice.customer_id)
+            .join(Tenant, Tenant.system_id == Customer.tenant_id)
+            .outerjoin(RecurringInvoiceTemplate, RecurringInvoiceTemplate.id == Invoice.recurring_template_id)
+            .where(Customer.tenant_id == tenant_id)
+            .order_by(Invoice.id)
+            .limit(InvoiceDocumentService.MAX_BATCH + 1)
+        )
+        if invoice_ids is not None:
+            query = query.where(Invoice.system_id.in_(invoice_ids))
+        if billing_period is not None:
+            query = query.where(Invoice.billing_period == billing_period.replace(day=1))
+
+        rows = db.execute(query).all()
+        if len(rows) > InvoiceDocumentService.MAX_BATCH:
+            raise ValidationError(
+                f"Selection has more than {InvoiceDocumentService.MAX_BATCH} invoices; "
+                "request them in smaller sets with invoice_ids"
+            )
+        return [InvoiceDocumentService.document_data(row) for row in rows]
+
+    @staticmethod
+    def document_data(row) -> Dict[str, Any]:
+        """Plain, picklable render input: exactly what appears on the document"""
+        party = InvoiceDocumentService.PARTY_FIELDS
+        as_date = lambda value: value.date().isoformat() if isinstance(value, datetime) else \
+            (value.isoformat() if value else None)
+        amount = row.amount if isinstance(row.amount, Decimal) else Decimal(row.amount or 0)
+        return {
+            "invoice_id": row.system_id,
+            "status": row.status,
+            "issue_date": as_date(row.issue_date),
+            "due_date": as_date(row.due_date),
+            "paid_date": as_date(row.paid_date),
+            "billing_period": row.billing_period.strftime("%Y-%m") if row.billing_period else None,
+            "description": row.description,
+            "amount": f"{amount:,.2f}",
+            "currency": row.currency or "USD",
+            "customer": {
+                "name": row.customer_name,
+                "company": row.customer_company,
+                "email": row.customer_email,
+                **{field: getattr(row, f"customer_{field}") for field in party}
+            },
+            "issuer": {
+                "business_name": row.business_name,
+                "email": row.business_email,
+                "phone": row.business_phone,
+                **{field: getattr(row, f"issuer_{field}") for field in party}
+            }
+        }
+
+    @staticmethod
+    def content_hash(document: Dict[str, Any]) -> str:
+        """Hash of everything the rendered PDF depends on, including the layout version"""
+        payload = json.dumps({"layout": LAYOUT_VERSION, "document": document}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    # ====================================================================
+    # CACHE
+    # ====================================================================
+
+    @staticmethod
+    def _path(content_hash: str) -> str:
+        return os.path.join(settings.INVOICE_DOCUMENT_CACHE_DIR, content_hash[:2], f"{content_hash}.pdf")
+
+    @staticmethod
+    def cached(content_hash: str) -> Optional[bytes]:
+        """Previously rendered PDF for this content, if any; a hit counts as a use for pruning"""
+        path = InvoiceDocumentService._path(content_hash)
+        try:
+            with open(path, "rb") as document:
+                pdf = document.read()
+        except FileNotFoundError:
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return pdf
+
+    @staticmethod
+    def _store(content_hash: str, pdf: bytes) -> None:
+        """Write atomically so concurrent readers never see a partial file"""
+        path = InvoiceDocumentService._path(content_hash)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as temp_file:
+                temp_file.write(pdf)
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+
+    @staticmethod
+    def register(scheduler: JobScheduler) -> None:
+        """Register the periodic cache pruning job"""
+        scheduler.register(
+            InvoiceDocumentService.PRUNE_JOB,
+            InvoiceDocumentService.run_prune_cache,
+            settings.INVOICE_DOCUMENT_CACHE_PRUNE_INTERVAL_SECONDS
+        )
+
+    @staticmethod
+    def run_prune_cache(job_id: str) -> Dict[str, Any]:
+        """Scheduler entry point for the cache pruning job"""
+        result = InvoiceDocumentService.prune_cache()
+        logger.info("Invoice document cache prune %s removed %d files (%d bytes)",
+                    job_id, result["rows_affected"], result["bytes_freed"])
+        return result
+
+    @staticmethod
+    def prune_cache() -> Dict[str, Any]:
+        """
+        Remove cached PDFs unused for INVOICE_DOCUMENT_CACHE_MAX_AGE_DAYS, then the least
+        recently used ones until the cache fits in INVOICE_DOCUMENT_CACHE_MAX_MB
+
+        Every invoice edit changes the content hash, so superseded renders only ever leave
+        the cache this way. A removed file is simply rendered again on its next request.
+        """
+        now = time.time()
+        max_age = settings.INVOICE_DOCUMENT_CACHE_MAX_AGE_DAYS * 86400
+        max_bytes = settings.INVOICE_DOCUMENT_CACHE_MAX_MB * 1024 * 1024
+        files: List[Tuple[float, int, str]] = []
+        removed, freed = 0, 0
+
+        def remove(path: str, size: int) -> None:
+            nonlocal removed, freed
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                return
+            removed += 1
+            freed += size
+
+        for directory, _, names in os.walk(settings.INVOICE_DOCUMENT_CACHE_DIR):
+            for name in names:
+                path = os.path.join(directory, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                age = now - stat.st_mtime
+                if name.endswith(".tmp"):
+                    if age > InvoiceDocumentService.ABANDONED_TEMP_SECONDS:
+                        remove(path, stat.st_size)
+                elif age > max_age:
+                    remove(path, stat.st_size)
+                else:
+                    files.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in files)
+        kept = len(files)
+        for _, size, path in sorted(files):
+            if total <= max_bytes:
+                break
+            remove(path, size)
+            total -= size
+            kept -= 1
+
+        return {
+            "rows_affected": removed,
+            "bytes_freed": freed,
+            "files": kept,
+            "bytes": total
+        }
+
+    # ====================================================================
+    # RENDERING
+    # ====================================================================
+
+    @staticmethod
+    def _submit(content_hash: str, document: Dict[str, Any], queued: bool) -> Future:
+        """
+        Pool future rendering document and caching the result, joined with an identical
+        render already in flight. With queued, a queue slot is taken (RuntimeError when
+        the queue is full) and released when the render finishes.
+        """
+        with InvoiceDocumentService._lock:
+            future = InvoiceDocumentService._inflight.get(content_hash)
+            if future is not None:
+                return future
+            if queued and not InvoiceDocumentService._slots.acquire(blocking=False):
+                raise RuntimeError("Invoice render queue is full")
+            InvoiceDocumentService._inflight[content_hash] = future = Future()
+
+        def finished(render: Future) -> None:
+            try:
+                pdf = render.result()
+                InvoiceDocumentService._store(content_hash, pdf)
+                future.set_result(pdf)
+            except BaseException as e:
+                future.set_exception(e)
+            finally:
+                with InvoiceDocumentService._lock:
+                    InvoiceDocumentService._inflight.pop(content_hash, None)
+                if queued:
+                    InvoiceDocumentService._slots.release()
+
+        try:
+            InvoiceDocumentService.executor().submit(render_invoice_pdf, document).add_done_callback(finished)
+        except BaseException as e:
+            with InvoiceDocumentService._lock:
+                InvoiceDocumentService._inflight.pop(content_hash, None)
+            if queued:
+                InvoiceDocumentService._slots.release()
+            future.set_exception(e)
+        return future
+
+    @staticmethod
+    async def render(document: Dict[str, Any]) -> Tuple[str, bytes]:
+        """Content hash and PDF of one document, from the cache or rendered in the pool"""
+        content_hash = InvoiceDocumentService.content_hash(document)
+        pdf = InvoiceDocumentService.cached(content_hash)
+        if pdf is None:
+            pdf = await asyncio.wrap_future(InvoiceDocumentService._submit(content_hash, document, queued=True))
+        return content_hash, pdf
+
+    @staticmethod
+    async def render_batch(documents: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Render many documents across all pool workers, e.g. a whole billing run
+
+        Cache hits are skipped; at most two renders per worker are outstanding at a time so a
+        large batch does not monopolize the pool. Returns the PDFs by invoice id plus counts.
+        """
+        start_time = time.perf_counter()
+        window = 2 * (settings.INVOICE_RENDER_WORKERS or os.cpu_count() or 1)
+        pdfs: Dict[str, bytes] = {}
+        errors: Dict[str, str] = {}
+        pending: Dict[asyncio.Future, str] = {}
+        cached = 0
+
+        async def drain(return_when) -> None:
+            done, _ = await asyncio.wait(pending, return_when=return_when)
+            for task in done:
+                invoice_id = pending.pop(task)
+                try:
+                    pdfs[invoice_id] = task.result()
+                except Exception as e:
+                    errors[invoice_id] = str(e)
+
+        for document in documents:
+            content_hash = InvoiceDocumentService.content_hash(document)
+            pdf = InvoiceDocumentService.cached(content_hash)
+            if pdf is not None:
+                pdfs[document["invoice_id"]] = pdf
+                cached += 1
+                continue
+            if len(pending) >= window:
+                await drain(asyncio.FIRST_COMPLETED)
+            future = InvoiceDocumentService._submit(content_hash, document, queued=False)
+            pending[asyncio.wrap_future(future)] = document["invoice_id"]
+        if pending:
+            await drain(asyncio.ALL_COMPLETED)
+
+        if errors:
+            logger.warning("Invoice batch render failed for %d of %d documents", len(errors), len(documents))
+        return {
+            "pdfs": pdfs,
+            "rendered": len(pdfs) - cached,
+            "cached": cached,
+            "errors": errors,
+            "duration_ms": int((time.perf_counter() - start_time) * 1000)
+        }
@@ -0,0 +1,91 @@
+"""
+Invoice summary
+Totals, paid, pending and overdue amounts of a tenant's invoices per currency from a single
+aggregate query, cached per tenant and invalidated by invoice writes
+"""
+
+from typing import Optional, Dict, Any
+from datetime import datetime, timezone
+from decimal import Decimal
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from ..core.cache import TTLCache
+from ..core.config import settings
+from ..models.invoice import InvoiceStatus
+
+
+class InvoiceSummaryService:
+    """Per-tenant invoice totals, grouped by currency"""
+
+    AMOUNTS = ("total_amount", "paid_amount", "pending_amount", "overdue_amount")
+    # Unpaid invoices past their due date count as overdue until they are paid or cancelled
+    OPEN_STATUSES = (InvoiceStatus.SENT, InvoiceStatus.VIEWED, InvoiceStatus.PENDING)
+
+    # Invoices carry no tenant_id; they belong to the tenant of their customer
+    SUMMARY_SQL = """
+        SELECT d.currency,
+               GROUPING(d.currency) AS is_total,
+               count(*) AS total_invoices,
+               coalesce(sum(d.amount), 0) AS total_amount,
+               coalesce(sum(d.amount) FILTER (WHERE d.status = :paid), 0) AS paid_amount,
+               coalesce(sum(d.amount) FILTER (WHERE d.status IS DISTINCT FROM :paid), 0) AS pending_amount,
+               coalesce(sum(d.amount) FILTER (
+                   WHERE d.status = :overdue
+                      OR (d.status = ANY(CAST(:open_statuses AS VARCHAR[])) AND d.due_date < :today)
+               ), 0) AS overdue_amount
+        FROM (
+            SELECT coalesce(v.currency, 'USD') AS currency, v.status, v.due_date, v.amount
+            FROM invoices v
+            JOIN customers c ON c.system_id = v.customer_id
+            WHERE c.tenant_id = :tenant_id
+        ) d
+        GROUP BY GROUPING SETS ((d.currency), ())
+    """
+
+    _cache = TTLCache(settings.INVOICE_SUMMARY_CACHE_TTL_SECONDS)
+
+    @staticmethod
+    def get_summary(db: Session, tenant_id: str) -> Dict[str, Any]:
+        """Cached summary of one tenant"""
+        return InvoiceSummaryService._cache.get_or_set(
+            tenant_id, lambda: InvoiceSummaryService.compute(db, tenant_id)
+        )
+
+    @staticmethod
+    def invalidate(tenant_id: Optional[str] = None) -> None:
+        """Drop the cached summary of one tenant (or all tenants) after invoice writes"""
+        if tenant_id is None:
+            InvoiceSummaryService._cache.invalidate()
+        else:
+            InvoiceSummaryService._cache.invalidate(tenant_id)
+
+    @staticmethod
+    def compute(db: Session, tenant_id: str) -> Dict[str, Any]:
+        """Run the summary query; overall totals plus one entry per currency"""
+        today = datetime.now(timezone.utc).replace(tzinfo=None, hour=0, minute=0, second=0, microsecond=0)
+        rows = db.execute(text(InvoiceSummaryService.SUMMARY_SQL), {
+            "tenant_id": tenant_id,
+            "paid": InvoiceStatus.PAID,
+            "overdue": InvoiceStatus.OVERDUE,
+            "open_statuses": list(InvoiceSummaryService.OPEN_STATUSES),
+            "today": today
+        }).all()
+
+        summary: Dict[str, Any] = {
+            "total_invoices": 0,
+            **{amount: Decimal("0") for amount in InvoiceSummaryService.AMOUNTS},
+            "by_currency": []
+        }
+        for row in rows:
+            totals = {
+                "total_invoices": row.total_invoices,
+                **{amount: getattr(row, amount) for amount in InvoiceSummaryService.AMOUNTS}
+            }
+            if row.is_total:
+                summary.update(totals)
+            else:
+                summary["by_currency"].append({"currency": row.currency, **totals})
+
+        summary["by_currency"].sort(key=lambda entry: entry["total_amount"], reverse=True)
+        return summary
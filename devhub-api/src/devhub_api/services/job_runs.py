@@ -0,0 +1,87 @@
+"""
+Job run history
+Persists every finished scheduler run with its duration and reported metrics, and serves
+the recent history next to the scheduler's live state
+"""
+
+from typing import Optional, Dict, Any, List
+from datetime import datetime, timedelta, timezone
+from sqlalchemy.orm import Session
+import json
+import logging
+
+from ..database import SessionLocal
+from ..models import JobRun
+from ..core.config import settings
+from .scheduler import JobScheduler
+
+logger = logging.getLogger(__name__)
+
+
+class JobRunService:
+    """Stored runs of scheduler jobs"""
+
+    # Result keys stored in their own columns; everything else goes to details
+    METRIC_FIELDS = ("rows_affected", "batches")
+
+    @staticmethod
+    def register(scheduler: JobScheduler) -> None:
+        """Record every run the scheduler finishes"""
+        scheduler.add_listener(JobRunService.record)
+
+    @staticmethod
+    def record(run: Dict[str, Any]) -> None:
+        """Scheduler listener: store one run and drop runs of the same job past retention"""
+        result = dict(run["result"] or {})
+        started_at = run["started_at"].replace(tzinfo=None)
+        db = SessionLocal()
+        try:
+            db.add(JobRun(
+                job_name=run["job_name"],
+                job_id=run["job_id"],
+                trigger=run["trigger"],
+                status=run["status"],
+                started_at=started_at,
+                finished_at=started_at + timedelta(milliseconds=run["duration_ms"]),
+                duration_ms=run["duration_ms"],
+                rows_affected=result.pop("rows_affected", None),
+                batches=result.pop("batches", None),
+                details=json.dumps(result, default=str) if result else None,
+                error=run["error"]
+            ))
+            cutoff = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=settings.JOB_RUN_RETENTION_DAYS)
+            db.query(JobRun).filter(
+                JobRun.job_name == run["job_name"],
+                JobRun.started_at < cutoff
+            ).delete(synchronize_session=False)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    @staticmethod
+    def recent(db: Session, job_name: Optional[str] = None, limit: int = 50) -> List[JobRun]:
+        """Latest runs, newest first, optionally of one job"""
+        query = db.query(JobRun)
+        if job_name:
+            query = query.filter(JobRun.job_name == job_name)
+        return query.order_by(JobRun.started_at.desc(), JobRun.id.desc()).limit(limit).all()
+
+    @staticmethod
+    def serialize(run: JobRun) -> Dict[str, Any]:
+        """API representation of a stored run"""
+        return {
+            "job_name": run.job_name,
+            "job_id": run.job_id,
+            "trigger": run.trigger,
+            "status": run.status,
+            "started_at": run.started_at.isoformat() if run.started_at else None,
+            "finished_at": run.finished_at.isoformat() if run.finished_at else None,
+            "duration_ms": run.duration_ms,
+            "rows_affected": run.rows_affected,
+            "batches": run.batches,
+            "details": json.loads(run.details) if run.details else None,
+            "error": run.error
+        }
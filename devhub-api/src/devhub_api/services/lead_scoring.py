@@ -0,0 +1,315 @@
+"""
+Lead scoring pipeline
+Derives formula inputs from leads, their interaction and stage history in bulk SQL,
+scores them with the batch formula engine and writes lead_score/probability back
+"""
+
+from typing import Dict, Any, List, Tuple
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import text, func, select
+from sqlalchemy.orm import Session
+import logging
+import time
+
+import numpy as np
+
+from ..database import SessionLocal
+from ..models import Tenant, Lead, LeadInteraction, SyncWatermark
+from ..core.config import settings
+from ..crm_formulas_batch import CRMBatchFormulas
+from ..crm_formulas import BusinessVariables
+from .formula_profiles import FormulaProfileService
+from .forecast import PipelineForecastService
+from .scheduler import JobScheduler
+
+logger = logging.getLogger(__name__)
+
+
+class LeadScoringService:
+    """Full backfill and incremental re-scoring of Lead.lead_score and Lead.probability"""
+
+    SCORE_JOB = "lead_scoring"
+    WATERMARK_SCOPE = "lead_scores"
+    # Start of the last run's recent-interaction window, kept in last_updated_at
+    WINDOW_SCOPE = "lead_scores:recent_window"
+    BATCH_SIZE = 2000
+
+    # Pipeline stages mapped onto the lifecycle formula's acquisition vocabulary
+    STAGE_ACQUISITION = {
+        "prospect": "lead",
+        "new": "lead",
+        "contacted": "lead",
+        "qualified": "qualified",
+        "proposal": "evaluation",
+        "negotiation": "ready",
+        "closed_won": "ready",
+        "closed_lost": "unknown"
+    }
+    # Base conversion probability of each pipeline stage
+    STAGE_PROBABILITY = {
+        "prospect": 0.05,
+        "new": 0.1,
+        "contacted": 0.2,
+        "qualified": 0.4,
+        "proposal": 0.6,
+        "negotiation": 0.8,
+        "closed_won": 1.0,
+        "closed_lost": 0.0
+    }
+    DECISION_MAKER_TITLES = r"\m(chief|ceo|cto|cfo|coo|founder|owner|president|director|vp|head)\M"
+    # Interactions within this window count towards the high_engagement signal
+    RECENT_DAYS = 30
+    HIGH_ENGAGEMENT_INTERACTIONS = 3
+
+    FEATURES_SQL = """
+        SELECT l.id, l.system_id, l.tenant_id, lower(coalesce(l.stage, '')) AS stage,
+               CAST(coalesce(l.estimated_value, 0) AS FLOAT) AS estimated_value,
+               coalesce(l.qualification_status, '') = 'qualified' AS is_qualified,
+               coalesce(l.estimated_value, 0) > 0 AS has_value,
+               coalesce(l.converted_to_customer, false) AS converted,
+               coalesce(l.job_title, '') ~* :decision_maker_titles AS decision_maker,
+               coalesce(f.emails, 0) AS emails,
+               coalesce(f.direct, 0) AS direct,
+               coalesce(f.demos, 0) AS demos,
+               coalesce(f.recent, 0) AS recent,
+               CAST(EXTRACT(EPOCH FROM (:now - coalesce(s.entered_at, l.created_at, :now))) / 86400 AS FLOAT) AS stage_days
+        FROM leads l
+        LEFT JOIN LATERAL (
+            SELECT count(*) FILTER (WHERE lower(i.interaction_type) = 'email') AS emails,
+                   count(*) FILTER (WHERE lower(i.interaction_type) IN ('call', 'meeting', 'demo')) AS direct,
+                   count(*) FILTER (WHERE lower(i.interaction_type) = 'demo') AS demos,
+                   count(*) FILTER (WHERE i.created_at >= :recent_since) AS recent
+            FROM lead_interactions i
+            WHERE i.lead_id = l.system_id
+        ) f ON true
+        LEFT JOIN LATERAL (
+            SELECT max(e.changed_at) AS entered_at
+            FROM lead_stage_events e
+            WHERE e.lead_id = l.system_id
+        ) s ON true
+        WHERE l.id = ANY(CAST(:ids AS INTEGER[]))
+    """
+
+    WRITEBACK_SQL = """
+        UPDATE leads l
+        SET lead_score = s.lead_score, probability = s.probability
+        FROM unnest(CAST(:ids AS INTEGER[]), CAST(:scores AS INTEGER[]), CAST(:probabilities AS INTEGER[]))
+             AS s(id, lead_score, probability)
+        WHERE l.id = s.id
+          AND (l.lead_score IS DISTINCT FROM s.lead_score OR l.probability IS DISTINCT FROM s.probability)
+    """
+
+    # Leads touched since the watermarks, directly or through their interactions, every
+    # lead of a tenant whose row (and so formula profile) changed, and leads with
+    # interactions that aged out of the RECENT_DAYS window since the last run
+    CHANGED_SQL = """
+        SELECT l.id FROM leads l
+        WHERE l.id > :leads_since_id OR l.updated_at > :leads_since_ts
+        UNION
+        SELECT l.id FROM lead_interactions i
+        JOIN leads l ON l.system_id = i.lead_id
+        WHERE i.id > :interactions_since_id OR i.updated_at > :interactions_since_ts
+        UNION
+        SELECT l.id FROM tenants t
+        JOIN leads l ON l.tenant_id = t.system_id
+        WHERE t.updated_at > :tenants_since_ts
+        UNION
+        SELECT l.id FROM lead_interactions i
+        JOIN leads l ON l.system_id = i.lead_id
+        WHERE i.created_at >= :window_since AND i.created_at < :recent_since
+        ORDER BY 1
+    """
+
+    @staticmethod
+    def register(scheduler: JobScheduler) -> None:
+        """Register the periodic scoring job"""
+        scheduler.register(
+            LeadScoringService.SCORE_JOB,
+            LeadScoringService.run_scoring,
+            settings.LEAD_SCORING_INTERVAL_SECONDS
+        )
+
+    @staticmethod
+    def run_scoring(job_id: str) -> None:
+        """Scheduler entry point: backfill on first run, then re-score changed leads"""
+        db = SessionLocal()
+        try:
+            result = LeadScoringService.score_leads(db)
+            logger.info(
+                "Lead scoring %s (%s) scored %d leads, updated %d",
+                job_id, result["mode"], result["scored"], result["updated"]
+            )
+        finally:
+            db.close()
+
+    @staticmethod
+    def score_leads(db: Session, full: bool = False) -> Dict[str, Any]:
+        """
+        Score every lead (full, or when no watermark exists yet) or only leads whose row
+        or interactions changed since the last run, whose tenant's formula profile changed,
+        or whose interactions left the recent window since then. Each batch commits on its own; the watermarks advance only
+        after all batches succeed.
+        """
+        start_time = time.perf_counter()
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        recent_since = now - timedelta(days=LeadScoringService.RECENT_DAYS)
+
+        # Snapshot the upper bounds first so writes during the run are picked up next time
+        marks = {}
+        for model in (Lead, LeadInteraction, Tenant):
+            table = model.__tablename__
+            watermark = db.query(SyncWatermark).filter(
+                SyncWatermark.scope == f"{LeadScoringService.WATERMARK_SCOPE}:{table}"
+            ).first()
+            until_ts, until_id = db.execute(select(func.max(model.updated_at), func.max(model.id))).one()
+            marks[table] = (watermark, until_ts, until_id)
+        window = db.query(SyncWatermark).filter(SyncWatermark.scope == LeadScoringService.WINDOW_SCOPE).first()
+
+        full = full or window is None or any(watermark is None for watermark, _, _ in marks.values())
+        if full:
+            lead_ids = db.execute(
+                select(Lead.id).where(Lead.id <= (marks["leads"][2] or 0)).order_by(Lead.id)
+            ).scalars().all()
+        else:
+            leads_mark, interactions_mark = marks["leads"][0], marks["lead_interactions"][0]
+            tenants_mark = marks["tenants"][0]
+            lead_ids = db.execute(text(LeadScoringService.CHANGED_SQL), {
+                "leads_since_id": leads_mark.last_id,
+                "leads_since_ts": leads_mark.last_updated_at or datetime.min,
+                "interactions_since_id": interactions_mark.last_id,
+                "interactions_since_ts": interactions_mark.last_updated_at or datetime.min,
+                "tenants_since_ts": tenants_mark.last_updated_at or datetime.min,
+                "window_since": window.last_updated_at or datetime.min,
+                "recent_since": recent_since
+            }).scalars().all()
+
+        updated = 0
+        for offset in range(0, len(lead_ids), LeadScoringService.BATCH_SIZE):
+            batch = lead_ids[offset:offset + LeadScoringService.BATCH_SIZE]
+            try:
+                batch_updated, tenant_ids = LeadScoringService._score_batch(db, batch, now, recent_since)
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+            updated += batch_updated
+            # Forecasts weight deals by probability
+            for tenant_id in tenant_ids:
+                PipelineForecastService.invalidate(tenant_id)
+
+        for table, (watermark, until_ts, until_id) in marks.items():
+            if watermark is None:
+                watermark = SyncWatermark(scope=f"{LeadScoringService.WATERMARK_SCOPE}:{table}", last_id=0)
+                db.add(watermark)
+            if until_ts is not None:
+                watermark.last_updated_at = until_ts
+            watermark.last_id = max(watermark.last_id or 0, until_id or 0)
+        if window is None:
+            window = SyncWatermark(scope=LeadScoringService.WINDOW_SCOPE, last_id=0)
+            db.add(window)
+        window.last_updated_at = recent_since
+        db.commit()
+
+        return {
+            "mode": "full" if full else "incremental",
+            "scored": len(lead_ids),
+            "updated": updated,
+            "duration_ms": int((time.perf_counter() - start_time) * 1000)
+        }
+
+    @staticmethod
+    def _score_batch(db: Session, lead_ids: List[int], now: datetime,
+                     recent_since: datetime) -> Tuple[int, List[str]]:
+        """
+        Load features for one batch of leads, score them with their tenant's profile and
+        write changed scores back; returns the updated row count and the tenants touched
+        """
+        rows = db.execute(text(LeadScoringService.FEATURES_SQL), {
+            "ids": lead_ids,
+            "now": now,
+            "recent_since": recent_since,
+            "decision_maker_titles": LeadScoringService.DECISION_MAKER_TITLES
+        }).all()
+        if not rows:
+            return 0, []
+
+        by_tenant: Dict[str, list] = {}
+        for row in rows:
+            by_tenant.setdefault(row.tenant_id, []).append(row)
+        profiles = FormulaProfileService.get_many(db, by_tenant)
+
+        ids, lead_scores, probabilities = [], [], []
+        for tenant_id, tenant_rows in by_tenant.items():
+            scores = LeadScoringService.score_features(tenant_rows, profiles.get(tenant_id))
+            ids.extend(row.id for row in tenant_rows)
+            lead_scores.extend(scores["lead_score"].tolist())
+            probabilities.extend(scores["probability"].tolist())
+
+        result = db.execute(text(LeadScoringService.WRITEBACK_SQL), {
+            "ids": ids,
+            "scores": lead_scores,
+            "probabilities": probabilities
+        })
+        return result.rowcount, list(by_tenant) if result.rowcount else []
+
+    @staticmethod
+    def score_features(rows, business_variables: BusinessVariables = None) -> Dict[str, np.ndarray]:
+        """
+        Score feature rows from FEATURES_SQL with the lifecycle and pipeline formulas
+
+        lead_score is the lifecycle score and probability the pipeline conversion
+        probability, both as 0-100 integers.
+        """
+        lifecycle, pipeline = LeadScoringService.evaluate(rows, business_variables)
+        return {
+            "lead_score": np.rint(np.clip(lifecycle["lifecycle_score"], 0.0, 1.0) * 100).astype(np.int64),
+            "probability": np.rint(np.clip(pipeline["conversion_probability"], 0.0, 1.0) * 100).astype(np.int64)
+        }
+
+    @staticmethod
+    def evaluate(rows, business_variables: BusinessVariables = None) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Full lifecycle and sales pipeline formula results for feature rows from FEATURES_SQL"""
+        formulas = CRMBatchFormulas
+        size = len(rows)
+        column = lambda name, dtype=np.float64: np.fromiter((getattr(row, name) for row in rows), dtype, size)
+
+        stages = [row.stage for row in rows]
+        demos = column("demos")
+        converted = column("converted", bool)
+        is_qualified = column("is_qualified", bool)
+
+        # Conversion events implied by the lead's stage and history, in a fixed order
+        events = np.full((size, 3), -1, dtype=np.int64)
+        events[:, 0] = np.where(demos > 0, formulas.CONVERSION_EVENTS.index("demo_requested"), -1)
+        events[:, 1] = np.where(
+            np.isin(stages, ["proposal", "negotiation"]), formulas.CONVERSION_EVENTS.index("proposal_sent"), -1
+        )
+        events[:, 2] = np.where(
+            converted | np.isin(stages, ["closed_won"]), formulas.CONVERSION_EVENTS.index("contract_signed"), -1
+        )
+
+        lifecycle = formulas.customer_lifecycle(
+            formulas.encode((LeadScoringService.STAGE_ACQUISITION.get(stage, "unknown") for stage in stages), formulas.STAGES),
+            {"email_opens": column("emails"), "direct_interactions": column("direct")},
+            events,
+            {},
+            np.empty((size, 0), dtype=np.int64),
+            business_variables
+        )
+
+        stage_probability = np.fromiter(
+            (LeadScoringService.STAGE_PROBABILITY.get(stage, 0.1) for stage in stages), np.float64, size
+        )
+        pipeline = formulas.sales_pipeline(
+            np.ones(size, dtype=bool),
+            stage_probability[:, None],
+            column("estimated_value"),
+            column("stage_days")[:, None],
+            {
+                "high_engagement": column("recent") >= LeadScoringService.HIGH_ENGAGEMENT_INTERACTIONS,
+                "budget_confirmed": is_qualified & column("has_value", bool),
+                "decision_maker": column("decision_maker", bool)
+            },
+            business_variables
+        )
+        return lifecycle, pipeline
@@ -0,0 +1,209 @@
+"""
+Status maintenance
+Scheduled set-based updates that keep derived statuses in the database, so reads filter on
+them with plain indexed equality: unpaid invoices past due become 'overdue' (and return to
+'pending' when their due date is moved out) and open leads without recent contact are
+flagged as stale
+"""
+
+from typing import Dict, Any, List, Set
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+import logging
+
+from ..database import SessionLocal
+from ..core.config import settings
+from .invoice_summary import InvoiceSummaryService
+from .receivables import ReceivablesAgingService
+from .scheduler import JobScheduler
+
+logger = logging.getLogger(__name__)
+
+
+class MaintenanceService:
+    """Overdue invoice marking and stale-lead flagging"""
+
+    OVERDUE_JOB = "mark_overdue_invoices"
+    STALE_LEADS_JOB = "flag_stale_leads"
+
+    # Rows per transaction, and transactions per run; a backlog larger than
+    # BATCH_SIZE * MAX_BATCHES is worked off over the following runs
+    BATCH_SIZE = 1000
+    MAX_BATCHES = 100
+
+    # One batch of open invoices past due, served by idx_invoices_open_due. SKIP LOCKED leaves
+    # invoices being edited to the next run instead of waiting on them. Overdue means due
+    # before today (UTC), as in the invoice summary and the aging report.
+    MARK_OVERDUE_SQL = """
+        WITH due AS (
+            SELECT id FROM invoices
+            WHERE status IN ('pending', 'sent', 'viewed')
+              AND due_date < :today
+            ORDER BY due_date, id
+            LIMIT :limit
+            FOR UPDATE SKIP LOCKED
+        )
+        UPDATE invoices v
+        SET status = 'overdue', updated_at = :now
+        FROM due, customers c
+        WHERE v.id = due.id AND c.system_id = v.customer_id
+        RETURNING c.tenant_id
+    """
+
+    # Overdue invoices whose due date was moved to today or later; the status they had
+    # before is not kept, so they return to 'pending'
+    UNMARK_OVERDUE_SQL = """
+        WITH moved AS (
+            SELECT id FROM invoices
+            WHERE status = 'overdue'
+              AND due_date >= :today
+            ORDER BY id
+            LIMIT :limit
+            FOR UPDATE SKIP LOCKED
+        )
+        UPDATE invoices v
+        SET status = 'pending', updated_at = :now
+        FROM moved, customers c
+        WHERE v.id = moved.id AND c.system_id = v.customer_id
+        RETURNING c.tenant_id
+    """
+
+    # Open lead whose last contact (or creation, if never contacted) is before :cutoff
+    STALE_LEAD_SQL = """
+        coalesce(is_active, true)
+        AND NOT coalesce(converted_to_customer, false)
+        AND coalesce(stage, '') NOT IN ('closed_won', 'closed_lost')
+        AND coalesce(last_contacted, CAST(created_at AS DATE)) < :cutoff
+    """
+
+    # is_stale is derived, so updated_at is left alone: flagging is not an edit of the lead
+    FLAG_STALE_SQL = f"""
+        WITH batch AS (
+            SELECT id FROM leads
+            WHERE NOT is_stale AND {STALE_LEAD_SQL}
+            ORDER BY id
+            LIMIT :limit
+            FOR UPDATE SKIP LOCKED
+        )
+        UPDATE leads l SET is_stale = true
+        FROM batch WHERE l.id = batch.id
+        RETURNING l.tenant_id
+    """
+
+    # Contacted, closed or converted since they were flagged
+    UNFLAG_STALE_SQL = f"""
+        WITH batch AS (
+            SELECT id FROM leads
+            WHERE is_stale AND NOT coalesce(({STALE_LEAD_SQL}), false)
+            ORDER BY id
+            LIMIT :limit
+            FOR UPDATE SKIP LOCKED
+        )
+        UPDATE leads l SET is_stale = false
+        FROM batch WHERE l.id = batch.id
+        RETURNING l.tenant_id
+    """
+
+    @staticmethod
+    def register(scheduler: JobScheduler) -> None:
+        """Register the periodic maintenance jobs"""
+        scheduler.register(
+            MaintenanceService.OVERDUE_JOB,
+            MaintenanceService.run_mark_overdue,
+            settings.OVERDUE_MARKING_INTERVAL_SECONDS
+        )
+        scheduler.register(
+            MaintenanceService.STALE_LEADS_JOB,
+            MaintenanceService.run_flag_stale_leads,
+            settings.STALE_LEAD_INTERVAL_SECONDS
+        )
+
+    @staticmethod
+    def run_mark_overdue(job_id: str) -> Dict[str, Any]:
+        """Scheduler entry point for mark_overdue_invoices"""
+        db = SessionLocal()
+        try:
+            result = MaintenanceService.mark_overdue_invoices(db)
+            logger.info("Overdue marking %s marked %d and cleared %d invoices",
+                        job_id, result["marked"], result["cleared"])
+            return result
+        finally:
+            db.close()
+
+    @staticmethod
+    def run_flag_stale_leads(job_id: str) -> Dict[str, Any]:
+        """Scheduler entry point for flag_stale_leads"""
+        db = SessionLocal()
+        try:
+            result = MaintenanceService.flag_stale_leads(db)
+            logger.info("Stale lead flagging %s flagged %d and cleared %d leads",
+                        job_id, result["flagged"], result["cleared"])
+            return result
+        finally:
+            db.close()
+
+    @staticmethod
+    def _run_batches(db: Session, sql: str, params: Dict[str, Any], tenant_ids: Set[str]) -> Dict[str, int]:
+        """Execute a batched UPDATE ... RETURNING tenant_id until it matches nothing, one commit per batch"""
+        rows, batches = 0, 0
+        while batches < MaintenanceService.MAX_BATCHES:
+            try:
+                returned: List[str] = db.execute(text(sql), {
+                    **params, "limit": MaintenanceService.BATCH_SIZE
+                }).scalars().all()
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+            if not returned:
+                break
+            rows += len(returned)
+            batches += 1
+            tenant_ids.update(returned)
+        return {"rows": rows, "batches": batches}
+
+    @staticmethod
+    def mark_overdue_invoices(db: Session) -> Dict[str, Any]:
+        """
+        Set status 'overdue' on pending, sent and viewed invoices due before today, and
+        return overdue invoices whose due date is no longer past to 'pending'
+        """
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        params = {"now": now, "today": now.date()}
+        tenant_ids: Set[str] = set()
+        marked = MaintenanceService._run_batches(db, MaintenanceService.MARK_OVERDUE_SQL, params, tenant_ids)
+        cleared = MaintenanceService._run_batches(db, MaintenanceService.UNMARK_OVERDUE_SQL, params, tenant_ids)
+
+        for tenant_id in tenant_ids:
+            InvoiceSummaryService.invalidate(tenant_id)
+            ReceivablesAgingService.invalidate(tenant_id)
+
+        return {
+            "rows_affected": marked["rows"] + cleared["rows"],
+            "batches": marked["batches"] + cleared["batches"],
+            "marked": marked["rows"],
+            "cleared": cleared["rows"],
+            "tenants": len(tenant_ids),
+            "as_of": params["today"].isoformat()
+        }
+
+    @staticmethod
+    def flag_stale_leads(db: Session) -> Dict[str, Any]:
+        """Flag open leads not contacted in STALE_LEAD_DAYS and clear the flag on leads that no longer qualify"""
+        cutoff = datetime.now(timezone.utc).date() - timedelta(days=settings.STALE_LEAD_DAYS)
+        tenant_ids: Set[str] = set()
+        flagged = MaintenanceService._run_batches(
+            db, MaintenanceService.FLAG_STALE_SQL, {"cutoff": cutoff}, tenant_ids
+        )
+        cleared = MaintenanceService._run_batches(
+            db, MaintenanceService.UNFLAG_STALE_SQL, {"cutoff": cutoff}, tenant_ids
+        )
+        return {
+            "rows_affected": flagged["rows"] + cleared["rows"],
+            "batches": flagged["batches"] + cleared["batches"],
+            "flagged": flagged["rows"],
+            "cleared": cleared["rows"],
+            "tenants": len(tenant_ids),
+            "cutoff": cutoff.isoformat()
+        }
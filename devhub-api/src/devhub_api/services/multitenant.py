@@ -4,13 +4,19 @@ Provides tenant-aware business logic and data access
 """
 
 from typing import Optional, List, Dict, Any
+from decimal import Decimal, InvalidOperation
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, func
 from fastapi import HTTPException, status
 import json
 
 from ..models import Tenant, User, Customer, Project, Lead, Invoice
 from ..core.config import settings
+from ..core.pagination import Page, PageParams, paginate, created_order
+from .analytics_rollup import AnalyticsRollupService
+from .forecast import PipelineForecastService
+from .pipeline_analytics import PipelineAnalyticsService
+from .search import ContactSearch
 
 
 class TenantService:
@@ -46,23 +52,24 @@ class TenantService:
         
         return context
     
-    def get_accessible_tenants(self, user_id: str) -> List[Tenant]:
-        """Get all tenants accessible to a user"""
+    def get_accessible_tenants(self, user_id: str, page: Optional[PageParams] = None) -> Page:
+        """Get one page of the tenants accessible to a user"""
         user = self.db.query(User).filter(User.system_id == user_id).first()
         if not user:
-            return []
+            return Page([])
         
         if user.is_founder:
             # Platform founder can access all tenants
-            return self.db.query(Tenant).filter(Tenant.is_active == True).all()
+            query = self.db.query(Tenant).filter(Tenant.is_active == True)
+            return paginate(self.db, query, page, created_order(Tenant))
         else:
             # Regular users can only access their own tenant
             if user.tenant_id:
                 tenant = self.db.query(Tenant).filter(
                     Tenant.system_id == user.tenant_id
                 ).first()
-                return [tenant] if tenant else []
-            return []
+                return Page([tenant] if tenant else [])
+            return Page([])
     
     def create_tenant(self, tenant_data: Dict[str, Any], creator_id: str) -> Tenant:
         """Create a new tenant (platform founder only)"""
@@ -112,27 +119,40 @@ class TenantService:
 class MultiTenantCRMService:
     """Tenant-aware CRM service"""
     
+    LEAD_UPDATABLE_FIELDS = {
+        "company", "name", "email", "phone", "job_title", "source", "stage",
+        "estimated_value", "probability", "qualification_status", "assigned_to",
+        "expected_close_date", "last_contacted", "converted_to_customer",
+        "converted_customer_id", "is_active"
+    }
+    # Fields whose changes move analytics rollup counters
+    LEAD_ROLLUP_FIELDS = ("stage", "source", "estimated_value", "qualification_status", "converted_to_customer")
+    
     def __init__(self, db: Session):
         self.db = db
         self.tenant_service = TenantService(db)
     
     def get_customers(self, tenant_context: Dict[str, Any], 
-                     filters: Optional[Dict[str, Any]] = None) -> List[Customer]:
-        """Get customers with tenant filtering"""
-        query = self.db.query(Customer)
+                     filters: Optional[Dict[str, Any]] = None,
+                     page: Optional[PageParams] = None,
+                     columns: Optional[List] = None) -> Page:
+        """
+        Get one page of customers with tenant filtering
+        
+        columns projects the SELECT onto those columns (see core.fieldsets) instead of
+        loading full Customer objects.
+        """
+        query = self.db.query(*columns) if columns else self.db.query(Customer)
         query = self.tenant_service.filter_by_tenant(query, Customer, tenant_context)
         
         if filters:
             # Note: Customer model doesn't have status field in current schema
             if filters.get("search"):
-                search_term = f"%{filters['search']}%"
-                query = query.filter(or_(
-                    Customer.company.ilike(search_term),
-                    Customer.name.ilike(search_term),  # Use 'name' instead of 'contact_name'
-                    Customer.email.ilike(search_term)
-                ))
-        
-        return query.all()
+                # Relevance order has no stable key to seek on, so search pages by offset
+                query = ContactSearch.apply(query, Customer, filters["search"], filters.get("search_mode", "ranked"))
+                return paginate(self.db, query, page)
+        
+        return paginate(self.db, query, page, created_order(Customer))
     
     def create_customer(self, customer_data: Dict[str, Any], 
                        tenant_context: Dict[str, Any]) -> Customer:
@@ -158,15 +178,18 @@ class MultiTenantCRMService:
         
         self.db.add(customer)
         self.db.flush()
+        AnalyticsRollupService.record_customer_created(self.db, customer)
         
         return customer
     
     def get_leads(self, tenant_context: Dict[str, Any], 
-                 filters: Optional[Dict[str, Any]] = None) -> List:
-        """Get leads with tenant filtering"""
+                 filters: Optional[Dict[str, Any]] = None,
+                 page: Optional[PageParams] = None,
+                 columns: Optional[List] = None) -> Page:
+        """Get one page of leads with tenant filtering, optionally projected onto columns"""
         from ..models import Lead
         
-        query = self.db.query(Lead)
+        query = self.db.query(*columns) if columns else self.db.query(Lead)
         query = self.tenant_service.filter_by_tenant(query, Lead, tenant_context)
         
         if filters:
@@ -174,15 +197,13 @@ class MultiTenantCRMService:
                 query = query.filter(Lead.stage == filters["stage"])
             if filters.get("source"):
                 query = query.filter(Lead.source == filters["source"])
+            if filters.get("is_stale") is not None:
+                query = query.filter(Lead.is_stale == filters["is_stale"])
             if filters.get("search"):
-                search_term = f"%{filters['search']}%"
-                query = query.filter(or_(
-                    Lead.company.ilike(search_term),
-                    Lead.name.ilike(search_term),  # Use 'name' instead of 'contact_name'
-                    Lead.email.ilike(search_term)
-                ))
-        
-        return query.all()
+                query = ContactSearch.apply(query, Lead, filters["search"], filters.get("search_mode", "ranked"))
+                return paginate(self.db, query, page)
+        
+        return paginate(self.db, query, page, created_order(Lead))
     
     def create_lead(self, lead_data: Dict[str, Any], 
                    tenant_context: Dict[str, Any]):
@@ -213,12 +234,16 @@ class MultiTenantCRMService:
         
         self.db.add(lead)
         self.db.flush()
+        AnalyticsRollupService.record_lead_created(self.db, lead)
+        PipelineAnalyticsService.record_stage_change(self.db, lead, None, tenant_context["user_id"])
+        PipelineForecastService.invalidate(lead.tenant_id)
         
         return lead
     
     def get_customer_interactions(self, tenant_context: Dict[str, Any], 
-                                 customer_id: str) -> List:
-        """Get customer interactions with tenant filtering"""
+                                 customer_id: str, page: Optional[PageParams] = None,
+                                 columns: Optional[List] = None) -> Page:
+        """Get one page of customer interactions with tenant filtering, optionally projected onto columns"""
         from ..models import CustomerInteraction
         
         # First verify the customer belongs to the tenant
@@ -235,10 +260,10 @@ class MultiTenantCRMService:
                 detail="Customer not found or not accessible"
             )
         
-        query = self.db.query(CustomerInteraction)
+        query = self.db.query(*columns) if columns else self.db.query(CustomerInteraction)
         query = query.filter(CustomerInteraction.customer_id == customer_id)
         
-        return query.all()
+        return paginate(self.db, query, page, created_order(CustomerInteraction))
     
     def create_customer_interaction(self, customer_id: str, 
                                    interaction_data: Dict[str, Any],
@@ -261,22 +286,145 @@ class MultiTenantCRMService:
                 detail="Customer not found or not accessible"
             )
         
-        interaction_id = IDGenerator.generate_id("interaction", self.db)
+        interaction_id = IDGenerator.generate_id("customer_interaction", self.db)
         
         interaction = CustomerInteraction(
             system_id=interaction_id,
             customer_id=customer_id,
-            type=interaction_data["type"],
-            notes=interaction_data.get("notes"),
-            date=interaction_data.get("date")
+            user_id=tenant_context["user_id"],
+            interaction_type=interaction_data["type"],
+            subject=interaction_data.get("subject"),
+            description=interaction_data.get("notes"),
+            outcome=interaction_data.get("outcome")
         )
         
         self.db.add(interaction)
         self.db.flush()
+        AnalyticsRollupService.record_interaction_created(self.db, customer.tenant_id)
         
         return interaction
 
 
+    def get_dashboard_analytics(self, tenant_context: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        CRM dashboard metrics
+        
+        Counts of new records, stages, sources, conversions and interactions are
+        summed from the per-day rollups (O(days), not O(rows)). Active customers
+        and project status, which the rollups do not track, come from one
+        COUNT(*) FILTER query per entity.
+        """
+        metrics = AnalyticsRollupService.read_metrics(
+            self.db,
+            lambda query, model: self.tenant_service.filter_by_tenant(query, model, tenant_context)
+        )
+        
+        def metric(name: str, period: str = "total", dimension: str = "") -> int:
+            return int(metrics.get((name, dimension), {}).get(period, 0))
+        
+        def by_dimension(name: str) -> Dict[str, Any]:
+            return {
+                dimension: value["total"]
+                for (metric_name, dimension), value in metrics.items()
+                if metric_name == name
+            }
+        
+        customer_query = self.db.query(
+            func.count(Customer.id).filter(Customer.is_active.is_(True))
+        )
+        customer_query = self.tenant_service.filter_by_tenant(customer_query, Customer, tenant_context)
+        active_customers = customer_query.scalar()
+        
+        project_query = self.db.query(
+            func.count(Project.id),
+            func.count(Project.id).filter(Project.status == "active")
+        )
+        project_query = self.tenant_service.filter_by_tenant(project_query, Project, tenant_context)
+        total_projects, active_projects = project_query.one()
+        
+        new_leads = by_dimension("new_leads")
+        conversions = by_dimension("conversions")
+        stage_counts = by_dimension("leads_in_stage")
+        stage_values = by_dimension("stage_value")
+        total_leads = int(sum(new_leads.values()))
+        converted_leads = int(sum(conversions.values()))
+        
+        return {
+            "customer_metrics": {
+                "total_customers": metric("new_customers"),
+                "new_customers_this_month": metric("new_customers", "month"),
+                "active_customers": active_customers
+            },
+            "lead_metrics": {
+                "total_leads": total_leads,
+                "new_leads_this_month": int(sum(
+                    value["month"] for (name, _), value in metrics.items() if name == "new_leads"
+                )),
+                "qualified_leads": metric("qualified_leads"),
+                "converted_leads": converted_leads,
+                "conversion_rate": round(converted_leads / total_leads * 100, 1) if total_leads else 0
+            },
+            "interaction_metrics": {
+                "total_interactions": metric("interactions"),
+                "interactions_this_week": metric("interactions", "week")
+            },
+            "project_metrics": {
+                "total_projects": total_projects,
+                "active_projects": active_projects
+            },
+            "pipeline_stages": {
+                stage or "unknown": {
+                    "count": int(count),
+                    "estimated_value": float(stage_values.get(stage, 0))
+                }
+                for stage, count in stage_counts.items() if count
+            },
+            "lead_sources": {
+                source or "unknown": {
+                    "count": int(count),
+                    "converted": int(conversions.get(source, 0))
+                }
+                for source, count in new_leads.items() if count
+            }
+        }
+    
+    def update_lead(self, lead_id: str, lead_data: Dict[str, Any],
+                   tenant_context: Dict[str, Any]) -> Lead:
+        """Update a lead and keep the analytics rollups in step"""
+        if lead_data.get("estimated_value") is not None:
+            try:
+                lead_data = {**lead_data, "estimated_value": int(Decimal(str(lead_data["estimated_value"])))}
+            except (InvalidOperation, ValueError):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="estimated_value must be a number"
+                )
+        
+        # Row lock: concurrent updates must compute their rollup deltas one after the other
+        query = self.db.query(Lead).filter(Lead.system_id == lead_id)
+        lead = self.tenant_service.filter_by_tenant(query, Lead, tenant_context).with_for_update().first()
+        
+        if not lead:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Lead not found or not accessible"
+            )
+        
+        before = {field: getattr(lead, field) for field in self.LEAD_ROLLUP_FIELDS}
+        
+        for field, value in lead_data.items():
+            if field in self.LEAD_UPDATABLE_FIELDS:
+                setattr(lead, field, value)
+        
+        self.db.flush()
+        AnalyticsRollupService.record_lead_changed(self.db, lead, before)
+        if before["stage"] != lead.stage:
+            PipelineAnalyticsService.record_stage_change(self.db, lead, before["stage"], tenant_context["user_id"])
+        PipelineForecastService.invalidate(lead.tenant_id)
+        
+        return lead
+
+
 class MultiTenantProjectService:
     """Tenant-aware project service"""
     
@@ -285,9 +433,11 @@ class MultiTenantProjectService:
         self.tenant_service = TenantService(db)
     
     def get_projects(self, tenant_context: Dict[str, Any],
-                    filters: Optional[Dict[str, Any]] = None) -> List[Project]:
-        """Get projects with tenant filtering"""
-        query = self.db.query(Project)
+                    filters: Optional[Dict[str, Any]] = None,
+                    page: Optional[PageParams] = None,
+                    columns: Optional[List] = None) -> Page:
+        """Get one page of projects with tenant filtering, optionally projected onto columns"""
+        query = self.db.query(*columns) if columns else self.db.query(Project)
         query = self.tenant_service.filter_by_tenant(query, Project, tenant_context)
         
         if filters:
@@ -298,7 +448,7 @@ class MultiTenantProjectService:
             if filters.get("customer_id"):
                 query = query.filter(Project.customer_id == filters["customer_id"])
         
-        return query.all()
+        return paginate(self.db, query, page, created_order(Project))
     
     def create_project(self, project_data: Dict[str, Any],
                       tenant_context: Dict[str, Any]) -> Project:
@@ -353,8 +503,9 @@ class MultiTenantInvoiceService:
         self.tenant_service = TenantService(db)
     
     def get_invoices(self, tenant_context: Dict[str, Any],
-                    filters: Optional[Dict[str, Any]] = None) -> List[Invoice]:
-        """Get invoices with tenant filtering"""
+                    filters: Optional[Dict[str, Any]] = None,
+                    page: Optional[PageParams] = None) -> Page:
+        """Get one page of invoices with tenant filtering"""
         query = self.db.query(Invoice)
         query = self.tenant_service.filter_by_tenant(query, Invoice, tenant_context)
         
@@ -364,7 +515,7 @@ class MultiTenantInvoiceService:
             if filters.get("customer_id"):
                 query = query.filter(Invoice.customer_id == filters["customer_id"])
         
-        return query.all()
+        return paginate(self.db, query, page, created_order(Invoice))
 
 
 class AuthorizationService:
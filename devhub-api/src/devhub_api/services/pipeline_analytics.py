@@ -0,0 +1,254 @@
+"""
+Pipeline analytics from lead stage history
+Funnel conversion, stage velocity and stalled deals computed in SQL from LeadStageEvent
+with window functions, plus per-lead time in stage for the sales pipeline formula
+"""
+
+from typing import Optional, Dict, Any, List
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from ..models import Lead, LeadStageEvent, LeadStatus
+from ..crm_formulas import CRMFormulas
+from .formula_profiles import FormulaProfileService
+from .lead_scoring import LeadScoringService
+
+
+class PipelineAnalyticsService:
+    """Stage history writes and the analytics read from it"""
+
+    # Funnel order; closed_lost is an exit, not a step
+    STAGE_ORDER = tuple(stage.value for stage in LeadStatus if stage != LeadStatus.CLOSED_LOST)
+    # Same threshold as CRMFormulas._identify_risk_factors
+    STALLED_DAYS = 30
+    DEFAULT_PERIOD_DAYS = 90
+    MAX_STALLED = 500
+
+    # Every event with the stage the lead moved to next and when it left
+    SPANS_CTE = """
+        WITH spans AS (
+            SELECT e.lead_id, e.to_stage AS stage, e.changed_at,
+                   lead(e.to_stage) OVER w AS next_stage,
+                   lead(e.changed_at) OVER w AS left_at
+            FROM lead_stage_events e
+            WHERE e.tenant_id = :tenant_id
+            WINDOW w AS (PARTITION BY e.lead_id ORDER BY e.changed_at, e.id)
+        )
+    """
+
+    FUNNEL_SQL = SPANS_CTE + """
+        SELECT coalesce(stage, '') AS stage,
+               count(DISTINCT lead_id) AS entered,
+               count(DISTINCT lead_id) FILTER (WHERE next_stage IS NOT NULL AND next_stage <> 'closed_lost') AS moved_on,
+               count(DISTINCT lead_id) FILTER (WHERE next_stage = 'closed_lost') AS lost,
+               count(DISTINCT lead_id) FILTER (WHERE left_at IS NULL) AS still_in_stage
+        FROM spans
+        WHERE changed_at >= :since AND changed_at < :until
+        GROUP BY coalesce(stage, '')
+    """
+
+    VELOCITY_SQL = SPANS_CTE + """
+        SELECT stage,
+               count(*) FILTER (WHERE left_at IS NOT NULL) AS completed,
+               count(*) FILTER (WHERE left_at IS NULL) AS in_stage,
+               avg(days) FILTER (WHERE left_at IS NOT NULL) AS avg_days,
+               percentile_cont(0.5) WITHIN GROUP (ORDER BY days) FILTER (WHERE left_at IS NOT NULL) AS median_days,
+               avg(days) FILTER (WHERE left_at IS NULL) AS avg_current_days
+        FROM (
+            SELECT stage, left_at,
+                   EXTRACT(EPOCH FROM (coalesce(left_at, :now) - changed_at)) / 86400 AS days
+            FROM spans
+            WHERE changed_at >= :since AND changed_at < :until
+              AND stage IS NOT NULL AND stage NOT IN ('closed_won', 'closed_lost')
+        ) d
+        GROUP BY stage
+    """
+
+    STALLED_SQL = """
+        SELECT l.system_id AS id, l.name, l.company, l.assigned_to, l.estimated_value,
+               c.to_stage AS stage, c.changed_at AS entered_at,
+               EXTRACT(EPOCH FROM (:now - c.changed_at)) / 86400 AS days_in_stage
+        FROM (
+            SELECT e.lead_id, e.to_stage, e.changed_at,
+                   row_number() OVER (PARTITION BY e.lead_id ORDER BY e.changed_at DESC, e.id DESC) AS position
+            FROM lead_stage_events e
+            WHERE e.tenant_id = :tenant_id
+        ) c
+        JOIN leads l ON l.system_id = c.lead_id
+        WHERE c.position = 1
+          AND coalesce(c.to_stage, '') NOT IN ('closed_won', 'closed_lost')
+          AND coalesce(l.is_active, true)
+          AND c.changed_at < :stalled_before
+        ORDER BY c.changed_at
+        LIMIT :limit
+    """
+
+    TIME_IN_STAGE_SQL = """
+        SELECT stage, sum(EXTRACT(EPOCH FROM (coalesce(left_at, :now) - changed_at)) / 86400) AS days
+        FROM (
+            SELECT e.to_stage AS stage, e.changed_at,
+                   lead(e.changed_at) OVER (ORDER BY e.changed_at, e.id) AS left_at
+            FROM lead_stage_events e
+            WHERE e.lead_id = :lead_id
+        ) spans
+        WHERE stage IS NOT NULL
+        GROUP BY stage
+        ORDER BY min(changed_at)
+    """
+
+    # ====================================================================
+    # WRITES
+    # ====================================================================
+
+    @staticmethod
+    def record_stage_change(db: Session, lead, from_stage: Optional[str],
+                            changed_by: Optional[str] = None) -> None:
+        """Append a stage event; call on lead creation (from_stage None) and on every stage change"""
+        db.add(LeadStageEvent(
+            tenant_id=lead.tenant_id,
+            lead_id=lead.system_id,
+            from_stage=from_stage,
+            to_stage=lead.stage,
+            changed_by=changed_by
+        ))
+
+    # ====================================================================
+    # READS
+    # ====================================================================
+
+    @staticmethod
+    def _period(since: Optional[datetime], until: Optional[datetime]):
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        until = until or now
+        since = since or until - timedelta(days=PipelineAnalyticsService.DEFAULT_PERIOD_DAYS)
+        return now, since, until
+
+    @staticmethod
+    def _stage_rank(stage: str):
+        order = PipelineAnalyticsService.STAGE_ORDER
+        return (order.index(stage) if stage in order else len(order), stage)
+
+    @staticmethod
+    def funnel(db: Session, tenant_id: str, since: Optional[datetime] = None,
+               until: Optional[datetime] = None) -> Dict[str, Any]:
+        """Leads entering each stage in the period, where they went next and step conversion"""
+        _, since, until = PipelineAnalyticsService._period(since, until)
+        rows = db.execute(text(PipelineAnalyticsService.FUNNEL_SQL), {
+            "tenant_id": tenant_id, "since": since, "until": until
+        }).all()
+
+        stages = sorted(rows, key=lambda row: PipelineAnalyticsService._stage_rank(row.stage))
+        entered = {row.stage: row.entered for row in rows}
+        funnel = []
+        for row in stages:
+            rank = PipelineAnalyticsService._stage_rank(row.stage)[0]
+            previous = PipelineAnalyticsService.STAGE_ORDER[rank - 1] \
+                if 0 < rank < len(PipelineAnalyticsService.STAGE_ORDER) else None
+            funnel.append({
+                "stage": row.stage or None,
+                "entered": row.entered,
+                "moved_on": row.moved_on,
+                "lost": row.lost,
+                "still_in_stage": row.still_in_stage,
+                # Share of the previous funnel step's entries that reached this stage
+                "step_conversion": round(row.entered / entered[previous], 4)
+                if previous and entered.get(previous) else None
+            })
+
+        return {
+            "tenant_id": tenant_id,
+            "since": since.isoformat(),
+            "until": until.isoformat(),
+            "stages": funnel
+        }
+
+    @staticmethod
+    def velocity(db: Session, tenant_id: str, since: Optional[datetime] = None,
+                 until: Optional[datetime] = None) -> Dict[str, Any]:
+        """Days spent per open stage: completed stays (average, median) and leads still there"""
+        now, since, until = PipelineAnalyticsService._period(since, until)
+        rows = db.execute(text(PipelineAnalyticsService.VELOCITY_SQL), {
+            "tenant_id": tenant_id, "since": since, "until": until, "now": now
+        }).all()
+
+        as_days = lambda value: round(float(value), 2) if value is not None else None
+        return {
+            "tenant_id": tenant_id,
+            "since": since.isoformat(),
+            "until": until.isoformat(),
+            "stages": [
+                {
+                    "stage": row.stage,
+                    "completed": row.completed,
+                    "in_stage": row.in_stage,
+                    "avg_days": as_days(row.avg_days),
+                    "median_days": as_days(row.median_days),
+                    "avg_current_days": as_days(row.avg_current_days)
+                }
+                for row in sorted(rows, key=lambda row: PipelineAnalyticsService._stage_rank(row.stage))
+            ]
+        }
+
+    @staticmethod
+    def stalled(db: Session, tenant_id: str, days: Optional[int] = None,
+                limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Open leads that entered their current stage more than `days` ago, longest stalled first"""
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        days = days or PipelineAnalyticsService.STALLED_DAYS
+        rows = db.execute(text(PipelineAnalyticsService.STALLED_SQL), {
+            "tenant_id": tenant_id,
+            "now": now,
+            "stalled_before": now - timedelta(days=days),
+            "limit": min(limit or PipelineAnalyticsService.MAX_STALLED, PipelineAnalyticsService.MAX_STALLED)
+        }).all()
+
+        return [
+            {
+                "id": row.id,
+                "name": row.name,
+                "company": row.company,
+                "assigned_to": row.assigned_to,
+                "estimated_value": row.estimated_value,
+                "stage": row.stage,
+                "entered_at": row.entered_at,
+                "days_in_stage": round(float(row.days_in_stage), 1)
+            }
+            for row in rows
+        ]
+
+    @staticmethod
+    def time_in_stage(db: Session, lead_id: str, now: Optional[datetime] = None) -> Dict[str, float]:
+        """Days a lead has spent in each stage it visited, in the order it first entered them"""
+        rows = db.execute(text(PipelineAnalyticsService.TIME_IN_STAGE_SQL), {
+            "lead_id": lead_id,
+            "now": now or datetime.now(timezone.utc).replace(tzinfo=None)
+        }).all()
+        return {row.stage: float(row.days) for row in rows}
+
+    @staticmethod
+    def lead_pipeline(db: Session, lead: Lead) -> Dict[str, Any]:
+        """sales_pipeline_formula for one lead, fed with its recorded stage history"""
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        time_in_stage = PipelineAnalyticsService.time_in_stage(db, lead.system_id, now)
+        features = db.execute(text(LeadScoringService.FEATURES_SQL), {
+            "ids": [lead.id],
+            "now": now,
+            "recent_since": now - timedelta(days=LeadScoringService.RECENT_DAYS),
+            "decision_maker_titles": LeadScoringService.DECISION_MAKER_TITLES
+        }).first()
+
+        stage = (lead.stage or "").lower()
+        result = CRMFormulas.sales_pipeline_formula(
+            pipeline_stages=list(time_in_stage),
+            stage_probabilities={stage: LeadScoringService.STAGE_PROBABILITY.get(stage, 0.1)},
+            deal_value=float(lead.estimated_value or 0),
+            time_in_stage=time_in_stage,
+            customer_signals={
+                "high_engagement": features.recent >= LeadScoringService.HIGH_ENGAGEMENT_INTERACTIONS,
+                "budget_confirmed": features.is_qualified and features.has_value,
+                "decision_maker": features.decision_maker
+            } if features else {},
+            business_variables=FormulaProfileService.get(db, lead.tenant_id)
+        )
+        return {"id": lead.system_id, "stage": lead.stage, "time_in_stage": time_in_stage, **result}
@@ -0,0 +1,150 @@
+"""
+Accounts-receivable aging
+Outstanding invoice amounts bucketed by days past due, per customer and per tenant, from a
+single CASE-bucketed aggregate query, cached per tenant and exportable as CSV
+"""
+
+from typing import Optional, Dict, Any, Iterator
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+import csv
+import io
+
+from ..core.cache import TTLCache
+from ..core.config import settings
+
+
+class ReceivablesAgingService:
+    """Aging report over a tenant's unpaid invoices"""
+
+    BUCKETS = ("current", "days_1_30", "days_31_60", "days_61_90", "days_90_plus")
+
+    # One row per (currency, customer) plus one tenant total per currency; amounts in
+    # different currencies are never added together. Drafts were never sent and cancelled
+    # invoices are not owed; the status predicate matches idx_invoices_customer_outstanding.
+    AGING_SQL = """
+        SELECT d.currency, d.customer_id, d.customer_name,
+               GROUPING(d.customer_id) AS is_total,
+               count(*) AS invoices,
+               sum(d.amount) AS outstanding,
+               coalesce(sum(d.amount) FILTER (WHERE d.bucket = 'current'), 0) AS current,
+               coalesce(sum(d.amount) FILTER (WHERE d.bucket = 'days_1_30'), 0) AS days_1_30,
+               coalesce(sum(d.amount) FILTER (WHERE d.bucket = 'days_31_60'), 0) AS days_31_60,
+               coalesce(sum(d.amount) FILTER (WHERE d.bucket = 'days_61_90'), 0) AS days_61_90,
+               coalesce(sum(d.amount) FILTER (WHERE d.bucket = 'days_90_plus'), 0) AS days_90_plus,
+               max(d.days_overdue) AS oldest_days_overdue
+        FROM (
+            SELECT coalesce(v.currency, 'USD') AS currency, v.customer_id,
+                   coalesce(c.company, c.name) AS customer_name, v.amount,
+                   greatest(:as_of - CAST(v.due_date AS DATE), 0) AS days_overdue,
+                   CASE
+                       WHEN CAST(v.due_date AS DATE) >= :as_of THEN 'current'
+                       WHEN :as_of - CAST(v.due_date AS DATE) <= 30 THEN 'days_1_30'
+                       WHEN :as_of - CAST(v.due_date AS DATE) <= 60 THEN 'days_31_60'
+                       WHEN :as_of - CAST(v.due_date AS DATE) <= 90 THEN 'days_61_90'
+                       ELSE 'days_90_plus'
+                   END AS bucket
+            FROM invoices v
+            JOIN customers c ON c.system_id = v.customer_id
+            WHERE c.tenant_id = :tenant_id
+              AND v.status NOT IN ('paid', 'cancelled', 'draft')
+        ) d
+        GROUP BY GROUPING SETS ((d.currency, d.customer_id, d.customer_name), (d.currency))
+    """
+
+    CSV_COLUMNS = ("tenant_id", "as_of", "currency", "customer_id", "customer_name", "invoices",
+                   *BUCKETS, "outstanding", "oldest_days_overdue")
+
+    # Leading characters that make spreadsheets evaluate a cell as a formula
+    FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+    _cache = TTLCache(settings.AGING_CACHE_TTL_SECONDS)
+
+    @staticmethod
+    def get_report(db: Session, tenant_id: str, as_of: Optional[date] = None) -> Dict[str, Any]:
+        """Cached aging report of one tenant; keyed by date so buckets roll over at midnight UTC"""
+        as_of = as_of or datetime.now(timezone.utc).date()
+        return ReceivablesAgingService._cache.get_or_set(
+            (tenant_id, as_of), lambda: ReceivablesAgingService.compute(db, tenant_id, as_of)
+        )
+
+    @staticmethod
+    def invalidate(tenant_id: Optional[str] = None) -> None:
+        """Drop every cached report of one tenant (or all tenants) after invoice writes"""
+        if tenant_id is None:
+            ReceivablesAgingService._cache.invalidate()
+        else:
+            ReceivablesAgingService._cache.invalidate(tenant_id)
+
+    @staticmethod
+    def compute(db: Session, tenant_id: str, as_of: date) -> Dict[str, Any]:
+        """Run the aging query; per-currency tenant totals and customers, largest balance first"""
+        rows = db.execute(text(ReceivablesAgingService.AGING_SQL), {
+            "tenant_id": tenant_id,
+            "as_of": as_of
+        }).all()
+
+        currencies: Dict[str, Dict[str, Any]] = {}
+        for row in rows:
+            entry = currencies.setdefault(row.currency, {"currency": row.currency, "total": None, "customers": []})
+            if row.is_total:
+                entry["total"] = ReceivablesAgingService._buckets(row)
+            else:
+                entry["customers"].append({
+                    "customer_id": row.customer_id,
+                    "customer_name": row.customer_name,
+                    **ReceivablesAgingService._buckets(row)
+                })
+
+        for entry in currencies.values():
+            entry["customers"].sort(key=lambda customer: customer["outstanding"], reverse=True)
+        return {
+            "tenant_id": tenant_id,
+            "as_of": as_of.isoformat(),
+            "buckets": list(ReceivablesAgingService.BUCKETS),
+            "currencies": sorted(currencies.values(), key=lambda entry: entry["total"]["outstanding"], reverse=True),
+            "generated_at": datetime.now(timezone.utc).isoformat()
+        }
+
+    @staticmethod
+    def _buckets(row) -> Dict[str, Any]:
+        """Invoice count, bucket amounts and outstanding total of one grouping row"""
+        return {
+            "invoices": row.invoices,
+            **{bucket: getattr(row, bucket) or Decimal("0") for bucket in ReceivablesAgingService.BUCKETS},
+            "outstanding": row.outstanding or Decimal("0"),
+            "oldest_days_overdue": row.oldest_days_overdue or 0
+        }
+
+    @staticmethod
+    def _csv_text(value: Optional[str]) -> Optional[str]:
+        """Neutralize user-entered text that a spreadsheet would run as a formula"""
+        if value and value.startswith(ReceivablesAgingService.FORMULA_PREFIXES):
+            return "'" + value
+        return value
+
+    @staticmethod
+    def iter_csv(report: Dict[str, Any]) -> Iterator[str]:
+        """Report as CSV lines for accounting: one row per customer and currency, then the tenant totals"""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+
+        def line(values) -> str:
+            writer.writerow(values)
+            value = buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            return value
+
+        yield line(ReceivablesAgingService.CSV_COLUMNS)
+        for entry in report["currencies"]:
+            rows = [*entry["customers"], {"customer_id": "", "customer_name": "TOTAL", **entry["total"]}]
+            for row in rows:
+                yield line([
+                    report["tenant_id"], report["as_of"], entry["currency"], row["customer_id"],
+                    ReceivablesAgingService._csv_text(row["customer_name"]), row["invoices"],
+                    *(row[bucket] for bucket in ReceivablesAgingService.BUCKETS),
+                    row["outstanding"], row["oldest_days_overdue"]
+                ])
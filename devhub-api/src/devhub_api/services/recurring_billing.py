@@ -0,0 +1,249 @@
+"""
+Recurring billing
+Invoice templates per customer (and optionally project) and the job that issues a billing
+period's invoices for a whole tenant in chunked transactions with bulk-reserved IDs
+"""
+
+from typing import Optional, Dict, Any, List
+from datetime import date, datetime, timezone
+from sqlalchemy import text, select
+from sqlalchemy.orm import Session
+import logging
+import time
+
+from ..database import SessionLocal
+from ..models import Customer, Project, InvoiceStatus, RecurringInvoiceTemplate, RecurringFrequency
+from ..id_system import IDGenerator
+from ..core.config import settings
+from ..core.exceptions import ValidationError
+from .invoice_summary import InvoiceSummaryService
+from .receivables import ReceivablesAgingService
+from .scheduler import JobScheduler
+
+logger = logging.getLogger(__name__)
+
+
+class RecurringBillingService:
+    """Recurring invoice templates and the periodic billing run"""
+
+    BILLING_JOB = "recurring_billing"
+    CHUNK_SIZE = 1000
+    TEMPLATE_FIELDS = ("description", "amount", "currency", "frequency", "payment_terms_days",
+                       "start_date", "end_date", "is_active")
+
+    # Months between the billed period and the template's first period
+    MONTHS_SINCE_START_SQL = (
+        "(CAST(EXTRACT(YEAR FROM CAST(:period AS DATE)) AS INTEGER) * 12 + CAST(EXTRACT(MONTH FROM CAST(:period AS DATE)) AS INTEGER))"
+        " - (CAST(EXTRACT(YEAR FROM t.start_date) AS INTEGER) * 12 + CAST(EXTRACT(MONTH FROM t.start_date) AS INTEGER))"
+    )
+    FREQUENCY_MONTHS_SQL = "CASE t.frequency " + " ".join(
+        f"WHEN '{frequency}' THEN {months}" for frequency, months in RecurringFrequency.MONTHS.items()
+    ) + " ELSE 1 END"
+
+    # Next chunk of templates billable in the period that have no invoice for it yet;
+    # the NOT EXISTS probe is served by uq_invoices_recurring_period. A template starting
+    # mid-period is billed for that period once its start date has arrived.
+    DUE_TEMPLATES_SQL = f"""
+        SELECT t.id
+        FROM recurring_invoice_templates t
+        WHERE t.tenant_id = :tenant_id
+          AND t.is_active
+          AND t.id > :after_id
+          AND t.start_date < :period_end
+          AND t.start_date <= :today
+          AND (t.end_date IS NULL OR t.end_date >= :period)
+          AND mod({MONTHS_SINCE_START_SQL}, {FREQUENCY_MONTHS_SQL}) = 0
+          AND NOT EXISTS (
+              SELECT 1 FROM invoices v
+              WHERE v.recurring_template_id = t.id AND v.billing_period = :period
+          )
+        ORDER BY t.id
+        LIMIT :limit
+    """
+
+    # One statement per chunk; a concurrent or repeated run loses the race on the unique
+    # (recurring_template_id, billing_period) index instead of billing twice. Invoices are
+    # issued on the first of the period, or on the start date when the contract starts later.
+    INSERT_SQL = """
+        INSERT INTO invoices (system_id, customer_id, amount, currency, status, issue_date, due_date,
+                              recurring_template_id, billing_period, created_at, updated_at)
+        SELECT s.system_id, t.customer_id, t.amount, t.currency, :status, d.issue_date,
+               d.issue_date + make_interval(days => t.payment_terms_days),
+               t.id, :period, :now, :now
+        FROM unnest(CAST(:template_ids AS INTEGER[]), CAST(:system_ids AS VARCHAR[])) AS s(template_id, system_id)
+        JOIN recurring_invoice_templates t ON t.id = s.template_id
+        CROSS JOIN LATERAL (
+            SELECT greatest(CAST(:period AS TIMESTAMP), CAST(t.start_date AS TIMESTAMP)) AS issue_date
+        ) d
+        ON CONFLICT (recurring_template_id, billing_period) DO NOTHING
+        RETURNING system_id
+    """
+
+    # ====================================================================
+    # TEMPLATES
+    # ====================================================================
+
+    @staticmethod
+    def create_template(db: Session, tenant_id: str, data: Dict[str, Any]) -> RecurringInvoiceTemplate:
+        """Validate and add a template for a customer (and project) of the tenant"""
+        RecurringBillingService._validate(db, tenant_id, data)
+        template = RecurringInvoiceTemplate(
+            system_id=IDGenerator.generate_id("recurring_invoice", db),
+            tenant_id=tenant_id,
+            customer_id=data["customer_id"],
+            project_id=data.get("project_id"),
+            **{field: data[field] for field in RecurringBillingService.TEMPLATE_FIELDS if data.get(field) is not None}
+        )
+        db.add(template)
+        db.flush()
+        return template
+
+    @staticmethod
+    def update_template(db: Session, tenant_id: str, template_id: str,
+                        data: Dict[str, Any]) -> Optional[RecurringInvoiceTemplate]:
+        """Apply a partial update; None if the template does not exist in the tenant"""
+        template = db.query(RecurringInvoiceTemplate).filter(
+            RecurringInvoiceTemplate.system_id == template_id,
+            RecurringInvoiceTemplate.tenant_id == tenant_id
+        ).first()
+        if not template:
+            return None
+
+        merged = {
+            "customer_id": template.customer_id,
+            "project_id": template.project_id,
+            **{field: getattr(template, field) for field in RecurringBillingService.TEMPLATE_FIELDS},
+            **data
+        }
+        RecurringBillingService._validate(db, tenant_id, merged)
+        for field, value in data.items():
+            setattr(template, field, value)
+        db.flush()
+        return template
+
+    @staticmethod
+    def list_templates(db: Session, tenant_id: str, active_only: bool = False) -> List[RecurringInvoiceTemplate]:
+        """Templates of one tenant, oldest first"""
+        query = db.query(RecurringInvoiceTemplate).filter(RecurringInvoiceTemplate.tenant_id == tenant_id)
+        if active_only:
+            query = query.filter(RecurringInvoiceTemplate.is_active.is_(True))
+        return query.order_by(RecurringInvoiceTemplate.id).all()
+
+    @staticmethod
+    def _validate(db: Session, tenant_id: str, data: Dict[str, Any]) -> None:
+        """Raise ValidationError unless the template references the tenant's own records and is coherent"""
+        frequency = data.get("frequency") or RecurringFrequency.MONTHLY
+        if frequency not in RecurringFrequency.MONTHS:
+            raise ValidationError(
+                f"Unknown frequency: {frequency}. Available frequencies: {', '.join(RecurringFrequency.MONTHS)}"
+            )
+        if data.get("end_date") and data.get("start_date") and data["end_date"] < data["start_date"]:
+            raise ValidationError("end_date must not be before start_date")
+
+        customer = db.execute(select(Customer.id).where(
+            Customer.system_id == data.get("customer_id"), Customer.tenant_id == tenant_id
+        )).first()
+        if not customer:
+            raise ValidationError("Customer not found")
+        if data.get("project_id"):
+            project = db.execute(select(Project.id).where(
+                Project.system_id == data["project_id"], Project.tenant_id == tenant_id
+            )).first()
+            if not project:
+                raise ValidationError("Project not found")
+
+    # ====================================================================
+    # BILLING RUN
+    # ====================================================================
+
+    @staticmethod
+    def register(scheduler: JobScheduler) -> None:
+        """Register the periodic billing job"""
+        scheduler.register(
+            RecurringBillingService.BILLING_JOB,
+            RecurringBillingService.run_billing,
+            settings.RECURRING_BILLING_INTERVAL_SECONDS
+        )
+
+    @staticmethod
+    def run_billing(job_id: str) -> None:
+        """Scheduler entry point: bill the current period for every tenant with active templates"""
+        db = SessionLocal()
+        try:
+            tenant_ids = db.execute(
+                select(RecurringInvoiceTemplate.tenant_id)
+                .where(RecurringInvoiceTemplate.is_active.is_(True))
+                .distinct()
+            ).scalars().all()
+            created = 0
+            for tenant_id in tenant_ids:
+                created += RecurringBillingService.bill_period(db, tenant_id)["created"]
+            logger.info("Recurring billing %s created %d invoices for %d tenants", job_id, created, len(tenant_ids))
+        finally:
+            db.close()
+
+    @staticmethod
+    def period_start(value: Optional[date] = None) -> date:
+        """First day of the month containing value (default: today, UTC)"""
+        value = value or datetime.now(timezone.utc).date()
+        return value.replace(day=1)
+
+    @staticmethod
+    def bill_period(db: Session, tenant_id: str, period: Optional[date] = None) -> Dict[str, Any]:
+        """
+        Issue the period's invoices for every due template of a tenant
+
+        Templates are processed in id order, CHUNK_SIZE per transaction: one query finds the
+        chunk, one block of invoice IDs is reserved and one INSERT writes it. Re-running for
+        the same period creates nothing for templates that were already billed.
+        """
+        start_time = time.perf_counter()
+        period = RecurringBillingService.period_start(period)
+        period_end = date(period.year + period.month // 12, period.month % 12 + 1, 1)
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+
+        after_id, created, skipped, chunks = 0, 0, 0, 0
+        while True:
+            template_ids = db.execute(text(RecurringBillingService.DUE_TEMPLATES_SQL), {
+                "tenant_id": tenant_id,
+                "after_id": after_id,
+                "period": period,
+                "period_end": period_end,
+                "today": now.date(),
+                "limit": RecurringBillingService.CHUNK_SIZE
+            }).scalars().all()
+            if not template_ids:
+                break
+
+            try:
+                system_ids = IDGenerator.reserve_ids("invoice", db, len(template_ids))
+                inserted = db.execute(text(RecurringBillingService.INSERT_SQL), {
+                    "template_ids": template_ids,
+                    "system_ids": system_ids,
+                    "status": InvoiceStatus.PENDING,
+                    "period": period,
+                    "now": now
+                }).scalars().all()
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+
+            created += len(inserted)
+            skipped += len(template_ids) - len(inserted)
+            chunks += 1
+            after_id = template_ids[-1]
+
+        if created:
+            InvoiceSummaryService.invalidate(tenant_id)
+            ReceivablesAgingService.invalidate(tenant_id)
+
+        return {
+            "tenant_id": tenant_id,
+            "period": period.isoformat(),
+            "created": created,
+            # Billed concurrently by another run between the chunk query and the insert
+            "skipped": skipped,
+            "chunks": chunks,
+            "duration_ms": int((time.perf_counter() - start_time) * 1000)
+        }
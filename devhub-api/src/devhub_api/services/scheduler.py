@@ -0,0 +1,185 @@
+"""
+In-process job scheduler for periodic background work
+Runs registered jobs on an interval and on demand, one at a time, off the request path
+"""
+
+from typing import Any, Callable, Dict, List, Optional
+from datetime import datetime, timezone
+import logging
+import queue
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+
+class ScheduledJob:
+    """A registered job, its next due time and the outcome of its runs so far"""
+
+    def __init__(self, name: str, func: Callable[[str], Optional[Dict[str, Any]]], interval_seconds: Optional[int]):
+        self.name = name
+        self.func = func
+        self.interval_seconds = interval_seconds
+        self.next_run_at = time.monotonic() + interval_seconds if interval_seconds else None
+        self.pending = False  # Queued or running; prevents piling up runs of a slow job
+        self.runs = 0
+        self.failures = 0
+        self.last_run: Optional[Dict[str, Any]] = None
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "interval_seconds": self.interval_seconds,
+            "pending": self.pending,
+            "runs": self.runs,
+            "failures": self.failures,
+            "last_run": self.last_run
+        }
+
+
+class JobScheduler:
+    """
+    Minimal scheduler with a timer thread and a single worker thread
+
+    Jobs are plain callables taking a job_id and optionally returning a dict of
+    run metrics. A single worker keeps background work serialized on one database
+    connection so it never competes with request handling for the pool. Listeners
+    are called with a record of every finished run.
+    """
+
+    def __init__(self, poll_interval: float = 1.0, max_queue_size: int = 100):
+        self.poll_interval = poll_interval
+        self._jobs: Dict[str, ScheduledJob] = {}
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue(maxsize=max_queue_size)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads: list[threading.Thread] = []
+        self._listeners: List[Callable[[Dict[str, Any]], None]] = []
+
+    def register(self, name: str, func: Callable[[str], Optional[Dict[str, Any]]],
+                 interval_seconds: Optional[int] = None) -> None:
+        """Register a job; jobs without an interval only run when submitted"""
+        with self._lock:
+            self._jobs[name] = ScheduledJob(name, func, interval_seconds)
+
+    def add_listener(self, listener: Callable[[Dict[str, Any]], None]) -> None:
+        """Call listener with the record of every finished run (see _worker_loop)"""
+        with self._lock:
+            if listener not in self._listeners:
+                self._listeners.append(listener)
+
+    def status(self) -> List[Dict[str, Any]]:
+        """Registered jobs with their schedule, run counts and last run"""
+        with self._lock:
+            return [job.status() for job in self._jobs.values()]
+
+    def submit(self, name: str, job_id: Optional[str] = None, trigger: str = "manual") -> str:
+        """Queue a job to run as soon as the worker is free and return its job_id"""
+        with self._lock:
+            job = self._jobs.get(name)
+            if not job:
+                raise ValueError(f"Unknown job: {name}")
+            job.pending = True
+
+        job_id = job_id or uuid.uuid4().hex
+        try:
+            self._queue.put_nowait((name, job_id, trigger))
+        except queue.Full:
+            with self._lock:
+                job.pending = False
+            raise RuntimeError("Background job queue is full")
+
+        return job_id
+
+    @property
+    def running(self) -> bool:
+        return any(thread.is_alive() for thread in self._threads)
+
+    def start(self) -> None:
+        """Start the timer and worker threads"""
+        if self.running:
+            return
+
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(target=self._timer_loop, name="scheduler-timer", daemon=True),
+            threading.Thread(target=self._worker_loop, name="scheduler-worker", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+        logger.info("Job scheduler started with %d jobs", len(self._jobs))
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Stop accepting work and wait briefly for the current job to finish"""
+        self._stop.set()
+        try:
+            self._queue.put_nowait(None)  # Wake the worker
+        except queue.Full:
+            pass
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def _timer_loop(self) -> None:
+        while not self._stop.wait(self.poll_interval):
+            now = time.monotonic()
+            with self._lock:
+                due = [
+                    job for job in self._jobs.values()
+                    if job.interval_seconds and not job.pending and job.next_run_at <= now
+                ]
+            for job in due:
+                job.next_run_at = now + job.interval_seconds
+                try:
+                    self.submit(job.name, trigger="scheduled")
+                except RuntimeError as e:
+                    logger.warning("Skipping scheduled run of %s: %s", job.name, e)
+
+    def _worker_loop(self) -> None:
+        while not self._stop.is_set():
+            item = self._queue.get()
+            if item is None:
+                break
+
+            name, job_id, trigger = item
+            job = self._jobs.get(name)
+            started_at = datetime.now(timezone.utc)
+            start_time = time.perf_counter()
+            result, error = None, None
+            try:
+                logger.info("Running job %s (%s)", name, job_id)
+                result = job.func(job_id)
+            except Exception as e:
+                error = str(e)
+                logger.exception("Job %s (%s) failed", name, job_id)
+            finally:
+                run = {
+                    "job_name": name,
+                    "job_id": job_id,
+                    "trigger": trigger,
+                    "status": "failed" if error else "completed",
+                    "started_at": started_at,
+                    "duration_ms": int((time.perf_counter() - start_time) * 1000),
+                    "result": result if isinstance(result, dict) else None,
+                    "error": error
+                }
+                with self._lock:
+                    job.pending = False
+                    job.runs += 1
+                    job.failures += 1 if error else 0
+                    job.last_run = run
+                    listeners = list(self._listeners)
+            self._notify(listeners, run)
+
+    @staticmethod
+    def _notify(listeners: List[Callable[[Dict[str, Any]], None]], run: Dict[str, Any]) -> None:
+        for listener in listeners:
+            try:
+                listener(run)
+            except Exception:
+                logger.exception("Job run listener failed for %s (%s)", run["job_name"], run["job_id"])
+
+
+# Process-wide scheduler started by the application lifespan
+scheduler = JobScheduler()
@@ -0,0 +1,131 @@
+"""
+Search services
+Contact search on generated tsvector/trigram columns and global search over search_documents
+"""
+
+from typing import Optional, List, Dict, Any
+from sqlalchemy import or_, func, false
+from sqlalchemy.orm import Session
+import re
+
+from ..models import SearchDocument
+
+
+class ContactSearch:
+    """Builds indexed search predicates for models with search_text/search_vector columns"""
+
+    MODES = ("ranked", "prefix")
+    # Trigram indexes only help from three characters; shorter terms use prefix matching
+    MIN_SUBSTRING_LENGTH = 3
+
+    @staticmethod
+    def apply(query, model, term: str, mode: str = "ranked"):
+        """Filter and order a query by search relevance"""
+        term = (term or "").strip().lower()
+        if not term:
+            return query
+
+        if mode == "prefix" or len(term) < ContactSearch.MIN_SUBSTRING_LENGTH:
+            return ContactSearch._apply_prefix(query, model, term)
+        if mode == "ranked":
+            return ContactSearch._apply_ranked(query, model, term)
+        raise ValueError(f"Unknown search mode: {mode}")
+
+    @staticmethod
+    def _apply_ranked(query, model, term: str):
+        """
+        Full-text matches plus trigram substring matches (partial emails, mid-word fragments)
+        Ranked by text rank, then trigram similarity
+        """
+        tsquery = func.websearch_to_tsquery("simple", term)
+        pattern = "%" + ContactSearch._escape_like(term) + "%"
+        rank = func.ts_rank_cd(model.search_vector, tsquery) + func.similarity(model.search_text, term)
+
+        return query.filter(or_(
+            model.search_vector.op("@@")(tsquery),
+            model.search_text.like(pattern, escape="\\")
+        )).order_by(rank.desc(), model.id)
+
+    @staticmethod
+    def _apply_prefix(query, model, term: str):
+        """Typeahead: every typed word must prefix-match a word in company, name or email"""
+        prefix_query = ContactSearch.prefix_tsquery(term)
+        if prefix_query is None:
+            return query.filter(false())
+
+        tsquery = func.to_tsquery("simple", prefix_query)
+        return query.filter(
+            model.search_vector.op("@@")(tsquery)
+        ).order_by(func.ts_rank_cd(model.search_vector, tsquery).desc(), model.id)
+
+    @staticmethod
+    def prefix_tsquery(term: str) -> Optional[str]:
+        """Turn free text into a safe to_tsquery string like 'acme:* & jo:*'"""
+        words = re.findall(r"\w+", term.lower())
+        if not words:
+            return None
+        return " & ".join(f"{word}:*" for word in words)
+
+    @staticmethod
+    def _escape_like(term: str) -> str:
+        return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+class GlobalSearch:
+    """Ranked search across every entity in the unified search_documents index"""
+
+    ENTITY_TYPES = ("customer", "lead", "project", "invoice", "note", "interaction")
+
+    @staticmethod
+    def search(db: Session, tenant_filter, term: str, mode: str = "ranked",
+               entity_types: Optional[List[str]] = None, page: int = 1, page_size: int = 20) -> Dict[str, Any]:
+        """
+        Mixed, ranked hits for one page
+
+        tenant_filter applies tenant scoping (see TenantService.filter_by_tenant), which
+        also lets PostgreSQL prune the search to the tenant's partition.
+        """
+        term = (term or "").strip()
+        if mode == "prefix":
+            prefix_query = ContactSearch.prefix_tsquery(term)
+            tsquery = func.to_tsquery("simple", prefix_query) if prefix_query else None
+        elif mode == "ranked":
+            tsquery = func.websearch_to_tsquery("simple", term) if term else None
+        else:
+            raise ValueError(f"Unknown search mode: {mode}")
+
+        result = {"query": term, "mode": mode, "page": page, "page_size": page_size, "results": [], "has_more": False}
+        if tsquery is None:
+            return result
+
+        rank = func.ts_rank_cd(SearchDocument.search_vector, tsquery)
+        query = db.query(
+            SearchDocument.entity_type,
+            SearchDocument.system_id,
+            SearchDocument.tenant_id,
+            SearchDocument.title,
+            SearchDocument.snippet,
+            rank.label("rank")
+        ).filter(SearchDocument.search_vector.op("@@")(tsquery))
+        query = tenant_filter(query, SearchDocument)
+        if entity_types:
+            query = query.filter(SearchDocument.entity_type.in_(entity_types))
+
+        # One extra row tells us whether another page exists without a COUNT
+        rows = query.order_by(
+            rank.desc(), SearchDocument.entity_type, SearchDocument.system_id
+        ).offset((page - 1) * page_size).limit(page_size + 1).all()
+
+        result["has_more"] = len(rows) > page_size
+        result["results"] = [
+            {
+                "entity_type": row.entity_type,
+                "system_id": row.system_id,
+                "tenant_id": row.tenant_id,
+                "title": row.title,
+                "snippet": row.snippet,
+                "rank": round(float(row.rank), 4)
+            }
+            for row in rows[:page_size]
+        ]
+        return result
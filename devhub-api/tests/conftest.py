@@ -0,0 +1,53 @@
+"""
+Shared fixtures
+
+pg_db runs a test against PostgreSQL: set TEST_DATABASE_URL to a database the tests may
+create schemas in. Each test gets its own schema with every model table, dropped afterwards.
+"""
+import os
+import uuid
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.schema import AddConstraint, CreateIndex, CreateTable
+import pytest
+
+from devhub_api.database import Base
+from devhub_api import models  # noqa: F401  (registers every table on Base.metadata)
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+
+@pytest.fixture
+def pg_db():
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+
+    schema = f"test_{uuid.uuid4().hex[:12]}"
+    engine = create_engine(TEST_DATABASE_URL, connect_args={"options": f"-csearch_path={schema}"})
+    with engine.begin() as conn:
+        conn.execute(text(f'CREATE SCHEMA "{schema}"'))
+        # Foreign keys go last: unique system_id columns are backed by unique indexes
+        for table in Base.metadata.sorted_tables:
+            conn.execute(CreateTable(table, include_foreign_key_constraints=[]))
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                # Trigram and similar indexes need extensions the test server may not have
+                savepoint = conn.begin_nested()
+                try:
+                    conn.execute(CreateIndex(index))
+                    savepoint.commit()
+                except Exception:
+                    savepoint.rollback()
+        for table in Base.metadata.sorted_tables:
+            for constraint in table.foreign_key_constraints:
+                conn.execute(AddConstraint(constraint))
+
+    session = sessionmaker(bind=engine, autoflush=False)()
+    try:
+        yield session
+    finally:
+        session.close()
+        with engine.begin() as conn:
+            conn.execute(text(f'DROP SCHEMA "{schema}" CASCADE'))
+        engine.dispose()
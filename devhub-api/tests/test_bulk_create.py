@@ -0,0 +1,59 @@
+"""
+DatabaseManager.create_records against an in-memory SQLite database
+"""
+from sqlalchemy import Column, Integer, String, create_engine
+from sqlalchemy.orm import declarative_base, sessionmaker
+import pytest
+
+from devhub_api.database_manager import DatabaseManager
+from devhub_api.id_system import IDGenerator
+
+Base = declarative_base()
+
+
+class Contact(Base):
+    __tablename__ = "contacts"
+
+    id = Column(Integer, primary_key=True)
+    system_id = Column(String, unique=True)
+    name = Column(String, nullable=False)
+    email = Column(String, nullable=True)
+    phone = Column(String, nullable=True)
+    source = Column(String, nullable=True, default="unknown")
+
+
+@pytest.fixture
+def db(monkeypatch):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    monkeypatch.setitem(DatabaseManager.BULK_CREATE_TABLES, "contacts", ("contact", Contact, {}))
+    # reserve_ids takes a PostgreSQL advisory lock
+    monkeypatch.setattr(IDGenerator, "reserve_ids",
+                        lambda entity_type, db, count: [f"CON-{n:03d}" for n in range(count)])
+    yield session
+    session.close()
+
+
+def test_rows_setting_different_columns_keep_their_values(db):
+    rows = [
+        {"name": "Ada"},
+        {"name": "Grace", "email": "grace@example.com"},
+        {"name": "Linus", "phone": "555-0100", "source": "referral"},
+        {"name": "Barbara", "email": "barbara@example.com"},
+    ]
+
+    result = DatabaseManager.create_records(db, "contacts", rows)
+
+    assert result["success"] and result["created"] == 4
+    assert [record["index"] for record in result["records"]] == [0, 1, 2, 3]
+    for row, record in zip(rows, result["records"]):
+        assert record["name"] == row["name"]
+
+    stored = {contact.name: contact for contact in db.query(Contact).all()}
+    assert stored["Ada"].email is None and stored["Ada"].source == "unknown"
+    assert stored["Grace"].email == "grace@example.com"
+    assert stored["Linus"].phone == "555-0100" and stored["Linus"].source == "referral"
+    assert stored["Barbara"].email == "barbara@example.com"
+    assert {record["system_id"]: record["name"] for record in result["records"]} == \
+        {contact.system_id: contact.name for contact in stored.values()}
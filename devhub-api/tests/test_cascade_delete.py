@@ -0,0 +1,104 @@
+"""
+CascadePlanner deletes against PostgreSQL (see conftest.pg_db)
+"""
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Delete
+import pytest
+
+from devhub_api.database_manager import CascadePlanner
+from devhub_api.models import Tenant, User, Project, ProjectAssignment, Lead, LeadStageEvent
+
+
+@pytest.fixture
+def planner_db(pg_db):
+    # The reflected graph is cached per process; each test has its own schema
+    CascadePlanner.invalidate()
+    yield pg_db
+    CascadePlanner.invalidate()
+
+
+@pytest.fixture
+def project(planner_db):
+    planner_db.add(Tenant(system_id="TNT-001", business_name="Acme"))
+    planner_db.flush()
+    planner_db.add(Project(system_id="PRJ-001", name="Launch", tenant_id="TNT-001"))
+    for n in range(5):
+        planner_db.add(User(system_id=f"USR-{n:03d}", email=f"user{n}@example.com", tenant_id="TNT-001"))
+    planner_db.flush()
+    for n in range(5):
+        planner_db.add(ProjectAssignment(user_id=f"USR-{n:03d}", project_id="PRJ-001"))
+    planner_db.commit()
+    return "PRJ-001"
+
+
+def remaining(db):
+    with Session(db.get_bind()) as other:
+        return (
+            other.query(Project).count(),
+            other.query(ProjectAssignment).count()
+        )
+
+
+def test_failed_delete_keeps_committed_batches_and_resumes(planner_db, project, monkeypatch):
+    execute = planner_db.execute
+    deletes = []
+
+    def failing_execute(statement, *args, **kwargs):
+        if isinstance(statement, Delete) and statement.table.name == "project_assignments":
+            deletes.append(statement)
+            if len(deletes) == 2:
+                raise RuntimeError("connection lost")
+        return execute(statement, *args, **kwargs)
+
+    monkeypatch.setattr(planner_db, "execute", failing_execute)
+    with pytest.raises(RuntimeError, match="repeat the delete"):
+        CascadePlanner.execute(planner_db, "projects", project, batch_size=2)
+
+    # The first batch of assignments was committed; the project is deleted last
+    assert remaining(planner_db) == (1, 3)
+
+    monkeypatch.setattr(planner_db, "execute", execute)
+    result = CascadePlanner.execute(planner_db, "projects", project, batch_size=2)
+
+    assert result["rows_affected"]["project_assignments"] == 3 and result["rows_deleted"] == 4
+    assert remaining(planner_db) == (0, 0)
+
+
+def test_lead_delete_takes_its_stage_history(planner_db):
+    planner_db.add(Tenant(system_id="TNT-001", business_name="Acme"))
+    planner_db.flush()
+    planner_db.add_all([
+        User(system_id="USR-001", email="rep@example.com", tenant_id="TNT-001"),
+        Lead(system_id="LED-001", tenant_id="TNT-001", name="Dana", stage="qualified")
+    ])
+    planner_db.flush()
+    planner_db.add_all([
+        LeadStageEvent(tenant_id="TNT-001", lead_id="LED-001", from_stage=None, to_stage="new"),
+        LeadStageEvent(tenant_id="TNT-001", lead_id="LED-001", from_stage="new", to_stage="qualified",
+                       changed_by="USR-001")
+    ])
+    planner_db.commit()
+
+    plan = CascadePlanner.plan(planner_db, "leads", "LED-001")
+    assert not plan["blocked"] and plan["rows_deleted"] == 3
+
+    CascadePlanner.execute(planner_db, "leads", "LED-001")
+    assert planner_db.query(Lead).count() == 0
+    assert planner_db.query(LeadStageEvent).count() == 0
+
+
+def test_user_delete_keeps_the_stage_events_they_made(planner_db):
+    planner_db.add(Tenant(system_id="TNT-001", business_name="Acme"))
+    planner_db.flush()
+    planner_db.add_all([
+        User(system_id="USR-001", email="rep@example.com", tenant_id="TNT-001"),
+        Lead(system_id="LED-001", tenant_id="TNT-001", name="Dana", stage="new")
+    ])
+    planner_db.flush()
+    planner_db.add(LeadStageEvent(tenant_id="TNT-001", lead_id="LED-001", to_stage="new", changed_by="USR-001"))
+    planner_db.commit()
+
+    CascadePlanner.execute(planner_db, "users", "USR-001")
+
+    planner_db.expire_all()
+    assert planner_db.query(LeadStageEvent).one().changed_by is None
@@ -0,0 +1,50 @@
+"""
+DatabaseValidator.validate_incremental against PostgreSQL (see conftest.pg_db)
+"""
+from sqlalchemy import text
+import pytest
+
+from devhub_api.database_manager import DatabaseValidator
+from devhub_api.models import User, IntegrityIssue
+
+
+@pytest.fixture
+def duplicated_users(pg_db):
+    # Databases created before system_id became unique can still hold duplicates; dropping
+    # the unique index also drops the foreign keys that reference users.system_id
+    pg_db.execute(text("DROP INDEX ix_users_system_id CASCADE"))
+    first = User(system_id="USR-001", email="first@example.com", full_name="First")
+    second = User(system_id="USR-001", email="second@example.com", full_name="Second")
+    pg_db.add_all([first, second])
+    pg_db.commit()
+    return first, second
+
+
+def duplicate_issue(db):
+    db.expire_all()
+    return db.query(IntegrityIssue).filter(
+        IntegrityIssue.check_name == "id_duplicates:users",
+        IntegrityIssue.record_key == "USR-001"
+    ).one()
+
+
+def test_duplicate_resolves_when_one_copy_is_deleted(pg_db, duplicated_users):
+    DatabaseValidator.validate_incremental(pg_db)
+    assert duplicate_issue(pg_db).resolved_at is None
+
+    pg_db.delete(duplicated_users[1])
+    pg_db.commit()
+    DatabaseValidator.validate_incremental(pg_db)
+
+    assert duplicate_issue(pg_db).resolved_at is not None
+
+
+def test_duplicate_resolves_when_one_copy_is_renamed(pg_db, duplicated_users):
+    DatabaseValidator.validate_incremental(pg_db)
+    assert duplicate_issue(pg_db).resolved_at is None
+
+    duplicated_users[1].system_id = "USR-002"
+    pg_db.commit()
+    DatabaseValidator.validate_incremental(pg_db)
+
+    assert duplicate_issue(pg_db).resolved_at is not None
@@ -0,0 +1,71 @@
+"""
+Incremental LeadScoringService.score_leads against PostgreSQL (see conftest.pg_db)
+"""
+from datetime import datetime, timedelta, timezone
+
+from fastapi import HTTPException
+from sqlalchemy import text
+import pytest
+
+from devhub_api.models import Tenant, User, Lead, LeadInteraction, SyncWatermark
+from devhub_api.services.formula_profiles import FormulaProfileService
+from devhub_api.services.lead_scoring import LeadScoringService
+
+
+@pytest.fixture
+def engaged_lead(pg_db):
+    created = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=LeadScoringService.RECENT_DAYS - 1)
+    pg_db.add(Tenant(system_id="TNT-001", business_name="Acme"))
+    pg_db.flush()
+    pg_db.add_all([
+        User(system_id="USR-001", email="rep@example.com", tenant_id="TNT-001"),
+        Lead(system_id="LED-001", tenant_id="TNT-001", name="Dana", stage="qualified", estimated_value=5000)
+    ])
+    pg_db.flush()
+    for n in range(LeadScoringService.HIGH_ENGAGEMENT_INTERACTIONS):
+        pg_db.add(LeadInteraction(
+            system_id=f"LI-{n:03d}", lead_id="LED-001", user_id="USR-001", interaction_type="call",
+            created_at=created, updated_at=created
+        ))
+    pg_db.commit()
+    return "LED-001"
+
+
+def probability(db, system_id):
+    db.expire_all()
+    return db.query(Lead).filter(Lead.system_id == system_id).one().probability
+
+
+def test_interactions_leaving_the_recent_window_rescore_the_lead(pg_db, engaged_lead):
+    assert LeadScoringService.score_leads(pg_db)["mode"] == "full"
+    engaged = probability(pg_db, engaged_lead)
+
+    # Two days later, with nothing written in between: the interactions are now older
+    # than RECENT_DAYS, and the lead no longer counts as highly engaged
+    pg_db.query(SyncWatermark).filter(SyncWatermark.scope == LeadScoringService.WINDOW_SCOPE).update(
+        {SyncWatermark.last_updated_at: SyncWatermark.last_updated_at - timedelta(days=2)}
+    )
+    pg_db.execute(text("UPDATE lead_interactions SET created_at = created_at - interval '2 days'"))
+    pg_db.commit()
+
+    result = LeadScoringService.score_leads(pg_db)
+
+    assert result["mode"] == "incremental" and result["scored"] == 1
+    assert probability(pg_db, engaged_lead) < engaged
+
+
+def test_profile_update_rescores_the_tenants_leads(pg_db, engaged_lead):
+    LeadScoringService.score_leads(pg_db)
+    assert LeadScoringService.score_leads(pg_db)["scored"] == 0
+
+    FormulaProfileService.update(pg_db, "TNT-001", {"lifecycle_weights": {"engagement": 0.5}})
+    pg_db.commit()
+    result = LeadScoringService.score_leads(pg_db)
+
+    assert result["mode"] == "incremental" and result["scored"] == 1
+
+
+def test_profile_update_rejects_malformed_communication_times(pg_db, engaged_lead):
+    with pytest.raises(HTTPException) as error:
+        FormulaProfileService.update(pg_db, "TNT-001", {"communication_norms": {"communication_times": "9 AM"}})
+    assert error.value.status_code == 422
@@ -0,0 +1,48 @@
+"""
+Lead writes through DatabaseManager record stage history (see conftest.pg_db)
+"""
+import pytest
+
+from devhub_api.database_manager import DatabaseManager
+from devhub_api.models import Tenant, LeadStageEvent
+
+
+@pytest.fixture
+def tenant(pg_db):
+    pg_db.add(Tenant(system_id="TNT-001", business_name="Acme"))
+    pg_db.commit()
+    return "TNT-001"
+
+
+def stage_events(db):
+    db.expire_all()
+    return [
+        (event.lead_id, event.from_stage, event.to_stage)
+        for event in db.query(LeadStageEvent).order_by(LeadStageEvent.id)
+    ]
+
+
+def test_created_leads_start_their_stage_history(pg_db, tenant):
+    single = DatabaseManager.create_record(pg_db, "leads", {"tenant_id": tenant, "name": "Dana"})
+    bulk = DatabaseManager.create_records(pg_db, "leads", [
+        {"tenant_id": tenant, "name": "Eli"},
+        {"tenant_id": tenant, "name": "Fay", "stage": "qualified"},
+        {"tenant_id": "TNT-404", "name": "Gus"},
+    ])
+
+    assert single["success"] and bulk["created"] == 2 and len(bulk["errors"]) == 1
+    lead_ids = [single["record"]["system_id"]] + [record["system_id"] for record in bulk["records"]]
+    assert sorted(stage_events(pg_db)) == sorted([
+        (lead_ids[0], None, "prospect"),
+        (lead_ids[1], None, "prospect"),
+        (lead_ids[2], None, "qualified"),
+    ])
+
+
+def test_stage_updates_are_recorded(pg_db, tenant):
+    lead_id = DatabaseManager.create_record(pg_db, "leads", {"tenant_id": tenant, "name": "Dana"})["record"]["system_id"]
+
+    assert DatabaseManager.update_record(pg_db, "leads", lead_id, {"name": "Dana Lee"})["success"]
+    assert DatabaseManager.update_record(pg_db, "leads", lead_id, {"stage": "contacted"})["success"]
+
+    assert stage_events(pg_db) == [(lead_id, None, "prospect"), (lead_id, "prospect", "contacted")]